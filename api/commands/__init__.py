@@ -44,8 +44,13 @@ from .system import (
 )
 from .vector import (
     add_qdrant_index,
+    create_pgvector_document_id_indexes,
     migrate_annotation_vector_database,
+    migrate_embedding_cache_format,
+    migrate_keyword_index,
     migrate_knowledge_vector_database,
+    migrate_pgvector_full_text_search,
+    migrate_pgvector_vector_index,
     old_metadata_migration,
     vdb_migrate,
 )
@@ -62,6 +67,7 @@ __all__ = [
     "clear_free_plan_tenant_expired_logs",
     "clear_orphaned_file_records",
     "convert_to_agent_apps",
+    "create_pgvector_document_id_indexes",
     "create_tenant",
     "data_migrate",
     "delete_archived_workflow_runs",
@@ -79,9 +85,13 @@ __all__ = [
     "migrate_annotation_vector_database",
     "migrate_data_for_plugin",
     "migrate_dataset_permissions_to_rbac",
+    "migrate_embedding_cache_format",
+    "migrate_keyword_index",
     "migrate_knowledge_vector_database",
     "migrate_member_roles_to_rbac",
     "migrate_oss",
+    "migrate_pgvector_full_text_search",
+    "migrate_pgvector_vector_index",
     "migration_data_wizard",
     "old_metadata_migration",
     "remove_orphaned_files_on_storage",
@@ -1,21 +1,31 @@
 import json
-from typing import cast
+from typing import Any, Literal, cast
 
 import click
 from flask import current_app
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
 from configs import dify_config
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.index_processor.constant.built_in_field import BuiltInField
 from core.rag.index_processor.constant.index_type import IndexStructureType, IndexTechniqueType
 from core.rag.models.document import ChildDocument, Document
 from extensions.ext_database import db
+from libs.embedding_codec import EmbeddingStorageDType, decode_embedding, encode_embedding, is_compact_embedding
 from libs.pagination import paginate_query
-from models.dataset import Dataset, DatasetCollectionBinding, DatasetMetadata, DatasetMetadataBinding, DocumentSegment
+from models.dataset import (
+    Dataset,
+    DatasetCollectionBinding,
+    DatasetKeywordTable,
+    DatasetMetadata,
+    DatasetMetadataBinding,
+    DocumentSegment,
+    Embedding,
+)
 from models.dataset import Document as DatasetDocument
 from models.enums import DatasetMetadataType, IndexingStatus, SegmentStatus
 from models.model import App, AppAnnotationSetting, MessageAnnotation
@@ -399,6 +409,329 @@ def add_qdrant_index(field: str):
     click.echo(click.style(f"Index creation complete. Created {create_count} collection indexes.", fg="green"))
 
 
+@click.command("migrate-embedding-cache-format", help="Rewrite pickled embedding cache rows in the compact format.")
+@click.option(
+    "--batch-size", default=500, show_default=True, help="Number of embedding rows converted per transaction."
+)
+@click.option(
+    "--dtype",
+    type=click.Choice([dtype.value for dtype in EmbeddingStorageDType]),
+    default=None,
+    help="Element type for converted rows. Defaults to EMBEDDING_CACHE_STORAGE_DTYPE.",
+)
+@click.option("--dry-run", is_flag=True, default=False, help="Count legacy rows without rewriting them.")
+def migrate_embedding_cache_format(batch_size: int, dtype: str | None, dry_run: bool):
+    """
+    Convert legacy pickled rows in the embeddings table to the compact binary format.
+
+    Rows are walked in primary-key order and each batch is committed on its own, so the
+    command can be interrupted and re-run; rows already in the compact format are skipped.
+    """
+    storage_dtype = EmbeddingStorageDType(dtype or dify_config.EMBEDDING_CACHE_STORAGE_DTYPE)
+    click.echo(click.style(f"Starting embedding cache format migration ({storage_dtype}).", fg="green"))
+    scanned_count = 0
+    converted_count = 0
+    failed_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(Embedding.id, Embedding.embedding).order_by(Embedding.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(Embedding.id > last_id)
+            rows = session.execute(stmt).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            scanned_count += len(rows)
+
+            converted_rows = []
+            for row in rows:
+                if is_compact_embedding(row.embedding):
+                    continue
+                try:
+                    vector = decode_embedding(row.embedding)
+                    converted_rows.append({"id": row.id, "embedding": encode_embedding(vector, storage_dtype)})
+                except Exception as e:
+                    failed_count += 1
+                    click.echo(click.style(f"Failed to convert embedding cache row {row.id}: {e}", fg="red"))
+            converted_count += len(converted_rows)
+            if converted_rows and not dry_run:
+                # ORM bulk UPDATE by primary key: one executemany per batch.
+                session.execute(update(Embedding), converted_rows)
+        click.echo(
+            f"Scanned {scanned_count} rows, {'found' if dry_run else 'converted'} {converted_count} legacy rows."
+        )
+
+    click.echo(
+        click.style(
+            f"Embedding cache format migration finished: scanned {scanned_count}, "
+            f"{'legacy' if dry_run else 'converted'} {converted_count}, failed {failed_count}.",
+            fg="green",
+        )
+    )
+
+
+@click.command("migrate-keyword-index", help="Backfill the inverted keyword index from keyword tables.")
+@click.option("--dataset-id", default=None, help="Only backfill this dataset. Defaults to every dataset.")
+def migrate_keyword_index(dataset_id: str | None):
+    """
+    Rebuild dataset_keyword_postings from the JSON keyword tables written by the jieba keyword store.
+
+    Run it before switching KEYWORD_STORE to jieba_inverted. Each dataset is rebuilt in its own
+    transaction and the keyword tables are left in place, so the command can be re-run and
+    KEYWORD_STORE can be switched back.
+    """
+    click.echo(click.style("Starting keyword index migration.", fg="green"))
+    migrated_count = 0
+    skipped_count = 0
+    failed_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(DatasetKeywordTable).order_by(DatasetKeywordTable.id).limit(1)
+            if last_id is not None:
+                stmt = stmt.where(DatasetKeywordTable.id > last_id)
+            if dataset_id:
+                stmt = stmt.where(DatasetKeywordTable.dataset_id == dataset_id)
+            dataset_keyword_table = session.scalar(stmt)
+            if dataset_keyword_table is None:
+                break
+            last_id = dataset_keyword_table.id
+
+            dataset = session.get(Dataset, dataset_keyword_table.dataset_id)
+            keyword_table_dict = dataset_keyword_table.get_keyword_table_dict(session=session)
+            if dataset is None or not keyword_table_dict:
+                skipped_count += 1
+                continue
+            try:
+                with session.begin_nested():
+                    data: Any = keyword_table_dict["__data__"]
+                    JiebaInvertedIndex(dataset).rebuild_from_keyword_table(data["table"] or {}, session)
+                migrated_count += 1
+            except Exception as e:
+                failed_count += 1
+                click.echo(click.style(f"Failed to migrate keyword index of dataset {dataset.id}: {e}", fg="red"))
+
+    click.echo(
+        click.style(
+            f"Keyword index migration finished: migrated {migrated_count}, "
+            f"skipped {skipped_count}, failed {failed_count}.",
+            fg="green",
+        )
+    )
+
+
+@click.command(
+    "migrate-pgvector-full-text-search", help="Add stored tsvector columns and GIN indexes to PGVector collections."
+)
+@click.option(
+    "--text-search-config",
+    default=None,
+    help="Text search configuration of the new columns. Defaults to PGVECTOR_TEXT_SEARCH_CONFIG.",
+)
+@click.option("--batch-size", default=1000, show_default=True, help="Number of rows backfilled per transaction.")
+@click.option("--dataset-id", default=None, help="Only migrate this dataset. Defaults to every PGVector dataset.")
+def migrate_pgvector_full_text_search(text_search_config: str | None, batch_size: int, dataset_id: str | None):
+    """
+    Backfill the stored full-text column of PGVector collections created before it existed.
+
+    Collections keep using query-time tokenization until their column is backfilled and indexed;
+    the dataset then records its text search configuration and full-text queries switch over. The
+    backfill commits per batch and the index is built concurrently, so it can run online and be re-run.
+    """
+    from dify_vdb_pgvector.pgvector import PGVector, PGVectorFactory
+
+    text_search_config = text_search_config or dify_config.PGVECTOR_TEXT_SEARCH_CONFIG
+    pgvector_config = PGVectorFactory.pgvector_config()
+    click.echo(click.style(f"Starting PGVector full-text search migration ({text_search_config}).", fg="green"))
+    migrated_count = 0
+    skipped_count = 0
+    failed_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(Dataset).where(Dataset.index_struct.is_not(None)).order_by(Dataset.id).limit(1)
+            if last_id is not None:
+                stmt = stmt.where(Dataset.id > last_id)
+            if dataset_id:
+                stmt = stmt.where(Dataset.id == dataset_id)
+            dataset = session.scalar(stmt)
+            if dataset is None:
+                break
+            last_id = dataset.id
+            index_struct_dict = dataset.index_struct_dict
+
+        if (
+            not index_struct_dict
+            or index_struct_dict["type"] != VectorType.PGVECTOR
+            or index_struct_dict["vector_store"].get("text_search_config")
+        ):
+            skipped_count += 1
+            continue
+
+        # The backfill can take long; it runs without holding the dataset row's transaction open.
+        vector = PGVector(index_struct_dict["vector_store"]["class_prefix"], pgvector_config)
+        try:
+            backfilled = vector.migrate_full_text_search(text_search_config, batch_size=batch_size)
+        except Exception as e:
+            failed_count += 1
+            click.echo(click.style(f"Failed to migrate full-text search of dataset {last_id}: {e}", fg="red"))
+            continue
+        finally:
+            vector.pool.closeall()
+
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            dataset = session.get(Dataset, last_id)
+            if dataset is None or not dataset.index_struct_dict:
+                continue
+            index_struct_dict = dataset.index_struct_dict
+            index_struct_dict["vector_store"]["text_search_config"] = text_search_config
+            dataset.index_struct = json.dumps(index_struct_dict)
+        migrated_count += 1
+        click.echo(f"Migrated dataset {last_id}, backfilled {backfilled} rows.")
+
+    click.echo(
+        click.style(
+            f"PGVector full-text search migration finished: migrated {migrated_count}, "
+            f"skipped {skipped_count}, failed {failed_count}.",
+            fg="green",
+        )
+    )
+
+
+@click.command(
+    "migrate-pgvector-vector-index", help="Add halfvec or binary quantized HNSW indexes to PGVector collections."
+)
+@click.option(
+    "--index-type",
+    type=click.Choice(["halfvec", "binary"]),
+    default=None,
+    help="Index type to build. Defaults to PGVECTOR_INDEX_TYPE.",
+)
+@click.option("--dataset-id", default=None, help="Only migrate this dataset. Defaults to every PGVector dataset.")
+def migrate_pgvector_vector_index(index_type: Literal["halfvec", "binary"] | None, dataset_id: str | None):
+    """
+    Build quantized HNSW indexes for PGVector collections created with the full-precision index type.
+
+    The index is built concurrently; the dataset records its index type afterwards, which switches its
+    vector queries to the quantized index with re-ranking. Collections too large for the index type are skipped.
+    """
+    from dify_vdb_pgvector.pgvector import PGVector, PGVectorFactory
+
+    target_index_type = index_type or dify_config.PGVECTOR_INDEX_TYPE
+    if target_index_type == "vector":
+        click.echo(click.style("Specify --index-type or set PGVECTOR_INDEX_TYPE to halfvec or binary.", fg="red"))
+        return
+    pgvector_config = PGVectorFactory.pgvector_config()
+    click.echo(click.style(f"Starting PGVector vector index migration ({target_index_type}).", fg="green"))
+    migrated_count = 0
+    skipped_count = 0
+    failed_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(Dataset).where(Dataset.index_struct.is_not(None)).order_by(Dataset.id).limit(1)
+            if last_id is not None:
+                stmt = stmt.where(Dataset.id > last_id)
+            if dataset_id:
+                stmt = stmt.where(Dataset.id == dataset_id)
+            dataset = session.scalar(stmt)
+            if dataset is None:
+                break
+            last_id = dataset.id
+
+            index_struct_dict = dataset.index_struct_dict
+            if (
+                not index_struct_dict
+                or index_struct_dict["type"] != VectorType.PGVECTOR
+                or index_struct_dict["vector_store"].get("index_type", "vector") == target_index_type
+            ):
+                skipped_count += 1
+                continue
+
+            vector = PGVector(index_struct_dict["vector_store"]["class_prefix"], pgvector_config)
+            try:
+                indexed = vector.migrate_vector_index(target_index_type)
+            except Exception as e:
+                failed_count += 1
+                click.echo(click.style(f"Failed to migrate vector index of dataset {dataset.id}: {e}", fg="red"))
+                continue
+            finally:
+                vector.pool.closeall()
+
+            if not indexed:
+                skipped_count += 1
+                click.echo(f"Skipped dataset {dataset.id}: too many dimensions for a {target_index_type} index.")
+                continue
+            index_struct_dict["vector_store"]["index_type"] = target_index_type
+            dataset.index_struct = json.dumps(index_struct_dict)
+            migrated_count += 1
+            click.echo(f"Migrated dataset {dataset.id}.")
+
+    click.echo(
+        click.style(
+            f"PGVector vector index migration finished: migrated {migrated_count}, "
+            f"skipped {skipped_count}, failed {failed_count}.",
+            fg="green",
+        )
+    )
+
+
+@click.command(
+    "create-pgvector-document-id-indexes", help="Index the document id of PGVector collections created without it."
+)
+@click.option("--dataset-id", default=None, help="Only index this dataset. Defaults to every PGVector dataset.")
+def create_pgvector_document_id_indexes(dataset_id: str | None):
+    """
+    Build the document id index that filtered PGVector searches use on collections created before it existed.
+
+    Indexes are built concurrently and queries pick them up as soon as they are valid, so this can run online.
+    """
+    from dify_vdb_pgvector.pgvector import PGVector, PGVectorFactory
+
+    pgvector_config = PGVectorFactory.pgvector_config()
+    click.echo(click.style("Starting PGVector document id indexing.", fg="green"))
+    indexed_count = 0
+    skipped_count = 0
+    failed_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(Dataset).where(Dataset.index_struct.is_not(None)).order_by(Dataset.id).limit(1)
+            if last_id is not None:
+                stmt = stmt.where(Dataset.id > last_id)
+            if dataset_id:
+                stmt = stmt.where(Dataset.id == dataset_id)
+            dataset = session.scalar(stmt)
+            if dataset is None:
+                break
+            last_id = dataset.id
+
+            index_struct_dict = dataset.index_struct_dict
+            if not index_struct_dict or index_struct_dict["type"] != VectorType.PGVECTOR:
+                skipped_count += 1
+                continue
+
+            vector = PGVector(index_struct_dict["vector_store"]["class_prefix"], pgvector_config)
+            try:
+                vector.create_document_id_index()
+            except Exception as e:
+                failed_count += 1
+                click.echo(click.style(f"Failed to index document ids of dataset {dataset.id}: {e}", fg="red"))
+                continue
+            finally:
+                vector.pool.closeall()
+            indexed_count += 1
+
+    click.echo(
+        click.style(
+            f"PGVector document id indexing finished: indexed {indexed_count}, "
+            f"skipped {skipped_count}, failed {failed_count}.",
+            fg="green",
+        )
+    )
+
+
 @click.command("old-metadata-migration", help="Old metadata migration.")
 def old_metadata_migration():
     """
@@ -7,6 +7,7 @@ from pydantic import (
     Field,
     HttpUrl,
     NegativeInt,
+    NonNegativeFloat,
     NonNegativeInt,
     PositiveFloat,
     PositiveInt,
@@ -219,6 +220,18 @@ class AsyncWorkflowConfig(BaseSettings):
         ge=1,
     )
 
+    ASYNC_WORKFLOW_CFS_ENABLED: bool = Field(
+        description="Share async workflow workers fairly between tenants: track each tenant's runtime in Redis, "
+        "defer and pause runs of tenants that are ahead of a waiting tenant by more than the scheduler "
+        "granularity, and resume them on their queue later",
+        default=False,
+    )
+
+    ASYNC_WORKFLOW_CFS_IDLE_TIMEOUT: PositiveInt = Field(
+        description="Seconds without any queued or running workflow after which a tenant leaves the fair scheduler",
+        default=3600,
+    )
+
 
 class PluginConfig(BaseSettings):
     """
@@ -810,6 +823,58 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    MODEL_LB_STRATEGY: Literal["round_robin", "least_outstanding", "latency_weighted", "token_bucket"] = Field(
+        description="Policy used to pick a load balancing config: round_robin, least_outstanding (fewest in-flight"
+        " requests), latency_weighted (weighted by EWMA latency) or token_bucket (most remaining rate budget)",
+        default="round_robin",
+    )
+
+    MODEL_LB_HEALTH_CACHE_TTL: NonNegativeFloat = Field(
+        description="Seconds a worker reuses the shared load balancing health state before re-reading it from Redis",
+        default=1.0,
+    )
+
+    MODEL_LB_LATENCY_EWMA_ALPHA: PositiveFloat = Field(
+        description="Smoothing factor (0-1] of the exponentially weighted latency used by the latency_weighted policy",
+        default=0.3,
+        le=1.0,
+    )
+
+    MODEL_LB_TOKEN_BUCKET_CAPACITY: PositiveFloat = Field(
+        description="Burst size in requests of each load balancing config's token bucket",
+        default=10.0,
+    )
+
+    MODEL_LB_TOKEN_BUCKET_REFILL_RATE: PositiveFloat = Field(
+        description="Requests per second refilled into each load balancing config's token bucket",
+        default=1.0,
+    )
+
+    MODEL_LB_OUTSTANDING_MAX_AGE: PositiveInt = Field(
+        description="Seconds after which a request still counted in flight by least_outstanding is dropped,"
+        " so requests of workers that died mid-request stop counting",
+        default=600,
+    )
+
+
+class ProviderConfigurationCacheConfig(BaseSettings):
+    """
+    Configuration for the per-worker cache of assembled tenant provider configurations
+    """
+
+    PROVIDER_CONFIGURATIONS_CACHE_MAX_TENANTS: NonNegativeInt = Field(
+        description="Maximum number of tenants whose assembled provider configurations are kept per worker process."
+        " Set to 0 to disable the cache.",
+        default=256,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: PositiveInt = Field(
+        description="Maximum age in seconds of a cached assembled provider configuration. Bounds how long quota usage"
+        " and plugin changes that do not bump a configuration version can stay stale. Capped at 300 seconds.",
+        default=60,
+        le=300,
+    )
+
 
 class UpdateConfig(BaseSettings):
     """
@@ -964,10 +1029,24 @@ class RepositoryConfig(BaseSettings):
         "'core.repositories.sqlalchemy_workflow_node_execution_repository."
         "SQLAlchemyWorkflowNodeExecutionRepository' (default), "
         "'core.repositories.celery_workflow_node_execution_repository."
-        "CeleryWorkflowNodeExecutionRepository'",
+        "CeleryWorkflowNodeExecutionRepository', "
+        "'core.repositories.write_behind_workflow_node_execution_repository."
+        "WriteBehindWorkflowNodeExecutionRepository'",
         default="core.repositories.sqlalchemy_workflow_node_execution_repository.SQLAlchemyWorkflowNodeExecutionRepository",
     )
 
+    WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Seconds the write-behind and Celery node execution repositories buffer node state "
+        "before writing or dispatching it",
+        default=1.0,
+    )
+
+    WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum node executions per upsert of the write-behind node execution repository "
+        "and per Celery message of the Celery one; reaching it also triggers an immediate flush",
+        default=100,
+    )
+
     API_WORKFLOW_NODE_EXECUTION_REPOSITORY: str = Field(
         description="Service-layer repository implementation for WorkflowNodeExecutionModel operations. "
         "Specify as a module path",
@@ -1229,6 +1308,55 @@ class RagEtlConfig(BaseSettings):
         default="database",
     )
 
+    KEYWORD_TABLE_CACHE_MAX_DATASETS: NonNegativeInt = Field(
+        description="Maximum number of decoded jieba keyword tables cached per process for search (0 to disable)",
+        default=32,
+    )
+
+    WEIGHT_RERANK_BM25_K1: NonNegativeFloat = Field(
+        description="BM25 term frequency saturation (k1) used by the keyword part of weighted-score reranking",
+        default=1.2,
+    )
+
+    WEIGHT_RERANK_BM25_B: float = Field(
+        ge=0,
+        le=1,
+        description="BM25 document length normalization (b) used by the keyword part of weighted-score reranking",
+        default=0.75,
+    )
+
+    WEIGHT_RERANK_BM25_SATURATION: PositiveFloat = Field(
+        description="BM25 score that weighted-score reranking maps to a keyword score of 0.5; keyword scores are"
+        " score / (score + saturation)",
+        default=1.0,
+    )
+
+    PDF_EXTRACTION_MAX_WORKERS: NonNegativeInt = Field(
+        description="Number of worker processes extracting the pages of large PDFs in parallel"
+        " (0 or 1 to extract in the calling process)",
+        default=0,
+    )
+
+    PDF_EXTRACTION_PARALLEL_MIN_PAGES: PositiveInt = Field(
+        description="Minimum number of pages for a PDF to be extracted by worker processes",
+        default=64,
+    )
+
+    PDF_EXTRACTION_PAGES_PER_TASK: PositiveInt = Field(
+        description="Number of consecutive PDF pages extracted by a worker process per task",
+        default=16,
+    )
+
+    PDF_EXTRACTION_CACHE_ENABLED: bool = Field(
+        description="Reuse the extraction of a PDF with identical content uploaded before to the same workspace",
+        default=False,
+    )
+
+    PDF_EXTRACTION_CACHE_TTL_DAYS: PositiveInt = Field(
+        description="Days a cached PDF extraction is reused before it expires and is deleted from storage",
+        default=7,
+    )
+
     UNSTRUCTURED_API_URL: str | None = Field(
         description="API URL for Unstructured.io service",
         default=None,
@@ -1290,6 +1418,17 @@ class DataSetConfig(BaseSettings):
         default=0,
     )
 
+    RETRIEVAL_RESULT_CACHE_ENABLED: bool = Field(
+        description="Cache the segments and scores retrieved from a dataset per query and retrieval settings"
+        " until the dataset's index changes",
+        default=False,
+    )
+
+    RETRIEVAL_RESULT_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of cached retrieval results",
+        default=600,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -1312,11 +1451,94 @@ class IndexingConfig(BaseSettings):
         default=4000,
     )
 
+    INDEXING_SEGMENTATION_LENGTH_UNIT: Literal["character", "token"] = Field(
+        description="Unit of segment length limits during indexing: 'character', or 'token' to count tokens "
+        "with the embedding model's tokenizer",
+        default="character",
+    )
+
     CHILD_CHUNKS_PREVIEW_NUMBER: PositiveInt = Field(
         description="Maximum number of child chunks to preview",
         default=50,
     )
 
+    INDEXING_LOAD_MAX_WORKERS: PositiveInt = Field(
+        description="Number of worker threads building the vector index of one document",
+        default=10,
+    )
+
+    INDEXING_LOAD_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks embedded, written and marked completed per commit while building an index",
+        default=100,
+    )
+
+    EMBEDDING_MAX_CONCURRENT_REQUESTS: PositiveInt = Field(
+        description="Maximum in-flight document embedding requests per model provider in each process",
+        default=10,
+    )
+
+
+class EmbeddingCacheConfig(BaseSettings):
+    """
+    Configuration for the tiered document embedding cache
+    """
+
+    EMBEDDING_CACHE_LOOKUP_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of hashes resolved by a single embedding cache database or Redis lookup",
+        default=500,
+    )
+
+    EMBEDDING_CACHE_LOCAL_ENABLED: bool = Field(
+        description="Enable the in-process LRU tier in front of the embedding cache table",
+        default=False,
+    )
+
+    EMBEDDING_CACHE_LOCAL_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of embeddings kept in the in-process LRU tier per worker",
+        default=10000,
+    )
+
+    EMBEDDING_CACHE_REDIS_ENABLED: bool = Field(
+        description="Enable the shared Redis tier in front of the embedding cache table",
+        default=False,
+    )
+
+    EMBEDDING_CACHE_REDIS_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds for document embeddings stored in the Redis tier",
+        default=3600,
+    )
+
+    EMBEDDING_CACHE_STORAGE_DTYPE: Literal["float32", "float16"] = Field(
+        description="Element type used when writing cached embeddings in the compact binary format",
+        default="float32",
+    )
+
+    EMBEDDING_CACHE_HIT_TRACKING_ENABLED: bool = Field(
+        description="Record when cached embeddings are last hit so eviction can keep frequently used entries",
+        default=True,
+    )
+
+    EMBEDDING_CACHE_HIT_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Seconds a worker buffers embedding cache hits before writing their last hit time",
+        default=60.0,
+    )
+
+    EMBEDDING_CACHE_HIT_BUFFER_SIZE: PositiveInt = Field(
+        description="Number of distinct buffered embedding cache hits that triggers an early write",
+        default=10000,
+    )
+
+    EMBEDDING_CACHE_EVICTION_POLICY: Literal["lru", "age"] = Field(
+        description="Eviction policy of the embedding cache cleanup task: 'lru' evicts entries not hit within "
+        "the retention period, 'age' evicts entries created before it",
+        default="lru",
+    )
+
+    EMBEDDING_CACHE_EVICTION_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of embedding cache rows removed by a single DELETE of the cleanup task",
+        default=1000,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -1359,6 +1581,60 @@ class OpsTraceConfig(BaseSettings):
         default=1800,
     )
 
+    TRACE_QUEUE_MANAGER_INTERVAL: PositiveInt = Field(
+        description="Maximum delay in seconds before queued ops traces are exported as a batch.",
+        default=5,
+    )
+
+    TRACE_QUEUE_MANAGER_BATCH_SIZE: PositiveInt = Field(
+        description="Number of queued ops traces that triggers an export before the interval elapses.",
+        default=100,
+    )
+
+    TRACE_QUEUE_MANAGER_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of ops traces waiting for export per process; further traces are dropped.",
+        default=10000,
+    )
+
+    OPS_TRACE_SAMPLE_RATE: float = Field(
+        description="Fraction of ops traces exported for apps without a rate in OPS_TRACE_APP_SAMPLE_RATES.",
+        ge=0.0,
+        le=1.0,
+        default=1.0,
+    )
+
+    inner_OPS_TRACE_APP_SAMPLE_RATES: str = Field(
+        description="Comma-separated per-app sample rates overriding OPS_TRACE_SAMPLE_RATE, e.g. 'app-id:0.1'.",
+        validation_alias=AliasChoices("OPS_TRACE_APP_SAMPLE_RATES"),
+        default="",
+    )
+
+    @field_validator("inner_OPS_TRACE_APP_SAMPLE_RATES")
+    @classmethod
+    def validate_app_sample_rates(cls, value: str) -> str:
+        cls._parse_app_sample_rates(value)
+        return value
+
+    @staticmethod
+    def _parse_app_sample_rates(value: str) -> dict[str, float]:
+        rates: dict[str, float] = {}
+        for entry in value.split(","):
+            if not entry.strip():
+                continue
+            app_id, separator, raw_rate = entry.strip().rpartition(":")
+            if not separator or not app_id:
+                raise ValueError(f"Invalid OPS_TRACE_APP_SAMPLE_RATES entry: {entry!r}")
+            rate = float(raw_rate)
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"OPS_TRACE_APP_SAMPLE_RATES rate must be between 0 and 1: {entry!r}")
+            rates[app_id] = rate
+        return rates
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def OPS_TRACE_APP_SAMPLE_RATES(self) -> dict[str, float]:
+        return self._parse_app_sample_rates(self.inner_OPS_TRACE_APP_SAMPLE_RATES)
+
     @model_validator(mode="after")
     def validate_parent_context_retention(self) -> "OpsTraceConfig":
         if not self.OPS_TRACE_UNIFIED_ENABLED:
@@ -1457,6 +1733,24 @@ class CeleryScheduleTasksConfig(BaseSettings):
         description="Maximum schedules to dispatch per tick (0=unlimited, circuit breaker)",
         default=0,
     )
+    ENABLE_WORKFLOW_SCHEDULE_DISPATCHER: bool = Field(
+        description="Run the timer-driven workflow schedule dispatcher in Celery beat, which fires schedules "
+        "at their due time from a Redis index; the poller keeps running as the fallback",
+        default=False,
+    )
+    WORKFLOW_SCHEDULE_DISPATCHER_MAX_WAIT: PositiveFloat = Field(
+        description="Maximum seconds the workflow schedule dispatcher sleeps before re-checking its index",
+        default=1.0,
+    )
+    WORKFLOW_SCHEDULE_DISPATCHER_RECONCILE_INTERVAL: PositiveFloat = Field(
+        description="Seconds between rebuilds of the workflow schedule dispatcher index from the database",
+        default=300.0,
+    )
+    WORKFLOW_SCHEDULE_DISPATCHER_LEADER_TTL: PositiveInt = Field(
+        description="Seconds the workflow schedule dispatcher leader lock survives without renewal; "
+        "another beat replica takes over after it expires",
+        default=30,
+    )
 
     # API token last_used_at batch update
     ENABLE_API_TOKEN_LAST_USED_UPDATE_TASK: bool = Field(
@@ -1666,6 +1960,7 @@ class FeatureConfig(
     PluginConfig,
     MarketplaceConfig,
     DataSetConfig,
+    EmbeddingCacheConfig,
     EndpointConfig,
     FileAccessConfig,
     FileUploadConfig,
@@ -1676,6 +1971,7 @@ class FeatureConfig(
     LoggingConfig,
     MailConfig,
     ModelLoadBalanceConfig,
+    ProviderConfigurationCacheConfig,
     ModerationConfig,
     MultiModalTransferConfig,
     NewAgentBetaConfig,
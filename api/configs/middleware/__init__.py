@@ -83,6 +83,39 @@ class StorageConfig(BaseSettings):
         deprecated=True,
     )
 
+    STORAGE_DISK_CACHE_ENABLED: bool = Field(
+        description="Keep a node-local disk copy of objects read from storage and serve repeated reads from it.",
+        default=False,
+    )
+
+    STORAGE_DISK_CACHE_PATH: str = Field(
+        description="Directory of the node-local storage cache; it is shared by all processes of the node.",
+        default="storage_cache",
+    )
+
+    STORAGE_DISK_CACHE_MAX_SIZE_MB: PositiveInt = Field(
+        description="Size limit of the node-local storage cache in megabytes; least recently used objects are"
+        " evicted above it.",
+        default=1024,
+    )
+
+    STORAGE_DISK_CACHE_MAX_OBJECT_SIZE_MB: PositiveInt = Field(
+        description="Objects larger than this many megabytes are never written to the node-local storage cache.",
+        default=16,
+    )
+
+    STORAGE_DISK_CACHE_KEY_PREFIXES: str = Field(
+        description="Comma-separated key prefixes eligible for the node-local storage cache. Only list prefixes"
+        " of objects that are never overwritten in place, since other nodes cannot invalidate the cache.",
+        default="upload_files/,image_files/,tools/",
+    )
+
+    STORAGE_DISK_CACHE_REVALIDATE_SECONDS: NonNegativeInt = Field(
+        description="Seconds a cached object is served before the storage backend is asked again whether it still"
+        " exists, so deletes made through other nodes are seen. 0 checks on every read.",
+        default=10,
+    )
+
 
 _VALID_KEY_PROVIDER_TYPE = Literal[
     "local",
@@ -121,7 +154,8 @@ class VectorStoreConfig(BaseSettings):
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
         description="Method for keyword extraction and storage."
-        " Default is 'jieba', a Chinese text segmentation library.",
+        " Default is 'jieba', a Chinese text segmentation library. 'jieba_inverted' stores the keyword"
+        " index as per-keyword postings rows that are updated incrementally.",
         default="jieba",
     )
 
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field, PositiveInt
 from pydantic_settings import BaseSettings
 
@@ -46,3 +48,22 @@ class PGVectorConfig(BaseSettings):
         description="Whether to use pg_bigm module for full text search",
         default=False,
     )
+
+    PGVECTOR_TEXT_SEARCH_CONFIG: str = Field(
+        description="Text search configuration (e.g. 'english', 'simple') used by the stored full-text search column"
+        " of new datasets",
+        pattern=r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$",
+        default="english",
+    )
+
+    PGVECTOR_INDEX_TYPE: Literal["vector", "halfvec", "binary"] = Field(
+        description="HNSW index of new datasets: 'vector' (up to 2000 dimensions), 'halfvec' (half precision, up to"
+        " 4000 dimensions) or 'binary' (binary quantized, up to 64000 dimensions). Quantized indexes require"
+        " pgvector 0.7.0 or later and re-rank their candidates on the full-precision vectors",
+        default="vector",
+    )
+
+    PGVECTOR_RERANK_CANDIDATES_FACTOR: PositiveInt = Field(
+        description="Candidates fetched from a quantized index per requested result before re-ranking",
+        default=4,
+    )
@@ -132,7 +132,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             graph_runtime_state = resume_state
             variable_pool = graph_runtime_state.variable_pool
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=self._workflow.graph_view,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
@@ -204,13 +204,13 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
                     conversation_variables=conversation_variables,
                 ),
             )
-            root_node_id = get_default_root_node_id(self._workflow.graph_dict)
+            root_node_id = get_default_root_node_id(self._workflow.graph_view)
             add_node_inputs_to_pool(variable_pool, node_id=root_node_id, inputs=new_inputs)
 
             # init graph
             graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.time())
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=self._workflow.graph_view,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
@@ -241,7 +241,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             app_id=self._workflow.app_id,
             workflow_id=self._workflow.id,
             graph=graph,
-            graph_config=self._workflow.graph_dict,
+            graph_config=self._workflow.graph_view,
             user_id=self.application_generate_entity.user_id,
             user_from=user_from,
             invoke_from=invoke_from,
@@ -260,7 +260,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
                 workflow_id=self._workflow.id,
                 workflow_type=WorkflowType(self._workflow.type),
                 version=self._workflow.version,
-                graph_data=self._workflow.graph_dict,
+                graph_data=self._workflow.graph_view,
             ),
             workflow_execution_repository=self._workflow_execution_repository,
             workflow_node_execution_repository=self._workflow_node_execution_repository,
@@ -310,9 +310,12 @@ class BaseAppGenerator:
         return value
 
     @classmethod
-    def convert_to_event_stream(cls, generator: Union[Mapping, Generator[Mapping | str, None, None]]):
+    def convert_to_event_stream(cls, generator: Union[Mapping, Generator[Mapping | str | bytes, None, None]]):
         """
         Convert messages into event stream
+
+        Bytes are already-serialized JSON events relayed from the broadcast channel and are
+        written as they are.
         """
         if isinstance(generator, dict):
             return generator
@@ -322,6 +325,8 @@ class BaseAppGenerator:
                 for message in generator:
                     if isinstance(message, Mapping | dict):
                         yield f"data: {orjson_dumps(message)}\n\n"
+                    elif isinstance(message, bytes):
+                        yield b"data: " + message + b"\n\n"
                     else:
                         yield f"event: {message}\n\n"
 
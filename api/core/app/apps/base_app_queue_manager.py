@@ -3,13 +3,16 @@ import queue
 import threading
 import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from enum import IntEnum, auto
 from typing import Any
 
 from cachetools import TTLCache, cachedmethod
+from pydantic import BaseModel
 from redis.exceptions import RedisError
 from sqlalchemy.orm import DeclarativeMeta
 
+from configs import dify_config
 from core.app.apps.execution_coordinator import (
     AppExecutionCoordinator,
     AppExecutionState,
@@ -29,6 +32,9 @@ from graphon.runtime import GraphRuntimeState
 
 logger = logging.getLogger(__name__)
 
+_STOP_CHECK_INTERVAL_SECONDS = 1.0
+_PING_INTERVAL_SECONDS = 10.0
+
 
 class PublishFrom(IntEnum):
     APPLICATION_MANAGER = auto()
@@ -67,31 +73,36 @@ class AppQueueManager(ABC):
         :return:
         """
         self._execution_coordinator.start_watchdog()
-        start_time = time.monotonic()
-        last_ping_time: int | float = 0
+        now = time.monotonic()
+        # Stop flag checks and pings run on their own schedule instead of once per message, so a fast
+        # token stream costs no Redis reads beyond one stop check per interval.
+        next_stop_check_at = now + _STOP_CHECK_INTERVAL_SECONDS
+        next_ping_at = now + _PING_INTERVAL_SECONDS
         try:
             while True:
                 try:
-                    message = self._q.get(timeout=1)
+                    message = self._q.get(timeout=max(0.0, min(next_stop_check_at, next_ping_at) - now))
+                except queue.Empty:
+                    pass
+                else:
                     if message is None:
                         break
 
                     yield message
-                except queue.Empty:
-                    continue
-                finally:
-                    elapsed_time = time.monotonic() - start_time
-                    manually_stopped = self._is_stopped()
-                    if manually_stopped and self._execution_coordinator.request_abort("App task was stopped"):
+
+                now = time.monotonic()
+                if now >= next_stop_check_at:
+                    next_stop_check_at = now + _STOP_CHECK_INTERVAL_SECONDS
+                    if self._is_stopped() and self._execution_coordinator.request_abort("App task was stopped"):
                         # publish two messages to make sure the client can receive the stop signal
                         # and stop listening after the stop signal processed
                         self.publish(
                             QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE
                         )
 
-                    if elapsed_time // 10 > last_ping_time:
-                        self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
-                        last_ping_time = elapsed_time // 10
+                if now >= next_ping_at:
+                    next_ping_at = now + _PING_INTERVAL_SECONDS
+                    self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
         finally:
             self._execution_coordinator.listener_closed(segment_completed=self._listener_segment_completed.is_set())
             self._graph_runtime_state = None  # Release reference once consumers finish or close the generator.
@@ -156,7 +167,9 @@ class AppQueueManager(ABC):
         :param pub_from:
         :return:
         """
-        self._check_for_sqlalchemy_models(event.model_dump())
+        # The recursive scan is too costly for every streamed event outside debug mode; checking the
+        # top-level fields still catches ORM instances attached directly to an event.
+        self._check_for_sqlalchemy_models(event, deep=dify_config.DEBUG)
         self._publish(event, pub_from)
 
     def is_stopped(self) -> bool:
@@ -232,18 +245,28 @@ class AppQueueManager(ABC):
         """
         return f"generate_task_stopped:{task_id}"
 
-    def _check_for_sqlalchemy_models(self, data: Any):
-        # from entity to dict or list
+    def _check_for_sqlalchemy_models(self, data: Any, *, deep: bool = True):
+        # walk pydantic models, dicts and lists in place instead of serializing them first
         match data:
+            case BaseModel():
+                values: Iterable[Any] = data.__dict__.values()
             case dict():
-                for value in data.values():
-                    self._check_for_sqlalchemy_models(value)
-            case list():
-                for item in data:
-                    self._check_for_sqlalchemy_models(item)
+                values = data.values()
+            case list() | tuple():
+                values = data
             case _:
-                if isinstance(data, DeclarativeMeta) or hasattr(data, "_sa_instance_state"):
-                    raise TypeError(
-                        "Critical Error: Passing SQLAlchemy Model instances that"
-                        " cause thread safety issues is not allowed."
-                    )
+                _raise_if_sqlalchemy_model(data)
+                return
+
+        for value in values:
+            if deep:
+                self._check_for_sqlalchemy_models(value)
+            else:
+                _raise_if_sqlalchemy_model(value)
+
+
+def _raise_if_sqlalchemy_model(data: Any) -> None:
+    if isinstance(data, DeclarativeMeta) or hasattr(data, "_sa_instance_state"):
+        raise TypeError(
+            "Critical Error: Passing SQLAlchemy Model instances that cause thread safety issues is not allowed."
+        )
@@ -321,7 +321,7 @@ class MessageBasedAppGenerator(BaseAppGenerator):
         workflow_run_id: str,
         idle_timeout=300,
         on_subscribe: Callable[[], None] | None = None,
-    ) -> Generator[Mapping | str, None, None]:
+    ) -> Generator[Mapping | str | bytes, None, None]:
         topic = cls.get_response_topic(app_mode, workflow_run_id)
         subscriber = topic.as_subscriber()
         subscription = (
@@ -333,4 +333,5 @@ class MessageBasedAppGenerator(BaseAppGenerator):
             subscription=subscription,
             idle_timeout=idle_timeout,
             on_subscribe=on_subscribe,
+            raw=True,
         )
@@ -28,7 +28,7 @@ class MessageGenerator:
         ping_interval: float = 10.0,
         on_subscribe: Callable[[], None] | None = None,
         terminal_events: Iterable[str | StreamEvent] | None = None,
-    ) -> Generator[Mapping | str, None, None]:
+    ) -> Generator[Mapping | str | bytes, None, None]:
         topic = cls.get_response_topic(app_mode, workflow_run_id)
         subscriber = topic.as_subscriber()
         subscription = (
@@ -42,4 +42,5 @@ class MessageGenerator:
             ping_interval=ping_interval,
             on_subscribe=on_subscribe,
             terminal_events=terminal_events,
+            raw=True,
         )
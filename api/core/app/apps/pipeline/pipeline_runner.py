@@ -187,7 +187,7 @@ class PipelineRunner(WorkflowBasedAppRunner):
                 ),
             )
             root_node_id = self.application_generate_entity.start_node_id or get_default_root_node_id(
-                workflow.graph_dict
+                workflow.graph_view
             )
             add_node_inputs_to_pool(variable_pool, node_id=root_node_id, inputs=inputs)
             graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter())
@@ -207,7 +207,7 @@ class PipelineRunner(WorkflowBasedAppRunner):
             app_id=workflow.app_id,
             workflow_id=workflow.id,
             graph=graph,
-            graph_config=workflow.graph_dict,
+            graph_config=workflow.graph_view,
             user_id=self.application_generate_entity.user_id,
             user_from=user_from,
             invoke_from=invoke_from,
@@ -224,7 +224,7 @@ class PipelineRunner(WorkflowBasedAppRunner):
                 workflow_id=workflow.id,
                 workflow_type=WorkflowType(workflow.type),
                 version=workflow.version,
-                graph_data=workflow.graph_dict,
+                graph_data=workflow.graph_view,
             ),
             workflow_execution_repository=self._workflow_execution_repository,
             workflow_node_execution_repository=self._workflow_node_execution_repository,
@@ -264,7 +264,7 @@ class PipelineRunner(WorkflowBasedAppRunner):
         """
         Init pipeline graph
         """
-        graph_config = workflow.graph_dict
+        graph_config = workflow.graph_view
         if "nodes" not in graph_config or "edges" not in graph_config:
             raise ValueError("nodes or edges not found in workflow graph")
 
@@ -9,6 +9,10 @@ from core.app.entities.task_entities import StreamEvent
 from libs.broadcast_channel.channel import Subscription
 from libs.broadcast_channel.exc import SubscriptionClosedError
 
+# Publishers write stream responses with `json.dumps`, which keeps `event` as the first key
+# (see `_publish_streaming_response` in tasks/app_generate/workflow_execute_task.py).
+_RAW_EVENT_PREFIX = b'{"event": "'
+
 
 def stream_topic_events(
     *,
@@ -17,7 +21,15 @@ def stream_topic_events(
     ping_interval: float | None = None,
     on_subscribe: Callable[[], None] | None = None,
     terminal_events: Iterable[str | StreamEvent] | None = None,
-) -> Generator[Mapping[str, Any] | str, None, None]:
+    raw: bool = False,
+) -> Generator[Mapping[str, Any] | str | bytes, None, None]:
+    """
+    Relay the events published on a topic until a terminal event or the idle timeout.
+
+    Events are decoded from JSON unless `raw` is set, in which case JSON objects are yielded as
+    the bytes received so they can be written to an SSE response without a decode/encode round
+    trip; only their leading `event` field is read to detect terminal events.
+    """
     # send a PING event immediately to prevent the connection staying in pending state for a long time.
     #
     # This simplify the debugging process as the DevTools in Chrome does not
@@ -48,16 +60,30 @@ def stream_topic_events(
 
             last_msg_time = time.time()
             last_ping_time = last_msg_time
-            event = json.loads(msg)
-            yield event
-            if not isinstance(event, dict):
-                continue
+            if raw and msg.startswith(_RAW_EVENT_PREFIX):
+                yield msg
+                event_type = _raw_event_type(msg)
+            else:
+                event = json.loads(msg)
+                yield event
+                if not isinstance(event, dict):
+                    continue
+                event_type = event.get("event")
 
-            event_type = event.get("event")
             if event_type in terminal_values:
                 return
 
 
+def _raw_event_type(msg: bytes) -> str | None:
+    # Event names never contain escaped characters, so the next quote closes the value.
+    start = len(_RAW_EVENT_PREFIX)
+    end = msg.find(b'"', start)
+    if end == -1:
+        event = json.loads(msg)
+        return event.get("event") if isinstance(event, dict) else None
+    return msg[start:end].decode()
+
+
 def _normalize_terminal_events(terminal_events: Iterable[str | StreamEvent] | None) -> set[str]:
     if terminal_events is None:
         return {StreamEvent.WORKFLOW_FINISHED.value, StreamEvent.WORKFLOW_PAUSED.value}
@@ -99,7 +99,7 @@ class RateLimit:
     def gen_request_key() -> str:
         return str(uuid.uuid4())
 
-    def generate(self, generator: Union[Generator[str, None, None], Mapping[str, Any]], request_id: str):
+    def generate(self, generator: Union[Generator[str | bytes, None, None], Mapping[str, Any]], request_id: str):
         if isinstance(generator, Mapping):
             return generator
         else:
@@ -119,7 +119,7 @@ def rate_limit_context(rate_limit: RateLimit, request_id: str | None):
 
 
 class RateLimitGenerator:
-    def __init__(self, rate_limit: RateLimit, generator: Generator[str, None, None], request_id: str):
+    def __init__(self, rate_limit: RateLimit, generator: Generator[str | bytes, None, None], request_id: str):
         self.rate_limit = rate_limit
         self.generator = generator
         self.request_id = request_id
@@ -4,9 +4,11 @@ from typing import ClassVar, override
 
 from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
 
-from graphon.graph_engine.entities.commands import CommandType, GraphEngineCommand
+from core.workflow.system_variables import SystemVariableKey, get_system_text
+from graphon.entities.pause_reason import SchedulingPause
+from graphon.graph_engine.entities.commands import PauseCommand
 from graphon.graph_engine.layers import GraphEngineLayer
-from graphon.graph_events import GraphEngineEvent
+from graphon.graph_events import GraphEngineEvent, GraphRunPausedEvent
 from services.workflow.entities import WorkflowScheduleCFSPlanEntity
 from services.workflow.scheduler import CFSPlanScheduler, SchedulerCommand
 
@@ -32,6 +34,8 @@ class TimeSliceLayer(GraphEngineLayer):
         self.cfs_plan_scheduler = cfs_plan_scheduler
         self.stopped = False
         self.schedule_id = ""
+        self.preempted = False
+        self.paused_by_scheduler = False
 
     def _checker_job(self, schedule_id: str):
         """
@@ -45,20 +49,15 @@ class TimeSliceLayer(GraphEngineLayer):
             if self.cfs_plan_scheduler.can_schedule() == SchedulerCommand.RESOURCE_LIMIT_REACHED:
                 # remove the job
                 self.scheduler.remove_job(schedule_id)
+                self.schedule_id = ""
 
                 if not self.command_channel:
                     logger.exception("No command channel to stop the workflow")
                     return
 
                 # send command to pause the workflow
-                self.command_channel.send_command(
-                    GraphEngineCommand(
-                        command_type=CommandType.PAUSE,
-                        payload={
-                            "reason": SchedulerCommand.RESOURCE_LIMIT_REACHED,
-                        },
-                    )
-                )
+                self.command_channel.send_command(PauseCommand(reason=SchedulerCommand.RESOURCE_LIMIT_REACHED))
+                self.preempted = True
 
         except Exception:
             logger.exception("scheduler error during check if the workflow need to be suspended")
@@ -81,7 +80,13 @@ class TimeSliceLayer(GraphEngineLayer):
 
     @override
     def on_event(self, event: GraphEngineEvent):
-        pass
+        """
+        Remember whether the run paused only for the scheduler, in which case it can be resumed later.
+        """
+        if isinstance(event, GraphRunPausedEvent):
+            self.paused_by_scheduler = bool(event.reasons) and all(
+                isinstance(reason, SchedulingPause) for reason in event.reasons
+            )
 
     @override
     def on_graph_end(self, error: Exception | None) -> None:
@@ -89,3 +94,14 @@ class TimeSliceLayer(GraphEngineLayer):
         # remove the scheduler
         if self.schedule_id:
             self.scheduler.remove_job(self.schedule_id)
+
+        paused_run_id = None
+        try:
+            if self.preempted and self.paused_by_scheduler:
+                paused_run_id = get_system_text(
+                    self.graph_runtime_state.variable_pool,
+                    SystemVariableKey.WORKFLOW_EXECUTION_ID,
+                )
+            self.cfs_plan_scheduler.on_run_end(paused_run_id)
+        except Exception:
+            logger.exception("scheduler error while releasing workflow run %s", paused_run_id)
@@ -144,7 +144,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
 
     @override
     def on_graph_end(self, error: Exception | None) -> None:
-        return
+        self._workflow_node_execution_repository.flush()
 
     # ------------------------------------------------------------------
     # Graph-level handlers
@@ -174,6 +174,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
         execution.status = WorkflowExecutionStatus.SUCCEEDED
         self._populate_completion_statistics(execution)
 
+        self._workflow_node_execution_repository.flush()
         self._workflow_execution_repository.save(execution)
         self._enqueue_trace_task(execution)
         _inspector_publish_workflow_completed(workflow_run_id=execution.id_, status=str(execution.status.value))
@@ -185,6 +186,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
         execution.exceptions_count = event.exceptions_count
         self._populate_completion_statistics(execution)
 
+        self._workflow_node_execution_repository.flush()
         self._workflow_execution_repository.save(execution)
         self._enqueue_trace_task(execution)
         _inspector_publish_workflow_completed(workflow_run_id=execution.id_, status=str(execution.status.value))
@@ -197,6 +199,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
         self._populate_completion_statistics(execution)
 
         self._fail_running_node_executions(error_message=event.error)
+        self._workflow_node_execution_repository.flush()
         self._workflow_execution_repository.save(execution)
         self._enqueue_trace_task(execution)
         _inspector_publish_workflow_completed(workflow_run_id=execution.id_, status=str(execution.status.value))
@@ -208,6 +211,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
         self._populate_completion_statistics(execution)
 
         self._fail_running_node_executions(error_message=execution.error_message or "")
+        self._workflow_node_execution_repository.flush()
         self._workflow_execution_repository.save(execution)
         self._enqueue_trace_task(execution)
         _inspector_publish_workflow_completed(workflow_run_id=execution.id_, status=str(execution.status.value))
@@ -218,6 +222,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
         execution.outputs = event.outputs
         self._populate_completion_statistics(execution, update_finished=False)
 
+        self._workflow_node_execution_repository.flush()
         self._workflow_execution_repository.save(execution)
 
     # ------------------------------------------------------------------
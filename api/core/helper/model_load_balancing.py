@@ -0,0 +1,371 @@
+"""Shared health state and selection policies for model load balancing.
+
+The health of every load balancing config of one model lives in a single Redis hash,
+so a worker refreshes all of it with one ``HGETALL`` and then reuses it for
+``MODEL_LB_HEALTH_CACHE_TTL`` seconds. Hash fields are ``{config_id}:{field}``:
+
+- ``cooldown_until``: wall-clock time until which the config is skipped,
+- ``latency``: EWMA of the time to the first response in seconds (``latency_weighted``),
+- ``tokens`` / ``tokens_updated_at``: the config's token bucket (``token_bucket``), refilled
+  and decremented atomically by a Lua script.
+
+Requests in flight (``least_outstanding``) are members ``{config_id}:{request_id}`` of a
+sorted set scored by their start time, read in the same round trip. Members older than
+``MODEL_LB_OUTSTANDING_MAX_AGE`` are dropped, so a worker that dies mid-request does not
+leave the config counted as busy forever.
+
+Updates made by a worker are applied to its cached copy as well, so it observes its
+own cooldowns immediately. Redis failures degrade to "everything healthy".
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from enum import StrEnum
+
+from cachetools import LRUCache
+from redis import RedisError
+
+from configs import dify_config
+from core.entities.provider_entities import ModelLoadBalancingConfiguration
+from extensions.ext_redis import redis_client
+from extensions.redis_names import serialize_redis_name
+from graphon.model_runtime.entities.model_entities import ModelType
+
+logger = logging.getLogger(__name__)
+
+_HEALTH_KEY = "model_lb_health:{tenant_id}:{provider}:{model_type}:{model}"
+_INDEX_KEY = "model_lb_index:{tenant_id}:{provider}:{model_type}:{model}"
+_OUTSTANDING_KEY = "model_lb_outstanding:{tenant_id}:{provider}:{model_type}:{model}"
+_KEY_TTL_SECONDS = 3600
+_MIN_LATENCY_SECONDS = 0.001
+
+
+class LoadBalancingStrategy(StrEnum):
+    ROUND_ROBIN = "round_robin"
+    LEAST_OUTSTANDING = "least_outstanding"
+    LATENCY_WEIGHTED = "latency_weighted"
+    TOKEN_BUCKET = "token_bucket"
+
+
+# Refill the bucket for the time elapsed since its last update, then take one token.
+# KEYS[1]: health hash; ARGV: tokens field, updated_at field, capacity, refill rate, key TTL.
+_CONSUME_TOKEN_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local capacity = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], ARGV[1]))
+local updated_at = tonumber(redis.call('HGET', KEYS[1], ARGV[2]))
+if tokens == nil or updated_at == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * tonumber(ARGV[4]))
+end
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], ARGV[1], tostring(tokens), ARGV[2], tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return {tostring(tokens), tostring(now)}
+"""
+
+
+class _HealthField(StrEnum):
+    COOLDOWN_UNTIL = "cooldown_until"
+    LATENCY = "latency"
+    TOKENS = "tokens"
+    TOKENS_UPDATED_AT = "tokens_updated_at"
+
+
+@dataclass(slots=True)
+class ConfigHealth:
+    cooldown_until: float = 0.0
+    outstanding: int = 0
+    latency: float | None = None
+    tokens: float | None = None
+    tokens_updated_at: float | None = None
+
+    def in_cooldown(self, now: float) -> bool:
+        return self.cooldown_until > now
+
+    def available_tokens(self, now: float) -> float:
+        capacity = dify_config.MODEL_LB_TOKEN_BUCKET_CAPACITY
+        if self.tokens is None or self.tokens_updated_at is None:
+            return capacity
+        refilled = max(0.0, now - self.tokens_updated_at) * dify_config.MODEL_LB_TOKEN_BUCKET_REFILL_RATE
+        return min(capacity, self.tokens + refilled)
+
+
+_snapshots: LRUCache[str, tuple[float, dict[str, ConfigHealth]]] = LRUCache(maxsize=1024)
+_snapshots_lock = threading.Lock()
+
+
+def clear_model_lb_health_cache() -> None:
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+def _parse_health_hash(raw: Mapping[bytes | str, bytes | str]) -> dict[str, ConfigHealth]:
+    health: dict[str, ConfigHealth] = {}
+    for raw_field, raw_value in raw.items():
+        field = raw_field.decode() if isinstance(raw_field, bytes) else raw_field
+        config_id, _, name = field.rpartition(":")
+        try:
+            value = float(raw_value)
+        except ValueError:
+            continue
+        entry = health.setdefault(config_id, ConfigHealth())
+        match name:
+            case _HealthField.COOLDOWN_UNTIL:
+                entry.cooldown_until = value
+            case _HealthField.LATENCY:
+                entry.latency = value
+            case _HealthField.TOKENS:
+                entry.tokens = value
+            case _HealthField.TOKENS_UPDATED_AT:
+                entry.tokens_updated_at = value
+            case _:
+                pass
+    return health
+
+
+def _count_outstanding(health: dict[str, ConfigHealth], members: Sequence[bytes | str]) -> None:
+    for raw_member in members:
+        member = raw_member.decode() if isinstance(raw_member, bytes) else raw_member
+        config_id, _, _ = member.rpartition(":")
+        health.setdefault(config_id, ConfigHealth()).outstanding += 1
+
+
+class ModelLBHealthStore:
+    """Health state of the load balancing configs of one tenant model."""
+
+    def __init__(self, tenant_id: str, provider: str, model_type: ModelType, model: str):
+        key_parts = {"tenant_id": tenant_id, "provider": provider, "model_type": model_type.value, "model": model}
+        self.key = _HEALTH_KEY.format(**key_parts)
+        self.index_key = _INDEX_KEY.format(**key_parts)
+        self.outstanding_key = _OUTSTANDING_KEY.format(**key_parts)
+
+    @staticmethod
+    def _field(config_id: str, field: _HealthField) -> str:
+        return f"{config_id}:{field}"
+
+    def _read(self) -> dict[str, ConfigHealth]:
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            # Pipelines bypass the wrapper's key prefixing, so serialize the physical names here.
+            outstanding_key = serialize_redis_name(self.outstanding_key)
+            pipeline.hgetall(serialize_redis_name(self.key))
+            pipeline.zremrangebyscore(outstanding_key, "-inf", time.time() - dify_config.MODEL_LB_OUTSTANDING_MAX_AGE)
+            pipeline.zrange(outstanding_key, 0, -1)
+            raw_health, _, outstanding = pipeline.execute()
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to read model load balancing health %s.", self.key, exc_info=True)
+            return {}
+        health = _parse_health_hash(raw_health or {})
+        _count_outstanding(health, outstanding or [])
+        return health
+
+    def snapshot(self) -> dict[str, ConfigHealth]:
+        """Return the health of every config, re-reading the hash at most once per cache TTL."""
+        now = time.monotonic()
+        with _snapshots_lock:
+            cached = _snapshots.get(self.key)
+        if cached is not None and now - cached[0] < dify_config.MODEL_LB_HEALTH_CACHE_TTL:
+            return cached[1]
+
+        health = self._read()
+        with _snapshots_lock:
+            _snapshots[self.key] = (now, health)
+        return health
+
+    def config_health(self, config_id: str) -> ConfigHealth:
+        snapshot = self.snapshot()
+        with _snapshots_lock:
+            return snapshot.setdefault(config_id, ConfigHealth())
+
+    def _update_local(self, config_id: str, update: Callable[[ConfigHealth], None]) -> ConfigHealth:
+        """Apply ``update`` to the cached health of ``config_id``, which other threads share."""
+        snapshot = self.snapshot()
+        with _snapshots_lock:
+            health = snapshot.setdefault(config_id, ConfigHealth())
+            update(health)
+            return health
+
+    def cooldown_remaining(self, config_id: str) -> float:
+        """Seconds left in the cooldown of ``config_id``, read from Redis without the local cache."""
+        health = self._read().get(config_id)
+        if health is None:
+            return 0.0
+        return max(0.0, health.cooldown_until - time.time())
+
+    def next_index(self) -> int:
+        index: int = redis_client.incr(self.index_key)
+        if index == 1:
+            redis_client.expire(self.index_key, _KEY_TTL_SECONDS)
+        return index
+
+    def _write(self, mapping: Mapping[str, float]) -> None:
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            # Pipelines bypass the wrapper's key prefixing, so serialize the physical name here.
+            key = serialize_redis_name(self.key)
+            pipeline.hset(key, mapping=dict(mapping))
+            pipeline.expire(key, _KEY_TTL_SECONDS)
+            pipeline.execute()
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to update model load balancing health %s.", self.key, exc_info=True)
+
+    def cooldown(self, config_id: str, seconds: int) -> None:
+        cooldown_until = time.time() + seconds
+
+        def update(health: ConfigHealth) -> None:
+            health.cooldown_until = cooldown_until
+
+        self._update_local(config_id, update)
+        self._write({self._field(config_id, _HealthField.COOLDOWN_UNTIL): cooldown_until})
+
+    def record_started(self, config_id: str) -> str:
+        """Register a request in flight and return the id to pass to ``record_finished``."""
+
+        def update(health: ConfigHealth) -> None:
+            health.outstanding += 1
+
+        self._update_local(config_id, update)
+        request_id = f"{config_id}:{uuid.uuid4().hex}"
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            key = serialize_redis_name(self.outstanding_key)
+            pipeline.zadd(key, {request_id: time.time()})
+            pipeline.expire(key, _KEY_TTL_SECONDS)
+            pipeline.execute()
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to update model load balancing health %s.", self.key, exc_info=True)
+        return request_id
+
+    def record_finished(self, config_id: str, *, latency: float | None, request_id: str | None = None) -> None:
+        alpha = dify_config.MODEL_LB_LATENCY_EWMA_ALPHA
+
+        def update(health: ConfigHealth) -> None:
+            if latency is not None:
+                health.latency = latency if health.latency is None else alpha * latency + (1 - alpha) * health.latency
+            if request_id is not None:
+                health.outstanding = max(0, health.outstanding - 1)
+
+        health = self._update_local(config_id, update)
+        if request_id is not None:
+            try:
+                redis_client.zrem(self.outstanding_key, request_id)
+            except (RedisError, RuntimeError):
+                logger.warning("Failed to update model load balancing health %s.", self.key, exc_info=True)
+        if latency is not None and health.latency is not None:
+            self._write({self._field(config_id, _HealthField.LATENCY): health.latency})
+
+    def consume_token(self, config_id: str) -> None:
+        """Take one token from the config's bucket; refill and decrement run atomically in Redis."""
+        try:
+            tokens, updated_at = redis_client.eval(
+                _CONSUME_TOKEN_LUA,
+                1,
+                serialize_redis_name(self.key),
+                self._field(config_id, _HealthField.TOKENS),
+                self._field(config_id, _HealthField.TOKENS_UPDATED_AT),
+                dify_config.MODEL_LB_TOKEN_BUCKET_CAPACITY,
+                dify_config.MODEL_LB_TOKEN_BUCKET_REFILL_RATE,
+                _KEY_TTL_SECONDS,
+            )
+        except (RedisError, RuntimeError, TypeError, ValueError):
+            logger.warning("Failed to update model load balancing health %s.", self.key, exc_info=True)
+            return
+
+        def update(health: ConfigHealth) -> None:
+            health.tokens = float(tokens)
+            health.tokens_updated_at = float(updated_at)
+
+        self._update_local(config_id, update)
+
+
+class LoadBalancingPolicy(ABC):
+    """Orders the configs of one model by preference; the caller takes the first usable one."""
+
+    tracks_outstanding = False
+    tracks_latency = False
+    consumes_tokens = False
+
+    @abstractmethod
+    def candidates(
+        self, configs: Sequence[ModelLoadBalancingConfiguration], health: ModelLBHealthStore
+    ) -> Iterator[ModelLoadBalancingConfiguration]:
+        raise NotImplementedError
+
+
+class RoundRobinPolicy(LoadBalancingPolicy):
+    def candidates(
+        self, configs: Sequence[ModelLoadBalancingConfiguration], health: ModelLBHealthStore
+    ) -> Iterator[ModelLoadBalancingConfiguration]:
+        for _ in configs:
+            yield configs[(health.next_index() - 1) % len(configs)]
+        # Concurrent workers share the counter, so make sure every config is offered once.
+        yield from configs
+
+
+class LeastOutstandingPolicy(LoadBalancingPolicy):
+    tracks_outstanding = True
+
+    def candidates(
+        self, configs: Sequence[ModelLoadBalancingConfiguration], health: ModelLBHealthStore
+    ) -> Iterator[ModelLoadBalancingConfiguration]:
+        snapshot = health.snapshot()
+        # Shuffle first so the stable sort spreads ties instead of always favoring the first config.
+        shuffled = random.sample(list(configs), len(configs))
+        yield from sorted(shuffled, key=lambda config: snapshot.get(config.id, ConfigHealth()).outstanding)
+
+
+class LatencyWeightedPolicy(LoadBalancingPolicy):
+    tracks_latency = True
+
+    def candidates(
+        self, configs: Sequence[ModelLoadBalancingConfiguration], health: ModelLBHealthStore
+    ) -> Iterator[ModelLoadBalancingConfiguration]:
+        snapshot = health.snapshot()
+        known = [latency for config in configs if (latency := snapshot.get(config.id, ConfigHealth()).latency)]
+        # Configs without samples are treated as the fastest one so they get explored.
+        default_latency = min(known) if known else 1.0
+
+        def sort_key(config: ModelLoadBalancingConfiguration) -> float:
+            latency = snapshot.get(config.id, ConfigHealth()).latency or default_latency
+            weight = 1 / max(latency, _MIN_LATENCY_SECONDS)
+            # Weighted random order (Efraimidis-Spirakis): faster configs tend to come first.
+            return random.random() ** (1 / weight)  # noqa: S311
+
+        yield from sorted(configs, key=sort_key, reverse=True)
+
+
+class TokenBucketPolicy(LoadBalancingPolicy):
+    consumes_tokens = True
+
+    def candidates(
+        self, configs: Sequence[ModelLoadBalancingConfiguration], health: ModelLBHealthStore
+    ) -> Iterator[ModelLoadBalancingConfiguration]:
+        snapshot = health.snapshot()
+        now = time.time()
+        shuffled = random.sample(list(configs), len(configs))
+        yield from sorted(
+            shuffled,
+            key=lambda config: snapshot.get(config.id, ConfigHealth()).available_tokens(now),
+            reverse=True,
+        )
+
+
+_POLICIES: dict[LoadBalancingStrategy, LoadBalancingPolicy] = {
+    LoadBalancingStrategy.ROUND_ROBIN: RoundRobinPolicy(),
+    LoadBalancingStrategy.LEAST_OUTSTANDING: LeastOutstandingPolicy(),
+    LoadBalancingStrategy.LATENCY_WEIGHTED: LatencyWeightedPolicy(),
+    LoadBalancingStrategy.TOKEN_BUCKET: TokenBucketPolicy(),
+}
+
+
+def get_load_balancing_policy(strategy: LoadBalancingStrategy | str | None = None) -> LoadBalancingPolicy:
+    return _POLICIES[LoadBalancingStrategy(strategy or dify_config.MODEL_LB_STRATEGY)]
@@ -657,7 +657,7 @@ class IndexingRunner:
             )
             create_keyword_thread.start()
 
-        max_workers = 10
+        max_workers = dify_config.INDEXING_LOAD_MAX_WORKERS
         if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = []
@@ -742,6 +742,12 @@ class IndexingRunner:
         dataset_id: str,
         dataset_document_id: str,
     ) -> None:
+        """Index one hash group in batches, committing the completed segments of every batch.
+
+        Segments of a committed batch stay completed if indexing stops later, so a retry only
+        re-indexes the batches after it, and a pause takes effect at the next batch boundary.
+        """
+        batch_size = dify_config.INDEXING_LOAD_BATCH_SIZE
         with flask_app.app_context():
             with session_factory.create_session() as session:
                 dataset = session.get(Dataset, dataset_id)
@@ -752,41 +758,44 @@ class IndexingRunner:
                 if not dataset_document:
                     raise ValueError("no document found")
 
-                # check document is paused
-                self._check_document_paused_status(dataset_document.id)
-
-                multimodal_documents = []
-                for document in chunk_documents:
-                    if document.attachments and dataset.is_multimodal:
-                        multimodal_documents.extend(document.attachments)
-
-                # load index
                 index_processor = IndexProcessorFactory(index_type).init_index_processor()
-                index_processor.load(
-                    dataset,
-                    chunk_documents,
-                    multimodal_documents=multimodal_documents,
-                    with_keywords=False,
-                    session=session,
-                )
-
-                document_ids = [document.metadata["doc_id"] for document in chunk_documents]
-                session.execute(
-                    update(DocumentSegment)
-                    .where(
-                        DocumentSegment.document_id == dataset_document.id,
-                        DocumentSegment.dataset_id == dataset.id,
-                        DocumentSegment.index_node_id.in_(document_ids),
-                        DocumentSegment.status == SegmentStatus.INDEXING,
+                for start in range(0, len(chunk_documents), batch_size):
+                    batch_documents = chunk_documents[start : start + batch_size]
+
+                    # check document is paused
+                    self._check_document_paused_status(dataset_document_id)
+
+                    multimodal_documents = []
+                    for document in batch_documents:
+                        if document.attachments and dataset.is_multimodal:
+                            multimodal_documents.extend(document.attachments)
+
+                    # load index
+                    index_processor.load(
+                        dataset,
+                        batch_documents,
+                        multimodal_documents=multimodal_documents,
+                        with_keywords=False,
+                        session=session,
                     )
-                    .values(
-                        status=SegmentStatus.COMPLETED,
-                        enabled=True,
-                        completed_at=naive_utc_now(),
+
+                    document_ids = [document.metadata["doc_id"] for document in batch_documents]
+                    session.execute(
+                        update(DocumentSegment)
+                        .where(
+                            DocumentSegment.document_id == dataset_document_id,
+                            DocumentSegment.dataset_id == dataset_id,
+                            DocumentSegment.index_node_id.in_(document_ids),
+                            DocumentSegment.status == SegmentStatus.INDEXING,
+                        )
+                        .values(
+                            status=SegmentStatus.COMPLETED,
+                            enabled=True,
+                            completed_at=naive_utc_now(),
+                        )
                     )
-                )
 
-                session.commit()
+                    session.commit()
 
     @staticmethod
     def _check_document_paused_status(document_id: str):
@@ -1,14 +1,19 @@
+import logging
 from collections import defaultdict
 from collections.abc import Sequence
+from dataclasses import dataclass
 
-from sqlalchemy import select
+from redis import RedisError
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import sessionmaker
 
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.file_access import DatabaseFileAccessController
 from core.model_manager import ModelInstance
-from core.prompt.utils.extract_thread_messages import extract_thread_messages
+from core.prompt.utils.extract_thread_messages import ThreadMessageExtractor
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from extensions.redis_names import serialize_redis_name
 from factories import file_factory
 from graphon.file import file_manager
 from graphon.model_runtime.entities import (
@@ -25,8 +30,23 @@ from models.workflow import Workflow
 from repositories.api_workflow_run_repository import APIWorkflowRunRepository
 from repositories.factory import DifyAPIRepositoryFactory
 
+logger = logging.getLogger(__name__)
+
 _file_access_controller = DatabaseFileAccessController()
 
+# Messages are loaded newest first in pages of this size until the token budget is used up.
+_HISTORY_PAGE_SIZE = 50
+_TOKEN_COUNT_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class _HistoryTurn:
+    message_id: str
+    user_prompt_message: PromptMessage
+    assistant_prompt_message: PromptMessage
+    # (user tokens, assistant tokens) when cached for the current model
+    token_counts: tuple[int, int] | None
+
 
 class TokenBufferMemory:
     def __init__(
@@ -125,36 +145,139 @@ class TokenBufferMemory:
     ) -> Sequence[PromptMessage]:
         """
         Get history prompt messages.
+
+        History that fits the budget is tokenized with a single count over the whole list, or not at
+        all when every message has a cached count. Only history over the budget is counted per
+        message, newest first, until the budget is used; those counts are cached in Redis per
+        message and model so later turns only tokenize new messages.
         :param max_token_limit: max token limit
         :param message_limit: message limit
         """
-        app_record = self.conversation.app
-
-        # fetch limited messages, and return reversed
-        stmt = (
-            select(Message).where(Message.conversation_id == self.conversation.id).order_by(Message.created_at.desc())
-        )
-
         if message_limit and message_limit > 0:
             message_limit = min(message_limit, 500)
         else:
             message_limit = 500
 
-        msg_limit_stmt = stmt.limit(message_limit)
+        turns = self._load_history_turns(max_token_limit, message_limit)
+        if not turns:
+            return []
+
+        cached_tokens = sum(sum(turn.token_counts) for turn in turns if turn.token_counts is not None)
+        if cached_tokens <= max_token_limit:
+            prompt_messages: list[PromptMessage] = []
+            for turn in reversed(turns):
+                prompt_messages.extend((turn.user_prompt_message, turn.assistant_prompt_message))
+            if all(turn.token_counts is not None for turn in turns):
+                return prompt_messages
+            if self.model_instance.get_llm_num_tokens(prompt_messages) <= max_token_limit:
+                return prompt_messages
 
-        messages = db.session.scalars(msg_limit_stmt).all()
+        return self._prune_history_turns(turns, max_token_limit)
 
-        # instead of all messages from the conversation, we only need to extract messages
-        # that belong to the thread of last message
-        thread_messages = extract_thread_messages(messages)
+    def _load_history_turns(self, max_token_limit: int, message_limit: int) -> list[_HistoryTurn]:
+        """
+        Load the turns of the newest thread, newest first, in pages of ``_HISTORY_PAGE_SIZE`` messages.
 
-        # for newly created message, its answer is temporarily empty, we don't need to add it to memory
-        if thread_messages and not thread_messages[0].answer and thread_messages[0].answer_tokens == 0:
-            thread_messages.pop(0)
+        Pages are keyed on the last loaded message rather than an offset, so messages created while
+        the history is read cannot shift a page and return a message twice.
+        """
+        app_record = self.conversation.app
+        turns: list[_HistoryTurn] = []
+        cached_tokens = 0
+        thread_extractor = ThreadMessageExtractor()
+        last_message: Message | None = None
+        fetched = 0
+        while not thread_extractor.finished and fetched < message_limit:
+            page_size = min(_HISTORY_PAGE_SIZE, message_limit - fetched)
+            stmt = (
+                select(Message)
+                .where(Message.conversation_id == self.conversation.id)
+                .order_by(Message.created_at.desc(), Message.id.desc())
+                .limit(page_size)
+            )
+            if last_message is not None:
+                stmt = stmt.where(
+                    or_(
+                        Message.created_at < last_message.created_at,
+                        and_(Message.created_at == last_message.created_at, Message.id < last_message.id),
+                    )
+                )
+            page = db.session.scalars(stmt).all()
+            if not page:
+                break
+
+            # instead of all messages from the conversation, we only need to extract messages
+            # that belong to the thread of last message
+            thread_messages = thread_extractor.feed(page)
+
+            # for newly created message, its answer is temporarily empty, we don't need to add it to memory
+            if (
+                last_message is None
+                and thread_messages
+                and not thread_messages[0].answer
+                and thread_messages[0].answer_tokens == 0
+            ):
+                thread_messages.pop(0)
+
+            page_turns = self._build_history_turns(thread_messages, app_record)
+            turns.extend(page_turns)
+            fetched += len(page)
+            last_message = page[-1]
+
+            # Older turns cannot fit once the cached counts alone exceed the budget.
+            cached_tokens += sum(sum(turn.token_counts) for turn in page_turns if turn.token_counts is not None)
+            if cached_tokens > max_token_limit or len(page) < page_size:
+                break
+
+        return turns
+
+    def _prune_history_turns(self, turns: Sequence[_HistoryTurn], max_token_limit: int) -> list[PromptMessage]:
+        """
+        Keep the newest prompt messages whose running token sum fits the budget.
 
-        messages = list(reversed(thread_messages))
+        Turns without a cached count are tokenized one prompt message at a time, and only until the
+        budget is used, so an over-budget history is never re-tokenized as a whole after each drop.
+        """
+        kept_prompt_messages: list[PromptMessage] = []
+        curr_message_tokens = 0
+        new_token_counts: dict[str, tuple[int, int]] = {}
+        for turn in turns:
+            token_counts = turn.token_counts
+            if token_counts is None:
+                token_counts = (
+                    self.model_instance.get_llm_num_tokens([turn.user_prompt_message]),
+                    self.model_instance.get_llm_num_tokens([turn.assistant_prompt_message]),
+                )
+                new_token_counts[turn.message_id] = token_counts
+
+            budget_exhausted = False
+            for prompt_message, prompt_tokens in (
+                (turn.assistant_prompt_message, token_counts[1]),
+                (turn.user_prompt_message, token_counts[0]),
+            ):
+                # prune the chat message if it exceeds the max token limit, but always keep the newest one
+                if kept_prompt_messages and curr_message_tokens + prompt_tokens > max_token_limit:
+                    budget_exhausted = True
+                    break
+                kept_prompt_messages.append(prompt_message)
+                curr_message_tokens += prompt_tokens
+            if budget_exhausted:
+                break
+
+        self._set_cached_token_counts(new_token_counts)
+        return list(reversed(kept_prompt_messages))
+
+    def _build_history_turns(self, messages: Sequence[Message], app_record) -> list[_HistoryTurn]:
+        """
+        Build the user and assistant prompt messages of each message with their cached token counts.
+        :param messages: messages ordered newest first
+        :param app_record: app record
+        :return: one turn per message, without token counts when they are not cached yet
+        """
+        if not messages:
+            return []
 
-        # Batch-load message files for the whole thread to avoid an N+1 query pattern.
+        # Batch-load message files for the whole page to avoid an N+1 query pattern.
         # Previously each message issued two MessageFile queries (user + assistant),
         # i.e. 2N+1 round-trips for N messages. We now use two batched queries keyed by
         # message_id, preserving the exact filter semantics (user files include rows
@@ -162,25 +285,24 @@ class TokenBufferMemory:
         message_ids = [message.id for message in messages]
         user_files_by_message: dict[str, list[MessageFile]] = defaultdict(list)
         assistant_files_by_message: dict[str, list[MessageFile]] = defaultdict(list)
-        if message_ids:
-            for message_file in db.session.scalars(
-                select(MessageFile).where(
-                    MessageFile.message_id.in_(message_ids),
-                    (MessageFile.belongs_to == "user") | (MessageFile.belongs_to.is_(None)),
-                )
-            ).all():
-                user_files_by_message[message_file.message_id].append(message_file)
-
-            for message_file in db.session.scalars(
-                select(MessageFile).where(
-                    MessageFile.message_id.in_(message_ids),
-                    MessageFile.belongs_to == "assistant",
-                )
-            ).all():
-                assistant_files_by_message[message_file.message_id].append(message_file)
-
-        curr_message_tokens = 0
-        prompt_messages: list[PromptMessage] = []
+        for message_file in db.session.scalars(
+            select(MessageFile).where(
+                MessageFile.message_id.in_(message_ids),
+                (MessageFile.belongs_to == "user") | (MessageFile.belongs_to.is_(None)),
+            )
+        ).all():
+            user_files_by_message[message_file.message_id].append(message_file)
+
+        for message_file in db.session.scalars(
+            select(MessageFile).where(
+                MessageFile.message_id.in_(message_ids),
+                MessageFile.belongs_to == "assistant",
+            )
+        ).all():
+            assistant_files_by_message[message_file.message_id].append(message_file)
+
+        cached_token_counts = self._get_cached_token_counts(message_ids)
+        turns: list[_HistoryTurn] = []
         for message in messages:
             # Process user message with files
             user_files = user_files_by_message.get(message.id, [])
@@ -193,9 +315,8 @@ class TokenBufferMemory:
                     app_record=app_record,
                     is_user_message=True,
                 )
-                prompt_messages.append(user_prompt_message)
             else:
-                prompt_messages.append(UserPromptMessage(content=message.query))
+                user_prompt_message = UserPromptMessage(content=message.query)
 
             # Process assistant message with files
             assistant_files = assistant_files_by_message.get(message.id, [])
@@ -208,22 +329,58 @@ class TokenBufferMemory:
                     app_record=app_record,
                     is_user_message=False,
                 )
-                prompt_messages.append(assistant_prompt_message)
             else:
-                prompt_messages.append(AssistantPromptMessage(content=message.answer))
+                assistant_prompt_message = AssistantPromptMessage(content=message.answer)
+
+            turns.append(
+                _HistoryTurn(
+                    message_id=message.id,
+                    user_prompt_message=user_prompt_message,
+                    assistant_prompt_message=assistant_prompt_message,
+                    token_counts=cached_token_counts.get(message.id),
+                )
+            )
 
-        if not prompt_messages:
-            return []
+        return turns
 
-        # prune the chat message if it exceeds the max token limit
-        curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+    def _token_count_cache_key(self, message_id: str) -> str:
+        # mget/pipeline bypass the wrapper's key prefixing, so serialize the physical name here.
+        return serialize_redis_name(
+            f"memory:message_tokens:{self.model_instance.provider}:{self.model_instance.model_name}:{message_id}"
+        )
 
-        if curr_message_tokens > max_token_limit:
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                prompt_messages.pop(0)
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+    def _get_cached_token_counts(self, message_ids: Sequence[str]) -> dict[str, tuple[int, int]]:
+        try:
+            values = redis_client.mget([self._token_count_cache_key(message_id) for message_id in message_ids])
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to read message token counts from Redis.", exc_info=True)
+            return {}
 
-        return prompt_messages
+        token_counts: dict[str, tuple[int, int]] = {}
+        for message_id, value in zip(message_ids, values):
+            if not value:
+                continue
+            try:
+                user_tokens, assistant_tokens = (int(count) for count in value.split(b","))
+            except ValueError:
+                continue
+            token_counts[message_id] = (user_tokens, assistant_tokens)
+        return token_counts
+
+    def _set_cached_token_counts(self, token_counts: dict[str, tuple[int, int]]) -> None:
+        if not token_counts:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for message_id, (user_tokens, assistant_tokens) in token_counts.items():
+                pipe.setex(
+                    self._token_count_cache_key(message_id),
+                    _TOKEN_COUNT_CACHE_TTL,
+                    f"{user_tokens},{assistant_tokens}",
+                )
+            pipe.execute()
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to write message token counts to Redis.", exc_info=True)
 
     def get_history_prompt_text(
         self,
@@ -1,4 +1,6 @@
 import logging
+import math
+import time
 from collections.abc import Callable, Generator, Iterable, Mapping, Sequence
 from copy import deepcopy
 from typing import IO, Any, Literal, Optional, ParamSpec, TypeVar, Union, cast, overload, override
@@ -10,9 +12,9 @@ from core.entities.embedding_type import EmbeddingInputType
 from core.entities.provider_configuration import ProviderConfiguration, ProviderModelBundle
 from core.entities.provider_entities import ModelLoadBalancingConfiguration
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError
+from core.helper.model_load_balancing import ModelLBHealthStore, get_load_balancing_policy
 from core.plugin.impl.model_runtime_factory import create_plugin_provider_manager
 from core.provider_manager import ProviderManager
-from extensions.ext_redis import redis_client
 from graphon.model_runtime.callbacks.base_callback import Callback
 from graphon.model_runtime.entities.llm_entities import LLMResult, LLMUsage
 from graphon.model_runtime.entities.message_entities import PromptMessage, PromptMessageTool
@@ -415,7 +417,7 @@ class ModelInstance:
 
             try:
                 kwargs["credentials"] = lb_config.credentials
-                return function(*args, **kwargs)
+                return self.load_balancing_manager.invoke(lb_config, function, *args, **kwargs)
             except InvokeRateLimitError as e:
                 # expire in 60 seconds
                 self.load_balancing_manager.cooldown(lb_config, expire=60)
@@ -875,39 +877,24 @@ class LBModelManager:
                 else:
                     load_balancing_config.credentials = managed_credentials
 
+        self._health = ModelLBHealthStore(tenant_id, provider, model_type, model)
+        self._policy = get_load_balancing_policy()
+
     def fetch_next(self) -> ModelLoadBalancingConfiguration | None:
         """
         Get next model load balancing config
-        Strategy: Round Robin
+        Strategy: the policy selected by MODEL_LB_STRATEGY, skipping configs in cooldown
         :return:
         """
-        cache_key = "model_lb_index:{}:{}:{}:{}".format(
-            self._tenant_id, self._provider, self._model_type.value, self._model
-        )
-
-        cooldown_load_balancing_configs = []
-        max_index = len(self._load_balancing_configs)
-
-        while True:
-            current_index = redis_client.incr(cache_key)
-            current_index = cast(int, current_index)
-            if current_index >= 10000000:
-                current_index = 1
-                redis_client.set(cache_key, current_index)
-
-            redis_client.expire(cache_key, 3600)
-            if current_index > max_index:
-                current_index = current_index % max_index
+        skipped_config_ids: set[str] = set()
 
-            real_index = current_index - 1
-            if real_index > max_index:
-                real_index = 0
-
-            config: ModelLoadBalancingConfiguration = self._load_balancing_configs[real_index]
+        for config in self._policy.candidates(self._load_balancing_configs, self._health):
+            if config.id in skipped_config_ids:
+                continue
 
             if self.in_cooldown(config):
-                cooldown_load_balancing_configs.append(config)
-                if len(cooldown_load_balancing_configs) >= len(self._load_balancing_configs):
+                skipped_config_ids.add(config.id)
+                if len(skipped_config_ids) >= len(self._load_balancing_configs):
                     # all configs are in cooldown
                     return None
 
@@ -925,12 +912,15 @@ class LBModelManager:
                     )
             except Exception:
                 logger.warning("Load balancing config %s failed policy compliance check", config.id, exc_info=True)
-                cooldown_load_balancing_configs.append(config)
-                if len(cooldown_load_balancing_configs) >= len(self._load_balancing_configs):
+                skipped_config_ids.add(config.id)
+                if len(skipped_config_ids) >= len(self._load_balancing_configs):
                     # all configs are in cooldown or failed policy compliance
                     return None
                 continue
 
+            if self._policy.consumes_tokens:
+                self._health.consume_token(config.id)
+
             if dify_config.DEBUG:
                 logger.info(
                     """Model LB
@@ -950,6 +940,53 @@ model: %s""",
 
             return config
 
+        return None
+
+    def invoke(
+        self, config: ModelLoadBalancingConfiguration, function: Callable[P, R], *args: P.args, **kwargs: P.kwargs
+    ) -> R:
+        """
+        Invoke function with config, recording the in-flight count and latency the policy balances on.
+        For streamed results the latency is the time to the first chunk and the request stays in flight
+        until the stream is exhausted or closed.
+        :param config: selected model load balancing config
+        :param function: function to invoke
+        :return:
+        """
+        track_outstanding = self._policy.tracks_outstanding
+        if not track_outstanding and not self._policy.tracks_latency:
+            return function(*args, **kwargs)
+
+        request_id = self._health.record_started(config.id) if track_outstanding else None
+        started_at = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException:
+            self._health.record_finished(config.id, latency=None, request_id=request_id)
+            raise
+
+        if isinstance(result, Generator):
+            return cast(R, self._track_stream(config, result, started_at, request_id))
+
+        self._health.record_finished(config.id, latency=time.perf_counter() - started_at, request_id=request_id)
+        return result
+
+    def _track_stream(
+        self,
+        config: ModelLoadBalancingConfiguration,
+        stream: Generator[Any, None, None],
+        started_at: float,
+        request_id: str | None,
+    ) -> Generator[Any, None, None]:
+        latency: float | None = None
+        try:
+            for chunk in stream:
+                if latency is None:
+                    latency = time.perf_counter() - started_at
+                yield chunk
+        finally:
+            self._health.record_finished(config.id, latency=latency, request_id=request_id)
+
     def cooldown(self, config: ModelLoadBalancingConfiguration, expire: int = 60):
         """
         Cooldown model load balancing config
@@ -957,24 +994,15 @@ model: %s""",
         :param expire: cooldown time
         :return:
         """
-        cooldown_cache_key = "model_lb_index:cooldown:{}:{}:{}:{}:{}".format(
-            self._tenant_id, self._provider, self._model_type.value, self._model, config.id
-        )
-
-        redis_client.setex(cooldown_cache_key, expire, "true")
+        self._health.cooldown(config.id, expire)
 
     def in_cooldown(self, config: ModelLoadBalancingConfiguration) -> bool:
         """
-        Check if model load balancing config is in cooldown
+        Check if model load balancing config is in cooldown, using the locally cached health state
         :param config: model load balancing config
         :return:
         """
-        cooldown_cache_key = "model_lb_index:cooldown:{}:{}:{}:{}:{}".format(
-            self._tenant_id, self._provider, self._model_type.value, self._model, config.id
-        )
-
-        res: bool = redis_client.exists(cooldown_cache_key)
-        return res
+        return self._health.config_health(config.id).in_cooldown(time.time())
 
     @staticmethod
     def get_config_in_cooldown_and_ttl(
@@ -989,13 +1017,8 @@ model: %s""",
         :param config_id: model load balancing config id
         :return:
         """
-        cooldown_cache_key = "model_lb_index:cooldown:{}:{}:{}:{}:{}".format(
-            tenant_id, provider, model_type.value, model, config_id
-        )
-
-        ttl = redis_client.ttl(cooldown_cache_key)
-        if ttl == -2:
+        remaining = ModelLBHealthStore(tenant_id, provider, model_type, model).cooldown_remaining(config_id)
+        if remaining <= 0:
             return False, 0
 
-        ttl = cast(int, ttl)
-        return True, ttl
+        return True, math.ceil(remaining)
@@ -247,6 +247,13 @@ class TaskData(BaseModel):
     trace_info: Any = None
 
 
+class TaskBatchData(BaseModel):
+    """Traces of one app exported together as a single storage object and Celery message."""
+
+    app_id: str
+    traces: list[TaskData]
+
+
 trace_info_info_map = {
     "WorkflowTraceInfo": WorkflowTraceInfo,
     "MessageTraceInfo": MessageTraceInfo,
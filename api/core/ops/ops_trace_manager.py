@@ -1,10 +1,12 @@
+import atexit
 import collections
 import json
 import logging
 import os
 import queue
+import random
 import threading
-import time
+import zlib
 from collections.abc import Mapping
 from datetime import timedelta
 from typing import TYPE_CHECKING, Any, TypedDict, override
@@ -33,6 +35,7 @@ from core.ops.entities.trace_entity import (
     ModerationTraceInfo,
     PromptGenerationTraceInfo,
     SuggestedQuestionTraceInfo,
+    TaskBatchData,
     TaskData,
     ToolTraceInfo,
     TraceTaskName,
@@ -1503,16 +1506,81 @@ class TraceTask:
             return {}
 
 
-trace_manager_timer: threading.Timer | None = None
-trace_manager_queue: queue.Queue = queue.Queue()
-trace_manager_interval = int(os.getenv("TRACE_QUEUE_MANAGER_INTERVAL", 5))
-trace_manager_batch_size = int(os.getenv("TRACE_QUEUE_MANAGER_BATCH_SIZE", 100))
+trace_manager_queue: queue.Queue = queue.Queue(maxsize=dify_config.TRACE_QUEUE_MANAGER_MAX_SIZE)
+trace_manager_interval = dify_config.TRACE_QUEUE_MANAGER_INTERVAL
+trace_manager_batch_size = dify_config.TRACE_QUEUE_MANAGER_BATCH_SIZE
+trace_manager_exporter: "TraceExporter | None" = None
+trace_manager_exporter_lock = threading.Lock()
+trace_manager_dropped_count = 0
+_DROPPED_TRACE_LOG_EVERY = 1000
+
+
+def _record_dropped_trace(trace_task: "TraceTask") -> None:
+    global trace_manager_dropped_count
+    with trace_manager_exporter_lock:
+        trace_manager_dropped_count += 1
+        dropped = trace_manager_dropped_count
+    if dropped == 1 or dropped % _DROPPED_TRACE_LOG_EVERY == 0:
+        logger.warning(
+            "Trace queue is full, dropped trace_type %s (%s traces dropped so far)", trace_task.trace_type, dropped
+        )
+
+
+def should_sample_trace(app_id: str | None, trace_task: "TraceTask") -> bool:
+    """Apply the app's sample rate, keeping or dropping the traces of one workflow run or message together."""
+    rate = dify_config.OPS_TRACE_SAMPLE_RATE
+    if app_id and dify_config.inner_OPS_TRACE_APP_SAMPLE_RATES:
+        rate = dify_config.OPS_TRACE_APP_SAMPLE_RATES.get(app_id, rate)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+
+    sampling_key = trace_task.trace_id or trace_task.workflow_run_id or trace_task.message_id
+    if sampling_key is None:
+        return random.random() < rate  # noqa: S311
+    return zlib.crc32(str(sampling_key).encode()) / 2**32 < rate
+
+
+class TraceExporter:
+    """Background thread that exports queued trace tasks in batches.
+
+    A flush runs every ``trace_manager_interval`` seconds, or as soon as
+    ``trace_manager_batch_size`` tasks were queued since the previous flush.
+    """
+
+    def __init__(self, trace_manager: "TraceQueueManager"):
+        self._trace_manager = trace_manager
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._queued_since_flush = 0
+        self._thread = threading.Thread(target=self._run, name="trace_manager_exporter", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        # The thread is a daemon, so export whatever is still queued when the process exits.
+        atexit.register(self._trace_manager.run)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def task_queued(self) -> None:
+        with self._lock:
+            self._queued_since_flush += 1
+            if self._queued_since_flush >= trace_manager_batch_size:
+                self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(trace_manager_interval)
+            self._wakeup.clear()
+            with self._lock:
+                self._queued_since_flush = 0
+            self._trace_manager.run()
 
 
 class TraceQueueManager:
     def __init__(self, app_id=None, user_id=None):
-        global trace_manager_timer
-
         self.app_id = app_id
         self.user_id = user_id
         self.trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
@@ -1521,44 +1589,53 @@ class TraceQueueManager:
         from core.telemetry.gateway import is_enterprise_telemetry_enabled
 
         self._enterprise_telemetry_enabled = is_enterprise_telemetry_enabled()
-        if trace_manager_timer is None:
-            self.start_timer()
+        self.start_exporter()
 
     def add_trace_task(self, trace_task: TraceTask):
-        global trace_manager_timer, trace_manager_queue
         try:
-            if self._enterprise_telemetry_enabled or self.trace_instance:
-                trace_task.app_id = self.app_id
-                trace_manager_queue.put(trace_task)
+            if not (self._enterprise_telemetry_enabled or self.trace_instance):
+                return
+            if not should_sample_trace(self.app_id, trace_task):
+                return
+            trace_task.app_id = self.app_id
+            # Never block the request thread on tracing; a full queue means the exporter is behind.
+            trace_manager_queue.put(trace_task, block=False)
+        except queue.Full:
+            _record_dropped_trace(trace_task)
+            return
         except Exception:
             logger.exception("Error adding trace task, trace_type %s", trace_task.trace_type)
-        finally:
-            self.start_timer()
+            return
+        self.start_exporter().task_queued()
 
     def collect_tasks(self):
-        global trace_manager_queue
         tasks: list[TraceTask] = []
-        while len(tasks) < trace_manager_batch_size and not trace_manager_queue.empty():
-            task = trace_manager_queue.get_nowait()
+        while len(tasks) < trace_manager_batch_size:
+            try:
+                task = trace_manager_queue.get_nowait()
+            except queue.Empty:
+                break
             tasks.append(task)
             trace_manager_queue.task_done()
         return tasks
 
     def run(self):
-        try:
-            tasks = self.collect_tasks()
-            if tasks:
+        while tasks := self.collect_tasks():
+            try:
                 self.send_to_celery(tasks)
-        except Exception:
-            logger.exception("Error processing trace tasks")
-
-    def start_timer(self):
-        global trace_manager_timer
-        if trace_manager_timer is None or not trace_manager_timer.is_alive():
-            trace_manager_timer = threading.Timer(trace_manager_interval, self.run)
-            trace_manager_timer.name = f"trace_manager_timer_{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}"
-            trace_manager_timer.daemon = False
-            trace_manager_timer.start()
+            except Exception:
+                logger.exception("Error processing trace tasks")
+
+    def start_exporter(self) -> TraceExporter:
+        global trace_manager_exporter
+        exporter = trace_manager_exporter
+        if exporter is None or not exporter.is_alive():
+            with trace_manager_exporter_lock:
+                if trace_manager_exporter is None or not trace_manager_exporter.is_alive():
+                    trace_manager_exporter = TraceExporter(self)
+                    trace_manager_exporter.start()
+                exporter = trace_manager_exporter
+        return exporter
 
     def _resolve_storage_id(self, task: TraceTask) -> str | None:
         storage_id = task.app_id
@@ -1572,29 +1649,15 @@ class TraceQueueManager:
         logger.warning("Skipping trace without app_id or tenant_id, trace_type: %s", task.trace_type)
         return None
 
-    def persist_trace_task(self, task: TraceTask, *, file_id: str | None = None) -> dict[str, str] | None:
-        if not (self._enterprise_telemetry_enabled or self.trace_instance):
-            return None
-
-        task.app_id = self.app_id
-        storage_id = self._resolve_storage_id(task)
-        if storage_id is None:
-            return None
-
-        resolved_file_id = file_id or uuid4().hex
+    def _build_task_data(self, task: TraceTask, storage_id: str) -> TaskData:
         trace_info = task.execute()
         if isinstance(trace_info, BaseTraceInfo) and trace_info.operation_id is None:
             trace_info = trace_info.model_copy(update={"operation_id": str(uuid4())})
-        task_data = TaskData(
+        return TaskData(
             app_id=storage_id,
             trace_info_type=type(trace_info).__name__,
             trace_info=trace_info.model_dump() if trace_info else None,
         )
-        storage.save(
-            ops_trace_payload_path(storage_id, resolved_file_id),
-            task_data.model_dump_json().encode("utf-8"),
-        )
-        return {"file_id": resolved_file_id, "app_id": storage_id}
 
     def enqueue_persisted_trace(self, file_info: dict[str, str]) -> None:
         process_trace_tasks.apply_async(
@@ -1609,8 +1672,26 @@ class TraceQueueManager:
         )
 
     def send_to_celery(self, tasks: list[TraceTask]):
+        """Persist the tasks as one storage object per app and enqueue one Celery message for each."""
+        batches: dict[str, list[TaskData]] = {}
         with self.flask_app.app_context():
             for task in tasks:
-                file_info = self.persist_trace_task(task)
-                if file_info is not None:
-                    self.enqueue_persisted_trace(file_info)
+                # Tasks were gated and stamped with their own app_id when queued.
+                storage_id = self._resolve_storage_id(task)
+                if storage_id is None:
+                    continue
+                try:
+                    batches.setdefault(storage_id, []).append(self._build_task_data(task, storage_id))
+                except Exception:
+                    logger.exception("Error building trace, trace_type %s", task.trace_type)
+
+            for storage_id, traces in batches.items():
+                file_id = uuid4().hex
+                try:
+                    storage.save(
+                        ops_trace_payload_path(storage_id, file_id),
+                        TaskBatchData(app_id=storage_id, traces=traces).model_dump_json().encode("utf-8"),
+                    )
+                    self.enqueue_persisted_trace({"file_id": file_id, "app_id": storage_id})
+                except Exception:
+                    logger.exception("Error exporting %s traces for %s", len(traces), storage_id)
@@ -4,22 +4,43 @@ from constants import UUID_NIL
 from models import Message
 
 
-def extract_thread_messages(messages: Sequence[Message]):
-    thread_messages: list[Message] = []
-    next_message = None
-
-    for message in messages:
-        if not message.parent_message_id:
-            # If the message is regenerated and does not have a parent message, it is the start of a new thread
-            thread_messages.append(message)
-            break
-
-        if not next_message:
-            thread_messages.append(message)
-            next_message = message.parent_message_id
-        else:
-            if next_message in {message.id, UUID_NIL}:
+class ThreadMessageExtractor:
+    """
+    Incrementally extract the thread of the newest message from pages of messages ordered newest first.
+
+    Feeding the pages one by one yields the same messages as calling ``extract_thread_messages`` on
+    their concatenation, so callers can stop fetching older pages as soon as they have enough history.
+    """
+
+    def __init__(self) -> None:
+        self._next_message: str | None = None
+        self._started = False
+        self.finished = False
+
+    def feed(self, messages: Sequence[Message]) -> list[Message]:
+        thread_messages: list[Message] = []
+
+        for message in messages:
+            if self.finished:
+                break
+
+            if not message.parent_message_id:
+                # If the message is regenerated and does not have a parent message, it is the start of a new thread
                 thread_messages.append(message)
-                next_message = message.parent_message_id
+                self.finished = True
+                break
 
-    return thread_messages
+            if not self._started:
+                thread_messages.append(message)
+                self._next_message = message.parent_message_id
+                self._started = True
+            else:
+                if self._next_message in {message.id, UUID_NIL}:
+                    thread_messages.append(message)
+                    self._next_message = message.parent_message_id
+
+        return thread_messages
+
+
+def extract_thread_messages(messages: Sequence[Message]):
+    return ThreadMessageExtractor().feed(messages)
@@ -3,6 +3,8 @@ from __future__ import annotations
 import contextlib
 import json
 import logging
+import threading
+import time
 from collections import defaultdict
 from collections.abc import Callable, Sequence
 from dataclasses import asdict, dataclass
@@ -10,7 +12,9 @@ from enum import StrEnum
 from json import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Protocol, Self
 
+from cachetools import LRUCache
 from pydantic import TypeAdapter, ValidationError
+from redis import RedisError
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
@@ -40,6 +44,7 @@ from enums import DeploymentEdition
 from extensions import ext_hosting_provider
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
+from extensions.redis_names import serialize_redis_name
 from graphon.model_runtime.entities.model_entities import ModelType
 from graphon.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -64,6 +69,8 @@ from models.provider_ids import ModelProviderID
 from services.feature_service import FeatureService
 
 if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter, Histogram
+
     from graphon.model_runtime.protocols.runtime import ModelRuntime
     from models.account import Account
 
@@ -334,10 +341,11 @@ class _LoadBalancingModelConfigCacheEntry:
 class _ProviderConfigurationSourceCache:
     """Redis-backed cache for tenant provider DB cache entries.
 
-    The assembled ``ProviderConfigurations`` object is intentionally not cached
-    here because it carries request-scoped runtime bindings. Cache only the DB
-    rows that are stable enough to reuse across processes, then let each
-    ``ProviderManager`` assemble and bind fresh runtime-aware entities.
+    The assembled ``ProviderConfigurations`` object is not shared across
+    processes because it carries decrypted credentials and request-scoped
+    runtime bindings. Cache only the DB rows here; the per-process
+    ``_AssembledProviderConfigurationsCache`` reuses assembled objects keyed by
+    the version stamps maintained by this class.
     """
 
     @classmethod
@@ -557,6 +565,199 @@ _PROVIDER_LOAD_BALANCING_CONFIGS_CACHE_SOURCE = _ProviderConfigurationCacheSourc
 )
 
 
+class ProviderConfigurationsCacheStats:
+    """Process-wide counters for the assembled configurations cache, optionally mirrored to OpenTelemetry."""
+
+    _lookups_total: Counter | None
+    _rebuild_duration: Histogram | None
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._lookups_total = None
+        self._rebuild_duration = None
+        self._instruments_initialized = False
+
+    def _init_instruments(self) -> None:
+        self._instruments_initialized = True
+        if not dify_config.ENABLE_OTEL:
+            return
+        try:
+            from opentelemetry.metrics import get_meter
+
+            meter = get_meter("provider_configurations_cache", version=dify_config.project.version)
+            self._lookups_total = meter.create_counter(
+                "provider_configurations_cache_lookups_total",
+                description="Total assembled provider configurations cache lookups by result.",
+                unit="{lookup}",
+            )
+            self._rebuild_duration = meter.create_histogram(
+                "provider_configurations_rebuild_duration",
+                description="Time spent assembling a tenant's provider configurations on a cache miss.",
+                unit="s",
+            )
+        except Exception:
+            logger.exception("provider_configurations_cache_metrics: failed to initialize instruments")
+
+    def _ensure_instruments(self) -> None:
+        if not self._instruments_initialized:
+            self._init_instruments()
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self._hits += 1
+            self._ensure_instruments()
+        if self._lookups_total is None:
+            return
+        try:
+            self._lookups_total.add(1, {"result": "hit"})
+        except Exception:
+            logger.exception("provider_configurations_cache_metrics: failed to add counter value")
+
+    def record_rebuild(self, duration: float) -> None:
+        with self._lock:
+            self._misses += 1
+            self._ensure_instruments()
+        try:
+            if self._lookups_total is not None:
+                self._lookups_total.add(1, {"result": "miss"})
+            if self._rebuild_duration is not None:
+                self._rebuild_duration.record(duration)
+        except Exception:
+            logger.exception("provider_configurations_cache_metrics: failed to record rebuild")
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+
+provider_configurations_cache_stats = ProviderConfigurationsCacheStats()
+
+
+@dataclass(frozen=True, slots=True)
+class _AssembledConfigurationsEntry:
+    stamp: tuple[str, ...]
+    built_at: float
+    configurations: ProviderConfigurations
+
+
+class _AssembledProviderConfigurationsCache:
+    """Per-process LRU of assembled ``ProviderConfigurations`` keyed by tenant.
+
+    Each entry is filed under the combined source version stamp read *before* the
+    configurations were assembled, so bumping any source version in Redis makes
+    every worker rebuild on its next lookup. Entries also expire after
+    ``PROVIDER_CONFIGURATIONS_CACHE_TTL`` because quota usage and plugin
+    installation state feed the assembly without bumping a version. Callers get
+    per-request copies bound to their own runtime, never the cached objects.
+    """
+
+    _cache: LRUCache[str, _AssembledConfigurationsEntry] | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_cache(cls) -> LRUCache[str, _AssembledConfigurationsEntry] | None:
+        max_size = dify_config.PROVIDER_CONFIGURATIONS_CACHE_MAX_TENANTS
+        if max_size <= 0:
+            return None
+
+        if cls._cache is None or cls._cache.maxsize != max_size:
+            with cls._lock:
+                if cls._cache is None or cls._cache.maxsize != max_size:
+                    cls._cache = LRUCache(maxsize=max_size)
+        return cls._cache
+
+    @classmethod
+    def read_stamp(cls, tenant_id: str) -> tuple[str, ...] | None:
+        """Return the combined source versions, or ``None`` when the cache is disabled or cannot be trusted."""
+        if cls._get_cache() is None:
+            return None
+        # mget bypasses the wrapper's key prefixing, so serialize the physical names here.
+        version_keys = [
+            serialize_redis_name(_PROVIDER_CONFIGURATION_CACHE_VERSION_KEY.format(tenant_id=tenant_id, source=source))
+            for source in _PROVIDER_CONFIGURATION_SOURCES
+        ]
+        try:
+            versions = list(redis_client.mget(version_keys))
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to read provider configuration versions", exc_info=True)
+            return None
+        # A missing version is recreated as "0" by the source cache during assembly; skip caching until it exists.
+        if len(versions) != len(version_keys) or any(version is None for version in versions):
+            return None
+        return tuple(version.decode("utf-8") if isinstance(version, bytes) else str(version) for version in versions)
+
+    @classmethod
+    def get(cls, tenant_id: str, stamp: tuple[str, ...]) -> ProviderConfigurations | None:
+        cache = cls._get_cache()
+        if cache is None:
+            return None
+        with cls._lock:
+            entry = cache.get(tenant_id)
+        if entry is None or entry.stamp != stamp:
+            return None
+        if time.monotonic() - entry.built_at > dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL:
+            return None
+        return entry.configurations
+
+    @classmethod
+    def set(
+        cls,
+        tenant_id: str,
+        stamp: tuple[str, ...],
+        configurations: ProviderConfigurations,
+        *,
+        built_at: float,
+    ) -> None:
+        cache = cls._get_cache()
+        if cache is None:
+            return
+        with cls._lock:
+            cache[tenant_id] = _AssembledConfigurationsEntry(
+                stamp=stamp, built_at=built_at, configurations=configurations
+            )
+
+    @classmethod
+    def discard(cls, tenant_id: str) -> None:
+        with cls._lock:
+            if cls._cache is not None:
+                cls._cache.pop(tenant_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._cache = None
+
+
+def clear_assembled_provider_configurations_cache() -> None:
+    """Drop every assembled configuration cached in this process (used by tests)."""
+    _AssembledProviderConfigurationsCache.clear()
+
+
+def _copy_provider_configurations(
+    configurations: ProviderConfigurations, model_runtime: ModelRuntime
+) -> ProviderConfigurations:
+    """Copy cached configurations for one request, sharing the immutable provider schemas."""
+    copied_configurations = ProviderConfigurations(tenant_id=configurations.tenant_id)
+    for provider_name, provider_configuration in configurations.configurations.items():
+        copied_configuration = provider_configuration.model_copy(
+            update={
+                "system_configuration": provider_configuration.system_configuration.model_copy(deep=True),
+                "custom_configuration": provider_configuration.custom_configuration.model_copy(deep=True),
+                "model_settings": [setting.model_copy(deep=True) for setting in provider_configuration.model_settings],
+            }
+        )
+        copied_configuration.bind_model_runtime(model_runtime)
+        copied_configurations[provider_name] = copied_configuration
+    return copied_configurations
+
+
 class ProviderManager:
     """
     ProviderManager manages tenant-scoped model provider configuration.
@@ -572,6 +773,10 @@ class ProviderManager:
     of rebuilding it for every lookup. Call ``clear_configurations_cache()``
     when a long-lived manager needs to observe writes performed within the same
     instance scope.
+
+    Across managers, assembled configurations are also reused per worker process
+    while the tenant's source version stamps in Redis are unchanged; each manager
+    receives its own copy bound to its runtime.
     """
 
     # Keyed by tenant_id -- a single ProviderManager instance may be asked to decrypt
@@ -607,6 +812,7 @@ class ProviderManager:
     ) -> None:
         """Invalidate cross-process provider configuration source cache for a tenant."""
         _ProviderConfigurationSourceCache.invalidate_tenant(tenant_id, sources=sources)
+        _AssembledProviderConfigurationsCache.discard(tenant_id)
 
     def get_configurations(self, tenant_id: str) -> ProviderConfigurations:
         """
@@ -649,6 +855,31 @@ class ProviderManager:
         if cached_configurations is not None:
             return cached_configurations
 
+        stamp = _AssembledProviderConfigurationsCache.read_stamp(tenant_id)
+        if stamp is not None:
+            shared_configurations = _AssembledProviderConfigurationsCache.get(tenant_id, stamp)
+            if shared_configurations is not None:
+                provider_configurations_cache_stats.record_hit()
+                provider_configurations = _copy_provider_configurations(shared_configurations, self._model_runtime)
+                self._configurations_cache[tenant_id] = provider_configurations
+                return provider_configurations
+
+        build_started_at = time.monotonic()
+        provider_configurations = self._build_configurations(tenant_id)
+        provider_configurations_cache_stats.record_rebuild(time.monotonic() - build_started_at)
+        if stamp is not None:
+            _AssembledProviderConfigurationsCache.set(
+                tenant_id,
+                stamp,
+                _copy_provider_configurations(provider_configurations, self._model_runtime),
+                built_at=build_started_at,
+            )
+        self._configurations_cache[tenant_id] = provider_configurations
+
+        # Return the encapsulated object
+        return provider_configurations
+
+    def _build_configurations(self, tenant_id: str) -> ProviderConfigurations:
         # Get all provider records of the workspace
         provider_name_to_provider_records_dict = self._get_all_providers(tenant_id)
 
@@ -820,9 +1051,6 @@ class ProviderManager:
 
             provider_configurations[str(provider_id_entity)] = provider_configuration
 
-        self._configurations_cache[tenant_id] = provider_configurations
-
-        # Return the encapsulated object
         return provider_configurations
 
     def get_provider_model_bundle(self, tenant_id: str, provider: str, model_type: ModelType) -> ProviderModelBundle:
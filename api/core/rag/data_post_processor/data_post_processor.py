@@ -93,6 +93,7 @@ class DataPostProcessor:
                         keyword_weight=weights["keyword_setting"]["keyword_weight"],
                     ),
                 ),
+                session=session,
             )
             return runner
         elif reranking_mode == RerankMode.RERANKING_MODEL:
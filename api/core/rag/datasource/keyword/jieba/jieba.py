@@ -8,6 +8,12 @@ from sqlalchemy.orm import Session
 
 from configs import dify_config
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.jieba.keyword_table_cache import (
+    KeywordTableSnapshot,
+    bump_keyword_table_version,
+    bump_keyword_table_version_after_commit,
+    load_keyword_table_snapshot,
+)
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
@@ -76,17 +82,10 @@ class Jieba(BaseKeyword):
 
     @override
     def text_exists(self, id: str, *, session: Session) -> bool:
-        dataset_keyword_table = self.dataset.get_dataset_keyword_table(session=session)
-        keyword_table = None
-        keyword_table_dict = (
-            dataset_keyword_table.get_keyword_table_dict(session=session) if dataset_keyword_table else None
-        )
-        if keyword_table_dict:
-            data: Any = keyword_table_dict["__data__"]
-            keyword_table = dict(data["table"])
-        if keyword_table is None:
+        snapshot = self._load_keyword_table_snapshot(session)
+        if snapshot is None:
             return False
-        return id in set.union(*keyword_table.values())
+        return id in snapshot.node_ids
 
     @override
     def delete_by_ids(self, ids: list[str], session: Session, **kwargs: Any):
@@ -100,18 +99,9 @@ class Jieba(BaseKeyword):
 
     @override
     def search(self, query: str, *, session: Session, **kwargs: Any) -> list[Document]:
-        dataset_keyword_table = self.dataset.get_dataset_keyword_table(session=session)
-        keyword_table = None
-        keyword_table_dict = (
-            dataset_keyword_table.get_keyword_table_dict(session=session) if dataset_keyword_table else None
-        )
-        if keyword_table_dict:
-            data: Any = keyword_table_dict["__data__"]
-            keyword_table = dict(data["table"])
-
         k = kwargs.get("top_k", 4)
         document_ids_filter = kwargs.get("document_ids_filter")
-        sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
+        sorted_chunk_indices = self._search_node_ids(query, k, session)
 
         documents = []
 
@@ -149,6 +139,7 @@ class Jieba(BaseKeyword):
             if dataset_keyword_table:
                 session.delete(dataset_keyword_table)
                 session.commit()
+                bump_keyword_table_version(self.dataset.id)
                 if dataset_keyword_table.data_source_type != "database":
                     file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
                     storage.delete(file_key)
@@ -167,11 +158,32 @@ class Jieba(BaseKeyword):
                 return
             dataset_keyword_table.keyword_table = dumps_with_sets(keyword_table_dict)
             session.flush()
+            bump_keyword_table_version_after_commit(session, self.dataset.id)
         else:
             file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
             if storage.exists(file_key):
                 storage.delete(file_key)
             storage.save(file_key, dumps_with_sets(keyword_table_dict).encode("utf-8"))
+            bump_keyword_table_version(self.dataset.id)
+
+    def _search_node_ids(self, query: str, k: int, session: Session) -> list[str]:
+        snapshot = self._load_keyword_table_snapshot(session)
+        return self._retrieve_ids_by_query(snapshot.table if snapshot else {}, query, k)
+
+    def _load_keyword_table_snapshot(self, session: Session) -> KeywordTableSnapshot | None:
+        """Read-only view of the keyword table, served from the per-process cache while its version is current."""
+
+        def load() -> dict[str, set[str]] | None:
+            dataset_keyword_table = self.dataset.get_dataset_keyword_table(session=session)
+            keyword_table_dict = (
+                dataset_keyword_table.get_keyword_table_dict(session=session) if dataset_keyword_table else None
+            )
+            if not keyword_table_dict:
+                return None
+            data: Any = keyword_table_dict["__data__"]
+            return dict(data["table"])
+
+        return load_keyword_table_snapshot(self.dataset.id, load)
 
     def _get_dataset_keyword_table(self, session: Session) -> dict[str, set[str]] | None:
         dataset_keyword_table = session.scalar(
@@ -233,7 +245,7 @@ class Jieba(BaseKeyword):
 
         # go through text chunks in order of most matching keywords
         chunk_indices_count: dict[str, int] = defaultdict(int)
-        keywords_list = [keyword for keyword in keywords if keyword in set(keyword_table.keys())]
+        keywords_list = [keyword for keyword in keywords if keyword in keyword_table]
         for keyword in keywords_list:
             for node_id in keyword_table[keyword]:
                 chunk_indices_count[node_id] += 1
@@ -0,0 +1,175 @@
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, override
+
+from sqlalchemy import Insert, delete, exists, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba, PreSegmentData
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from models.dataset import DatasetKeywordPosting
+
+_MAX_KEYWORD_LENGTH = 255
+_NODE_ID_BATCH_SIZE = 500
+
+
+def _batched(items: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _insert_ignoring_existing_postings(session: Session) -> Insert:
+    """INSERT that skips postings already written, e.g. by a concurrent indexing of the same node."""
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return pg_insert(DatasetKeywordPosting).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite_insert(DatasetKeywordPosting).on_conflict_do_nothing()
+    if dialect_name == "mysql":
+        stmt = mysql_insert(DatasetKeywordPosting)
+        # The whole row is the primary key, so rewriting one of its columns is a no-op update.
+        return stmt.on_duplicate_key_update(index_node_id=stmt.inserted.index_node_id)
+    return insert(DatasetKeywordPosting)
+
+
+class JiebaInvertedIndex(Jieba):
+    """Jieba keyword index stored as one ``dataset_keyword_postings`` row per (keyword, node).
+
+    Unlike :class:`Jieba`, which rewrites a single JSON keyword table per dataset under a
+    dataset-wide Redis lock, every write here only touches the postings of the nodes being
+    indexed and runs in the caller's transaction, so concurrent indexing of one dataset no
+    longer serializes and searches never decode the whole table.
+    """
+
+    @override
+    def create(self, texts: list[Document], session: Session, **kwargs: Any) -> BaseKeyword:
+        self.add_texts(texts, session, **kwargs)
+        return self
+
+    @override
+    def add_texts(self, texts: list[Document], session: Session, **kwargs: Any):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+        keyword_number = self.dataset.keyword_number or self._config.max_keywords_per_chunk
+
+        node_keywords: dict[str, list[str]] = {}
+        for i, text in enumerate(texts):
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(text.page_content, keyword_number)
+            if text.metadata is not None:
+                node_id = text.metadata["doc_id"]
+                self._update_segment_keywords(self.dataset.id, node_id, list(keywords), session)
+                node_keywords[node_id] = list(keywords)
+
+        self._replace_postings(node_keywords, session)
+
+    @override
+    def text_exists(self, id: str, *, session: Session) -> bool:
+        return bool(
+            session.scalar(
+                select(
+                    exists().where(
+                        DatasetKeywordPosting.dataset_id == self.dataset.id,
+                        DatasetKeywordPosting.index_node_id == id,
+                    )
+                )
+            )
+        )
+
+    @override
+    def delete_by_ids(self, ids: list[str], session: Session, **kwargs: Any):
+        self._delete_postings(ids, session)
+
+    @override
+    def delete(self, *, session: Session):
+        session.execute(delete(DatasetKeywordPosting).where(DatasetKeywordPosting.dataset_id == self.dataset.id))
+        session.commit()
+
+    @override
+    def _search_node_ids(self, query: str, k: int, session: Session) -> list[str]:
+        keywords = list(JiebaKeywordTableHandler().extract_keywords(query))
+        if not keywords:
+            return []
+
+        # Rank nodes by the number of query keywords they contain, as the JSON keyword table does.
+        match_count = func.count().label("match_count")
+        stmt = (
+            select(DatasetKeywordPosting.index_node_id, match_count)
+            .where(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.keyword.in_(keywords),
+            )
+            .group_by(DatasetKeywordPosting.index_node_id)
+            .order_by(match_count.desc(), DatasetKeywordPosting.index_node_id)
+            .limit(k)
+        )
+        return list(session.scalars(stmt))
+
+    @override
+    def create_segment_keywords(self, node_id: str, keywords: list[str], session: Session):
+        self._update_segment_keywords(self.dataset.id, node_id, keywords, session)
+        self._replace_postings({node_id: keywords}, session)
+
+    @override
+    def multi_create_segment_keywords(self, pre_segment_data_list: list[PreSegmentData], session: Session):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keyword_number = self.dataset.keyword_number or self._config.max_keywords_per_chunk
+        node_keywords: dict[str, list[str]] = {}
+        for pre_segment_data in pre_segment_data_list:
+            segment = pre_segment_data["segment"]
+            keywords = pre_segment_data["keywords"] or list(
+                keyword_table_handler.extract_keywords(segment.content, keyword_number)
+            )
+            segment.keywords = keywords
+            assert segment.index_node_id
+            node_keywords[segment.index_node_id] = keywords
+        self._replace_postings(node_keywords, session)
+
+    @override
+    def update_segment_keywords_index(self, node_id: str, keywords: list[str], session: Session):
+        existing = session.scalars(
+            select(DatasetKeywordPosting.keyword).where(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.index_node_id == node_id,
+            )
+        ).all()
+        existing_keywords = set(existing)
+        self._insert_postings({node_id: [keyword for keyword in keywords if keyword not in existing_keywords]}, session)
+
+    def rebuild_from_keyword_table(self, keyword_table: Mapping[str, Iterable[str]], session: Session):
+        """Replace all postings of the dataset with the contents of a legacy keyword -> node ids table."""
+        node_keywords: dict[str, list[str]] = {}
+        for keyword, node_ids in keyword_table.items():
+            for node_id in node_ids:
+                node_keywords.setdefault(node_id, []).append(keyword)
+        session.execute(delete(DatasetKeywordPosting).where(DatasetKeywordPosting.dataset_id == self.dataset.id))
+        self._insert_postings(node_keywords, session)
+
+    def _replace_postings(self, node_keywords: Mapping[str, Iterable[str]], session: Session):
+        self._delete_postings(list(node_keywords), session)
+        self._insert_postings(node_keywords, session)
+
+    def _delete_postings(self, node_ids: Sequence[str], session: Session):
+        for batch in _batched(node_ids, _NODE_ID_BATCH_SIZE):
+            session.execute(
+                delete(DatasetKeywordPosting).where(
+                    DatasetKeywordPosting.dataset_id == self.dataset.id,
+                    DatasetKeywordPosting.index_node_id.in_(batch),
+                )
+            )
+
+    def _insert_postings(self, node_keywords: Mapping[str, Iterable[str]], session: Session):
+        rows = [
+            {"dataset_id": self.dataset.id, "keyword": keyword, "index_node_id": node_id}
+            for node_id, keywords in node_keywords.items()
+            for keyword in dict.fromkeys(keywords)
+            # Longer tokens do not fit the keyword column.
+            if keyword and len(keyword) <= _MAX_KEYWORD_LENGTH
+        ]
+        if rows:
+            session.execute(_insert_ignoring_existing_postings(session), rows)
@@ -0,0 +1,132 @@
+"""Per-process cache of decoded jieba keyword tables, invalidated by a Redis version stamp.
+
+Searching a keyword-table dataset used to re-read and JSON-decode the whole table on
+every query. Decoded tables are now kept per process and keyed by a version stamp that
+writers bump once their change is visible to other processes: immediately for
+object-storage tables and after the session commits for database tables. Readers take
+the stamp *before* loading the table, so a table loaded concurrently with a write is
+filed under the old stamp and never served once the stamp has moved on.
+
+When Redis is unavailable the cache is bypassed and every read goes to the source.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+
+from cachetools import LRUCache
+from redis import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_PENDING_BUMPS_INFO_KEY = "keyword_table_versions_to_bump"
+
+
+class KeywordTableSnapshot:
+    """A decoded keyword table plus the reverse node -> keywords lookup derived from it."""
+
+    def __init__(self, table: dict[str, set[str]]) -> None:
+        self.table = table
+        self._node_ids: frozenset[str] | None = None
+
+    @property
+    def node_ids(self) -> frozenset[str]:
+        if self._node_ids is None:
+            self._node_ids = frozenset(node_id for node_ids in self.table.values() for node_id in node_ids)
+        return self._node_ids
+
+
+_cache: LRUCache[str, tuple[int, KeywordTableSnapshot | None]] | None = None
+_cache_lock = threading.Lock()
+
+
+def _version_key(dataset_id: str) -> str:
+    return f"keyword_table_version:{dataset_id}"
+
+
+def _get_cache() -> LRUCache[str, tuple[int, KeywordTableSnapshot | None]] | None:
+    max_size = dify_config.KEYWORD_TABLE_CACHE_MAX_DATASETS
+    if max_size <= 0:
+        return None
+
+    global _cache
+    if _cache is None or _cache.maxsize != max_size:
+        with _cache_lock:
+            if _cache is None or _cache.maxsize != max_size:
+                _cache = LRUCache(maxsize=max_size)
+    return _cache
+
+
+def clear_keyword_table_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def _read_version(dataset_id: str) -> int | None:
+    key = _version_key(dataset_id)
+    try:
+        version = redis_client.get(key)
+        if version is None:
+            redis_client.setnx(key, 0)
+            version = redis_client.get(key)
+        return int(version) if version is not None else None
+    except (RedisError, RuntimeError, ValueError):
+        logger.warning("Failed to read keyword table version for dataset %s.", dataset_id, exc_info=True)
+        return None
+
+
+def load_keyword_table_snapshot(
+    dataset_id: str, loader: Callable[[], dict[str, set[str]] | None]
+) -> KeywordTableSnapshot | None:
+    """Return the decoded keyword table for ``dataset_id``, loading it only when the stamp changed."""
+    cache = _get_cache()
+    version = _read_version(dataset_id) if cache is not None else None
+    if cache is None or version is None:
+        table = loader()
+        return KeywordTableSnapshot(table) if table is not None else None
+
+    with _cache_lock:
+        cached = cache.get(dataset_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    table = loader()
+    snapshot = KeywordTableSnapshot(table) if table is not None else None
+    with _cache_lock:
+        cache[dataset_id] = (version, snapshot)
+    return snapshot
+
+
+def bump_keyword_table_version(dataset_id: str) -> None:
+    try:
+        redis_client.incr(_version_key(dataset_id))
+    except (RedisError, RuntimeError):
+        logger.warning("Failed to bump keyword table version for dataset %s.", dataset_id, exc_info=True)
+    with _cache_lock:
+        if _cache is not None:
+            _cache.pop(dataset_id, None)
+
+
+def _bump_pending_versions(session: Session) -> None:
+    for dataset_id in session.info.pop(_PENDING_BUMPS_INFO_KEY, set()):
+        bump_keyword_table_version(dataset_id)
+
+
+def _discard_pending_versions(session: Session, previous_transaction: SessionTransaction) -> None:
+    # A rolled back savepoint leaves the outer transaction's writes pending; bumping for them is harmless.
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_BUMPS_INFO_KEY, None)
+
+
+def bump_keyword_table_version_after_commit(session: Session, dataset_id: str) -> None:
+    """Bump the version once ``session`` commits, so readers never cache uncommitted state."""
+    session.info.setdefault(_PENDING_BUMPS_INFO_KEY, set()).add(dataset_id)
+    if not event.contains(session, "after_commit", _bump_pending_versions):
+        event.listen(session, "after_commit", _bump_pending_versions)
+        event.listen(session, "after_soft_rollback", _discard_pending_versions)
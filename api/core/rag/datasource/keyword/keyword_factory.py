@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from configs import dify_config
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
 from core.rag.datasource.keyword.keyword_type import KeyWordType
+from core.rag.datasource.retrieval_cache import bump_dataset_retrieval_version
 from core.rag.models.document import Document
 from models.dataset import Dataset
 
@@ -26,23 +27,31 @@ class Keyword:
                 from core.rag.datasource.keyword.jieba.jieba import Jieba
 
                 return Jieba
+            case KeyWordType.JIEBA_INVERTED:
+                from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+
+                return JiebaInvertedIndex
             case _:
                 raise ValueError(f"Keyword store {keyword_type} is not supported.")
 
     def create(self, texts: list[Document], session: Session, **kwargs: Any):
         self._keyword_processor.create(texts, session, **kwargs)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def add_texts(self, texts: list[Document], session: Session, **kwargs: Any):
         self._keyword_processor.add_texts(texts, session, **kwargs)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def text_exists(self, id: str, *, session: Session) -> bool:
         return self._keyword_processor.text_exists(id, session=session)
 
     def delete_by_ids(self, ids: list[str], session: Session, **kwargs: Any):
         self._keyword_processor.delete_by_ids(ids, session, **kwargs)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def delete(self, *, session: Session):
         self._keyword_processor.delete(session=session)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def search(self, query: str, *, session: Session, **kwargs: Any) -> list[Document]:
         return self._keyword_processor.search(query, session=session, **kwargs)
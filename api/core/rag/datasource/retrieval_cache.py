@@ -0,0 +1,225 @@
+"""Query-level cache of ``RetrievalService.retrieve`` results.
+
+Entries live in Redis under a key derived from the dataset, its retrieval version, the
+query and every retrieval parameter, and expire after ``RETRIEVAL_RESULT_CACHE_TTL``
+seconds (Redis' ``maxmemory-policy`` handles LRU eviction under memory pressure).
+
+The retrieval version of a dataset is a Redis counter bumped by ``Vector`` and
+``Keyword`` on every index write, so results cached before an index change are never
+read again. Entries store the metadata of the retrieved documents (index node ids,
+document ids and scores) but not their content, which is reloaded from the segment,
+child chunk or summary rows on a hit.
+"""
+
+import hashlib
+import json
+import logging
+import numbers
+import threading
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+from redis import RedisError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from configs import dify_config
+from core.rag.index_processor.constant.doc_type import DocType
+from core.rag.models.document import Document
+from extensions.ext_redis import redis_client
+from models.dataset import ChildChunk, DocumentSegment, DocumentSegmentSummary
+
+if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+_RESULT_KEY_NAMESPACE = "retrieval_cache:result"
+_VERSION_KEY_NAMESPACE = "retrieval_cache:version"
+
+
+def _version_key(dataset_id: str) -> str:
+    return f"{_VERSION_KEY_NAMESPACE}:{dataset_id}"
+
+
+def bump_dataset_retrieval_version(dataset_id: str) -> None:
+    """Invalidate the cached retrieval results of a dataset after its index changed."""
+    try:
+        redis_client.incr(_version_key(dataset_id))
+    except RedisError:
+        logger.warning("Failed to bump retrieval cache version of dataset %s", dataset_id, exc_info=True)
+
+
+class RetrievalCacheStats:
+    """Process-wide hit/miss counters per dataset, optionally mirrored to OpenTelemetry."""
+
+    _lookups_total: "Counter | None"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits: dict[str, int] = defaultdict(int)
+        self._misses: dict[str, int] = defaultdict(int)
+        self._lookups_total = None
+        self._instruments_initialized = False
+
+    def _init_instruments(self) -> None:
+        self._instruments_initialized = True
+        if not dify_config.ENABLE_OTEL:
+            return
+        try:
+            from opentelemetry.metrics import get_meter
+
+            meter = get_meter("retrieval_cache", version=dify_config.project.version)
+            self._lookups_total = meter.create_counter(
+                "retrieval_cache_lookups_total",
+                description="Total retrieval result cache lookups by dataset and result.",
+                unit="{lookup}",
+            )
+        except Exception:
+            logger.exception("retrieval_cache_metrics: failed to initialize instruments")
+
+    def record(self, dataset_id: str, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits[dataset_id] += 1
+            else:
+                self._misses[dataset_id] += 1
+            if not self._instruments_initialized:
+                self._init_instruments()
+        if self._lookups_total is None:
+            return
+        try:
+            self._lookups_total.add(1, {"dataset_id": dataset_id, "result": "hit" if hit else "miss"})
+        except Exception:
+            logger.exception("retrieval_cache_metrics: failed to add counter value")
+
+    def hit_rate(self, dataset_id: str) -> float | None:
+        """Share of lookups of a dataset answered from the cache, or None before its first lookup."""
+        with self._lock:
+            hits = self._hits.get(dataset_id, 0)
+            lookups = hits + self._misses.get(dataset_id, 0)
+        return hits / lookups if lookups else None
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                dataset_id: {"hits": self._hits.get(dataset_id, 0), "misses": self._misses.get(dataset_id, 0)}
+                for dataset_id in self._hits.keys() | self._misses.keys()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+
+retrieval_cache_stats = RetrievalCacheStats()
+
+
+def _json_default(value: object) -> float:
+    # Vector stores may return numpy or decimal scores.
+    if isinstance(value, numbers.Real):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def retrieval_cache_key(dataset_id: str, parameters: Mapping[str, Any]) -> str | None:
+    """
+    Build the cache key of a retrieval, or None when the dataset version cannot be read.
+
+    ``parameters`` must hold everything that affects the result besides the dataset content:
+    query, method, top_k, score threshold, filters, rerank settings and embedding model.
+    """
+    try:
+        version = int(redis_client.get(_version_key(dataset_id)) or 0)
+    except (RedisError, ValueError):
+        logger.warning("Failed to read retrieval cache version of dataset %s", dataset_id, exc_info=True)
+        return None
+    digest = hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{_RESULT_KEY_NAMESPACE}:{dataset_id}:{version}:{digest}"
+
+
+def load_cached_retrieval(session: Session, dataset_id: str, cache_key: str) -> list[Document] | None:
+    """Return the cached documents of a retrieval with their content reloaded, or None on a miss."""
+    documents = None
+    try:
+        raw = redis_client.get(cache_key)
+    except RedisError:
+        logger.warning("Failed to read retrieval cache entry %s", cache_key, exc_info=True)
+        raw = None
+    if raw is not None:
+        documents = _hydrate(session, dataset_id, json.loads(raw))
+    retrieval_cache_stats.record(dataset_id, hit=documents is not None)
+    return documents
+
+
+def save_cached_retrieval(cache_key: str, documents: Sequence[Document]) -> None:
+    """Store the metadata of retrieved documents; results whose content cannot be reloaded are skipped."""
+    entries = []
+    for document in documents:
+        metadata = document.metadata or {}
+        if metadata.get("doc_type") == DocType.IMAGE or not metadata.get("doc_id"):
+            return
+        if document.children or document.attachments:
+            return
+        entries.append({"provider": document.provider, "metadata": metadata})
+    try:
+        payload = json.dumps(entries, default=_json_default)
+    except (TypeError, ValueError):
+        logger.debug("Retrieval result is not cacheable", exc_info=True)
+        return
+    try:
+        redis_client.setex(cache_key, dify_config.RETRIEVAL_RESULT_CACHE_TTL, payload)
+    except RedisError:
+        logger.warning("Failed to write retrieval cache entry %s", cache_key, exc_info=True)
+
+
+def _hydrate(session: Session, dataset_id: str, entries: list[dict[str, Any]]) -> list[Document] | None:
+    """Reload the content of cached documents by index node id, or None when any of them is gone."""
+    summary_node_ids = [e["metadata"]["doc_id"] for e in entries if e["metadata"].get("is_summary")]
+    node_ids = [e["metadata"]["doc_id"] for e in entries if not e["metadata"].get("is_summary")]
+
+    contents: dict[str, str] = {}
+    if node_ids:
+        contents.update(
+            session.execute(
+                select(DocumentSegment.index_node_id, DocumentSegment.content).where(
+                    DocumentSegment.dataset_id == dataset_id, DocumentSegment.index_node_id.in_(node_ids)
+                )
+            )
+            .tuples()
+            .all()
+        )
+        missing = [node_id for node_id in node_ids if node_id not in contents]
+        if missing:
+            contents.update(
+                session.execute(
+                    select(ChildChunk.index_node_id, ChildChunk.content).where(
+                        ChildChunk.dataset_id == dataset_id, ChildChunk.index_node_id.in_(missing)
+                    )
+                )
+                .tuples()
+                .all()
+            )
+    summaries: dict[str, str | None] = {}
+    if summary_node_ids:
+        summaries.update(
+            session.execute(
+                select(DocumentSegmentSummary.summary_index_node_id, DocumentSegmentSummary.summary_content).where(
+                    DocumentSegmentSummary.dataset_id == dataset_id,
+                    DocumentSegmentSummary.summary_index_node_id.in_(summary_node_ids),
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+    documents = []
+    for entry in entries:
+        metadata = entry["metadata"]
+        content = (summaries if metadata.get("is_summary") else contents).get(metadata["doc_id"])
+        if content is None:
+            return None
+        documents.append(Document(page_content=content, metadata=metadata, provider=entry["provider"]))
+    return documents
@@ -13,6 +13,7 @@ from core.app.file_access import grant_upload_file_access
 from core.model_manager import ModelManager
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor, RerankingModelDict, WeightsDict
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.retrieval_cache import load_cached_retrieval, retrieval_cache_key, save_cached_retrieval
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.embedding.retrieval import AttachmentInfoDict, RetrievalChildChunk, RetrievalSegments
 from core.rag.entities import MetadataFilteringCondition
@@ -113,6 +114,29 @@ class RetrievalService:
         if not dataset:
             return []
 
+        # Image queries are not cached: their results cannot be rebuilt from stored rows.
+        cache_key = None
+        if dify_config.RETRIEVAL_RESULT_CACHE_ENABLED and not attachment_ids:
+            cache_key = retrieval_cache_key(
+                dataset_id,
+                {
+                    "query": query,
+                    "retrieval_method": retrieval_method,
+                    "top_k": top_k,
+                    "score_threshold": score_threshold,
+                    "reranking_model": reranking_model,
+                    "reranking_mode": reranking_mode,
+                    "weights": weights,
+                    "document_ids_filter": sorted(document_ids_filter) if document_ids_filter is not None else None,
+                    "embedding_model": [dataset.embedding_model_provider, dataset.embedding_model],
+                },
+            )
+        if cache_key:
+            with Session(db.engine) as session:
+                cached_documents = load_cached_retrieval(session, dataset_id, cache_key)
+            if cached_documents is not None:
+                return cached_documents
+
         all_documents: list[Document] = []
         exceptions: list[str] = []
 
@@ -170,6 +194,8 @@ class RetrievalService:
         if exceptions:
             raise ValueError(";\n".join(exceptions))
 
+        if cache_key:
+            save_cached_retrieval(cache_key, all_documents)
         return all_documents
 
     @classmethod
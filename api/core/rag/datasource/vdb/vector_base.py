@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, TypedDict
+from typing import Any, NotRequired, TypedDict
 
 from core.rag.models.document import Document
 
 
 class VectorStoreDict(TypedDict):
     class_prefix: str
+    # Text search configuration of the stored full-text column, for backends that have one.
+    text_search_config: NotRequired[str]
 
 
 class VectorIndexStructDict(TypedDict):
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from configs import dify_config
 from core.model_manager import ModelManager
+from core.rag.datasource.retrieval_cache import bump_dataset_retrieval_version
 from core.rag.datasource.vdb.vector_backend_registry import get_vector_factory_class
 from core.rag.datasource.vdb.vector_base import BaseVector, VectorIndexStructDict
 from core.rag.datasource.vdb.vector_type import VectorType
@@ -185,6 +186,7 @@ class Vector:
                 )
                 self._vector_processor.create(texts=batch, embeddings=batch_embeddings, **kwargs)
             logger.info("Embedding %s texts took %s s", len(texts), time.time() - start)
+            bump_dataset_retrieval_version(self._dataset.id)
 
     def create_multimodal(self, file_documents: list | None = None, **kwargs):
         if file_documents:
@@ -226,6 +228,7 @@ class Vector:
                 )
                 self._vector_processor.create(texts=real_batch, embeddings=batch_embeddings, **kwargs)
             logger.info("Embedding %s files took %s s", len(file_documents), time.time() - start)
+            bump_dataset_retrieval_version(self._dataset.id)
 
     def add_texts(self, documents: list[Document], **kwargs):
         documents = self._filter_empty_text_documents(documents)
@@ -239,15 +242,18 @@ class Vector:
 
         embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
         self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
     def delete_by_ids(self, ids: list[str]):
         self._vector_processor.delete_by_ids(ids)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def delete_by_metadata_field(self, key: str, value: str):
         self._vector_processor.delete_by_metadata_field(key, value)
+        bump_dataset_retrieval_version(self._dataset.id)
 
     def search_by_vector(self, query: str, **kwargs: Any) -> list[Document]:
         query_vector = self._embeddings.embed_query(query)
@@ -278,6 +284,7 @@ class Vector:
 
     def delete(self):
         self._vector_processor.delete()
+        bump_dataset_retrieval_version(self._dataset.id)
         # delete collection redis cache
         if self._vector_processor.collection_name:
             collection_exist_cache_key = f"vector_indexing_{self._vector_processor.collection_name}"
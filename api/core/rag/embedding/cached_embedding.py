@@ -1,29 +1,57 @@
-import base64
+import contextvars
 import logging
-import pickle
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, cast, override
 
 import numpy as np
-from sqlalchemy import select
+from flask import Flask, current_app
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
 from core.model_manager import ModelInstance
 from core.rag.embedding.embedding_base import Embeddings
+from core.rag.embedding.embedding_cache import DocumentEmbeddingCache
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from graphon.model_runtime.entities.model_entities import ModelPropertyKey
+from graphon.model_runtime.entities.text_embedding_entities import EmbeddingResult
 from graphon.model_runtime.model_providers.base.text_embedding_model import TextEmbeddingModel
 from libs import helper
+from libs.embedding_codec import decode_cached_query_embedding, encode_embedding
 from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+_request_executors: dict[tuple[str, int], ThreadPoolExecutor] = {}
+_request_executors_lock = threading.Lock()
+
+
+def _document_embedding_executor(provider: str) -> ThreadPoolExecutor:
+    """
+    Pool for the document embedding requests of one provider; its size caps that provider's requests in flight.
+
+    Each provider gets its own pool so a slow provider only queues its own requests instead of
+    holding the workers every other provider and tenant needs.
+    """
+    max_workers = dify_config.EMBEDDING_MAX_CONCURRENT_REQUESTS
+    with _request_executors_lock:
+        executor = _request_executors.get((provider, max_workers))
+        if executor is None:
+            executor = _request_executors[(provider, max_workers)] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="document_embedding"
+            )
+        return executor
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance):
         self._model_instance = model_instance
+        self._document_cache = DocumentEmbeddingCache(
+            provider_name=model_instance.provider, model_name=model_instance.model_name
+        )
 
     @override
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
@@ -31,19 +59,11 @@ class CacheEmbedding(Embeddings):
         # use doc embedding cache or store if not exists
         text_embeddings: list[Any] = [None for _ in range(len(texts))]
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = db.session.scalar(
-                select(Embedding)
-                .where(
-                    Embedding.model_name == self._model_instance.model_name,
-                    Embedding.hash == hash,
-                    Embedding.provider_name == self._model_instance.provider,
-                )
-                .limit(1)
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._document_cache.get_many(text_hashes, db.session)
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
 
@@ -62,13 +82,10 @@ class CacheEmbedding(Embeddings):
                     if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
                     else 1
                 )
-                for i in range(0, len(embedding_queue_texts), max_chunks):
-                    batch_texts = embedding_queue_texts[i : i + max_chunks]
-
-                    embedding_result = self._model_instance.invoke_text_embedding(
-                        texts=batch_texts, input_type=EmbeddingInputType.DOCUMENT
-                    )
-
+                text_batches = [
+                    embedding_queue_texts[i : i + max_chunks] for i in range(0, len(embedding_queue_texts), max_chunks)
+                ]
+                for embedding_result in self._invoke_document_embeddings(text_batches):
                     for vector in embedding_result.embeddings:
                         try:
                             # FIXME: type ignore for numpy here
@@ -87,19 +104,25 @@ class CacheEmbedding(Embeddings):
                 try:
                     for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
                         text_embeddings[i] = n_embedding
-                        hash = helper.generate_text_hash(texts[i])
+                        hash = text_hashes[i]
                         if hash not in cache_embeddings:
                             embedding_cache = Embedding(
                                 model_name=self._model_instance.model_name,
                                 hash=hash,
                                 provider_name=self._model_instance.provider,
-                                embedding=pickle.dumps(n_embedding, protocol=pickle.HIGHEST_PROTOCOL),
+                                embedding=encode_embedding(n_embedding, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE),
                             )
                             db.session.add(embedding_cache)
                             cache_embeddings.append(hash)
                     db.session.commit()
                 except IntegrityError:
                     db.session.rollback()
+                self._document_cache.put_many(
+                    {
+                        text_hashes[i]: n_embedding
+                        for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings)
+                    }
+                )
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents")
@@ -107,25 +130,55 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def _invoke_document_embedding(self, texts: list[str]) -> EmbeddingResult:
+        return self._model_instance.invoke_text_embedding(texts=texts, input_type=EmbeddingInputType.DOCUMENT)
+
+    def _invoke_document_embedding_in_app_context(
+        self, flask_app: Flask, context: contextvars.Context, texts: list[str]
+    ) -> EmbeddingResult:
+        # Quota reservation reads and commits through db.session, so each request needs its own
+        # app context (and scoped session) instead of sharing the caller's.
+        def invoke() -> EmbeddingResult:
+            with flask_app.app_context():
+                return self._invoke_document_embedding(texts)
+
+        return context.run(invoke)
+
+    def _invoke_document_embeddings(self, text_batches: list[list[str]]) -> Iterator[EmbeddingResult]:
+        """Embed the batches on the provider's request pool, yielding the results in batch order."""
+        if len(text_batches) <= 1 or dify_config.EMBEDDING_MAX_CONCURRENT_REQUESTS <= 1:
+            for texts in text_batches:
+                yield self._invoke_document_embedding(texts)
+            return
+
+        # Pool threads have no app context of their own, so every request enters the caller's app
+        # (Celery tasks and commands run inside one too) in a copy of the caller's context.
+        flask_app = current_app._get_current_object()  # type: ignore
+        executor = _document_embedding_executor(self._model_instance.provider)
+        futures = [
+            executor.submit(
+                self._invoke_document_embedding_in_app_context, flask_app, contextvars.copy_context(), texts
+            )
+            for texts in text_batches
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
     @override
     def embed_multimodal_documents(self, multimodel_documents: list[dict[str, Any]]) -> list[list[float]]:
         """Embed file documents."""
         # use doc embedding cache or store if not exists
         multimodel_embeddings: list[Any] = [None for _ in range(len(multimodel_documents))]
         embedding_queue_indices = []
-        for i, multimodel_document in enumerate(multimodel_documents):
-            file_id = multimodel_document["file_id"]
-            embedding = db.session.scalar(
-                select(Embedding)
-                .where(
-                    Embedding.model_name == self._model_instance.model_name,
-                    Embedding.hash == file_id,
-                    Embedding.provider_name == self._model_instance.provider,
-                )
-                .limit(1)
-            )
-            if embedding:
-                multimodel_embeddings[i] = embedding.get_embedding()
+        file_ids = [multimodel_document["file_id"] for multimodel_document in multimodel_documents]
+        cached_embeddings = self._document_cache.get_many(file_ids, db.session)
+        for i, file_id in enumerate(file_ids):
+            if file_id in cached_embeddings:
+                multimodel_embeddings[i] = cached_embeddings[file_id]
             else:
                 embedding_queue_indices.append(i)
 
@@ -176,14 +229,19 @@ class CacheEmbedding(Embeddings):
                                 model_name=self._model_instance.model_name,
                                 hash=file_id,
                                 provider_name=self._model_instance.provider,
-                                embedding=pickle.dumps(n_embedding, protocol=pickle.HIGHEST_PROTOCOL),
+                                embedding=encode_embedding(n_embedding, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE),
                             )
-                            embedding_cache.set_embedding(n_embedding)
                             db.session.add(embedding_cache)
                             cache_embeddings.append(file_id)
                     db.session.commit()
                 except IntegrityError:
                     db.session.rollback()
+                self._document_cache.put_many(
+                    {
+                        file_ids[i]: n_embedding
+                        for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings)
+                    }
+                )
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents")
@@ -200,8 +258,7 @@ class CacheEmbedding(Embeddings):
         embedding = redis_client.get(embedding_cache_key)
         if embedding:
             redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+            return decode_cached_query_embedding(embedding).tolist()
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], input_type=EmbeddingInputType.QUERY
@@ -218,14 +275,8 @@ class CacheEmbedding(Embeddings):
             raise ex
 
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            encoded_vector = encode_embedding(embedding_results, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE)
+            redis_client.setex(embedding_cache_key, 600, encoded_vector)
         except Exception as ex:
             if dify_config.DEBUG:
                 logger.exception(
@@ -244,8 +295,7 @@ class CacheEmbedding(Embeddings):
         embedding = redis_client.get(embedding_cache_key)
         if embedding:
             redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+            return decode_cached_query_embedding(embedding).tolist()
         try:
             embedding_result = self._model_instance.invoke_multimodal_embedding(
                 multimodel_documents=[multimodel_document], input_type=EmbeddingInputType.QUERY
@@ -262,14 +312,8 @@ class CacheEmbedding(Embeddings):
             raise ex
 
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            encoded_vector = encode_embedding(embedding_results, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE)
+            redis_client.setex(embedding_cache_key, 600, encoded_vector)
         except Exception as ex:
             if dify_config.DEBUG:
                 logger.exception(
@@ -0,0 +1,426 @@
+"""Tiered, set-based lookup for cached document embeddings.
+
+Document embeddings are persisted in the ``embeddings`` table keyed by
+``(model_name, hash, provider_name)``. Resolving a batch of texts used to cost one
+``SELECT ... LIMIT 1`` per text; this module resolves a whole batch through up to
+three tiers instead:
+
+1. an optional in-process LRU shared by every ``CacheEmbedding`` in the worker,
+2. an optional shared Redis tier read with one ``MGET`` per lookup batch,
+3. the ``embeddings`` table read with one ``hash IN (...)`` query per lookup batch.
+
+Hits from a slower tier are written back to the faster tiers. Persisting new rows
+in the database stays with the caller so its integrity-error handling is unchanged.
+
+Hits of every tier are buffered by ``embedding_cache_hit_recorder`` and stamped onto
+``Embedding.last_hit_at`` in batches, which lets the cleanup task evict by recency.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import TYPE_CHECKING, Literal
+
+from cachetools import LRUCache
+from redis import RedisError
+from sqlalchemy import ColumnElement, and_, delete, func, or_, select, text, update
+from sqlalchemy.orm import Session, scoped_session
+
+from configs import dify_config
+from core.db.session_factory import session_factory
+from extensions.ext_redis import redis_client
+from extensions.redis_names import serialize_redis_name
+from libs.datetime_utils import naive_utc_now
+from libs.embedding_codec import EmbeddingCodecError, decode_compact_embedding, encode_embedding
+from models.dataset import Embedding
+
+if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_NAMESPACE = "embedding_cache:document"
+# Eviction works in days, so rows hit within the last hour are not re-stamped; this keeps hot rows from
+# being rewritten on every flush.
+_HIT_RESOLUTION = timedelta(hours=1)
+
+
+class EmbeddingCacheTier(StrEnum):
+    LOCAL = "local"
+    REDIS = "redis"
+    DATABASE = "database"
+
+
+class EmbeddingCacheStats:
+    """Process-wide hit/miss counters per cache tier, optionally mirrored to OpenTelemetry."""
+
+    _lookups_total: "Counter | None"
+    _evictions_total: "Counter | None"
+    _table_rows: "Gauge | None"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits: dict[EmbeddingCacheTier, int] = dict.fromkeys(EmbeddingCacheTier, 0)
+        self._misses: dict[EmbeddingCacheTier, int] = dict.fromkeys(EmbeddingCacheTier, 0)
+        self._lookups_total = None
+        self._evictions_total = None
+        self._table_rows = None
+        self._instruments_initialized = False
+
+    def _init_instruments(self) -> None:
+        self._instruments_initialized = True
+        if not dify_config.ENABLE_OTEL:
+            return
+        try:
+            from opentelemetry.metrics import get_meter
+
+            meter = get_meter("embedding_cache", version=dify_config.project.version)
+            self._lookups_total = meter.create_counter(
+                "embedding_cache_lookups_total",
+                description="Total document embedding cache lookups by tier and result.",
+                unit="{lookup}",
+            )
+            self._evictions_total = meter.create_counter(
+                "embedding_cache_evictions_total",
+                description="Total document embedding cache rows removed by the cleanup task.",
+                unit="{row}",
+            )
+            self._table_rows = meter.create_gauge(
+                "embedding_cache_table_rows",
+                description="Approximate number of rows in the embeddings table after cleanup.",
+                unit="{row}",
+            )
+        except Exception:
+            logger.exception("embedding_cache_metrics: failed to initialize instruments")
+
+    def record(self, tier: EmbeddingCacheTier, *, hits: int, misses: int) -> None:
+        with self._lock:
+            self._hits[tier] += hits
+            self._misses[tier] += misses
+            if not self._instruments_initialized:
+                self._init_instruments()
+        if self._lookups_total is None:
+            return
+        try:
+            if hits:
+                self._lookups_total.add(hits, {"tier": tier.value, "result": "hit"})
+            if misses:
+                self._lookups_total.add(misses, {"tier": tier.value, "result": "miss"})
+        except Exception:
+            logger.exception("embedding_cache_metrics: failed to add counter value")
+
+    def record_eviction(self, *, evicted: int, table_rows: int | None, policy: str) -> None:
+        with self._lock:
+            if not self._instruments_initialized:
+                self._init_instruments()
+        try:
+            if self._evictions_total is not None and evicted:
+                self._evictions_total.add(evicted, {"policy": policy})
+            if self._table_rows is not None and table_rows is not None:
+                self._table_rows.set(table_rows)
+        except Exception:
+            logger.exception("embedding_cache_metrics: failed to record eviction")
+
+    def hit_rate(self) -> float | None:
+        """Share of lookups answered by any tier, or None before the first lookup."""
+        with self._lock:
+            lookups = self._hits[EmbeddingCacheTier.DATABASE] + self._misses[EmbeddingCacheTier.DATABASE]
+            hits = self._hits[EmbeddingCacheTier.DATABASE]
+            # Lookups start at the fastest enabled tier, so its hits and misses add up to all lookups.
+            for tier in (EmbeddingCacheTier.REDIS, EmbeddingCacheTier.LOCAL):
+                if self._hits[tier] + self._misses[tier]:
+                    lookups = self._hits[tier] + self._misses[tier]
+                hits += self._hits[tier]
+        return hits / lookups if lookups else None
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {tier.value: {"hits": self._hits[tier], "misses": self._misses[tier]} for tier in EmbeddingCacheTier}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits = dict.fromkeys(EmbeddingCacheTier, 0)
+            self._misses = dict.fromkeys(EmbeddingCacheTier, 0)
+
+
+embedding_cache_stats = EmbeddingCacheStats()
+
+_local_cache: LRUCache[tuple[str, str, str], list[float]] | None = None
+_local_cache_lock = threading.Lock()
+
+
+def _get_local_cache() -> LRUCache[tuple[str, str, str], list[float]] | None:
+    if not dify_config.EMBEDDING_CACHE_LOCAL_ENABLED:
+        return None
+
+    global _local_cache
+    max_size = dify_config.EMBEDDING_CACHE_LOCAL_MAX_SIZE
+    if _local_cache is None or _local_cache.maxsize != max_size:
+        with _local_cache_lock:
+            if _local_cache is None or _local_cache.maxsize != max_size:
+                _local_cache = LRUCache(maxsize=max_size)
+    return _local_cache
+
+
+def clear_local_embedding_cache() -> None:
+    """Drop the in-process tier (used by tests and after bulk cache eviction)."""
+    global _local_cache
+    with _local_cache_lock:
+        _local_cache = None
+
+
+def _batched(items: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class EmbeddingCacheHitRecorder:
+    """
+    Buffer document embedding cache hits per worker and stamp ``Embedding.last_hit_at`` in batches.
+
+    Hits are written ``EMBEDDING_CACHE_HIT_FLUSH_INTERVAL`` seconds after the first buffered hit, or as
+    soon as ``EMBEDDING_CACHE_HIT_BUFFER_SIZE`` distinct entries are buffered, with one ``UPDATE`` per
+    model and lookup batch. Tracking is best effort: buffered hits are lost when the worker exits and a
+    failed write is only logged, which at worst lets the cleanup task treat an entry as older than it is.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: set[tuple[str, str, str]] = set()
+        self._flush_timer: threading.Timer | None = None
+
+    def record(self, *, provider_name: str, model_name: str, keys: Iterable[str]) -> None:
+        if not dify_config.EMBEDDING_CACHE_HIT_TRACKING_ENABLED:
+            return
+        with self._lock:
+            self._pending.update((provider_name, model_name, key) for key in keys)
+            if not self._pending:
+                return
+            if len(self._pending) >= dify_config.EMBEDDING_CACHE_HIT_BUFFER_SIZE:
+                self._schedule_flush(0)
+            elif self._flush_timer is None:
+                self._schedule_flush(dify_config.EMBEDDING_CACHE_HIT_FLUSH_INTERVAL)
+
+    def flush(self) -> int:
+        """Write the buffered hits and return the number of rows stamped."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if not pending:
+            return 0
+
+        hashes_by_model: defaultdict[tuple[str, str], list[str]] = defaultdict(list)
+        for provider_name, model_name, key in pending:
+            hashes_by_model[(provider_name, model_name)].append(key)
+
+        now = naive_utc_now()
+        stamped = 0
+        with session_factory.create_session() as session, session.begin():
+            for (provider_name, model_name), hashes in hashes_by_model.items():
+                for batch in _batched(sorted(hashes), dify_config.EMBEDDING_CACHE_LOOKUP_BATCH_SIZE):
+                    result = session.execute(
+                        update(Embedding)
+                        .where(
+                            Embedding.provider_name == provider_name,
+                            Embedding.model_name == model_name,
+                            Embedding.hash.in_(batch),
+                            or_(Embedding.last_hit_at.is_(None), Embedding.last_hit_at < now - _HIT_RESOLUTION),
+                        )
+                        .values(last_hit_at=now)
+                    )
+                    stamped += result.rowcount
+        return stamped
+
+    def _schedule_flush(self, delay: float) -> None:
+        """Start a flush in ``delay`` seconds, replacing a later pending one. Callers hold ``_lock``."""
+        if self._flush_timer is not None:
+            if delay > 0:
+                return
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(delay, self._flush_on_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to record document embedding cache hits")
+
+
+embedding_cache_hit_recorder = EmbeddingCacheHitRecorder()
+
+
+def _eviction_condition(policy: Literal["lru", "age"], cutoff: datetime) -> ColumnElement[bool]:
+    if policy == "age":
+        return Embedding.created_at < cutoff
+    # Entries not hit since hit tracking started fall back to their creation time.
+    return or_(
+        Embedding.last_hit_at < cutoff,
+        and_(Embedding.last_hit_at.is_(None), Embedding.created_at < cutoff),
+    )
+
+
+def evict_embedding_cache(
+    session: Session | scoped_session[Session], *, policy: Literal["lru", "age"], cutoff: datetime, batch_size: int
+) -> int:
+    """Delete cached embeddings last hit (``lru``) or created (``age``) before ``cutoff``; return the count.
+
+    Rows are removed with one ``DELETE ... WHERE id IN (...)`` of at most ``batch_size`` rows per
+    transaction, so every commit stays small and WAL can be recycled while the sweep runs. Ids are
+    selected first because MySQL rejects ``LIMIT`` inside an ``IN`` subquery.
+    """
+    condition = _eviction_condition(policy, cutoff)
+    evicted = 0
+    while True:
+        embedding_ids = session.scalars(select(Embedding.id).where(condition).limit(batch_size)).all()
+        if not embedding_ids:
+            break
+        session.execute(delete(Embedding).where(Embedding.id.in_(embedding_ids)))
+        session.commit()
+        evicted += len(embedding_ids)
+        if len(embedding_ids) < batch_size:
+            break
+    return evicted
+
+
+def estimate_embedding_cache_rows(session: Session | scoped_session[Session]) -> int | None:
+    """Approximate row count of the ``embeddings`` table, read from statistics where the database keeps them."""
+    match session.get_bind().dialect.name:
+        case "postgresql":
+            reltuples = session.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'embeddings'::regclass")
+            )
+            # -1 until the table is vacuumed or analyzed for the first time.
+            return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+        case "mysql":
+            table_rows = session.scalar(
+                text(
+                    "SELECT table_rows FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = 'embeddings'"
+                )
+            )
+            return int(table_rows) if table_rows is not None else None
+        case _:
+            return session.scalar(select(func.count()).select_from(Embedding))
+
+
+class DocumentEmbeddingCache:
+    """Resolve and populate cached document embeddings for one provider model."""
+
+    def __init__(self, *, provider_name: str, model_name: str) -> None:
+        self._provider_name = provider_name
+        self._model_name = model_name
+
+    def get_many(self, keys: Iterable[str], session: Session | scoped_session[Session]) -> dict[str, list[float]]:
+        """Return the cached vectors for ``keys``; keys without a cached vector are omitted.
+
+        ``session`` is only used for the database tier, so callers keep control of
+        the session (and its transaction) that the cache rows are read through.
+        """
+        pending = list(dict.fromkeys(keys))
+        found: dict[str, list[float]] = {}
+        if not pending:
+            return found
+
+        local_cache = _get_local_cache()
+        if local_cache is not None:
+            with _local_cache_lock:
+                for key in pending:
+                    vector = local_cache.get(self._local_key(key))
+                    if vector is not None:
+                        found[key] = list(vector)
+            pending = [key for key in pending if key not in found]
+            embedding_cache_stats.record(EmbeddingCacheTier.LOCAL, hits=len(found), misses=len(pending))
+
+        if pending and dify_config.EMBEDDING_CACHE_REDIS_ENABLED:
+            redis_hits = self._get_from_redis(pending)
+            found.update(redis_hits)
+            pending = [key for key in pending if key not in redis_hits]
+            embedding_cache_stats.record(EmbeddingCacheTier.REDIS, hits=len(redis_hits), misses=len(pending))
+            self._put_local(redis_hits)
+
+        if pending:
+            database_hits = self._get_from_database(pending, session)
+            found.update(database_hits)
+            embedding_cache_stats.record(
+                EmbeddingCacheTier.DATABASE, hits=len(database_hits), misses=len(pending) - len(database_hits)
+            )
+            self._put_local(database_hits)
+            self._put_redis(database_hits)
+
+        embedding_cache_hit_recorder.record(provider_name=self._provider_name, model_name=self._model_name, keys=found)
+        return found
+
+    def put_many(self, embeddings: Mapping[str, list[float]]) -> None:
+        """Populate the in-process and Redis tiers with freshly computed vectors."""
+        if not embeddings:
+            return
+        self._put_local(embeddings)
+        self._put_redis(embeddings)
+
+    def _local_key(self, key: str) -> tuple[str, str, str]:
+        return self._provider_name, self._model_name, key
+
+    def _redis_key(self, key: str) -> str:
+        # mget/pipeline bypass the wrapper's key prefixing, so serialize the physical name here.
+        return serialize_redis_name(f"{_REDIS_KEY_NAMESPACE}:{self._provider_name}:{self._model_name}:{key}")
+
+    def _get_from_database(
+        self, keys: Sequence[str], session: Session | scoped_session[Session]
+    ) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        for batch in _batched(keys, dify_config.EMBEDDING_CACHE_LOOKUP_BATCH_SIZE):
+            rows = session.scalars(
+                select(Embedding).where(
+                    Embedding.model_name == self._model_name,
+                    Embedding.provider_name == self._provider_name,
+                    Embedding.hash.in_(batch),
+                )
+            ).all()
+            for row in rows:
+                found[row.hash] = row.get_embedding()
+        return found
+
+    def _get_from_redis(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        try:
+            for batch in _batched(keys, dify_config.EMBEDDING_CACHE_LOOKUP_BATCH_SIZE):
+                values = redis_client.mget([self._redis_key(key) for key in batch])
+                for key, value in zip(batch, values):
+                    if not value:
+                        continue
+                    try:
+                        found[key] = decode_compact_embedding(value).tolist()
+                    except EmbeddingCodecError:
+                        logger.warning("Ignoring undecodable Redis embedding cache entry for %s.", key)
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to read document embeddings from the Redis cache tier.", exc_info=True)
+        return found
+
+    def _put_local(self, embeddings: Mapping[str, list[float]]) -> None:
+        local_cache = _get_local_cache()
+        if local_cache is None or not embeddings:
+            return
+        with _local_cache_lock:
+            for key, vector in embeddings.items():
+                local_cache[self._local_key(key)] = vector
+
+    def _put_redis(self, embeddings: Mapping[str, list[float]]) -> None:
+        if not embeddings or not dify_config.EMBEDDING_CACHE_REDIS_ENABLED:
+            return
+        ttl = dify_config.EMBEDDING_CACHE_REDIS_TTL
+        storage_dtype = dify_config.EMBEDDING_CACHE_STORAGE_DTYPE
+        try:
+            for batch in _batched(list(embeddings), dify_config.EMBEDDING_CACHE_LOOKUP_BATCH_SIZE):
+                pipe = redis_client.pipeline(transaction=False)
+                for key in batch:
+                    pipe.setex(self._redis_key(key), ttl, encode_embedding(embeddings[key], storage_dtype))
+                pipe.execute()
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to write document embeddings to the Redis cache tier.", exc_info=True)
@@ -1,21 +1,37 @@
 """Abstract interface for document loader implementations."""
 
 import contextlib
-import io
+import hashlib
+import json
 import logging
+import multiprocessing
+import time
 import uuid
-from collections.abc import Iterator
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from typing import override
 
 import pypdfium2
-import pypdfium2.raw as pdfium_c
 from sqlalchemy.orm import Session
 
 from configs import dify_config
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
+from core.rag.extractor.pdf_page_reader import (
+    IMAGE_FORMATS,
+    MAX_MAGIC_LEN,
+    PdfImage,
+    PdfPage,
+    count_pages,
+    read_page,
+    read_page_images,
+    read_page_range,
+)
 from core.rag.models.document import Document
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from extensions.storage.storage_type import StorageType
 from libs.datetime_utils import naive_utc_now
@@ -24,6 +40,13 @@ from models.model import UploadFile
 
 logger = logging.getLogger(__name__)
 
+# Storage prefix of the extraction results cached by PDF content; bump the version when the output changes.
+_CONTENT_CACHE_PREFIX = "extract_cache/pdf/v2"
+# Redis sorted set of the cache entries in storage, scored by their expiry time.
+_CONTENT_CACHE_EXPIRY_KEY = "pdf_extraction_cache:expiry"
+# Expired cache entries deleted from storage each time an entry is saved.
+_CONTENT_CACHE_SWEEP_BATCH = 100
+
 
 class PdfExtractor(BaseExtractor):
     """
@@ -37,19 +60,8 @@ class PdfExtractor(BaseExtractor):
         session: Session used to persist extracted images.
     """
 
-    # Magic bytes for image format detection: (magic_bytes, extension, mime_type)
-    IMAGE_FORMATS: tuple[tuple[bytes, str, str], ...] = (
-        (b"\xff\xd8\xff", "jpg", "image/jpeg"),
-        (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
-        (b"\x00\x00\x00\x0c\x6a\x50\x20\x20\x0d\x0a\x87\x0a", "jp2", "image/jp2"),
-        (b"GIF8", "gif", "image/gif"),
-        (b"BM", "bmp", "image/bmp"),
-        (b"II*\x00", "tiff", "image/tiff"),
-        (b"MM\x00*", "tiff", "image/tiff"),
-        (b"II+\x00", "tiff", "image/tiff"),
-        (b"MM\x00+", "tiff", "image/tiff"),
-    )
-    MAX_MAGIC_LEN = max(len(m) for m, _, _ in IMAGE_FORMATS)
+    IMAGE_FORMATS = IMAGE_FORMATS
+    MAX_MAGIC_LEN = MAX_MAGIC_LEN
     _session: Session | None
 
     def __init__(
@@ -93,29 +105,89 @@ class PdfExtractor(BaseExtractor):
     ) -> Iterator[Document]:
         """Lazy load given path as pages."""
         blob = Blob.from_path(self._file_path)
-        yield from self.parse(blob)
+        if dify_config.PDF_EXTRACTION_CACHE_ENABLED:
+            yield from self._load_with_content_cache(blob)
+        else:
+            yield from self.parse(blob)
 
     def parse(self, blob: Blob) -> Iterator[Document]:
         """Lazily parse the blob."""
+        for page_number, text, image_content in self._parse_pages(blob):
+            yield self._page_document(blob.source, page_number, text, image_content)
+
+    def _parse_pages(self, blob: Blob) -> Iterator[tuple[int, str, str]]:
+        """Yield the number, text and markdown links of the stored images of every page."""
+        workers = dify_config.PDF_EXTRACTION_MAX_WORKERS
+        if workers > 1 and blob.path is not None:
+            file_path = str(blob.path)
+            page_count = count_pages(file_path)
+            if page_count >= dify_config.PDF_EXTRACTION_PARALLEL_MIN_PAGES:
+                for pages in self._read_pages_in_parallel(file_path, page_count, workers):
+                    # Store the images of all pages read together in one batch.
+                    links = iter(self._store_images([image for page in pages for image in page.images]))
+                    for page in pages:
+                        image_content = "\n".join(link for link in islice(links, len(page.images)) if link)
+                        yield page.number, page.text, image_content
+                return
 
         with blob.as_bytes_io() as file_path:
             pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
             try:
                 for page_number, page in enumerate(pdf_reader):
-                    text_page = page.get_textpage()
-                    content = text_page.get_text_range()
-                    text_page.close()
-
+                    text = read_page(page, page_number, with_images=False).text
                     image_content = self._extract_images(page)
-                    if image_content:
-                        content += "\n" + image_content
-
                     page.close()
-                    metadata = {"source": blob.source, "page": page_number}
-                    yield Document(page_content=content, metadata=metadata)
+                    yield page_number, text, image_content
             finally:
                 pdf_reader.close()
 
+    def _read_pages_in_parallel(self, file_path: str, page_count: int, workers: int) -> Iterator[list[PdfPage]]:
+        """
+        Read the pages in ranges of ``PDF_EXTRACTION_PAGES_PER_TASK`` on a process pool, in page order.
+
+        At most two ranges per worker are in flight so that a slow consumer does not buffer the whole
+        document. Ranges the pool fails to read, or every range when no worker process can be started
+        (e.g. inside a daemonic process), are read in-process instead.
+        """
+        step = dify_config.PDF_EXTRACTION_PAGES_PER_TASK
+        ranges = deque((start, min(start + step, page_count)) for start in range(0, page_count, step))
+        executor: ProcessPoolExecutor | None = ProcessPoolExecutor(
+            max_workers=min(workers, len(ranges)), mp_context=multiprocessing.get_context("spawn")
+        )
+        pending: deque[tuple[int, int, Future[list[PdfPage]] | None]] = deque()
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < 2 * workers:
+                    start, stop = ranges.popleft()
+                    future = None
+                    if executor is not None:
+                        try:
+                            future = executor.submit(read_page_range, file_path, start, stop)
+                        except Exception:
+                            logger.warning("Cannot extract PDF pages in worker processes", exc_info=True)
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            executor = None
+                    pending.append((start, stop, future))
+
+                start, stop, future = pending.popleft()
+                if future is not None:
+                    try:
+                        yield future.result()
+                        continue
+                    except Exception:
+                        logger.warning("Failed to extract PDF pages %s-%s in a worker process", start, stop - 1)
+                yield read_page_range(file_path, start, stop)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _page_document(source: str | None, page_number: int, text: str, image_content: str) -> Document:
+        content = text
+        if image_content:
+            content += "\n" + image_content
+        return Document(page_content=content, metadata={"source": source, "page": page_number})
+
     def _extract_images(self, page) -> str:
         """
         Extract images from a PDF page, save them to storage and database,
@@ -127,67 +199,124 @@ class PdfExtractor(BaseExtractor):
         Returns:
             Markdown string containing links to the extracted images.
         """
-        image_content = []
+        return "\n".join(link for link in self._store_images(read_page_images(page)) if link)
+
+    def _store_images(self, images: Sequence[PdfImage]) -> list[str | None]:
+        """
+        Save images to storage and their upload files to the database in one commit.
+
+        Returns:
+            A markdown image link per image, or None for images that could not be saved.
+        """
+        links: list[str | None] = []
         upload_files = []
         base_url = dify_config.FILES_URL
 
-        try:
-            image_objects = page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,))
-            for obj in image_objects:
-                try:
-                    # Extract image bytes
-                    img_byte_arr = io.BytesIO()
-                    # Extract DCTDecode (JPEG) and JPXDecode (JPEG 2000) images directly
-                    # Fallback to png for other formats
-                    obj.extract(img_byte_arr, fb_format="png")
-                    img_bytes = img_byte_arr.getvalue()
-
-                    if not img_bytes:
-                        continue
-
-                    header = img_bytes[: self.MAX_MAGIC_LEN]
-                    image_ext = None
-                    mime_type = None
-                    for magic, ext, mime in self.IMAGE_FORMATS:
-                        if header.startswith(magic):
-                            image_ext = ext
-                            mime_type = mime
-                            break
+        for image in images:
+            file_uuid = str(uuid.uuid4())
+            file_key = "image_files/" + self._tenant_id + "/" + file_uuid + "." + image.extension
+            try:
+                storage.save(file_key, image.data)
+            except Exception as e:
+                logger.warning("Failed to save image extracted from PDF: %s", e)
+                links.append(None)
+                continue
 
-                    if not image_ext or not mime_type:
-                        continue
+            # save file to db
+            upload_file = UploadFile(
+                tenant_id=self._tenant_id,
+                storage_type=StorageType(dify_config.STORAGE_TYPE),
+                key=file_key,
+                name=file_key,
+                size=len(image.data),
+                extension=image.extension,
+                mime_type=image.mime_type,
+                created_by=self._user_id,
+                created_by_role=CreatorUserRole.ACCOUNT,
+                created_at=naive_utc_now(),
+                used=True,
+                used_by=self._user_id,
+                used_at=naive_utc_now(),
+            )
+            upload_files.append(upload_file)
+            links.append(f"![image]({base_url}/files/{upload_file.id}/file-preview)")
 
-                    file_uuid = str(uuid.uuid4())
-                    file_key = "image_files/" + self._tenant_id + "/" + file_uuid + "." + image_ext
-
-                    storage.save(file_key, img_bytes)
-
-                    # save file to db
-                    upload_file = UploadFile(
-                        tenant_id=self._tenant_id,
-                        storage_type=StorageType(dify_config.STORAGE_TYPE),
-                        key=file_key,
-                        name=file_key,
-                        size=len(img_bytes),
-                        extension=image_ext,
-                        mime_type=mime_type,
-                        created_by=self._user_id,
-                        created_by_role=CreatorUserRole.ACCOUNT,
-                        created_at=naive_utc_now(),
-                        used=True,
-                        used_by=self._user_id,
-                        used_at=naive_utc_now(),
-                    )
-                    upload_files.append(upload_file)
-                    image_content.append(f"![image]({base_url}/files/{upload_file.id}/file-preview)")
-                except Exception as e:
-                    logger.warning("Failed to extract image from PDF: %s", e)
-                    continue
-        except Exception as e:
-            logger.warning("Failed to get objects from PDF page: %s", e)
         if upload_files:
             session = self._session or db.session
             session.add_all(upload_files)
             if self._session is None:
                 session.commit()
-        return "\n".join(image_content)
+        return links
+
+    def _load_with_content_cache(self, blob: Blob) -> Iterator[Document]:
+        """
+        Reuse the page text extracted from an identical PDF uploaded before to the same workspace.
+
+        The cache is keyed by the SHA-256 of the file and holds text only. Images belong to the
+        document they were extracted for and are deleted with it, so on a hit the images of the
+        pages that had any are read again and stored as new upload files of this extraction.
+        """
+        with blob.as_bytes_io() as file:
+            digest = hashlib.file_digest(file, "sha256").hexdigest()
+        cache_key = f"{_CONTENT_CACHE_PREFIX}/{self._tenant_id}/{digest}.json"
+
+        cached = self._load_content_cache(cache_key)
+        if cached is not None:
+            yield from self._cached_page_documents(blob, cached["pages"])
+            return
+
+        pages = []
+        for page_number, text, image_content in self._parse_pages(blob):
+            pages.append({"text": text, "has_images": bool(image_content)})
+            yield self._page_document(blob.source, page_number, text, image_content)
+        self._save_content_cache(cache_key, pages)
+
+    def _cached_page_documents(self, blob: Blob, pages: list[dict]) -> Iterator[Document]:
+        with blob.as_bytes_io() as file:
+            pdf_reader = pypdfium2.PdfDocument(file, autoclose=True)
+            try:
+                for page_number, cached_page in enumerate(pages):
+                    image_content = ""
+                    if cached_page["has_images"]:
+                        page = pdf_reader[page_number]
+                        image_content = self._extract_images(page)
+                        page.close()
+                    yield self._page_document(blob.source, page_number, cached_page["text"], image_content)
+            finally:
+                pdf_reader.close()
+
+    @staticmethod
+    def _load_content_cache(cache_key: str) -> dict | None:
+        try:
+            cached = json.loads(storage.load(cache_key))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Failed to load PDF extraction cache %s", cache_key, exc_info=True)
+            return None
+        if cached.get("expires_at", 0) <= time.time():
+            return None
+        return cached
+
+    @staticmethod
+    def _save_content_cache(cache_key: str, pages: list[dict]) -> None:
+        """Save a cache entry and delete entries that have expired from storage."""
+        now = time.time()
+        expires_at = now + dify_config.PDF_EXTRACTION_CACHE_TTL_DAYS * 86400
+        try:
+            storage.save(cache_key, json.dumps({"pages": pages, "expires_at": expires_at}).encode("utf-8"))
+            redis_client.zadd(_CONTENT_CACHE_EXPIRY_KEY, {cache_key: expires_at})
+        except Exception:
+            logger.warning("Failed to save PDF extraction cache %s", cache_key, exc_info=True)
+            return
+
+        try:
+            expired = redis_client.zrangebyscore(
+                _CONTENT_CACHE_EXPIRY_KEY, 0, now, start=0, num=_CONTENT_CACHE_SWEEP_BATCH
+            )
+            for member in expired:
+                # Only the worker that removes the member deletes the entry.
+                if redis_client.zrem(_CONTENT_CACHE_EXPIRY_KEY, member):
+                    storage.delete(member.decode() if isinstance(member, bytes) else member)
+        except Exception:
+            logger.warning("Failed to delete expired PDF extraction cache entries", exc_info=True)
@@ -0,0 +1,113 @@
+"""
+Page-level reading of PDF files with pypdfium2.
+
+This module only depends on pypdfium2 so that extraction worker processes can import it without
+loading the application; everything it returns is picklable.
+"""
+
+import io
+import logging
+from dataclasses import dataclass, field
+
+import pypdfium2
+import pypdfium2.raw as pdfium_c
+
+logger = logging.getLogger(__name__)
+
+# Magic bytes for image format detection: (magic_bytes, extension, mime_type)
+IMAGE_FORMATS: tuple[tuple[bytes, str, str], ...] = (
+    (b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (b"\x00\x00\x00\x0c\x6a\x50\x20\x20\x0d\x0a\x87\x0a", "jp2", "image/jp2"),
+    (b"GIF8", "gif", "image/gif"),
+    (b"BM", "bmp", "image/bmp"),
+    (b"II*\x00", "tiff", "image/tiff"),
+    (b"MM\x00*", "tiff", "image/tiff"),
+    (b"II+\x00", "tiff", "image/tiff"),
+    (b"MM\x00+", "tiff", "image/tiff"),
+)
+MAX_MAGIC_LEN = max(len(m) for m, _, _ in IMAGE_FORMATS)
+
+
+@dataclass(frozen=True)
+class PdfImage:
+    data: bytes
+    extension: str
+    mime_type: str
+
+
+@dataclass(frozen=True)
+class PdfPage:
+    number: int
+    text: str
+    images: list[PdfImage] = field(default_factory=list)
+
+
+def read_page_images(page) -> list[PdfImage]:
+    """
+    Extract the embedded images of a page in a format detected from their magic bytes.
+
+    Images that cannot be extracted or whose format is unknown are skipped.
+    """
+    images: list[PdfImage] = []
+    try:
+        image_objects = page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,))
+        for obj in image_objects or ():
+            try:
+                img_byte_arr = io.BytesIO()
+                # Extract DCTDecode (JPEG) and JPXDecode (JPEG 2000) images directly
+                # Fallback to png for other formats
+                obj.extract(img_byte_arr, fb_format="png")
+                img_bytes = img_byte_arr.getvalue()
+                if not img_bytes:
+                    continue
+
+                header = img_bytes[:MAX_MAGIC_LEN]
+                for magic, ext, mime in IMAGE_FORMATS:
+                    if header.startswith(magic):
+                        images.append(PdfImage(data=img_bytes, extension=ext, mime_type=mime))
+                        break
+            except Exception as e:
+                logger.warning("Failed to extract image from PDF: %s", e)
+                continue
+    except Exception as e:
+        logger.warning("Failed to get objects from PDF page: %s", e)
+    return images
+
+
+def read_page(page, page_number: int, *, with_images: bool = True) -> PdfPage:
+    """Read the text, and optionally the images, of an open page."""
+    text_page = page.get_textpage()
+    text = text_page.get_text_range()
+    text_page.close()
+    images = read_page_images(page) if with_images else []
+    return PdfPage(number=page_number, text=text, images=images)
+
+
+def count_pages(file_path: str) -> int:
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def read_page_range(file_path: str, start: int, stop: int) -> list[PdfPage]:
+    """
+    Read pages ``start`` to ``stop - 1`` of the PDF at ``file_path``.
+
+    Runs in extraction worker processes: every worker opens the same file, which pdfium reads
+    on demand, so the document is shared through the OS page cache instead of being copied.
+    """
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        pages = []
+        for page_number in range(start, stop):
+            page = pdf[page_number]
+            try:
+                pages.append(read_page(page, page_number))
+            finally:
+                page.close()
+        return pages
+    finally:
+        pdf.close()
@@ -1,9 +1,13 @@
-import math
 from collections import Counter
+from collections.abc import Iterable, Sequence
 from typing import override
 
 import numpy as np
+import numpy.typing as npt
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
+from configs import dify_config
 from core.model_manager import ModelManager
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.embedding.cached_embedding import CacheEmbedding
@@ -13,12 +17,60 @@ from core.rag.models.document import Document
 from core.rag.rerank.entity.weight import VectorSetting, Weights
 from core.rag.rerank.rerank_base import BaseRerankRunner
 from graphon.model_runtime.entities.model_entities import ModelType
+from models.dataset import DocumentSegment
+
+
+def bm25_scores(
+    query_keywords: Iterable[str],
+    documents_keywords: Sequence[Iterable[str]],
+    *,
+    k1: float = 1.2,
+    b: float = 0.75,
+    saturation: float = 1.0,
+) -> npt.NDArray[np.float64]:
+    """
+    Score every document against the query with Okapi BM25, using the candidate documents as the corpus.
+
+    Only query terms contribute to BM25, so the term-document matrix is built over the query
+    vocabulary (documents x query terms) and scored in one vectorized pass. Scores are mapped
+    into [0, 1) by ``score / (score + saturation)`` so they can be combined with cosine
+    similarities. Unlike dividing by the best candidate, a weak lexical match stays low even when
+    it is the best one, so ``keyword_weight`` means the same for every query.
+    """
+    query_term_counts = Counter(query_keywords)
+    if not documents_keywords or not query_term_counts:
+        return np.zeros(len(documents_keywords))
+
+    vocabulary = {term: column for column, term in enumerate(query_term_counts)}
+    term_frequencies = np.zeros((len(documents_keywords), len(vocabulary)))
+    document_lengths = np.zeros(len(documents_keywords))
+    for row, document_keywords in enumerate(documents_keywords):
+        document_keywords = list(document_keywords)
+        document_lengths[row] = len(document_keywords)
+        for keyword in document_keywords:
+            column = vocabulary.get(keyword)
+            if column is not None:
+                term_frequencies[row, column] += 1
+
+    document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+    total_documents = len(documents_keywords)
+    idf = np.log((total_documents - document_frequencies + 0.5) / (document_frequencies + 0.5) + 1)
+    average_length = document_lengths.mean() or 1.0
+    length_norm = k1 * (1 - b + b * document_lengths / average_length)
+    denominator = term_frequencies + length_norm[:, np.newaxis]
+    saturated = np.divide(
+        term_frequencies * (k1 + 1), denominator, out=np.zeros_like(term_frequencies), where=denominator > 0
+    )
+    query_weights = np.fromiter(query_term_counts.values(), dtype=np.float64, count=len(vocabulary))
+    scores: npt.NDArray[np.float64] = saturated @ (idf * query_weights)
+    return scores / (scores + saturation)
 
 
 class WeightRerankRunner(BaseRerankRunner):
-    def __init__(self, tenant_id: str, weights: Weights):
+    def __init__(self, tenant_id: str, weights: Weights, *, session: Session | None = None):
         self.tenant_id = tenant_id
         self.weights = weights
+        self._session = session
 
     @override
     def run(
@@ -76,80 +128,61 @@ class WeightRerankRunner(BaseRerankRunner):
 
     def _calculate_keyword_score(self, query: str, documents: list[Document]) -> list[float]:
         """
-        Calculate BM25 scores
+        Calculate BM25 scores over the keyword sets of the documents.
+
+        Every document is represented by at most ``keyword_number`` distinct keywords, so term
+        frequencies are 0 or 1 and BM25 reduces to the IDF-weighted share of query keywords a
+        document carries: the same signal the previous TF-IDF cosine used, but saturated instead of
+        divided by the norm of the document's unrelated keywords. Document length then counts
+        keywords, so ``b`` only favours short segments that yielded fewer keywords than the cap.
+        For IDF and lengths to be comparable, all candidates take their keywords from one source:
+        the keywords stored on their segments when every candidate has them, otherwise keywords
+        extracted from every candidate's content.
         :param query: search query
         :param documents: documents for reranking
 
-        :return:
+        :return: BM25 scores saturated into [0, 1)
         """
         keyword_table_handler = JiebaKeywordTableHandler()
         query_keywords = keyword_table_handler.extract_keywords(query, None)
+        documents = [document for document in documents if document.metadata is not None]
+        stored_keywords = self._get_stored_segment_keywords(documents)
         documents_keywords = []
         for document in documents:
-            # get the document keywords
-            document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
-            if document.metadata is not None:
-                document.metadata["keywords"] = document_keywords
-                documents_keywords.append(document_keywords)
-
-        # Counter query keywords(TF)
-        query_keyword_counts = Counter(query_keywords)
-
-        # total documents
-        total_documents = len(documents)
-
-        # calculate all documents' keywords IDF
-        all_keywords = set()
-        for document_keywords in documents_keywords:
-            all_keywords.update(document_keywords)
-
-        keyword_idf = {}
-        for keyword in all_keywords:
-            # calculate include query keywords' documents
-            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
-            # IDF
-            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
-
-        query_tfidf = {}
-
-        for keyword, count in query_keyword_counts.items():
-            tf = count
-            idf = keyword_idf.get(keyword, 0)
-            query_tfidf[keyword] = tf * idf
-
-        # calculate all documents' TF-IDF
-        documents_tfidf = []
-        for document_keywords in documents_keywords:
-            document_keyword_counts = Counter(document_keywords)
-            document_tfidf = {}
-            for keyword, count in document_keyword_counts.items():
-                tf = count
-                idf = keyword_idf.get(keyword, 0)
-                document_tfidf[keyword] = tf * idf
-            documents_tfidf.append(document_tfidf)
-
-        def cosine_similarity(vec1, vec2):
-            intersection = set(vec1.keys()) & set(vec2.keys())
-            numerator = sum(vec1[x] * vec2[x] for x in intersection)
-
-            sum1 = sum(vec1[x] ** 2 for x in vec1)
-            sum2 = sum(vec2[x] ** 2 for x in vec2)
-            denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-            if not denominator:
-                return 0.0
+            assert document.metadata is not None
+            if stored_keywords:
+                document_keywords = stored_keywords[document.metadata["doc_id"]]
             else:
-                return float(numerator) / denominator
-
-        similarities = []
-        for document_tfidf in documents_tfidf:
-            similarity = cosine_similarity(query_tfidf, document_tfidf)
-            similarities.append(similarity)
-
-        # for idx, similarity in enumerate(similarities):
-        #     print(f"Document {idx + 1} similarity: {similarity}")
-
-        return similarities
+                document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+            document.metadata["keywords"] = document_keywords
+            documents_keywords.append(document_keywords)
+
+        return bm25_scores(
+            query_keywords,
+            documents_keywords,
+            k1=dify_config.WEIGHT_RERANK_BM25_K1,
+            b=dify_config.WEIGHT_RERANK_BM25_B,
+            saturation=dify_config.WEIGHT_RERANK_BM25_SATURATION,
+        ).tolist()
+
+    def _get_stored_segment_keywords(self, documents: list[Document]) -> dict[str, list[str]]:
+        """Keywords stored on the segments of the documents, or nothing unless every document has them."""
+        if self._session is None or not documents:
+            return {}
+        index_node_ids = []
+        for document in documents:
+            if document.provider != "dify" or document.metadata is None or not document.metadata.get("doc_id"):
+                return {}
+            index_node_ids.append(document.metadata["doc_id"])
+        rows = self._session.execute(
+            select(DocumentSegment.index_node_id, DocumentSegment.keywords).where(
+                DocumentSegment.index_node_id.in_(index_node_ids)
+            )
+        ).all()
+        stored_keywords = {index_node_id: keywords for index_node_id, keywords in rows if index_node_id and keywords}
+        if not all(index_node_id in stored_keywords for index_node_id in index_node_ids):
+            return {}
+        return stored_keywords
 
     def _calculate_cosine(
         self, tenant_id: str, query: str, documents: list[Document], vector_setting: VectorSetting
@@ -4,13 +4,25 @@ from __future__ import annotations
 
 import codecs
 import re
+import threading
+from collections.abc import Iterator
 from collections.abc import Set as AbstractSet
+from itertools import batched
 from typing import Any, Literal, override
 
+from cachetools import LRUCache
+
+from configs import dify_config
 from core.model_manager import ModelInstance
-from core.rag.splitter.text_splitter import RecursiveCharacterTextSplitter
+from core.rag.splitter.text_splitter import RecursiveCharacterTextSplitter, character_lengths
 from graphon.model_runtime.model_providers.base.tokenizers.gpt2_tokenizer import GPT2Tokenizer
 
+# Pieces measured per call of the length function while streaming fixed-separator chunks.
+_LENGTH_BATCH_SIZE = 512
+# Token counts of short pieces (separators, repeated lines) are cached per splitter; long ones rarely repeat.
+_TOKEN_LENGTH_CACHE_SIZE = 8192
+_TOKEN_LENGTH_CACHE_MAX_TEXT_LENGTH = 2048
+
 
 class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
     """
@@ -23,25 +35,41 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
         embedding_model_instance: ModelInstance | None,
         allowed_special: Literal["all"] | AbstractSet[str] = frozenset(),
         disallowed_special: Literal["all"] | AbstractSet[str] = "all",
+        length_unit: Literal["character", "token"] | None = None,
         **kwargs: Any,
     ) -> T:
-        def _token_encoder(texts: list[str]) -> list[int]:
-            if not texts:
-                return []
+        """
+        Create a splitter measuring chunks in characters or in tokens.
 
-            if embedding_model_instance:
-                return embedding_model_instance.get_text_embedding_num_tokens(texts=texts)
-            else:
-                return [GPT2Tokenizer.get_num_tokens(text) for text in texts]
+        ``length_unit`` defaults to ``INDEXING_SEGMENTATION_LENGTH_UNIT``. Token lengths come from the
+        embedding model's tokenizer, or GPT-2 without a model; every call tokenizes its uncached pieces
+        in one batch.
+        """
+        token_length_cache: LRUCache[str, int] = LRUCache(maxsize=_TOKEN_LENGTH_CACHE_SIZE)
+        token_length_cache_lock = threading.Lock()
 
-        def _character_encoder(texts: list[str]) -> list[int]:
+        def _token_encoder(texts: list[str]) -> list[int]:
             if not texts:
                 return []
 
-            return [len(text) for text in texts]
+            with token_length_cache_lock:
+                lengths = {text: length for text in texts if (length := token_length_cache.get(text)) is not None}
+            misses = list(dict.fromkeys(text for text in texts if text not in lengths))
+            if misses:
+                if embedding_model_instance:
+                    miss_lengths = embedding_model_instance.get_text_embedding_num_tokens(texts=misses)
+                else:
+                    miss_lengths = [GPT2Tokenizer.get_num_tokens(text) for text in misses]
+                lengths.update(zip(misses, miss_lengths))
+                with token_length_cache_lock:
+                    for text, length in zip(misses, miss_lengths):
+                        if len(text) <= _TOKEN_LENGTH_CACHE_MAX_TEXT_LENGTH:
+                            token_length_cache[text] = length
+            return [lengths[text] for text in texts]
 
-        _ = _token_encoder  # kept for future token-length wiring
-        return cls(length_function=_character_encoder, **kwargs)
+        if (length_unit or dify_config.INDEXING_SEGMENTATION_LENGTH_UNIT) == "token":
+            return cls(length_function=_token_encoder, **kwargs)
+        return cls(length_function=character_lengths, **kwargs)
 
 
 class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter):
@@ -54,20 +82,35 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
     @override
     def split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
-        if self._fixed_separator:
-            chunks = text.split(self._fixed_separator)
-        else:
-            chunks = [text]
+        return list(self.iter_split_text(text))
 
-        final_chunks = []
-        chunks_lengths = self._length_function(chunks)
-        for chunk, chunk_length in zip(chunks, chunks_lengths):
-            if chunk_length > self._chunk_size:
-                final_chunks.extend(self.recursive_split_text(chunk))
-            else:
-                final_chunks.append(chunk)
-
-        return final_chunks
+    @override
+    def iter_split_text(self, text: str) -> Iterator[str]:
+        """
+        Yield the chunks of ``split_text`` as the text is walked.
+
+        Fixed-separator chunks are located one at a time and measured in batches, so neither the
+        list of chunks nor their lengths are materialized for the whole text; only chunks longer
+        than ``chunk_size`` are split further.
+        """
+        for chunks in batched(self._iter_fixed_chunks(text), _LENGTH_BATCH_SIZE):
+            for chunk, chunk_length in zip(chunks, self._length_function(list(chunks))):
+                if chunk_length > self._chunk_size:
+                    yield from self.recursive_split_text(chunk)
+                else:
+                    yield chunk
+
+    def _iter_fixed_chunks(self, text: str) -> Iterator[str]:
+        """Same pieces as ``text.split(self._fixed_separator)``, produced lazily."""
+        separator = self._fixed_separator
+        if not separator:
+            yield text
+            return
+        start = 0
+        while (end := text.find(separator, start)) != -1:
+            yield text[start:end]
+            start = end + len(separator)
+        yield text[start:]
 
     def recursive_split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
@@ -85,6 +128,9 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
                 new_separators = self._separators[i + 1 :]
                 break
 
+        if separator == "" and self._length_function is character_lengths:
+            return self._split_characters(text.replace("\n", ""))
+
         # Now that we have the separator, split the text
         if separator:
             if separator == " ":
@@ -124,26 +170,57 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
                 merged_text = self._merge_splits(_good_splits, _separator, _good_splits_lengths)
                 final_chunks.extend(merged_text)
         else:
-            current_part = ""
+            current_parts: list[str] = []
             current_length = 0
-            overlap_part = ""
+            overlap_parts: list[str] = []
             overlap_part_length = 0
             for s, s_len in zip(splits, s_lens):
                 if current_length + s_len <= self._chunk_size - self._chunk_overlap:
-                    current_part += s
+                    current_parts.append(s)
                     current_length += s_len
                 elif current_length + s_len <= self._chunk_size:
-                    current_part += s
+                    current_parts.append(s)
                     current_length += s_len
-                    overlap_part += s
+                    overlap_parts.append(s)
                     overlap_part_length += s_len
                 else:
-                    final_chunks.append(current_part)
-                    current_part = overlap_part + s
+                    final_chunks.append("".join(current_parts))
+                    current_parts = [*overlap_parts, s]
                     current_length = s_len + overlap_part_length
-                    overlap_part = ""
+                    overlap_parts = []
                     overlap_part_length = 0
-            if current_part:
-                final_chunks.append(current_part)
+            if current_parts:
+                final_chunks.append("".join(current_parts))
 
         return final_chunks
+
+    def _split_characters(self, text: str) -> list[str]:
+        """
+        Character-level chunks of ``recursive_split_text`` when lengths are character counts.
+
+        Every piece is one character long, so the chunk boundaries of the piece-by-piece loop
+        are computed in runs instead of visiting each character.
+        """
+        chunks = []
+        start = 0  # first character of the current chunk
+        length = 0
+        overlap_start: int | None = None  # first character carried over into the next chunk
+        position = 0
+        while position < len(text):
+            if length + 1 <= self._chunk_size - self._chunk_overlap:
+                step = min(self._chunk_size - self._chunk_overlap - length, len(text) - position)
+            elif length + 1 <= self._chunk_size:
+                step = min(self._chunk_size - length, len(text) - position)
+                if overlap_start is None:
+                    overlap_start = position
+            else:
+                chunks.append(text[start:position])
+                start = overlap_start if overlap_start is not None else position
+                overlap_start = None
+                step = 1
+                length = position - start
+            length += step
+            position += step
+        if length:
+            chunks.append(text[start:position])
+        return chunks
@@ -4,7 +4,8 @@ import copy
 import logging
 import re
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Iterable, Sequence
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from collections.abc import Set as AbstractSet
 from dataclasses import dataclass
 from typing import Any, Literal, override
@@ -14,6 +15,11 @@ from core.rag.models.document import BaseDocumentTransformer, Document
 logger = logging.getLogger(__name__)
 
 
+def character_lengths(texts: list[str]) -> list[int]:
+    """Default length function: the number of characters of each text."""
+    return [len(text) for text in texts]
+
+
 def _split_text_with_regex(text: str, separator: str, keep_separator: bool) -> list[str]:
     # Now that we have the separator, split the text
     if separator:
@@ -37,7 +43,7 @@ class TextSplitter(BaseDocumentTransformer, ABC):
         self,
         chunk_size: int = 4000,
         chunk_overlap: int = 200,
-        length_function: Callable[[list[str]], list[int]] = lambda x: [len(x) for x in x],
+        length_function: Callable[[list[str]], list[int]] = character_lengths,
         keep_separator: bool = False,
         add_start_index: bool = False,
     ):
@@ -64,13 +70,17 @@ class TextSplitter(BaseDocumentTransformer, ABC):
     def split_text(self, text: str) -> list[str]:
         """Split text into multiple components."""
 
+    def iter_split_text(self, text: str) -> Iterator[str]:
+        """Split text lazily; splitters that can produce chunks incrementally override this."""
+        yield from self.split_text(text)
+
     def create_documents(self, texts: list[str], metadatas: list[dict[str, Any]] | None = None) -> list[Document]:
         """Create documents from a list of texts."""
         _metadatas = metadatas or [{}] * len(texts)
         documents = []
         for i, text in enumerate(texts):
             index = -1
-            for chunk in self.split_text(text):
+            for chunk in self.iter_split_text(text):
                 metadata = copy.deepcopy(_metadatas[i])
                 if self._add_start_index:
                     index = text.find(chunk, index + 1)
@@ -101,7 +111,8 @@ class TextSplitter(BaseDocumentTransformer, ABC):
         separator_len = self._length_function([separator])[0]
 
         docs = []
-        current_doc: list[str] = []
+        # Pieces of the chunk being built with their lengths, so popping the overlap never re-measures them.
+        current_doc: deque[tuple[str, int]] = deque()
         total = 0
         for d, _len in zip(splits, lengths):
             if total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size:
@@ -110,7 +121,7 @@ class TextSplitter(BaseDocumentTransformer, ABC):
                         "Created a chunk of size %s, which is longer than the specified %s", total, self._chunk_size
                     )
                 if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                    doc = self._join_docs([piece for piece, _ in current_doc], separator)
                     if doc is not None:
                         docs.append(doc)
                     # Keep on popping if:
@@ -119,13 +130,11 @@ class TextSplitter(BaseDocumentTransformer, ABC):
                     while total > self._chunk_overlap or (
                         total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size and total > 0
                     ):
-                        total -= self._length_function([current_doc[0]])[0] + (
-                            separator_len if len(current_doc) > 1 else 0
-                        )
-                        current_doc = current_doc[1:]
-            current_doc.append(d)
+                        total -= current_doc[0][1] + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc.popleft()
+            current_doc.append((d, _len))
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs([piece for piece, _ in current_doc], separator)
         if doc is not None:
             docs.append(doc)
         return docs
@@ -6,12 +6,15 @@ providing improved performance by offloading database operations to background w
 """
 
 import logging
+import threading
+from collections import defaultdict
 from collections.abc import Sequence
 from typing import override
 
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
+from configs import dify_config
 from core.repositories.factory import (
     OrderConfig,
     WorkflowNodeExecutionRepository,
@@ -23,7 +26,8 @@ from graphon.entities import WorkflowNodeExecution
 from models import Account, CreatorUserRole, EndUser
 from models.workflow import WorkflowNodeExecutionTriggeredFrom
 from tasks.workflow_node_execution_tasks import (
-    save_workflow_node_execution_task,
+    encode_node_execution_batch,
+    save_workflow_node_executions_task,
 )
 
 logger = logging.getLogger(__name__)
@@ -37,8 +41,14 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
     to handle database operations in background workers. This improves performance by
     reducing the blocking time for workflow node execution storage operations.
 
+    Saves only record the latest state of each node execution. Pending states are sent as
+    one compressed Celery message per workflow run and ``WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE``
+    executions, so intermediate states superseded before a dispatch never reach the broker.
+    Dispatch happens ``WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL`` seconds after the first pending
+    save, when the batch size is reached, or when ``flush`` is called at the end of a run.
+
     Key features:
-    - Asynchronous save operations using Celery tasks
+    - Asynchronous save operations using Celery tasks, batched per workflow run
     - In-memory cache for immediate reads with database backfill across Celery tasks
     - Support for multi-tenancy through tenant/app filtering
     - Automatic retry and error handling through Celery
@@ -54,6 +64,10 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
     _workflow_execution_mapping: dict[str, list[str]]
     _database_loaded_workflow_executions: set[str]
     _sql_repository: SQLAlchemyWorkflowNodeExecutionRepository
+    _pending: dict[str, tuple[str | None, str]]
+    _pending_lock: threading.Lock
+    _dispatch_lock: threading.Lock
+    _flush_timer: threading.Timer | None
 
     def __init__(
         self,
@@ -112,6 +126,13 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
             triggered_from=triggered_from,
         )
 
+        # Latest unsent state of each execution id as (workflow_execution_id, JSON)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        # Held for a whole dispatch so an older state is never sent after a newer one
+        self._dispatch_lock = threading.Lock()
+        self._flush_timer = None
+
         logger.info(
             "Initialized CeleryWorkflowNodeExecutionRepository for tenant %s, app %s, triggered_from %s",
             self._tenant_id,
@@ -124,8 +145,8 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
         """
         Save or update a WorkflowNodeExecution instance to cache and asynchronously to database.
 
-        This method stores the execution in cache immediately for fast reads and queues
-        the save operation as a Celery task without tracking the task status.
+        This method stores the execution in cache immediately for fast reads and records its
+        current state for the next batched Celery dispatch, replacing any unsent earlier state.
 
         Args:
             execution: The WorkflowNodeExecution instance to save or update
@@ -141,38 +162,104 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
                 if execution.id not in self._workflow_execution_mapping[execution.workflow_execution_id]:
                     self._workflow_execution_mapping[execution.workflow_execution_id].append(execution.id)
 
-            # Serialize execution for Celery task
-            execution_data = execution.model_dump()
-
-            # Queue the save operation as a Celery task (fire and forget)
-            save_workflow_node_execution_task.delay(
-                execution_data=execution_data,
-                tenant_id=self._tenant_id,
-                app_id=self._app_id or "",
-                triggered_from=self._triggered_from.value if self._triggered_from else "",
-                creator_user_id=self._creator_user_id,
-                creator_user_role=self._creator_user_role.value,
-            )
+            # Serialize now: the caller keeps mutating the execution after save returns
+            execution_json = execution.model_dump_json()
+            with self._pending_lock:
+                self._pending[execution.id] = (execution.workflow_execution_id, execution_json)
+                pending_count = len(self._pending)
+                self._schedule_flush()
 
-            logger.debug("Cached and queued async save for workflow node execution: %s", execution.id)
+            logger.debug("Cached and buffered async save for workflow node execution: %s", execution.id)
 
         except Exception:
-            logger.exception("Failed to cache or queue save operation for node execution %s", execution.id)
-            # In case of Celery failure, we could implement a fallback to synchronous save
-            # For now, we'll re-raise the exception
+            logger.exception("Failed to cache or buffer save operation for node execution %s", execution.id)
             raise
 
+        if pending_count >= dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE:
+            self.flush()
+
     @override
     def save_synchronously(self, execution: WorkflowNodeExecution) -> None:
         """Create the Agent v2 caller row before runtime participant allocation."""
 
-        self._sql_repository.save_synchronously(execution)
+        with self._dispatch_lock:
+            # The synchronous write is newer than any unsent state of this execution.
+            with self._pending_lock:
+                self._pending.pop(execution.id, None)
+            self._sql_repository.save_synchronously(execution)
         self._execution_cache[execution.id] = execution
         if execution.workflow_execution_id:
             execution_ids = self._workflow_execution_mapping.setdefault(execution.workflow_execution_id, [])
             if execution.id not in execution_ids:
                 execution_ids.append(execution.id)
 
+    @override
+    def flush(self) -> None:
+        """
+        Send every pending node execution state to Celery, one message per workflow run and batch.
+
+        Batches that could not be queued are kept for the next flush and the error is re-raised.
+        """
+        with self._dispatch_lock:
+            with self._pending_lock:
+                pending = self._pending
+                self._pending = {}
+                self._cancel_flush()
+            if not pending:
+                return
+
+            runs: defaultdict[str | None, list[tuple[str, str]]] = defaultdict(list)
+            for execution_id, (workflow_execution_id, execution_json) in pending.items():
+                runs[workflow_execution_id].append((execution_id, execution_json))
+
+            batch_size = dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE
+            batches = [
+                executions[start : start + batch_size]
+                for executions in runs.values()
+                for start in range(0, len(executions), batch_size)
+            ]
+            for sent, batch in enumerate(batches):
+                try:
+                    save_workflow_node_executions_task.delay(
+                        payload=encode_node_execution_batch([execution_json for _, execution_json in batch]),
+                        tenant_id=self._tenant_id,
+                        app_id=self._app_id or "",
+                        triggered_from=self._triggered_from.value if self._triggered_from else "",
+                        creator_user_id=self._creator_user_id,
+                        creator_user_role=self._creator_user_role.value,
+                    )
+                except Exception:
+                    with self._pending_lock:
+                        # States saved since the flush started are newer and take precedence.
+                        requeued = {
+                            execution_id: pending[execution_id]
+                            for unsent in batches[sent:]
+                            for execution_id, _ in unsent
+                        }
+                        self._pending = requeued | self._pending
+                        self._schedule_flush()
+                    raise
+
+    def _schedule_flush(self) -> None:
+        """Start the flush timer unless one is running. Callers hold ``_pending_lock``."""
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL, self._flush_on_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _cancel_flush(self) -> None:
+        """Stop the flush timer. Callers hold ``_pending_lock``."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered workflow node executions")
+
     @override
     def get_by_workflow_execution(
         self,
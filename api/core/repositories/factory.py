@@ -39,6 +39,8 @@ class WorkflowNodeExecutionRepository(Protocol):
 
     def save_execution_data(self, execution: WorkflowNodeExecution): ...
 
+    def flush(self) -> None: ...
+
     def get_by_workflow_execution(
         self,
         workflow_execution_id: str,
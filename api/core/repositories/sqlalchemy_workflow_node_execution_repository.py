@@ -379,6 +379,10 @@ class SQLAlchemyWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository)
 
         self.save(execution)
 
+    @override
+    def flush(self) -> None:
+        """Every save is written immediately, so there is nothing to flush."""
+
     def _persist_to_database(self, db_model: WorkflowNodeExecutionModel):
         """
         Persist the database model to the database.
@@ -415,21 +419,18 @@ class SQLAlchemyWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository)
             if db_model.node_execution_id:
                 self._node_execution_cache[db_model.node_execution_id] = db_model
 
-    @override
-    def save_execution_data(self, execution: WorkflowNodeExecution):
-        domain_model = execution
-        with self._session_factory(expire_on_commit=False) as session:
-            query = WorkflowNodeExecutionModel.preload_offload_data(select(WorkflowNodeExecutionModel)).where(
-                WorkflowNodeExecutionModel.id == domain_model.id
-            )
-            db_model: WorkflowNodeExecutionModel | None = session.execute(query).scalars().first()
-
-        if db_model is not None:
-            offload_data = db_model.offload_data
-        else:
-            db_model = self._to_db_model(domain_model)
-            offload_data = db_model.offload_data
+    def _apply_execution_data(
+        self,
+        domain_model: WorkflowNodeExecution,
+        db_model: WorkflowNodeExecutionModel,
+        offload_data: list[WorkflowNodeExecutionOffload],
+    ) -> list[WorkflowNodeExecutionOffload]:
+        """
+        Copy inputs, outputs and process data onto ``db_model``, truncating and offloading large values.
 
+        Returns:
+            ``offload_data`` with the offloads created here replacing those of the same type.
+        """
         if domain_model.inputs is not None:
             result = self._truncate_and_upload(
                 domain_model.inputs,
@@ -476,7 +477,24 @@ class SQLAlchemyWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository)
             else:
                 db_model.process_data = self._json_encode(process_data)
 
-        db_model.offload_data = offload_data
+        return offload_data
+
+    @override
+    def save_execution_data(self, execution: WorkflowNodeExecution):
+        domain_model = execution
+        with self._session_factory(expire_on_commit=False) as session:
+            query = WorkflowNodeExecutionModel.preload_offload_data(select(WorkflowNodeExecutionModel)).where(
+                WorkflowNodeExecutionModel.id == domain_model.id
+            )
+            db_model: WorkflowNodeExecutionModel | None = session.execute(query).scalars().first()
+
+        if db_model is not None:
+            offload_data = db_model.offload_data
+        else:
+            db_model = self._to_db_model(domain_model)
+            offload_data = db_model.offload_data
+
+        db_model.offload_data = self._apply_execution_data(domain_model, db_model, offload_data)
         with self._session_factory() as session, session.begin():
             session.merge(db_model)
             session.flush()
@@ -0,0 +1,244 @@
+"""
+Write-behind implementation of the WorkflowNodeExecutionRepository.
+
+Node executions of workflow runs are buffered in memory and written in multi-row upserts,
+so the start, retry and finish events of one node collapse into a single row write.
+"""
+
+import dataclasses
+import logging
+import threading
+from collections.abc import Sequence
+from typing import Any, override
+
+from sqlalchemy import Insert, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from configs import dify_config
+from core.repositories.factory import OrderConfig
+from core.repositories.sqlalchemy_workflow_node_execution_repository import (
+    SQLAlchemyWorkflowNodeExecutionRepository,
+    _replace_or_append_offload,
+)
+from graphon.entities import WorkflowNodeExecution
+from models import Account, EndUser, WorkflowNodeExecutionModel, WorkflowNodeExecutionTriggeredFrom
+from models.workflow import WorkflowNodeExecutionOffload
+
+logger = logging.getLogger(__name__)
+
+# Written by the Agent v2 session store directly; the repository never owns this column.
+_UPSERT_COLUMNS = tuple(
+    column.name
+    for column in WorkflowNodeExecutionModel.__table__.columns
+    if column.name != WorkflowNodeExecutionModel.agent_workspace_binding_id.key
+)
+
+
+@dataclasses.dataclass
+class _PendingNodeExecution:
+    db_model: WorkflowNodeExecutionModel
+    offloads: list[WorkflowNodeExecutionOffload] = dataclasses.field(default_factory=list)
+
+
+class WriteBehindWorkflowNodeExecutionRepository(SQLAlchemyWorkflowNodeExecutionRepository):
+    """
+    SQLAlchemy repository that buffers node executions of workflow runs and writes them in batches.
+
+    ``save`` and ``save_execution_data`` only update an in-memory entry per node execution.
+    Pending entries are written with one ``INSERT ... ON CONFLICT DO UPDATE`` (``ON DUPLICATE KEY
+    UPDATE`` on MySQL) per ``WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE`` rows when:
+    - ``WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL`` seconds passed since the first pending save,
+    - the batch size is reached,
+    - ``flush`` is called, which the persistence layer does before saving the run's final state,
+    - node executions of the run are read back through this repository.
+
+    Ordering: the last saved state of a node execution wins and flushes never overlap, so a
+    row is never overwritten by an older state. Rows of one flush become visible together.
+
+    Crash semantics: state saved since the last flush is lost if the process dies, i.e. at most
+    one flush interval of node progress. A run that reaches a terminal state has all its node
+    executions written before the run itself, so a finished run never lacks its nodes. A failed
+    flush is re-queued behind newer state and raised to the caller.
+
+    Single-step runs and Agent v2 callers (``save_synchronously``) read rows right after saving
+    them, so they keep the immediate writes of the parent repository.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker | Engine,
+        tenant_id: str,
+        user: Account | EndUser,
+        app_id: str | None,
+        triggered_from: WorkflowNodeExecutionTriggeredFrom | None,
+    ):
+        super().__init__(
+            session_factory=session_factory,
+            tenant_id=tenant_id,
+            user=user,
+            app_id=app_id,
+            triggered_from=triggered_from,
+        )
+        # Keyed by execution id; dict order is the order of first save.
+        self._pending: dict[str, _PendingNodeExecution] = {}
+        self._pending_lock = threading.Lock()
+        # Held for a whole flush so concurrent flushes cannot write states out of order.
+        self._flush_lock = threading.Lock()
+        self._flush_timer: threading.Timer | None = None
+        self._synchronous_ids: set[str] = set()
+
+    def _buffers(self, execution: WorkflowNodeExecution) -> bool:
+        return (
+            self._triggered_from == WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN
+            and execution.id not in self._synchronous_ids
+        )
+
+    @override
+    def save(self, execution: WorkflowNodeExecution) -> None:
+        if not self._buffers(execution):
+            super().save(execution)
+            return
+
+        db_model = self._to_db_model(execution)
+        with self._pending_lock:
+            previous = self._pending.get(db_model.id)
+            self._pending[db_model.id] = _PendingNodeExecution(
+                db_model=db_model,
+                offloads=previous.offloads if previous is not None else [],
+            )
+            pending_count = len(self._pending)
+            self._schedule_flush()
+        if db_model.node_execution_id:
+            self._node_execution_cache[db_model.node_execution_id] = db_model
+
+        if pending_count >= dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE:
+            self.flush()
+
+    @override
+    def save_synchronously(self, execution: WorkflowNodeExecution) -> None:
+        """Write the row immediately; later saves of this execution bypass the buffer as well."""
+        self.flush()
+        self._synchronous_ids.add(execution.id)
+        super().save(execution)
+
+    @override
+    def save_execution_data(self, execution: WorkflowNodeExecution):
+        # Holding the flush lock keeps a concurrent flush from writing a half-updated entry.
+        with self._flush_lock:
+            with self._pending_lock:
+                pending = self._pending.get(execution.id)
+            if pending is None:
+                super().save_execution_data(execution)
+                return
+            pending.offloads = self._apply_execution_data(execution, pending.db_model, pending.offloads)
+
+    @override
+    def flush(self) -> None:
+        """Write every pending node execution; re-queue the unwritten ones and re-raise on failure."""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending = list(self._pending.values())
+                self._pending = {}
+                self._cancel_flush()
+            if not pending:
+                return
+
+            batch_size = dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE
+            written = 0
+            try:
+                while written < len(pending):
+                    self._write_batch(pending[written : written + batch_size])
+                    written += batch_size
+            except Exception:
+                with self._pending_lock:
+                    requeued = {entry.db_model.id: entry for entry in pending[written:]}
+                    # Newer state saved during the flush replaces the failed entry but keeps its offloads.
+                    for execution_id, newer in self._pending.items():
+                        if (failed := requeued.get(execution_id)) is not None:
+                            for offload in newer.offloads:
+                                failed.offloads = _replace_or_append_offload(failed.offloads, offload)
+                            newer.offloads = failed.offloads
+                        requeued[execution_id] = newer
+                    self._pending = requeued
+                    self._schedule_flush()
+                raise
+
+    def _write_batch(self, batch: Sequence[_PendingNodeExecution]) -> None:
+        with self._session_factory() as session, session.begin():
+            rows = [{name: getattr(entry.db_model, name) for name in _UPSERT_COLUMNS} for entry in batch]
+            session.execute(_upsert_statement(session.get_bind().dialect.name, rows))
+            for entry in batch:
+                if not entry.offloads:
+                    continue
+                # Detach replaced offloads the way the relationship does, leaving them to garbage collection.
+                session.execute(
+                    update(WorkflowNodeExecutionOffload)
+                    .where(
+                        WorkflowNodeExecutionOffload.node_execution_id == entry.db_model.id,
+                        WorkflowNodeExecutionOffload.type_.in_([offload.type_ for offload in entry.offloads]),
+                        WorkflowNodeExecutionOffload.id.not_in([offload.id for offload in entry.offloads]),
+                    )
+                    .values(node_execution_id=None)
+                )
+                for offload in entry.offloads:
+                    session.merge(offload)
+
+    def _schedule_flush(self) -> None:
+        """Start the flush timer unless one is running. Callers hold ``_pending_lock``."""
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(
+            dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL,
+            self._flush_on_timer,
+        )
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _cancel_flush(self) -> None:
+        """Stop the flush timer. Callers hold ``_pending_lock``."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered workflow node executions")
+
+    @override
+    def get_db_models_by_workflow_run(
+        self,
+        workflow_run_id: str,
+        order_config: OrderConfig | None = None,
+        triggered_from: WorkflowNodeExecutionTriggeredFrom = WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN,
+    ) -> Sequence[WorkflowNodeExecutionModel]:
+        self.flush()
+        return super().get_db_models_by_workflow_run(workflow_run_id, order_config, triggered_from)
+
+
+def _upsert_statement(dialect_name: str, rows: list[dict[str, Any]]) -> Insert:
+    table = WorkflowNodeExecutionModel.__table__
+    updated_columns = [name for name in _UPSERT_COLUMNS if name != "id"]
+    match dialect_name:
+        case "postgresql":
+            pg_stmt = pg_insert(table).values(rows)
+            return pg_stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={name: pg_stmt.excluded[name] for name in updated_columns},
+            )
+        case "sqlite":
+            sqlite_stmt = sqlite_insert(table).values(rows)
+            return sqlite_stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={name: sqlite_stmt.excluded[name] for name in updated_columns},
+            )
+        case _:
+            mysql_stmt = mysql_insert(table).values(rows)
+            return mysql_stmt.on_duplicate_key_update(
+                {name: mysql_stmt.inserted[name] for name in updated_columns}  # type: ignore[attr-defined]
+            )
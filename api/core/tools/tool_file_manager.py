@@ -108,25 +108,29 @@ class ToolFileManager:
         file_url: str,
         conversation_id: str | None = None,
     ) -> ToolFile:
-        # try to download image
+        # try to download image, streaming the body into storage instead of buffering it
         try:
-            response = remote_fetcher.make_request("GET", file_url)
-            response.raise_for_status()
-            blob = response.content
+            response = remote_fetcher.make_request("GET", file_url, stream_response=True)
         except httpx.TimeoutException:
             raise ValueError(f"timeout when downloading file from {file_url}")
+        try:
+            response.raise_for_status()
 
-        mimetype = (
-            guess_type(file_url)[0]
-            or response.headers.get("Content-Type", "").split(";")[0].strip()
-            or "application/octet-stream"
-        )
-        url_filename = os.path.basename(urllib.parse.urlparse(file_url).path)
-        extension = resolve_extension(filename=url_filename, mimetype=mimetype)
-        unique_name = uuid4().hex
-        filename = f"{unique_name}{extension}"
-        filepath = f"tools/{tenant_id}/{filename}"
-        storage.save(filepath, blob)
+            mimetype = (
+                guess_type(file_url)[0]
+                or response.headers.get("Content-Type", "").split(";")[0].strip()
+                or "application/octet-stream"
+            )
+            url_filename = os.path.basename(urllib.parse.urlparse(file_url).path)
+            extension = resolve_extension(filename=url_filename, mimetype=mimetype)
+            unique_name = uuid4().hex
+            filename = f"{unique_name}{extension}"
+            filepath = f"tools/{tenant_id}/{filename}"
+            size = storage.save_stream(filepath, response.iter_bytes())
+        except httpx.TimeoutException:
+            raise ValueError(f"timeout when downloading file from {file_url}")
+        finally:
+            response.close()
         with session_factory.create_session() as session:
             tool_file = ToolFile(
                 user_id=user_id,
@@ -136,7 +140,7 @@ class ToolFileManager:
                 mimetype=mimetype,
                 original_url=file_url,
                 name=filename,
-                size=len(blob),
+                size=size,
             )
 
             session.add(tool_file)
@@ -231,7 +231,7 @@ class WorkflowEntry:
         )
         graph_init_context = DifyGraphInitContext(
             workflow_id=workflow.id,
-            graph_config=workflow.graph_dict,
+            graph_config=workflow.graph_view,
             run_context=run_context,
             call_depth=0,
         )
@@ -256,7 +256,7 @@ class WorkflowEntry:
         try:
             # variable selector to variable mapping
             variable_mapping = node_cls.extract_variable_selector_to_variable_mapping(
-                graph_config=workflow.graph_dict, config=node_config
+                graph_config=workflow.graph_view, config=node_config
             )
         except NotImplementedError:
             variable_mapping = {}
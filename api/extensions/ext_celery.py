@@ -269,6 +269,14 @@ def init_app(app: DifyApp) -> Celery:
             "task": "schedule.workflow_schedule_task.poll_workflow_schedules",
             "schedule": timedelta(minutes=dify_config.WORKFLOW_SCHEDULE_POLLER_INTERVAL),
         }
+    if dify_config.ENABLE_WORKFLOW_SCHEDULE_DISPATCHER:
+
+        def _start_workflow_schedule_dispatcher(sender: Any, **_: Any) -> None:
+            from schedule.workflow_schedule_dispatcher import start_workflow_schedule_dispatcher
+
+            start_workflow_schedule_dispatcher(app)
+
+        beat_init.connect(_start_workflow_schedule_dispatcher, weak=False)
     if dify_config.ENABLE_TRIGGER_PROVIDER_REFRESH_TASK:
         imports.append("schedule.trigger_provider_refresh_task")
         beat_schedule["trigger_provider_refresh"] = {
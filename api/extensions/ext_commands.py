@@ -14,6 +14,7 @@ def init_app(app: DifyApp):
         clear_free_plan_tenant_expired_logs,
         clear_orphaned_file_records,
         convert_to_agent_apps,
+        create_pgvector_document_id_indexes,
         create_tenant,
         data_migrate,
         delete_archived_workflow_runs,
@@ -29,8 +30,12 @@ def init_app(app: DifyApp):
         install_rag_pipeline_plugins,
         migrate_data_for_plugin,
         migrate_dataset_permissions_to_rbac,
+        migrate_embedding_cache_format,
+        migrate_keyword_index,
         migrate_member_roles_to_rbac,
         migrate_oss,
+        migrate_pgvector_full_text_search,
+        migrate_pgvector_vector_index,
         migration_data_wizard,
         old_metadata_migration,
         remove_orphaned_files_on_storage,
@@ -51,6 +56,11 @@ def init_app(app: DifyApp):
         reset_email,
         reset_encrypt_key_pair,
         vdb_migrate,
+        migrate_embedding_cache_format,
+        migrate_keyword_index,
+        migrate_pgvector_full_text_search,
+        migrate_pgvector_vector_index,
+        create_pgvector_document_id_indexes,
         convert_to_agent_apps,
         add_qdrant_index,
         create_tenant,
@@ -183,6 +183,9 @@ class RedisClientWrapper:
     def hlen(self, name: str | bytes) -> Any:
         return self._require_client().hlen(_serialize_redis_name_arg(name, self._get_prefix()))
 
+    def hincrby(self, name: str | bytes, key: str | bytes, amount: int = 1) -> Any:
+        return self._require_client().hincrby(_serialize_redis_name_arg(name, self._get_prefix()), key, amount)
+
     def zadd(
         self,
         name: str | bytes,
@@ -205,6 +208,33 @@ class RedisClientWrapper:
             lt=lt,
         )
 
+    def zincrby(self, name: str | bytes, amount: float, value: str | bytes) -> Any:
+        return self._require_client().zincrby(_serialize_redis_name_arg(name, self._get_prefix()), amount, value)
+
+    def zscore(self, name: str | bytes, value: str | bytes) -> Any:
+        return self._require_client().zscore(_serialize_redis_name_arg(name, self._get_prefix()), value)
+
+    def zrange(self, name: str | bytes, start: int, end: int, withscores: bool = False) -> Any:
+        return self._require_client().zrange(
+            _serialize_redis_name_arg(name, self._get_prefix()), start, end, withscores=withscores
+        )
+
+    def zrangebyscore(
+        self,
+        name: str | bytes,
+        min: float | str,
+        max: float | str,
+        start: int | None = None,
+        num: int | None = None,
+        withscores: bool = False,
+    ) -> Any:
+        return self._require_client().zrangebyscore(
+            _serialize_redis_name_arg(name, self._get_prefix()), min, max, start=start, num=num, withscores=withscores
+        )
+
+    def zrem(self, name: str | bytes, *values: str | bytes) -> Any:
+        return self._require_client().zrem(_serialize_redis_name_arg(name, self._get_prefix()), *values)
+
     def zremrangebyscore(self, name: str | bytes, min: float | str, max: float | str) -> Any:
         return self._require_client().zremrangebyscore(_serialize_redis_name_arg(name, self._get_prefix()), min, max)
 
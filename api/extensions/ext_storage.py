@@ -6,7 +6,7 @@ from flask import Flask
 
 from configs import dify_config
 from dify_app import DifyApp
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, DataStream
 from extensions.storage.storage_type import StorageType
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,20 @@ class Storage:
     def init_app(self, app: Flask):
         storage_factory = self.get_storage_factory(dify_config.STORAGE_TYPE)
         with app.app_context():
-            self.storage_runner = storage_factory()
+            storage_runner = storage_factory()
+        if dify_config.STORAGE_DISK_CACHE_ENABLED:
+            from extensions.storage.disk_cached_storage import DiskCachedStorage
+
+            storage_runner = DiskCachedStorage(
+                storage_runner,
+                backend=dify_config.STORAGE_TYPE,
+                cache_dir=dify_config.STORAGE_DISK_CACHE_PATH,
+                max_size=dify_config.STORAGE_DISK_CACHE_MAX_SIZE_MB * 1024 * 1024,
+                max_object_size=dify_config.STORAGE_DISK_CACHE_MAX_OBJECT_SIZE_MB * 1024 * 1024,
+                key_prefixes=[p.strip() for p in dify_config.STORAGE_DISK_CACHE_KEY_PREFIXES.split(",") if p.strip()],
+                revalidate_after=dify_config.STORAGE_DISK_CACHE_REVALIDATE_SECONDS,
+            )
+        self.storage_runner = storage_runner
 
     @staticmethod
     def get_storage_factory(storage_type: str) -> Callable[[], BaseStorage]:
@@ -88,6 +101,9 @@ class Storage:
     def save(self, filename: str, data: bytes):
         self.storage_runner.save(filename, data)
 
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        return self.storage_runner.save_stream(filename, data)
+
     @overload
     def load(self, filename: str, /, *, stream: Literal[False] = False) -> bytes: ...
 
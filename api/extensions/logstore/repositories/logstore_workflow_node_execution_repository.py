@@ -318,6 +318,10 @@ class LogstoreWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
                 logger.exception("Failed to dual-write node execution data to SQL database: id=%s", execution.id)
                 # Don't raise - LogStore write succeeded, SQL is just a backup
 
+    @override
+    def flush(self) -> None:
+        """Every save is written immediately, so there is nothing to flush."""
+
     @override
     def get_by_workflow_execution(
         self,
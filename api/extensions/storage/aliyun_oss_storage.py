@@ -1,11 +1,13 @@
+import itertools
 import posixpath
 from collections.abc import Generator
 from typing import override
 
 import oss2 as aliyun_s3
+from oss2.models import PartInfo
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, DataStream, iter_parts
 
 
 class AliyunOssStorage(BaseStorage):
@@ -34,6 +36,30 @@ class AliyunOssStorage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(self.__wrapper_folder_filename(filename), data)
 
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        key = self.__wrapper_folder_filename(filename)
+        parts = iter_parts(data)
+        first_part = next(parts, b"")
+        second_part = next(parts, None)
+        if second_part is None:
+            self.client.put_object(key, first_part)
+            return len(first_part)
+
+        upload_id = self.client.init_multipart_upload(key).upload_id
+        uploaded: list[PartInfo] = []
+        size = 0
+        try:
+            for part_number, part in enumerate(itertools.chain((first_part, second_part), parts), start=1):
+                result = self.client.upload_part(key, upload_id, part_number, part)
+                uploaded.append(PartInfo(part_number, result.etag))
+                size += len(part)
+            self.client.complete_multipart_upload(key, upload_id, uploaded)
+        except Exception:
+            self.client.abort_multipart_upload(key, upload_id)
+            raise
+        return size
+
     @override
     def load_once(self, filename: str) -> bytes:
         obj = self.client.get_object(self.__wrapper_folder_filename(filename))
@@ -3,11 +3,12 @@ from collections.abc import Generator
 from typing import override
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import STREAM_PART_SIZE, BaseStorage, DataStream, StreamReader
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,16 @@ class AwsS3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        # Streams above one part are sent as a multipart upload with a few parts in flight.
+        reader = StreamReader(data)
+        config = TransferConfig(
+            multipart_threshold=STREAM_PART_SIZE, multipart_chunksize=STREAM_PART_SIZE, max_concurrency=4
+        )
+        self.client.upload_fileobj(reader, self.bucket_name, filename, Config=config)
+        return reader.bytes_read
+
     @override
     def load_once(self, filename: str) -> bytes:
         try:
@@ -7,7 +7,7 @@ from azure.storage.blob import AccountSasPermissions, BlobServiceClient, Resourc
 
 from configs import dify_config
 from extensions.ext_redis import redis_client
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, DataStream, StreamReader
 from libs.datetime_utils import naive_utc_now
 
 
@@ -36,6 +36,18 @@ class AzureBlobStorage(BaseStorage):
         blob_container = client.get_container_client(container=self.bucket_name)
         blob_container.upload_blob(filename, data)
 
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        if not self.bucket_name:
+            return 0
+
+        # Without a length the SDK stages the stream block by block and commits the block list.
+        reader = StreamReader(data)
+        client = self._sync_client()
+        blob_container = client.get_container_client(container=self.bucket_name)
+        blob_container.upload_blob(filename, reader, max_concurrency=4)
+        return reader.bytes_read
+
     @override
     def load_once(self, filename: str) -> bytes:
         if not self.bucket_name:
@@ -1,7 +1,66 @@
 """Abstract interface for file storage implementations."""
 
+import io
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Generator, Iterable, Iterator
+from typing import BinaryIO, override
+
+# Size of the parts sent by ``save_stream``; above the minimum multipart part size of every backend.
+STREAM_PART_SIZE = 8 * 1024 * 1024
+
+type DataStream = Iterable[bytes] | BinaryIO
+
+
+def iter_stream(data: DataStream, chunk_size: int = STREAM_PART_SIZE) -> Iterator[bytes]:
+    """Yield the non-empty chunks of an iterable of bytes or of a readable file object."""
+    read = getattr(data, "read", None)
+    if callable(read):
+        while chunk := read(chunk_size):
+            yield chunk
+        return
+    for chunk in data:
+        if chunk:
+            yield chunk
+
+
+def iter_parts(data: DataStream, part_size: int = STREAM_PART_SIZE) -> Iterator[bytes]:
+    """Regroup a stream into parts of exactly ``part_size`` bytes, except for the last one."""
+    buffer = bytearray()
+    for chunk in iter_stream(data, part_size):
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class StreamReader(io.RawIOBase):
+    """Read-only, non-seekable file object over a stream, for SDKs that upload from file objects."""
+
+    def __init__(self, data: DataStream):
+        super().__init__()
+        self._chunks = iter_stream(data)
+        self._chunk = memoryview(b"")
+        self.bytes_read = 0
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            self._chunk = memoryview(next(self._chunks, b""))
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        self.bytes_read += size
+        return size
+
+    @override
+    def tell(self) -> int:
+        return self.bytes_read
 
 
 class BaseStorage(ABC):
@@ -11,6 +70,20 @@ class BaseStorage(ABC):
     def save(self, filename: str, data: bytes):
         raise NotImplementedError
 
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        """
+        Save an iterable of bytes or a readable file object without holding it in memory.
+
+        Backends with multipart or chunked uploads override this; the others buffer the stream
+        and call ``save``.
+
+        Returns:
+            The number of bytes saved.
+        """
+        content = b"".join(iter_stream(data))
+        self.save(filename, content)
+        return len(content)
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
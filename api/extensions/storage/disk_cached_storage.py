@@ -0,0 +1,424 @@
+"""
+Node-local read-through disk cache in front of any storage backend.
+
+Objects are kept under ``cache_dir`` in files named after the SHA-256 of their storage key and
+only for keys under the configured prefixes, which must hold write-once objects (upload files,
+extracted images, tool files). Other nodes cannot invalidate the cache of this one, so a hit is
+only served after the backend confirmed within the last ``revalidate_after`` seconds that the
+object still exists; ``exists()`` always asks the backend.
+
+Entries are written to a temporary file and renamed into place, so readers in any process of the
+node never see a partial object, and are read through ``mmap``. Every hit bumps the modification
+time of the entry; when the cache grows above ``max_size`` the least recently used entries are
+evicted down to ``EVICTION_TARGET`` of it.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Generator, Sequence
+from typing import IO, TYPE_CHECKING, override
+
+from cachetools import LRUCache
+
+from configs import dify_config
+from extensions.storage.base_storage import BaseStorage, DataStream
+
+if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+EVICTION_TARGET = 0.9
+_TEMP_PREFIX = ".tmp-"
+# Temporary files older than this were left behind by a crashed writer.
+_STALE_TEMP_SECONDS = 3600
+# Keys whose last backend existence check is remembered per process.
+_MAX_VALIDATED_KEYS = 10000
+
+
+class StorageCacheStats:
+    """Process-wide hit/miss counters per storage backend, optionally mirrored to OpenTelemetry."""
+
+    _lookups_total: "Counter | None"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits: dict[str, int] = defaultdict(int)
+        self._misses: dict[str, int] = defaultdict(int)
+        self._lookups_total = None
+        self._instruments_initialized = False
+
+    def _init_instruments(self) -> None:
+        self._instruments_initialized = True
+        if not dify_config.ENABLE_OTEL:
+            return
+        try:
+            from opentelemetry.metrics import get_meter
+
+            meter = get_meter("storage_disk_cache", version=dify_config.project.version)
+            self._lookups_total = meter.create_counter(
+                "storage_disk_cache_lookups_total",
+                description="Total storage disk cache lookups by backend and result.",
+                unit="{lookup}",
+            )
+        except Exception:
+            logger.exception("storage_disk_cache_metrics: failed to initialize instruments")
+
+    def record(self, backend: str, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits[backend] += 1
+            else:
+                self._misses[backend] += 1
+            if not self._instruments_initialized:
+                self._init_instruments()
+        if self._lookups_total is None:
+            return
+        try:
+            self._lookups_total.add(1, {"backend": backend, "result": "hit" if hit else "miss"})
+        except Exception:
+            logger.exception("storage_disk_cache_metrics: failed to add counter value")
+
+    def hit_rate(self, backend: str) -> float | None:
+        """Share of lookups of a backend answered from disk, or None before its first lookup."""
+        with self._lock:
+            hits = self._hits.get(backend, 0)
+            lookups = hits + self._misses.get(backend, 0)
+        return hits / lookups if lookups else None
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                backend: {"hits": self._hits.get(backend, 0), "misses": self._misses.get(backend, 0)}
+                for backend in self._hits.keys() | self._misses.keys()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+
+storage_cache_stats = StorageCacheStats()
+
+
+class DiskCachedStorage(BaseStorage):
+    """Storage wrapper serving repeated reads of cacheable keys from the local disk."""
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        *,
+        backend: str,
+        cache_dir: str,
+        max_size: int,
+        max_object_size: int,
+        key_prefixes: Sequence[str],
+        revalidate_after: float = 0,
+    ):
+        self._storage = storage
+        self._backend = backend
+        self._cache_dir = os.path.abspath(cache_dir)
+        self._max_size = max_size
+        self._max_object_size = min(max_object_size, max_size)
+        self._key_prefixes = tuple(key_prefixes)
+        self._revalidate_after = revalidate_after
+        self._lock = threading.Lock()
+        # Monotonic time at which the backend last confirmed that a cached key still exists.
+        self._validated_at: LRUCache[str, float] = LRUCache(maxsize=_MAX_VALIDATED_KEYS)
+        # Size of the cache at the last scan, None before the first one, plus the bytes written since.
+        self._scanned_size: int | None = None
+        self._written_size = 0
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    def _is_cacheable(self, filename: str) -> bool:
+        return filename.startswith(self._key_prefixes)
+
+    def _entry_path(self, filename: str) -> str:
+        digest = hashlib.sha256(filename.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, digest[:2], digest)
+
+    @override
+    def save(self, filename: str, data: bytes):
+        self._storage.save(filename, data)
+        if self._is_cacheable(filename):
+            self._invalidate(filename)
+            self._write_entry(filename, data)
+
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        size = self._storage.save_stream(filename, data)
+        if self._is_cacheable(filename):
+            self._invalidate(filename)
+        return size
+
+    @override
+    def load_once(self, filename: str) -> bytes:
+        if not self._is_cacheable(filename):
+            return self._storage.load_once(filename)
+        data = self._read_entry(filename)
+        if data is not None and not self._still_exists(filename):
+            data = None
+        storage_cache_stats.record(self._backend, hit=data is not None)
+        if data is None:
+            data = self._storage.load_once(filename)
+            self._write_entry(filename, data)
+        return data
+
+    @override
+    def load_stream(self, filename: str) -> Generator:
+        if not self._is_cacheable(filename):
+            return self._storage.load_stream(filename)
+        # Opening the entry now keeps it readable even if it is evicted or replaced while streaming.
+        try:
+            entry = open(self._entry_path(filename), "rb")  # noqa: SIM115
+        except FileNotFoundError:
+            storage_cache_stats.record(self._backend, hit=False)
+            return self._stream_and_fill(filename)
+        if not self._still_exists(filename):
+            entry.close()
+            storage_cache_stats.record(self._backend, hit=False)
+            return self._storage.load_stream(filename)
+        storage_cache_stats.record(self._backend, hit=True)
+        self._touch(filename)
+        return self._stream_entry(entry)
+
+    @override
+    def download(self, filename: str, target_filepath: str) -> None:
+        if not self._is_cacheable(filename):
+            self._storage.download(filename, target_filepath)
+            return
+        path = self._entry_path(filename)
+        if os.path.exists(path) and self._still_exists(filename):
+            try:
+                shutil.copyfile(path, target_filepath)
+            except FileNotFoundError:
+                pass
+            else:
+                storage_cache_stats.record(self._backend, hit=True)
+                self._touch(filename)
+                return
+        storage_cache_stats.record(self._backend, hit=False)
+        self._storage.download(filename, target_filepath)
+        if os.path.getsize(target_filepath) <= self._max_object_size:
+            with open(target_filepath, "rb") as source:
+                self._write_entry_from(filename, source)
+
+    @override
+    def exists(self, filename: str) -> bool:
+        # Never answered from the cache: the object may have been deleted through another node.
+        return self._storage.exists(filename)
+
+    @override
+    def delete(self, filename: str):
+        if self._is_cacheable(filename):
+            self._invalidate(filename)
+        return self._storage.delete(filename)
+
+    @override
+    def generate_presigned_url(
+        self,
+        filename: str,
+        *,
+        expires_in: int,
+        content_type: str | None = None,
+    ) -> str:
+        return self._storage.generate_presigned_url(filename, expires_in=expires_in, content_type=content_type)
+
+    @override
+    def scan(self, path, files=True, directories=False) -> list[str]:
+        return self._storage.scan(path, files=files, directories=directories)
+
+    def _still_exists(self, filename: str) -> bool:
+        """
+        Whether a cached object still exists in the backend, asking it at most once per
+        ``revalidate_after`` seconds. The entry of an object deleted elsewhere is removed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            validated_at = self._validated_at.get(filename)
+        if validated_at is not None and now - validated_at < self._revalidate_after:
+            return True
+        if not self._storage.exists(filename):
+            self._invalidate(filename)
+            return False
+        with self._lock:
+            self._validated_at[filename] = now
+        return True
+
+    def _read_entry(self, filename: str) -> bytes | None:
+        try:
+            with open(self._entry_path(filename), "rb") as entry:
+                if os.fstat(entry.fileno()).st_size == 0:
+                    data = b""
+                else:
+                    with mmap.mmap(entry.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        data = mapped[:]
+        except FileNotFoundError:
+            return None
+        self._touch(filename)
+        return data
+
+    @staticmethod
+    def _stream_entry(entry: IO[bytes]) -> Generator[bytes, None, None]:
+        with entry:
+            size = os.fstat(entry.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(entry.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, size, READ_CHUNK_SIZE):
+                    yield mapped[offset : offset + READ_CHUNK_SIZE]
+
+    def _stream_and_fill(self, filename: str) -> Generator[bytes, None, None]:
+        """Stream an object from the backend while copying it to a new entry, kept only if fully read."""
+        temp = self._open_temp()
+        size = 0
+        try:
+            for chunk in self._storage.load_stream(filename):
+                yield chunk
+                if temp is None:
+                    continue
+                size += len(chunk)
+                if size > self._max_object_size:
+                    self._discard_temp(temp)
+                    temp = None
+                    continue
+                try:
+                    temp.write(chunk)
+                except OSError:
+                    logger.warning("Failed to write storage cache entry of %s", filename, exc_info=True)
+                    self._discard_temp(temp)
+                    temp = None
+            if temp is not None:
+                self._commit_temp(filename, temp, size)
+                temp = None
+        finally:
+            if temp is not None:
+                self._discard_temp(temp)
+
+    def _write_entry(self, filename: str, data: bytes) -> None:
+        if len(data) > self._max_object_size:
+            return
+        temp = self._open_temp()
+        if temp is None:
+            return
+        try:
+            temp.write(data)
+        except OSError:
+            logger.warning("Failed to write storage cache entry of %s", filename, exc_info=True)
+            self._discard_temp(temp)
+            return
+        self._commit_temp(filename, temp, len(data))
+
+    def _write_entry_from(self, filename: str, source: IO[bytes]) -> None:
+        temp = self._open_temp()
+        if temp is None:
+            return
+        try:
+            shutil.copyfileobj(source, temp)
+            size = temp.tell()
+        except OSError:
+            logger.warning("Failed to write storage cache entry of %s", filename, exc_info=True)
+            self._discard_temp(temp)
+            return
+        self._commit_temp(filename, temp, size)
+
+    def _open_temp(self) -> IO[bytes] | None:
+        try:
+            return tempfile.NamedTemporaryFile(dir=self._cache_dir, prefix=_TEMP_PREFIX, delete=False)
+        except OSError:
+            logger.warning("Failed to create storage cache entry in %s", self._cache_dir, exc_info=True)
+            return None
+
+    @staticmethod
+    def _discard_temp(temp: IO[bytes]) -> None:
+        temp.close()
+        try:
+            os.remove(temp.name)
+        except OSError:
+            pass
+
+    def _commit_temp(self, filename: str, temp: IO[bytes], size: int) -> None:
+        path = self._entry_path(filename)
+        try:
+            temp.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp.name, path)
+        except OSError:
+            logger.warning("Failed to write storage cache entry of %s", filename, exc_info=True)
+            self._discard_temp(temp)
+            return
+        self._account(size)
+
+    def _touch(self, filename: str) -> None:
+        try:
+            os.utime(self._entry_path(filename))
+        except OSError:
+            pass
+
+    def _invalidate(self, filename: str) -> None:
+        with self._lock:
+            self._validated_at.pop(filename, None)
+        try:
+            os.remove(self._entry_path(filename))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("Failed to remove storage cache entry of %s", filename, exc_info=True)
+
+    def _account(self, size: int) -> None:
+        with self._lock:
+            self._written_size += size
+            if self._scanned_size is not None and self._scanned_size + self._written_size <= self._max_size:
+                return
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Rescan the cache and remove the least recently used entries until it fits the target size.
+
+        The scan sees the entries written by every process of the node, so the size limit holds for
+        the node even though each process only counts its own writes between scans.
+        """
+        entries: list[tuple[float, int, str]] = []
+        total = 0
+        now = time.time()
+        with os.scandir(self._cache_dir) as top:
+            for item in top:
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        with os.scandir(item.path) as bucket:
+                            for entry in bucket:
+                                stat = entry.stat(follow_symlinks=False)
+                                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                                total += stat.st_size
+                    elif item.name.startswith(_TEMP_PREFIX):
+                        if now - item.stat(follow_symlinks=False).st_mtime > _STALE_TEMP_SECONDS:
+                            os.remove(item.path)
+                except OSError:
+                    # Entries removed concurrently by another process.
+                    continue
+        if total > self._max_size:
+            target = self._max_size * EVICTION_TARGET
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logger.warning("Failed to evict storage cache entry %s", path, exc_info=True)
+                    continue
+                total -= size
+        self._scanned_size = total
+        self._written_size = 0
@@ -7,7 +7,7 @@ from google.cloud import storage as google_cloud_storage  # type: ignore
 from pydantic import TypeAdapter
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import STREAM_PART_SIZE, BaseStorage, DataStream, StreamReader
 
 _service_account_adapter: TypeAdapter[dict[str, Any]] = TypeAdapter(dict[str, Any])
 
@@ -36,6 +36,15 @@ class GoogleCloudStorage(BaseStorage):
         with io.BytesIO(data) as stream:
             blob.upload_from_file(stream)
 
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        # A chunk size turns the upload into a resumable upload sent one chunk at a time.
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename, chunk_size=STREAM_PART_SIZE)
+        reader = StreamReader(data)
+        blob.upload_from_file(reader)
+        return reader.bytes_read
+
     @override
     def load_once(self, filename: str) -> bytes:
         bucket = self.client.get_bucket(self.bucket_name)
@@ -8,7 +8,7 @@ import opendal
 from dotenv import dotenv_values
 from opendal import Operator
 
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, DataStream, iter_stream
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +46,16 @@ class OpenDALStorage(BaseStorage):
         self.op.write(path=filename, bs=data)
         logger.debug("file %s saved", filename)
 
+    @override
+    def save_stream(self, filename: str, data: DataStream) -> int:
+        size = 0
+        with self.op.open(path=filename, mode="wb") as file:
+            for chunk in iter_stream(data):
+                file.write(chunk)
+                size += len(chunk)
+        logger.debug("file %s saved from stream", filename)
+        return size
+
     @override
     def load_once(self, filename: str) -> bytes:
         if not self.exists(filename):
@@ -0,0 +1,97 @@
+"""Compact binary serialization for cached embedding vectors.
+
+Cached embeddings used to be stored as ``pickle.dumps(list[float])`` in the
+``embeddings`` table and as base64-encoded float64 bytes in Redis. The compact
+format stores the raw little-endian vector behind a small fixed header so it can be
+decoded with a single ``np.frombuffer`` call:
+
+    magic (4 bytes) | version (1 byte) | dtype code (1 byte) | dimension (uint32 LE) | payload
+
+The magic starts with ``0x00`` which is neither a pickle protocol marker (``0x80``)
+nor a base64 character, so legacy payloads are still detected and decoded
+transparently.
+"""
+
+import base64
+import pickle
+import struct
+from enum import StrEnum
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+COMPACT_EMBEDDING_MAGIC = b"\x00EMB"
+COMPACT_EMBEDDING_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBI")
+
+
+class EmbeddingStorageDType(StrEnum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+
+
+_DTYPE_CODES: dict[EmbeddingStorageDType, int] = {
+    EmbeddingStorageDType.FLOAT32: 1,
+    EmbeddingStorageDType.FLOAT16: 2,
+}
+_NUMPY_DTYPES: dict[int, np.dtype[Any]] = {
+    1: np.dtype("<f4"),
+    2: np.dtype("<f2"),
+}
+
+
+class EmbeddingCodecError(ValueError):
+    pass
+
+
+def is_compact_embedding(data: bytes) -> bool:
+    return data[: len(COMPACT_EMBEDDING_MAGIC)] == COMPACT_EMBEDDING_MAGIC
+
+
+def encode_embedding(
+    vector: npt.ArrayLike, dtype: EmbeddingStorageDType | str = EmbeddingStorageDType.FLOAT32
+) -> bytes:
+    """Serialize a one-dimensional vector into the compact format."""
+    dtype_code = _DTYPE_CODES[EmbeddingStorageDType(dtype)]
+    array = np.asarray(vector, dtype=_NUMPY_DTYPES[dtype_code])
+    if array.ndim != 1:
+        raise EmbeddingCodecError(f"Embedding must be one-dimensional, got shape {array.shape}")
+    header = _HEADER.pack(COMPACT_EMBEDDING_MAGIC, COMPACT_EMBEDDING_VERSION, dtype_code, array.shape[0])
+    return header + array.tobytes()
+
+
+def decode_compact_embedding(data: bytes) -> npt.NDArray[np.floating[Any]]:
+    """Decode a payload that must be in the compact format; raises ``EmbeddingCodecError`` otherwise."""
+    if not is_compact_embedding(data):
+        raise EmbeddingCodecError("Payload is not a compact embedding")
+    if len(data) < _HEADER.size:
+        raise EmbeddingCodecError("Compact embedding payload is truncated")
+    _, version, dtype_code, dimension = _HEADER.unpack_from(data)
+    if version != COMPACT_EMBEDDING_VERSION:
+        raise EmbeddingCodecError(f"Unsupported compact embedding version: {version}")
+    numpy_dtype = _NUMPY_DTYPES.get(dtype_code)
+    if numpy_dtype is None:
+        raise EmbeddingCodecError(f"Unsupported compact embedding dtype code: {dtype_code}")
+    if len(data) - _HEADER.size != dimension * numpy_dtype.itemsize:
+        raise EmbeddingCodecError("Compact embedding payload does not match its declared dimension")
+    return np.frombuffer(data, dtype=numpy_dtype, offset=_HEADER.size)
+
+
+def decode_embedding(data: bytes) -> npt.NDArray[np.floating[Any]]:
+    """Decode a stored embedding row, accepting both the compact format and legacy pickles.
+
+    The returned array is a read-only view over ``data`` for compact payloads.
+    """
+    if is_compact_embedding(data):
+        return decode_compact_embedding(data)
+    # Legacy rows written by Embedding.set_embedding before the compact format existed.
+    return np.asarray(pickle.loads(data), dtype=np.float64)  # noqa: S301
+
+
+def decode_cached_query_embedding(data: bytes) -> npt.NDArray[np.floating[Any]]:
+    """Decode a Redis query-embedding entry, accepting legacy base64-encoded float64 payloads."""
+    if is_compact_embedding(data):
+        return decode_compact_embedding(data)
+    return np.frombuffer(base64.b64decode(data), dtype=np.float64)
@@ -410,7 +410,7 @@ def generate_text_hash(text: str) -> str:
 
 
 def compact_generate_response(
-    response: Mapping[str, Any] | Generator[str, None, None] | RateLimitGenerator,
+    response: Mapping[str, Any] | Generator[str | bytes, None, None] | RateLimitGenerator,
 ) -> Response:
     if isinstance(response, Mapping):
         return Response(
@@ -421,7 +421,7 @@ def compact_generate_response(
     else:
         stream_response = response
 
-        def generate() -> Generator[str, None, None]:
+        def generate() -> Generator[str | bytes, None, None]:
             yield from stream_response
 
         return Response(
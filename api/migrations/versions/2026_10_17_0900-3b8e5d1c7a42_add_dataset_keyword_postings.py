@@ -0,0 +1,37 @@
+"""add dataset keyword postings
+
+Revision ID: 3b8e5d1c7a42
+Revises: 925e75620b69
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+import models as models
+
+# revision identifiers, used by Alembic.
+revision = "3b8e5d1c7a42"
+down_revision = "925e75620b69"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_keyword_postings",
+        sa.Column("dataset_id", models.types.StringUUID(), nullable=False),
+        sa.Column("keyword", sa.String(length=255), nullable=False),
+        sa.Column("index_node_id", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_pkey"),
+    )
+    with op.batch_alter_table("dataset_keyword_postings", schema=None) as batch_op:
+        batch_op.create_index("dataset_keyword_posting_node_idx", ["dataset_id", "index_node_id"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("dataset_keyword_postings", schema=None) as batch_op:
+        batch_op.drop_index("dataset_keyword_posting_node_idx")
+
+    op.drop_table("dataset_keyword_postings")
@@ -0,0 +1,50 @@
+"""add embedding last hit at
+
+Revision ID: 6f2c9a4e8d13
+Revises: 3b8e5d1c7a42
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6f2c9a4e8d13"
+down_revision = "3b8e5d1c7a42"
+branch_labels = None
+depends_on = None
+
+
+def _is_pg(conn):
+    return conn.dialect.name == "postgresql"
+
+
+def upgrade():
+    with op.batch_alter_table("embeddings", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("last_hit_at", sa.DateTime(), nullable=True))
+
+    if _is_pg(op.get_bind()):
+        # embeddings is large and written by every indexing run, so build the index without
+        # blocking writes. `CREATE INDEX CONCURRENTLY` cannot run within a transaction.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "embedding_last_hit_at_idx",
+                "embeddings",
+                ["last_hit_at"],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+    else:
+        op.create_index("embedding_last_hit_at_idx", "embeddings", ["last_hit_at"], unique=False)
+
+
+def downgrade():
+    if _is_pg(op.get_bind()):
+        with op.get_context().autocommit_block():
+            op.drop_index("embedding_last_hit_at_idx", table_name="embeddings", postgresql_concurrently=True)
+    else:
+        op.drop_index("embedding_last_hit_at_idx", table_name="embeddings")
+
+    with op.batch_alter_table("embeddings", schema=None) as batch_op:
+        batch_op.drop_column("last_hit_at")
@@ -4,7 +4,6 @@ import hmac
 import json
 import logging
 import os
-import pickle
 import re
 import time
 from collections.abc import Sequence
@@ -25,6 +24,7 @@ from core.rag.index_processor.constant.query_type import QueryType
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from core.tools.signature import sign_upload_file_preview_url
 from extensions.ext_storage import storage
+from libs.embedding_codec import decode_embedding, encode_embedding
 from libs.uuid_utils import uuidv7
 
 from .account import Account
@@ -1328,12 +1328,31 @@ class DatasetKeywordTable(TypeBase):
                 return None
 
 
+class DatasetKeywordPosting(TypeBase):
+    """One (keyword, index node) posting of a dataset's inverted keyword index.
+
+    The primary key serves keyword lookups, and the secondary index is the reverse
+    node -> keywords map used to delete a node's postings without scanning the table.
+    """
+
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_pkey"),
+        sa.Index("dataset_keyword_posting_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    dataset_id: Mapped[str] = mapped_column(StringUUID, nullable=False)
+    keyword: Mapped[str] = mapped_column(String(255), nullable=False)
+    index_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+
+
 class Embedding(TypeBase):
     __tablename__ = "embeddings"
     __table_args__ = (
         sa.PrimaryKeyConstraint("id", name="embedding_pkey"),
         sa.UniqueConstraint("model_name", "hash", "provider_name", name="embedding_hash_idx"),
         sa.Index("created_at_idx", "created_at"),
+        sa.Index("embedding_last_hit_at_idx", "last_hit_at"),
     )
 
     id: Mapped[str] = mapped_column(
@@ -1352,12 +1371,15 @@ class Embedding(TypeBase):
         DateTime, nullable=False, server_default=func.current_timestamp(), init=False
     )
     provider_name: Mapped[str] = mapped_column(String(255), nullable=False, server_default=sa.text("''"))
+    # Stamped in batches by EmbeddingCacheHitRecorder, at most once per hit resolution; NULL until the first hit.
+    last_hit_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
 
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = encode_embedding(embedding_data, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE)
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        # Rows written before the compact format are legacy pickles; decode_embedding handles both.
+        return cast(list[float], decode_embedding(self.embedding).tolist())
 
 
 class DatasetCollectionBinding(TypeBase):
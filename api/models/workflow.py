@@ -57,6 +57,7 @@ from libs.datetime_utils import naive_utc_now
 from libs.uuid_utils import uuidv7
 
 from ._workflow_exc import NodeNotFoundError, WorkflowDataError
+from .workflow_graph import WorkflowGraph, load_workflow_graph, thaw
 
 if TYPE_CHECKING:
     from .model import AppMode
@@ -321,25 +322,27 @@ class Workflow(Base):  # bug
 
     @property
     def graph_dict(self) -> Mapping[str, Any]:
-        # TODO(QuantumGhost): Consider caching `graph_dict` to avoid repeated JSON decoding.
-        #
-        # Using `functools.cached_property` could help, but some code in the codebase may
-        # modify the returned dict, which can cause issues elsewhere.
-        #
-        # For example, changing this property to a cached property led to errors like the
-        # following when single stepping an `Iteration` node:
-        #
-        #     Root node id 1748401971780start not found in the graph
-        #
-        # There is currently no standard way to make a dict deeply immutable in Python,
-        # and tracking modifications to the returned dict is difficult. For now, we leave
-        # the code as-is to avoid these issues.
-        #
-        # Currently, the following functions / methods would mutate the returned dict:
-        #
-        # - `_get_graph_and_variable_pool_for_single_node_run`.
+        """A private, mutable copy of the graph decoded on every access.
+
+        Callers that only read the graph should use `graph_view`, which is parsed once and shared.
+        Callers that change it use this property or `thaw(self.graph_view)`.
+        """
         return json.loads(self.graph) if self.graph else {}
 
+    @property
+    def graph_view(self) -> WorkflowGraph:
+        """The graph as a deeply frozen mapping shared by every reader of the same workflow version.
+
+        Mutating it raises `TypeError`; see `models.workflow_graph`.
+        """
+        graph = self.graph
+        memo: tuple[str, WorkflowGraph] | None = self.__dict__.get("_graph_view_memo")
+        if memo is not None and memo[0] is graph:
+            return memo[1]
+        view = load_workflow_graph(self.id, graph)
+        self.__dict__["_graph_view_memo"] = (graph, view)
+        return view
+
     def get_node_config_by_id(self, node_id: str) -> NodeConfigDict:
         """Extract a node configuration from the workflow graph by node ID.
 
@@ -348,20 +351,18 @@ class Workflow(Base):  # bug
         model fields plus Pydantic extra storage for legacy consumers, but callers should
         prefer attribute access.
         """
-        workflow_graph = self.graph_dict
+        workflow_graph = self.graph_view
 
         if not workflow_graph:
             raise WorkflowDataError(f"workflow graph not found, workflow_id={self.id}")
 
-        nodes = workflow_graph.get("nodes")
-        if not nodes:
+        if not workflow_graph.get("nodes"):
             raise WorkflowDataError("nodes not found in workflow graph")
 
-        try:
-            node_config: dict[str, Any] = next(filter(lambda node: node["id"] == node_id, nodes))
-        except StopIteration:
+        node_config = workflow_graph.get_node(node_id)
+        if node_config is None:
             raise NodeNotFoundError(node_id)
-        return NodeConfigDictAdapter.validate_python(adapt_node_config_for_graph(node_config))
+        return NodeConfigDictAdapter.validate_python(adapt_node_config_for_graph(thaw(node_config)))
 
     @staticmethod
     def get_node_type_from_node_config(node_config: NodeConfigDict) -> NodeType:
@@ -508,7 +509,7 @@ class Workflow(Base):  # bug
 
         For specific node type, refer to `graphon.nodes`
         """
-        graph_dict = self.graph_dict
+        graph_dict = self.graph_view
         if "nodes" not in graph_dict:
             raise WorkflowDataError("nodes not found in workflow graph")
 
@@ -524,7 +525,7 @@ class Workflow(Base):  # bug
         if not self.graph:
             return []
 
-        graph_dict = self.graph_dict
+        graph_dict = self.graph_view
         if "nodes" not in graph_dict:
             return []
 
@@ -536,7 +537,7 @@ class Workflow(Base):  # bug
             return []
 
         # get user_input_form from start node
-        variables: list[Any] = start_node.get("data", {}).get("variables", [])
+        variables: list[Any] = thaw(start_node.get("data", {}).get("variables", []))
 
         if to_old_structure:
             old_structure_variables: list[dict[str, Any]] = []
@@ -560,7 +561,7 @@ class Workflow(Base):  # bug
 
         :return: hash
         """
-        entity = {"graph": self.graph_dict}
+        entity = {"graph": self.graph_view}
 
         return helper.generate_text_hash(json.dumps(entity, sort_keys=True))
 
@@ -0,0 +1,167 @@
+"""
+Immutable, memoized parsed workflow graphs.
+
+``Workflow.graph`` is a JSON document that can hold hundreds of nodes and is read many times per
+run. ``load_workflow_graph`` parses it once per workflow id and graph content and shares the
+result between every reader in the process, so the result is deeply frozen: its dicts and lists
+are ``FrozenDict`` and ``FrozenList``, which still pass ``isinstance(..., dict | list)`` checks,
+serialize like their mutable counterparts and are accepted by Pydantic, but raise ``TypeError``
+on any in-place change.
+
+Callers that need to change a graph take a private copy with ``thaw`` (``copy.copy`` and
+``copy.deepcopy`` also return mutable copies), or use ``Workflow.graph_dict``, which still
+decodes a fresh dict on every access.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, NoReturn
+
+# Parsed graphs kept by the process; a graph of a few hundred nodes takes a few megabytes.
+GRAPH_CACHE_MAX_ENTRIES = 64
+
+
+def _immutable(self: object, *args: object, **kwargs: object) -> NoReturn:
+    raise TypeError(f"{type(self).__name__} is immutable, use thaw() to get a mutable copy")
+
+
+class FrozenDict(dict[str, Any]):  # noqa: FURB189 - consumers check isinstance(value, dict)
+    """A ``dict`` that cannot be changed after construction."""
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list[Any]):  # noqa: FURB189 - consumers check isinstance(value, list)
+    """A ``list`` that cannot be changed after construction."""
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    clear = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    reverse = _immutable
+    sort = _immutable
+
+    def __copy__(self) -> list[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        return thaw(self)
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Return a deeply frozen copy of a decoded JSON value; frozen containers are reused as-is."""
+    if isinstance(value, FrozenDict | FrozenList):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList([freeze(item) for item in value])
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a deeply mutable copy of a decoded JSON value, frozen or not."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+class WorkflowGraph(FrozenDict):
+    """A frozen workflow graph with an index of its nodes by id."""
+
+    __slots__ = ("_nodes_by_id",)
+
+    def __init__(self, graph: Mapping[str, Any]):
+        super().__init__({key: freeze(value) for key, value in graph.items()})
+        self._nodes_by_id: dict[str, FrozenDict] = {}
+        for node in self.nodes:
+            if isinstance(node, FrozenDict) and isinstance(node.get("id"), str):
+                self._nodes_by_id.setdefault(node["id"], node)
+
+    @property
+    def nodes(self) -> FrozenList:
+        nodes = self.get("nodes")
+        return nodes if isinstance(nodes, FrozenList) else FrozenList()
+
+    @property
+    def edges(self) -> FrozenList:
+        edges = self.get("edges")
+        return edges if isinstance(edges, FrozenList) else FrozenList()
+
+    def get_node(self, node_id: str) -> FrozenDict | None:
+        return self._nodes_by_id.get(node_id)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+_EMPTY_GRAPH = WorkflowGraph({})
+_cache: OrderedDict[tuple[str, str], WorkflowGraph] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_workflow_graph(workflow_id: str | None, graph: str | None) -> WorkflowGraph:
+    """
+    Return the parsed graph of a workflow, shared with every other reader of the same content.
+
+    Entries are keyed by workflow id and a hash of the graph JSON, so a draft saved with a new
+    graph is parsed again while published versions are parsed once per process.
+    """
+    if not graph:
+        return _EMPTY_GRAPH
+    if workflow_id is None:
+        return WorkflowGraph(json.loads(graph))
+
+    key = (workflow_id, hashlib.sha256(graph.encode("utf-8")).hexdigest())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    parsed = WorkflowGraph(json.loads(graph))
+    with _cache_lock:
+        _cache[key] = parsed
+        _cache.move_to_end(key)
+        while len(_cache) > GRAPH_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return parsed
+
+
+def clear_workflow_graph_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -1,14 +1,17 @@
 import hashlib
+import io
 import json
 import logging
+import struct
 import uuid
+from collections.abc import Sequence
 from contextlib import contextmanager
-from typing import Any, override
+from typing import Any, Literal, override
 
 import psycopg2.errors
-import psycopg2.extras
 import psycopg2.pool
-from pydantic import BaseModel, model_validator
+from pgvector import Vector
+from pydantic import BaseModel, Field, model_validator
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
@@ -21,6 +24,11 @@ from models.dataset import Dataset
 
 logger = logging.getLogger(__name__)
 
+PGVectorIndexType = Literal["vector", "halfvec", "binary"]
+
+# pgvector extension version of each server, read once per process.
+_pgvector_versions: dict[tuple[str, int, str], tuple[int, ...]] = {}
+
 
 class PGVectorConfig(BaseModel):
     host: str
@@ -31,6 +39,11 @@ class PGVectorConfig(BaseModel):
     min_connection: int
     max_connection: int
     pg_bigm: bool = False
+    # Set for collections that have the stored ``text_tsv`` column, None for older collections.
+    text_search_config: str | None = Field(default=None, pattern=r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+    # "halfvec" and "binary" collections search a quantized HNSW index and re-rank on the full vectors.
+    index_type: PGVectorIndexType = "vector"
+    rerank_candidates_factor: int = Field(default=4, gt=0)
 
     @model_validator(mode="before")
     @classmethod
@@ -59,20 +72,70 @@ CREATE TABLE IF NOT EXISTS {table_name} (
     id UUID PRIMARY KEY,
     text TEXT NOT NULL,
     meta JSONB NOT NULL,
-    embedding vector({dimension}) NOT NULL
+    embedding vector({dimension}) NOT NULL{text_tsv_column}
 ) using heap;
 """
 
+SQL_TEXT_TSV_COLUMN = """,
+    text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('{text_search_config}'::regconfig, coalesce(text, ''))) STORED"""
+
 SQL_CREATE_INDEX = """
-CREATE INDEX IF NOT EXISTS embedding_cosine_v1_idx_{index_hash} ON {table_name}
+CREATE INDEX {concurrently} IF NOT EXISTS embedding_cosine_v1_idx_{index_hash} ON {table_name}
 USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 """
 
+# Expression indexes on quantized embeddings (pgvector >= 0.7.0); queries must use the same expression.
+SQL_CREATE_INDEX_HALFVEC = """
+CREATE INDEX {concurrently} IF NOT EXISTS embedding_halfvec_cosine_idx_{index_hash} ON {table_name}
+USING hnsw ((embedding::halfvec({dimension})) halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+"""
+
+SQL_CREATE_INDEX_BINARY = """
+CREATE INDEX {concurrently} IF NOT EXISTS embedding_bit_hamming_idx_{index_hash} ON {table_name}
+USING hnsw ((binary_quantize(embedding)::bit({dimension})) bit_hamming_ops) WITH (m = 16, ef_construction = 64);
+"""
+
+SQL_CREATE_VECTOR_INDEX: dict[PGVectorIndexType, str] = {
+    "vector": SQL_CREATE_INDEX,
+    "halfvec": SQL_CREATE_INDEX_HALFVEC,
+    "binary": SQL_CREATE_INDEX_BINARY,
+}
+
+# Largest dimension an HNSW index supports for each index type.
+# ref: https://github.com/pgvector/pgvector?tab=readme-ov-file#indexing
+HNSW_MAX_DIMENSIONS: dict[PGVectorIndexType, int] = {"vector": 2000, "halfvec": 4000, "binary": 64000}
+
+# Upper bound of hnsw.ef_search accepted by pgvector.
+HNSW_MAX_EF_SEARCH = 1000
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+JSONB_BINARY_VERSION = b"\x01"
+
+SQL_CREATE_INDEX_DOCUMENT_ID = """
+CREATE INDEX {concurrently} IF NOT EXISTS document_id_idx_{index_hash} ON {table_name}
+USING btree ((meta->>'document_id'));
+"""
+
 SQL_CREATE_INDEX_PG_BIGM = """
 CREATE INDEX IF NOT EXISTS bigm_idx_{index_hash} ON {table_name}
 USING gin (text gin_bigm_ops);
 """
 
+SQL_CREATE_INDEX_TEXT_TSV = """
+CREATE INDEX {concurrently} IF NOT EXISTS text_tsv_idx_{index_hash} ON {table_name}
+USING gin (text_tsv);
+"""
+
+# Older collections get a plain column kept up to date by a trigger, because adding a
+# generated column rewrites the whole table under an exclusive lock.
+SQL_ADD_TEXT_TSV_COLUMN = """
+ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS text_tsv tsvector;
+DROP TRIGGER IF EXISTS text_tsv_update_{index_hash} ON {table_name};
+CREATE TRIGGER text_tsv_update_{index_hash} BEFORE INSERT OR UPDATE OF text ON {table_name}
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(text_tsv, '{qualified_text_search_config}', text);
+"""
+
 
 class PGVector(BaseVector):
     def __init__(self, collection_name: str, config: PGVectorConfig):
@@ -81,6 +144,10 @@ class PGVector(BaseVector):
         self.table_name = f"embedding_{collection_name}"
         self.index_hash = hashlib.md5(self.table_name.encode()).hexdigest()[:8]
         self.pg_bigm = config.pg_bigm
+        self.text_search_config = config.text_search_config
+        self.index_type = config.index_type
+        self.rerank_candidates_factor = config.rerank_candidates_factor
+        self.server_key = (config.host, config.port, config.database)
 
     @override
     def get_type(self) -> str:
@@ -116,23 +183,29 @@ class PGVector(BaseVector):
 
     @override
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
-        values = []
         pks = []
+        buffer = io.BytesIO()
+        buffer.write(PGCOPY_HEADER)
         for i, doc in enumerate(documents):
             if doc.metadata is not None:
                 doc_id = doc.metadata.get("doc_id", str(uuid.uuid4()))
                 pks.append(doc_id)
-                values.append(
-                    (
-                        doc_id,
-                        doc.page_content,
-                        json.dumps(doc.metadata),
-                        embeddings[i],
+                buffer.write(
+                    _copy_binary_row(
+                        (
+                            uuid.UUID(doc_id).bytes,
+                            doc.page_content.encode(),
+                            JSONB_BINARY_VERSION + json.dumps(doc.metadata).encode(),
+                            Vector(embeddings[i]).to_binary(),
+                        )
                     )
                 )
+        buffer.write(PGCOPY_TRAILER)
+        buffer.seek(0)
+        # Binary COPY ships embeddings as raw float4 arrays instead of formatting and parsing decimal text.
         with self._get_cursor() as cur:
-            psycopg2.extras.execute_values(
-                cur, f"INSERT INTO {self.table_name} (id, text, meta, embedding) VALUES %s", values
+            cur.copy_expert(
+                f"COPY {self.table_name} (id, text, meta, embedding) FROM STDIN WITH (FORMAT binary)", buffer
             )
         return pks
 
@@ -170,7 +243,11 @@ class PGVector(BaseVector):
     @override
     def delete_by_metadata_field(self, key: str, value: str):
         with self._get_cursor() as cur:
-            cur.execute(f"DELETE FROM {self.table_name} WHERE meta->>%s = %s", (key, value))
+            if key == "document_id":
+                # Spelled out so the expression index on the document id applies.
+                cur.execute(f"DELETE FROM {self.table_name} WHERE meta->>'document_id' = %s", (value,))
+            else:
+                cur.execute(f"DELETE FROM {self.table_name} WHERE meta->>%s = %s", (key, value))
 
     @override
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
@@ -185,17 +262,40 @@ class PGVector(BaseVector):
             raise ValueError("top_k must be a positive integer")
         document_ids_filter = kwargs.get("document_ids_filter")
         where_clause = ""
+        filter_params: tuple[list[str], ...] = ()
         if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause = f" WHERE meta->>'document_id' in ({document_ids}) "
+            where_clause = " WHERE meta->>'document_id' = ANY(%s) "
+            filter_params = (list(document_ids_filter),)
+        query = json.dumps(query_vector)
 
         with self._get_cursor() as cur:
-            cur.execute(
-                f"SELECT meta, text, embedding <=> %s AS distance FROM {self.table_name}"
-                f" {where_clause}"
-                f" ORDER BY distance LIMIT {top_k}",
-                (json.dumps(query_vector),),
-            )
+            # HNSW applies filters after the scan, which can leave fewer than top_k rows; iterative scans
+            # keep walking the index until enough rows pass the filter.
+            iterative_scan = bool(document_ids_filter) and self._supports_iterative_scan(cur)
+            if iterative_scan:
+                cur.execute("SET LOCAL hnsw.iterative_scan = relaxed_order")
+            if self.index_type == "vector":
+                sql = (
+                    f"SELECT meta, text, embedding <=> %s AS distance FROM {self.table_name}"
+                    f" {where_clause}"
+                    f" ORDER BY distance LIMIT {top_k}"
+                )
+                if iterative_scan:
+                    # Relaxed order may return slightly out of order rows.
+                    sql = f"SELECT * FROM ({sql}) matches ORDER BY distance"
+                cur.execute(sql, (query, *filter_params))
+            else:
+                # Collect candidates through the quantized index, then re-rank them on the full vectors.
+                candidates = top_k * self.rerank_candidates_factor
+                cur.execute(f"SET LOCAL hnsw.ef_search = {min(max(candidates, 40), HNSW_MAX_EF_SEARCH)}")
+                cur.execute(
+                    f"SELECT meta, text, embedding <=> %s::vector AS distance FROM ("
+                    f"SELECT meta, text, embedding FROM {self.table_name}"
+                    f" {where_clause}"
+                    f" ORDER BY {self._quantized_distance(len(query_vector))} LIMIT {candidates}"
+                    f") candidates ORDER BY distance LIMIT {top_k}",
+                    (query, *filter_params, query),
+                )
             docs = []
             score_threshold = float(kwargs.get("score_threshold") or 0.0)
             for record in cur:
@@ -206,6 +306,21 @@ class PGVector(BaseVector):
                     docs.append(Document(page_content=text, metadata=metadata))
         return docs
 
+    def _supports_iterative_scan(self, cur) -> bool:
+        version = _pgvector_versions.get(self.server_key)
+        if version is None:
+            cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cur.fetchone()
+            version = tuple(int(part) for part in row[0].split(".")[:2]) if row else ()
+            _pgvector_versions[self.server_key] = version
+        # hnsw.iterative_scan was added in pgvector 0.8.0.
+        return version >= (0, 8)
+
+    def _quantized_distance(self, dimension: int) -> str:
+        if self.index_type == "halfvec":
+            return f"embedding::halfvec({dimension}) <=> %s::halfvec({dimension})"
+        return f"binary_quantize(embedding)::bit({dimension}) <~> binary_quantize(%s::vector)"
+
     @override
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         top_k = kwargs.get("top_k", 5)
@@ -214,9 +329,10 @@ class PGVector(BaseVector):
         with self._get_cursor() as cur:
             document_ids_filter = kwargs.get("document_ids_filter")
             where_clause = ""
+            filter_params: tuple[list[str], ...] = ()
             if document_ids_filter:
-                document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-                where_clause = f" AND meta->>'document_id' in ({document_ids}) "
+                where_clause = " AND meta->>'document_id' = ANY(%s) "
+                filter_params = (list(document_ids_filter),)
             if self.pg_bigm:
                 cur.execute("SET pg_bigm.similarity_limit TO 0.000001")
                 cur.execute(
@@ -227,9 +343,21 @@ class PGVector(BaseVector):
                     ORDER BY score DESC
                     LIMIT {top_k}""",
                     # f"'{query}'" is required in order to account for whitespace in query
-                    (f"'{query}'", f"'{query}'"),
+                    (f"'{query}'", f"'{query}'", *filter_params),
+                )
+            elif self.text_search_config:
+                cur.execute(
+                    f"""SELECT meta, text, ts_rank(text_tsv, query) AS score
+                    FROM {self.table_name}, plainto_tsquery(%s::regconfig, %s) query
+                    WHERE text_tsv @@ query
+                    {where_clause}
+                    ORDER BY score DESC
+                    LIMIT {top_k}""",
+                    # f"'{query}'" is required in order to account for whitespace in query
+                    (self.text_search_config, f"'{query}'", *filter_params),
                 )
             else:
+                # Collections created before the stored column existed tokenize every row at query time.
                 cur.execute(
                     f"""SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), plainto_tsquery(%s)) AS score
                     FROM {self.table_name}
@@ -238,7 +366,7 @@ class PGVector(BaseVector):
                     ORDER BY score DESC
                     LIMIT {top_k}""",
                     # f"'{query}'" is required in order to account for whitespace in query
-                    (f"'{query}'", f"'{query}'"),
+                    (f"'{query}'", f"'{query}'", *filter_params),
                 )
 
             docs = []
@@ -268,37 +396,186 @@ class PGVector(BaseVector):
                 if not cur.fetchone():
                     cur.execute("CREATE EXTENSION vector")
 
-                cur.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension))
-                # PG hnsw index only support 2000 dimension or less
-                # ref: https://github.com/pgvector/pgvector?tab=readme-ov-file#indexing
-                if dimension <= 2000:
-                    cur.execute(SQL_CREATE_INDEX.format(table_name=self.table_name, index_hash=self.index_hash))
+                text_tsv_column = ""
+                if self.text_search_config:
+                    text_tsv_column = SQL_TEXT_TSV_COLUMN.format(text_search_config=self.text_search_config)
+                cur.execute(
+                    SQL_CREATE_TABLE.format(
+                        table_name=self.table_name, dimension=dimension, text_tsv_column=text_tsv_column
+                    )
+                )
+                # Without an index (too many dimensions for the index type) queries scan the whole table.
+                if dimension <= HNSW_MAX_DIMENSIONS[self.index_type]:
+                    cur.execute(self._vector_index_sql(self.index_type, dimension, concurrently=False))
+                cur.execute(
+                    SQL_CREATE_INDEX_DOCUMENT_ID.format(
+                        concurrently="", table_name=self.table_name, index_hash=self.index_hash
+                    )
+                )
                 if self.pg_bigm:
                     cur.execute(SQL_CREATE_INDEX_PG_BIGM.format(table_name=self.table_name, index_hash=self.index_hash))
+                if self.text_search_config:
+                    cur.execute(
+                        SQL_CREATE_INDEX_TEXT_TSV.format(
+                            concurrently="", table_name=self.table_name, index_hash=self.index_hash
+                        )
+                    )
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
 
+    def _vector_index_sql(self, index_type: PGVectorIndexType, dimension: int, concurrently: bool) -> str:
+        return SQL_CREATE_VECTOR_INDEX[index_type].format(
+            concurrently="CONCURRENTLY" if concurrently else "",
+            table_name=self.table_name,
+            index_hash=self.index_hash,
+            dimension=dimension,
+        )
+
+    def _execute_autocommit(self, sql: str):
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(sql)
+        finally:
+            conn.autocommit = False
+            self.pool.putconn(conn)
+
+    def create_document_id_index(self):
+        """Build the document id index of a collection created without it, concurrently."""
+        self._execute_autocommit(
+            SQL_CREATE_INDEX_DOCUMENT_ID.format(
+                concurrently="CONCURRENTLY", table_name=self.table_name, index_hash=self.index_hash
+            )
+        )
+
+    def migrate_vector_index(self, index_type: PGVectorIndexType) -> bool:
+        """
+        Build the HNSW index of ``index_type`` on an existing collection, concurrently.
+
+        Callers switch the collection to the new index type (``index_type``) only after this returns.
+
+        :return: False if the collection's dimension is too large for ``index_type``.
+        """
+        with self._get_cursor() as cur:
+            # The type modifier of a vector column is its dimension.
+            cur.execute(
+                "SELECT atttypmod FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'embedding'",
+                (self.table_name,),
+            )
+            row = cur.fetchone()
+        if row is None or row[0] > HNSW_MAX_DIMENSIONS[index_type]:
+            return False
+        self._execute_autocommit(self._vector_index_sql(index_type, row[0], concurrently=True))
+        return True
+
+    def migrate_full_text_search(self, text_search_config: str, batch_size: int = 1000) -> int:
+        """
+        Add the stored ``text_tsv`` column and its GIN index to a collection created without them.
+
+        Rows are backfilled in primary key order with one commit per batch and the index is built
+        concurrently, so the collection stays readable and writable throughout. Callers switch the
+        collection to the column (``text_search_config``) only after this returns.
+
+        :return: the number of rows backfilled.
+        """
+        qualified_config = text_search_config if "." in text_search_config else f"pg_catalog.{text_search_config}"
+        with self._get_cursor() as cur:
+            # The table was created with an unquoted name, which regclass folds to lower case the same way.
+            cur.execute(
+                "SELECT attgenerated FROM pg_attribute"
+                " WHERE attrelid = %s::regclass AND attname = 'text_tsv' AND NOT attisdropped",
+                (self.table_name,),
+            )
+            column = cur.fetchone()
+            # A stored generated column is already filled by PostgreSQL; only the index may be missing.
+            needs_backfill = column is None or column[0] != "s"
+            if needs_backfill:
+                cur.execute(
+                    SQL_ADD_TEXT_TSV_COLUMN.format(
+                        table_name=self.table_name,
+                        index_hash=self.index_hash,
+                        qualified_text_search_config=qualified_config,
+                    )
+                )
+
+        backfilled = 0
+        last_id: str | None = None
+        while True:
+            with self._get_cursor() as cur:
+                if last_id is None:
+                    cur.execute(f"SELECT id FROM {self.table_name} ORDER BY id LIMIT %s", (batch_size,))
+                else:
+                    cur.execute(
+                        f"SELECT id FROM {self.table_name} WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size)
+                    )
+                ids = [str(row[0]) for row in cur.fetchall()]
+                if not ids:
+                    break
+                last_id = ids[-1]
+                if needs_backfill:
+                    cur.execute(
+                        f"UPDATE {self.table_name} SET text_tsv = to_tsvector(%s::regconfig, coalesce(text, ''))"
+                        " WHERE id = ANY(%s::uuid[]) AND text_tsv IS NULL",
+                        (qualified_config, ids),
+                    )
+                    backfilled += cur.rowcount
+
+        self._execute_autocommit(
+            SQL_CREATE_INDEX_TEXT_TSV.format(
+                concurrently="CONCURRENTLY", table_name=self.table_name, index_hash=self.index_hash
+            )
+        )
+        return backfilled
+
+
+def _copy_binary_row(fields: Sequence[bytes]) -> bytes:
+    """Encode one tuple of already binary-encoded, non-null fields in PostgreSQL's binary COPY format."""
+    return struct.pack("!h", len(fields)) + b"".join(struct.pack("!i", len(field)) + field for field in fields)
+
 
 class PGVectorFactory(AbstractVectorFactory):
     @override
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> PGVector:
+        text_search_config: str | None
+        index_type: PGVectorIndexType
         if dataset.index_struct_dict:
-            class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
+            vector_store = dataset.index_struct_dict["vector_store"]
+            class_prefix: str = vector_store["class_prefix"]
             collection_name = class_prefix
+            text_search_config = vector_store.get("text_search_config")
+            index_type = vector_store.get("index_type", "vector")
         else:
             dataset_id = dataset.id
             collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-            dataset.index_struct = json.dumps(self.gen_index_struct_dict(VectorType.PGVECTOR, collection_name))
+            index_struct_dict = self.gen_index_struct_dict(VectorType.PGVECTOR, collection_name)
+            # pg_bigm serves full-text search on its own, so the stored tsvector column is not needed.
+            text_search_config = None if dify_config.PGVECTOR_PG_BIGM else dify_config.PGVECTOR_TEXT_SEARCH_CONFIG
+            if text_search_config:
+                index_struct_dict["vector_store"]["text_search_config"] = text_search_config
+            index_type = dify_config.PGVECTOR_INDEX_TYPE
+            if index_type != "vector":
+                index_struct_dict["vector_store"]["index_type"] = index_type
+            dataset.index_struct = json.dumps(index_struct_dict)
 
         return PGVector(
-            collection_name=collection_name,
-            config=PGVectorConfig(
-                host=dify_config.PGVECTOR_HOST or "localhost",
-                port=dify_config.PGVECTOR_PORT,
-                user=dify_config.PGVECTOR_USER or "postgres",
-                password=dify_config.PGVECTOR_PASSWORD or "",
-                database=dify_config.PGVECTOR_DATABASE or "postgres",
-                min_connection=dify_config.PGVECTOR_MIN_CONNECTION,
-                max_connection=dify_config.PGVECTOR_MAX_CONNECTION,
-                pg_bigm=dify_config.PGVECTOR_PG_BIGM,
-            ),
+            collection_name=collection_name, config=self.pgvector_config(text_search_config, index_type=index_type)
+        )
+
+    @staticmethod
+    def pgvector_config(
+        text_search_config: str | None = None, index_type: PGVectorIndexType = "vector"
+    ) -> PGVectorConfig:
+        return PGVectorConfig(
+            host=dify_config.PGVECTOR_HOST or "localhost",
+            port=dify_config.PGVECTOR_PORT,
+            user=dify_config.PGVECTOR_USER or "postgres",
+            password=dify_config.PGVECTOR_PASSWORD or "",
+            database=dify_config.PGVECTOR_DATABASE or "postgres",
+            min_connection=dify_config.PGVECTOR_MIN_CONNECTION,
+            max_connection=dify_config.PGVECTOR_MAX_CONNECTION,
+            pg_bigm=dify_config.PGVECTOR_PG_BIGM,
+            text_search_config=text_search_config,
+            index_type=index_type,
+            rerank_candidates_factor=dify_config.PGVECTOR_RERANK_CANDIDATES_FACTOR,
         )
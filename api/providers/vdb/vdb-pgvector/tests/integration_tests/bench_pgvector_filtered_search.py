@@ -0,0 +1,167 @@
+"""
+Benchmark: PGVector filtered vector search — recall@k and latency across filter selectivities,
+with and without the document id index and HNSW iterative index scans (pgvector >= 0.8.0).
+
+Usage (from repo root, against the pgvector service of docker/docker-compose.middleware.yaml):
+    uv run --project api python api/providers/vdb/vdb-pgvector/tests/integration_tests/bench_pgvector_filtered_search.py
+"""
+
+import logging
+import statistics
+import time
+import uuid
+
+import dify_vdb_pgvector.pgvector as pgvector_module
+import numpy as np
+from dify_vdb_pgvector.pgvector import PGVector, PGVectorConfig
+
+from core.rag.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+CONFIG = PGVectorConfig(
+    host="localhost",
+    port=5433,
+    user="postgres",
+    password="difyai123456",
+    database="dify",
+    min_connection=1,
+    max_connection=2,
+)
+
+VEC_DIM = 256
+N_DOCUMENTS = 1000
+SEGMENTS_PER_DOCUMENT = 50
+TOP_K = 10
+N_QUERIES = 20
+INSERT_BATCH_SIZE = 1000
+# Fraction of the collection's documents the filter keeps.
+SELECTIVITIES = [0.001, 0.01, 0.1, 0.5]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _rand_vecs(rng, n):
+    vecs = rng.standard_normal((n, VEC_DIM)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _create_collection(vector, with_document_id_index):
+    with vector._get_cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute(
+            pgvector_module.SQL_CREATE_TABLE.format(table_name=vector.table_name, dimension=VEC_DIM, text_tsv_column="")
+        )
+        cur.execute(vector._vector_index_sql("vector", VEC_DIM, concurrently=False))
+        if with_document_id_index:
+            cur.execute(
+                pgvector_module.SQL_CREATE_INDEX_DOCUMENT_ID.format(
+                    concurrently="", table_name=vector.table_name, index_hash=vector.index_hash
+                )
+            )
+
+
+def _load(vector, rng):
+    document_ids = [str(uuid.uuid4()) for _ in range(N_DOCUMENTS)]
+    owners = np.repeat(np.arange(N_DOCUMENTS), SEGMENTS_PER_DOCUMENT)
+    embeddings = _rand_vecs(rng, len(owners))
+    for start in range(0, len(owners), INSERT_BATCH_SIZE):
+        documents = [
+            Document(
+                page_content=f"benchmark segment {i}",
+                metadata={"doc_id": str(uuid.uuid4()), "document_id": document_ids[owners[i]]},
+            )
+            for i in range(start, min(start + INSERT_BATCH_SIZE, len(owners)))
+        ]
+        vector.add_texts(documents, embeddings[start : start + INSERT_BATCH_SIZE].tolist())
+    return document_ids, owners, embeddings
+
+
+def _exact_top_k(query, allowed, embeddings):
+    distances = 1 - embeddings[allowed] @ query
+    return {int(i) for i in allowed[np.argsort(distances)[:TOP_K]]}
+
+
+def bench_filtered_search(vector, rng, document_ids, owners, embeddings, selectivity, iterative_scan):
+    """Return (recall@k, latencies) of filtered searches keeping ``selectivity`` of the documents."""
+    # Hiding the server version disables iterative scans without touching the query path.
+    pgvector_module._pgvector_versions.pop(vector.server_key, None)
+    if not iterative_scan:
+        pgvector_module._pgvector_versions[vector.server_key] = ()
+
+    texts = {f"benchmark segment {i}": i for i in range(len(owners))}
+    recalls = []
+    times = []
+    for _ in range(N_QUERIES):
+        kept = rng.choice(N_DOCUMENTS, size=max(1, int(N_DOCUMENTS * selectivity)), replace=False)
+        allowed = np.flatnonzero(np.isin(owners, kept))
+        query = _rand_vecs(rng, 1)[0]
+
+        t0 = time.perf_counter()
+        docs = vector.search_by_vector(query.tolist(), top_k=TOP_K, document_ids_filter=[document_ids[i] for i in kept])
+        times.append(time.perf_counter() - t0)
+
+        found = {texts[doc.page_content] for doc in docs}
+        expected = _exact_top_k(query, allowed, embeddings)
+        recalls.append(len(found & expected) / len(expected))
+    return statistics.mean(recalls), times
+
+
+def _fmt(times):
+    """Format list of durations as 'mean ± stdev'."""
+    m = statistics.mean(times) * 1000
+    s = statistics.stdev(times) * 1000 if len(times) > 1 else 0
+    return f"{m:.1f} ± {s:.1f} ms"
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    rng = np.random.default_rng(0)
+
+    logger.info("=" * 70)
+    logger.info("PGVector — Filtered Search Benchmark")
+    logger.info("  Endpoint : %s:%s", CONFIG.host, CONFIG.port)
+    logger.info("  Rows     : %s (%s documents)", N_DOCUMENTS * SEGMENTS_PER_DOCUMENT, N_DOCUMENTS)
+    logger.info("  Vec dim  : %s, top-%s, %s queries per cell", VEC_DIM, TOP_K, N_QUERIES)
+    logger.info("=" * 70)
+
+    for with_document_id_index in (False, True):
+        vector = PGVector(f"bench_filtered_{uuid.uuid4().hex[:8]}", CONFIG)
+        try:
+            _create_collection(vector, with_document_id_index)
+            document_ids, owners, embeddings = _load(vector, rng)
+            with vector._get_cursor() as cur:
+                cur.execute(f"ANALYZE {vector.table_name}")
+
+            logger.info("\n[document id index: %s]", "yes" if with_document_id_index else "no")
+            logger.info("  %-12s %-10s %-10s %s", "selectivity", "iterative", "recall@k", "latency")
+            for selectivity in SELECTIVITIES:
+                for iterative_scan in (False, True):
+                    recall, times = bench_filtered_search(
+                        vector, rng, document_ids, owners, embeddings, selectivity, iterative_scan
+                    )
+                    logger.info(
+                        "  %-12s %-10s %-10.3f %s",
+                        f"{selectivity:.1%}",
+                        "yes" if iterative_scan else "no",
+                        recall,
+                        _fmt(times),
+                    )
+        finally:
+            vector.delete()
+            vector.pool.closeall()
+
+    logger.info("\n%s", "=" * 70)
+    logger.info("Benchmark complete.")
+    logger.info("=" * 70)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main()
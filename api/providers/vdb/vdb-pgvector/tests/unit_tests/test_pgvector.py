@@ -1,3 +1,6 @@
+import json
+import struct
+import uuid
 from contextlib import contextmanager
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
@@ -336,30 +339,50 @@ def test_create_delegates_collection_creation_and_insert():
     vector.add_texts.assert_called_once_with(docs, [[0.1, 0.2]])
 
 
-def test_add_texts_uses_execute_values_and_returns_ids(monkeypatch: pytest.MonkeyPatch):
+def test_add_texts_copies_binary_rows_and_returns_ids(monkeypatch: pytest.MonkeyPatch):
     vector = PGVector.__new__(PGVector)
     vector.table_name = "embedding_collection_1"
 
     cursor = MagicMock()
+    copied: list[bytes] = []
+    cursor.copy_expert.side_effect = lambda _sql, buffer: copied.append(buffer.read())
 
     @contextmanager
     def _cursor_ctx():
         yield cursor
 
     vector._get_cursor = _cursor_ctx
-    monkeypatch.setattr(pgvector_module.uuid, "uuid4", lambda: "generated-uuid")
-    execute_values = MagicMock()
-    monkeypatch.setattr(pgvector_module.psycopg2.extras, "execute_values", execute_values)
+    generated_id = "00000000-0000-0000-0000-0000000000ff"
+    monkeypatch.setattr(pgvector_module.uuid, "uuid4", lambda: generated_id)
 
+    doc_id = "00000000-0000-0000-0000-000000000001"
     docs = [
-        Document(page_content="a", metadata={"doc_id": "doc-a"}),
+        Document(page_content="a", metadata={"doc_id": doc_id}),
         Document(page_content="b", metadata={"document_id": "doc-b"}),
         SimpleNamespace(page_content="c", metadata=None),
     ]
-    ids = vector.add_texts(docs, [[0.1], [0.2], [0.3]])
-
-    assert ids == ["doc-a", "generated-uuid"]
-    execute_values.assert_called_once()
+    ids = vector.add_texts(docs, [[0.5], [0.25, -1.0], [0.3]])
+
+    assert ids == [doc_id, generated_id]
+    assert "FROM STDIN WITH (FORMAT binary)" in cursor.copy_expert.call_args.args[0]
+    stream = copied[0]
+    assert stream.startswith(b"PGCOPY\n\xff\r\n\x00")
+    assert stream.endswith(struct.pack("!h", -1))
+    meta = json.dumps({"doc_id": doc_id}).encode()
+    first_row = (
+        struct.pack("!h", 4)
+        + struct.pack("!i", 16)
+        + uuid.UUID(doc_id).bytes
+        + struct.pack("!i", 1)
+        + b"a"
+        + struct.pack("!i", len(meta) + 1)
+        + b"\x01"
+        + meta
+        + struct.pack("!i", 8)
+        + struct.pack(">HHf", 1, 0, 0.5)
+    )
+    assert stream[19:].startswith(first_row)
+    assert struct.pack(">HHff", 2, 0, 0.25, -1.0) in stream
 
 
 def test_text_get_and_delete_methods():
@@ -381,9 +404,12 @@ def test_text_get_and_delete_methods():
     assert docs[0].page_content == "text-1"
 
     vector.delete_by_metadata_field("document_id", "doc-1")
+    vector.delete_by_metadata_field("doc_hash", "hash-1")
     vector.delete()
-    executed_sql = [call.args[0] for call in cursor.execute.call_args_list]
-    assert any("meta->>%s = %s" in sql for sql in executed_sql)
+    executed = [call.args for call in cursor.execute.call_args_list]
+    executed_sql = [args[0] for args in executed]
+    assert ("DELETE FROM embedding_collection_1 WHERE meta->>'document_id' = %s", ("doc-1",)) in executed
+    assert ("DELETE FROM embedding_collection_1 WHERE meta->>%s = %s", ("doc_hash", "hash-1")) in executed
     assert any("DROP TABLE IF EXISTS embedding_collection_1" in sql for sql in executed_sql)
 
 
@@ -412,10 +438,14 @@ def test_delete_by_ids_handles_empty_undefined_table_and_generic_exception(monke
         vector.delete_by_ids(["doc-1"])
 
 
-def test_search_by_vector_supports_filter_and_threshold():
+def test_search_by_vector_supports_filter_and_threshold(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(pgvector_module, "_pgvector_versions", {})
     vector = PGVector.__new__(PGVector)
     vector.table_name = "embedding_collection_1"
+    vector.index_type = "vector"
+    vector.server_key = ("localhost", 5432, "dify")
     cursor = MagicMock()
+    cursor.fetchone.return_value = ("0.7.4",)
     cursor.__iter__.return_value = iter([({"doc_id": "1"}, "text-1", 0.1), ({"doc_id": "2"}, "text-2", 0.8)])
 
     @contextmanager
@@ -430,8 +460,39 @@ def test_search_by_vector_supports_filter_and_threshold():
     docs = vector.search_by_vector([0.1, 0.2], top_k=2, score_threshold=0.5, document_ids_filter=["d-1"])
     assert len(docs) == 1
     assert docs[0].metadata["score"] == pytest.approx(0.9)
-    sql = cursor.execute.call_args.args[0]
-    assert "meta->>'document_id' in ('d-1')" in sql
+    sql, params = cursor.execute.call_args.args
+    assert "WHERE meta->>'document_id' = ANY(%s)" in sql
+    assert params == ("[0.1, 0.2]", ["d-1"])
+    assert not any("iterative_scan" in call.args[0] for call in cursor.execute.call_args_list)
+
+
+def test_filtered_search_by_vector_uses_iterative_index_scans(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(pgvector_module, "_pgvector_versions", {})
+    vector = PGVector.__new__(PGVector)
+    vector.table_name = "embedding_collection_1"
+    vector.index_type = "vector"
+    vector.server_key = ("localhost", 5432, "dify")
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ("0.8.0",)
+
+    @contextmanager
+    def _cursor_ctx():
+        yield cursor
+
+    vector._get_cursor = _cursor_ctx
+
+    vector.search_by_vector([0.1, 0.2], top_k=2, document_ids_filter=["d-1", "d-2"])
+    vector.search_by_vector([0.1, 0.2], top_k=2, document_ids_filter=["d-1"])
+    vector.search_by_vector([0.1, 0.2], top_k=2)
+
+    executed_sql = [call.args[0] for call in cursor.execute.call_args_list]
+    assert executed_sql.count("SELECT extversion FROM pg_extension WHERE extname = 'vector'") == 1
+    assert executed_sql.count("SET LOCAL hnsw.iterative_scan = relaxed_order") == 2
+    filtered_sql = executed_sql[2]
+    assert filtered_sql.startswith("SELECT * FROM (SELECT meta, text, embedding <=> %s AS distance")
+    assert filtered_sql.endswith(") matches ORDER BY distance")
+    assert "iterative_scan" not in executed_sql[-2]
+    assert "matches" not in executed_sql[-1]
 
 
 def test_search_by_full_text_branches_for_bigm_and_standard():
@@ -450,11 +511,21 @@ def test_search_by_full_text_branches_for_bigm_and_standard():
         vector.search_by_full_text("hello", top_k=0)
 
     vector.pg_bigm = False
+    vector.text_search_config = None
     docs = vector.search_by_full_text("hello world", top_k=2, document_ids_filter=["d-1"])
     assert len(docs) == 1
     assert docs[0].metadata["score"] == pytest.approx(0.7)
     standard_sql = cursor.execute.call_args.args[0]
     assert "to_tsvector(text) @@ plainto_tsquery(%s)" in standard_sql
+    assert "AND meta->>'document_id' = ANY(%s)" in standard_sql
+
+    cursor.__iter__.return_value = iter([({"doc_id": "1"}, "text-1", 0.7)])
+    vector.text_search_config = "simple"
+    vector.search_by_full_text("hello world", top_k=2, document_ids_filter=["d-1"])
+    stored_sql, stored_params = cursor.execute.call_args.args
+    assert "WHERE text_tsv @@ query" in stored_sql
+    assert "to_tsvector" not in stored_sql
+    assert stored_params == ("simple", "'hello world'", ["d-1"])
 
     cursor.execute.reset_mock()
     cursor.__iter__.return_value = iter([({"doc_id": "2"}, "text-2", 0.6)])
@@ -492,3 +563,180 @@ def test_pgvector_factory_initializes_expected_collection_name(monkeypatch: pyte
     assert vector_cls.call_args_list[0].kwargs["collection_name"] == "EXISTING_COLLECTION"
     assert vector_cls.call_args_list[1].kwargs["collection_name"] == "AUTO_COLLECTION"
     assert dataset_without_index.index_struct is not None
+    assert vector_cls.call_args_list[0].kwargs["config"].text_search_config is None
+    assert vector_cls.call_args_list[1].kwargs["config"].text_search_config == "english"
+    assert json.loads(dataset_without_index.index_struct)["vector_store"]["text_search_config"] == "english"
+
+
+@pytest.mark.parametrize(
+    ("index_type", "candidate_order"),
+    [
+        ("halfvec", "ORDER BY embedding::halfvec(2) <=> %s::halfvec(2) LIMIT 12"),
+        ("binary", "ORDER BY binary_quantize(embedding)::bit(2) <~> binary_quantize(%s::vector) LIMIT 12"),
+    ],
+)
+def test_search_by_vector_reranks_quantized_candidates(index_type: str, candidate_order: str):
+    vector = PGVector.__new__(PGVector)
+    vector.table_name = "embedding_collection_1"
+    vector.index_type = index_type
+    vector.rerank_candidates_factor = 4
+    cursor = MagicMock()
+    cursor.__iter__.return_value = iter([({"doc_id": "1"}, "text-1", 0.1)])
+
+    @contextmanager
+    def _cursor_ctx():
+        yield cursor
+
+    vector._get_cursor = _cursor_ctx
+
+    docs = vector.search_by_vector([0.1, 0.2], top_k=3)
+
+    assert docs[0].metadata["score"] == pytest.approx(0.9)
+    assert cursor.execute.call_args_list[0].args[0] == "SET LOCAL hnsw.ef_search = 40"
+    sql, params = cursor.execute.call_args.args
+    assert sql.startswith("SELECT meta, text, embedding <=> %s::vector AS distance FROM (")
+    assert candidate_order in sql
+    assert sql.endswith(") candidates ORDER BY distance LIMIT 3")
+    assert params == ("[0.1, 0.2]", "[0.1, 0.2]")
+
+
+@patch("dify_vdb_pgvector.pgvector.psycopg2.pool.SimpleConnectionPool")
+@patch("dify_vdb_pgvector.pgvector.redis_client")
+def test_create_collection_indexes_large_dimensions_with_halfvec(mock_redis, mock_pool_class):
+    mock_redis.get.return_value = None
+    cursor = mock_pool_class.return_value.getconn.return_value.cursor.return_value
+    cursor.fetchone.return_value = [1]
+    config = PGVectorConfig(
+        host="localhost",
+        port=5432,
+        user="test_user",
+        password="test_password",
+        database="test_db",
+        min_connection=1,
+        max_connection=5,
+        index_type="halfvec",
+    )
+
+    PGVector("test_collection", config)._create_collection(3072)
+
+    executed_sql = [call.args[0] for call in cursor.execute.call_args_list]
+    assert any("USING hnsw ((embedding::halfvec(3072)) halfvec_cosine_ops)" in sql for sql in executed_sql)
+    assert not any("vector_cosine_ops" in sql and "halfvec" not in sql for sql in executed_sql)
+
+
+def test_pgvector_factory_records_index_type_of_new_datasets(monkeypatch: pytest.MonkeyPatch):
+    factory = pgvector_module.PGVectorFactory()
+    dataset = SimpleNamespace(id="dataset-1", index_struct_dict=None, index_struct=None)
+    monkeypatch.setattr(pgvector_module.Dataset, "gen_collection_name_by_id", lambda _id: "AUTO_COLLECTION")
+    monkeypatch.setattr(pgvector_module.dify_config, "PGVECTOR_PASSWORD", "secret")
+    monkeypatch.setattr(pgvector_module.dify_config, "PGVECTOR_INDEX_TYPE", "binary")
+    monkeypatch.setattr(pgvector_module.dify_config, "PGVECTOR_RERANK_CANDIDATES_FACTOR", 10)
+
+    with patch.object(pgvector_module, "PGVector") as vector_cls:
+        factory.init_vector(dataset, attributes=[], embeddings=MagicMock())
+
+    config = vector_cls.call_args.kwargs["config"]
+    assert config.index_type == "binary"
+    assert config.rerank_candidates_factor == 10
+    assert json.loads(dataset.index_struct)["vector_store"]["index_type"] == "binary"
+
+
+def test_migrate_vector_index_builds_quantized_index_concurrently():
+    vector = PGVector.__new__(PGVector)
+    vector.table_name = "embedding_collection_1"
+    vector.index_hash = "abcd1234"
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [(3072,), (3072,)]
+
+    @contextmanager
+    def _cursor_ctx():
+        yield cursor
+
+    vector._get_cursor = _cursor_ctx
+    conn = MagicMock()
+    vector.pool = MagicMock()
+    vector.pool.getconn.return_value = conn
+
+    assert vector.migrate_vector_index("vector") is False
+    conn.cursor.assert_not_called()
+    assert vector.migrate_vector_index("binary") is True
+    index_sql = conn.cursor.return_value.__enter__.return_value.execute.call_args.args[0]
+    assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS embedding_bit_hamming_idx_abcd1234" in index_sql
+    assert "binary_quantize(embedding)::bit(3072)" in index_sql
+    vector.pool.putconn.assert_called_once_with(conn)
+
+
+@patch("dify_vdb_pgvector.pgvector.psycopg2.pool.SimpleConnectionPool")
+@patch("dify_vdb_pgvector.pgvector.redis_client")
+def test_create_collection_adds_stored_tsvector_column_and_gin_index(mock_redis, mock_pool_class):
+    mock_redis.get.return_value = None
+    cursor = mock_pool_class.return_value.getconn.return_value.cursor.return_value
+    cursor.fetchone.return_value = [1]
+    config = PGVectorConfig(
+        host="localhost",
+        port=5432,
+        user="test_user",
+        password="test_password",
+        database="test_db",
+        min_connection=1,
+        max_connection=5,
+        text_search_config="simple",
+    )
+
+    PGVector("test_collection", config)._create_collection(1536)
+
+    executed_sql = [call.args[0] for call in cursor.execute.call_args_list]
+    create_table_sql = next(sql for sql in executed_sql if "CREATE TABLE" in sql)
+    assert "text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple'::regconfig" in create_table_sql
+    assert any("USING gin (text_tsv)" in sql and "CONCURRENTLY" not in sql for sql in executed_sql)
+    assert any("USING btree ((meta->>'document_id'))" in sql for sql in executed_sql)
+
+
+def test_text_search_config_is_validated():
+    with pytest.raises(ValueError):
+        PGVectorConfig(
+            host="localhost",
+            port=5432,
+            user="test_user",
+            password="test_password",
+            database="test_db",
+            min_connection=1,
+            max_connection=5,
+            text_search_config="english'); DROP TABLE x; --",
+        )
+
+
+def test_migrate_full_text_search_backfills_in_batches_and_indexes_concurrently():
+    vector = PGVector.__new__(PGVector)
+    vector.table_name = "embedding_collection_1"
+    vector.index_hash = "abcd1234"
+    cursor = MagicMock()
+    cursor.fetchone.return_value = None
+    cursor.fetchall.side_effect = [[("id-1",), ("id-2",)], [("id-3",)], []]
+    cursor.rowcount = 2
+
+    @contextmanager
+    def _cursor_ctx():
+        yield cursor
+
+    vector._get_cursor = _cursor_ctx
+    conn = MagicMock()
+    vector.pool = MagicMock()
+    vector.pool.getconn.return_value = conn
+
+    backfilled = vector.migrate_full_text_search("english", batch_size=2)
+
+    executed = [call.args for call in cursor.execute.call_args_list]
+    assert "attrelid = %s::regclass" in executed[0][0]
+    assert executed[0][1] == ("embedding_collection_1",)
+    assert "tsvector_update_trigger(text_tsv, 'pg_catalog.english', text)" in executed[1][0]
+    updates = [args for args in executed if args[0].startswith("UPDATE")]
+    assert [params for _, params in updates] == [
+        ("pg_catalog.english", ["id-1", "id-2"]),
+        ("pg_catalog.english", ["id-3"]),
+    ]
+    assert ("SELECT id FROM embedding_collection_1 WHERE id > %s ORDER BY id LIMIT %s", ("id-2", 2)) in executed
+    assert backfilled == 4
+    index_sql = conn.cursor.return_value.__enter__.return_value.execute.call_args.args[0]
+    assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS text_tsv_idx_abcd1234" in index_sql
+    vector.pool.putconn.assert_called_once_with(conn)
@@ -2,39 +2,37 @@ import datetime
 import time
 
 import click
-from sqlalchemy import select, text
-from sqlalchemy.exc import SQLAlchemyError
 
 import app
 from configs import dify_config
+from core.rag.embedding.embedding_cache import (
+    embedding_cache_stats,
+    estimate_embedding_cache_rows,
+    evict_embedding_cache,
+)
 from extensions.ext_database import db
-from models.dataset import Embedding
+from libs.datetime_utils import naive_utc_now
 
 
 @app.celery.task(queue="dataset")
 def clean_embedding_cache_task():
     click.echo(click.style("Start clean embedding cache.", fg="green"))
     clean_days = int(dify_config.PLAN_SANDBOX_CLEAN_DAY_SETTING)
+    policy = dify_config.EMBEDDING_CACHE_EVICTION_POLICY
     start_at = time.perf_counter()
-    thirty_days_ago = datetime.datetime.now() - datetime.timedelta(days=clean_days)
-    while True:
-        try:
-            embedding_ids = db.session.scalars(
-                select(Embedding.id)
-                .where(Embedding.created_at < thirty_days_ago)
-                .order_by(Embedding.created_at.desc())
-                .limit(100)
-            ).all()
-        except SQLAlchemyError:
-            raise
-        if embedding_ids:
-            for embedding_id in embedding_ids:
-                db.session.execute(
-                    text("DELETE FROM embeddings WHERE id = :embedding_id"), {"embedding_id": embedding_id}
-                )
+    cutoff = naive_utc_now() - datetime.timedelta(days=clean_days)
+
+    evicted = evict_embedding_cache(
+        db.session, policy=policy, cutoff=cutoff, batch_size=dify_config.EMBEDDING_CACHE_EVICTION_BATCH_SIZE
+    )
+    table_rows = estimate_embedding_cache_rows(db.session)
+    embedding_cache_stats.record_eviction(evicted=evicted, table_rows=table_rows, policy=policy)
 
-            db.session.commit()
-        else:
-            break
     end_at = time.perf_counter()
-    click.echo(click.style(f"Cleaned embedding cache from db success latency: {end_at - start_at}", fg="green"))
+    click.echo(
+        click.style(
+            f"Cleaned {evicted} embedding cache rows ({policy}) from db success latency: {end_at - start_at}, "
+            f"remaining rows: {table_rows if table_rows is not None else 'unknown'}",
+            fg="green",
+        )
+    )
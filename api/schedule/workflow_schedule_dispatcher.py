@@ -0,0 +1,195 @@
+"""
+Timer-driven dispatcher for workflow schedule plans.
+
+Instead of scanning ``workflow_schedule_plans`` on every beat tick, the dispatcher sleeps until the
+earliest fire time in ``ScheduleTimerIndex`` and then dispatches exactly the plans that are due.
+Plans enter the index when ``ScheduleService`` creates or changes them and whenever the poller or
+the dispatcher advances them; a periodic reconciliation rebuilds the index from the database.
+
+Every beat replica starts a dispatcher thread, but only the holder of a Redis leader lock
+dispatches. Due plans are re-checked and advanced under ``FOR UPDATE SKIP LOCKED`` exactly like
+``poll_workflow_schedules``, which keeps running as the fallback, so a plan occurrence is dispatched
+once even when the dispatcher and the poller race.
+"""
+
+import logging
+import threading
+import time
+
+from celery import current_app
+from redis.exceptions import LockError
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from configs import dify_config
+from dify_app import DifyApp
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.trigger import WorkflowSchedulePlan
+from schedule.workflow_schedule_task import _enabled_schedule_plans, _fetch_due_schedules, _process_schedules
+from services.trigger.schedule_timer_index import ScheduleTimerIndex
+
+logger = logging.getLogger(__name__)
+
+_LEADER_LOCK_KEY = "workflow_schedule:dispatcher_leader"
+# Lower bound of a wait, so plans locked by a concurrent poll are not re-checked in a busy loop.
+_MIN_WAIT_SECONDS = 0.05
+_RECONCILE_BATCH_SIZE = 1000
+
+
+class WorkflowScheduleDispatcher:
+    def __init__(self) -> None:
+        self._session_factory = sessionmaker(bind=db.engine, expire_on_commit=False)
+        # Not thread local: the lock is created here and held by the dispatcher thread.
+        self._leader_lock = redis_client.lock(
+            _LEADER_LOCK_KEY,
+            timeout=dify_config.WORKFLOW_SCHEDULE_DISPATCHER_LEADER_TTL,
+            thread_local=False,
+        )
+        self._is_leader = False
+        self._reconciled_at: float | None = None
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Dispatch due plans until ``stop`` is called."""
+        while not self._stop_event.is_set():
+            try:
+                wait = self.tick()
+            except Exception:
+                logger.exception("Workflow schedule dispatcher iteration failed")
+                wait = dify_config.WORKFLOW_SCHEDULE_DISPATCHER_MAX_WAIT
+            self._stop_event.wait(wait)
+        self._release_leadership()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def tick(self) -> float:
+        """Run one iteration and return the seconds to wait before the next one."""
+        max_wait = dify_config.WORKFLOW_SCHEDULE_DISPATCHER_MAX_WAIT
+        if not self._hold_leadership():
+            return max_wait
+
+        if (
+            self._reconciled_at is None
+            or time.monotonic() - self._reconciled_at >= dify_config.WORKFLOW_SCHEDULE_DISPATCHER_RECONCILE_INTERVAL
+        ):
+            self.reconcile()
+
+        self.dispatch_due()
+
+        next_fire_time = ScheduleTimerIndex.next_fire_time()
+        if next_fire_time is None:
+            return max_wait
+        return min(max(next_fire_time - time.time(), _MIN_WAIT_SECONDS), max_wait)
+
+    def dispatch_due(self) -> int:
+        """Dispatch every indexed plan whose fire time has passed and return how many were dispatched."""
+        batch_size = dify_config.WORKFLOW_SCHEDULE_POLLER_BATCH_SIZE
+        total_dispatched = 0
+        while True:
+            due_ids = ScheduleTimerIndex.due_ids(time.time(), batch_size)
+            if not due_ids:
+                break
+
+            with self._session_factory() as session:
+                due_schedules = _fetch_due_schedules(session, due_ids)
+                with current_app.producer_or_acquire() as producer:  # type: ignore
+                    dispatched_count = _process_schedules(session, due_schedules, producer)
+            total_dispatched += dispatched_count
+
+            # The rest were deleted, disabled, advanced by the poller or are locked by it right now.
+            dispatched_ids = {schedule.id for schedule in due_schedules}
+            self._refresh([schedule_id for schedule_id in due_ids if schedule_id not in dispatched_ids])
+
+            if 0 < dify_config.WORKFLOW_SCHEDULE_MAX_DISPATCH_PER_TICK <= total_dispatched:
+                logger.warning(
+                    "Circuit breaker activated: reached dispatch limit (%d), will continue next tick",
+                    dify_config.WORKFLOW_SCHEDULE_MAX_DISPATCH_PER_TICK,
+                )
+                break
+            if dispatched_count == 0 or len(due_ids) < batch_size:
+                break
+
+        if total_dispatched > 0:
+            logger.info("Dispatcher processed: %d workflow schedule(s) dispatched", total_dispatched)
+        return total_dispatched
+
+    def _refresh(self, schedule_ids: list[str]) -> None:
+        """Re-read the fire time of ``schedule_ids``, dropping plans that no longer run."""
+        if not schedule_ids:
+            return
+        with self._session_factory() as session:
+            rows = session.execute(
+                _enabled_schedule_plans(
+                    select(WorkflowSchedulePlan.id, WorkflowSchedulePlan.next_run_at).where(
+                        WorkflowSchedulePlan.id.in_(schedule_ids)
+                    )
+                )
+            ).all()
+        next_run_ats = {row.id: row.next_run_at for row in rows}
+        ScheduleTimerIndex.add(next_run_ats)
+        ScheduleTimerIndex.remove(set(schedule_ids) - next_run_ats.keys())
+
+    def reconcile(self) -> None:
+        """Rebuild the index from the database: index every enabled plan and drop all others."""
+        indexed_ids = ScheduleTimerIndex.all_ids()
+        seen_ids: set[str] = set()
+        last_id: str | None = None
+        with self._session_factory() as session:
+            while True:
+                stmt = _enabled_schedule_plans(
+                    select(WorkflowSchedulePlan.id, WorkflowSchedulePlan.next_run_at)
+                    .order_by(WorkflowSchedulePlan.id)
+                    .limit(_RECONCILE_BATCH_SIZE)
+                )
+                if last_id is not None:
+                    stmt = stmt.where(WorkflowSchedulePlan.id > last_id)
+                rows = session.execute(stmt).all()
+                if not rows:
+                    break
+                ScheduleTimerIndex.add({row.id: row.next_run_at for row in rows})
+                seen_ids.update(row.id for row in rows)
+                last_id = rows[-1].id
+
+        ScheduleTimerIndex.remove(indexed_ids - seen_ids)
+        self._reconciled_at = time.monotonic()
+        logger.info("Workflow schedule timer index reconciled: %d plan(s)", len(seen_ids))
+
+    def _hold_leadership(self) -> bool:
+        if self._is_leader:
+            try:
+                self._leader_lock.reacquire()
+                return True
+            except LockError:
+                logger.warning("Workflow schedule dispatcher lost leadership")
+                self._is_leader = False
+
+        self._is_leader = bool(self._leader_lock.acquire(blocking=False))
+        if self._is_leader:
+            logger.info("Workflow schedule dispatcher acquired leadership")
+            # Changes made while another replica led may have missed this replica's view.
+            self._reconciled_at = None
+        return self._is_leader
+
+    def _release_leadership(self) -> None:
+        if not self._is_leader:
+            return
+        self._is_leader = False
+        try:
+            self._leader_lock.release()
+        except LockError:
+            logger.warning("Workflow schedule dispatcher leadership expired before release")
+
+
+def start_workflow_schedule_dispatcher(app: DifyApp) -> WorkflowScheduleDispatcher:
+    """Start a dispatcher on a daemon thread inside ``app``'s context."""
+    with app.app_context():
+        dispatcher = WorkflowScheduleDispatcher()
+
+    def run() -> None:
+        with app.app_context():
+            dispatcher.run()
+
+    threading.Thread(target=run, name="WorkflowScheduleDispatcher", daemon=True).start()
+    return dispatcher
@@ -1,7 +1,8 @@
 import logging
+from collections.abc import Sequence
 
 from celery import current_app, group, shared_task
-from sqlalchemy import and_, select
+from sqlalchemy import Select, and_, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from configs import dify_config
@@ -9,6 +10,7 @@ from extensions.ext_database import db
 from libs.datetime_utils import naive_utc_now
 from libs.schedule_utils import calculate_next_run_at
 from models.trigger import AppTrigger, AppTriggerStatus, AppTriggerType, WorkflowSchedulePlan
+from services.trigger.schedule_timer_index import ScheduleTimerIndex
 from tasks.workflow_schedule_tasks import run_schedule_trigger
 
 logger = logging.getLogger(__name__)
@@ -52,33 +54,22 @@ def poll_workflow_schedules() -> None:
             logger.info("Total processed: %d workflow schedule(s) dispatched", total_dispatched)
 
 
-def _fetch_due_schedules(session: Session) -> list[WorkflowSchedulePlan]:
+def _fetch_due_schedules(session: Session, schedule_ids: Sequence[str] | None = None) -> list[WorkflowSchedulePlan]:
     """
     Fetch a batch of due schedules, sorted by most overdue first.
 
     Returns up to WORKFLOW_SCHEDULE_POLLER_BATCH_SIZE schedules per call.
     Used in a loop to progressively process all due schedules.
+    When schedule_ids is given, only those schedules are considered.
     """
     now = naive_utc_now()
 
+    stmt = _enabled_schedule_plans(select(WorkflowSchedulePlan)).where(WorkflowSchedulePlan.next_run_at <= now)
+    if schedule_ids is not None:
+        stmt = stmt.where(WorkflowSchedulePlan.id.in_(schedule_ids))
+
     due_schedules = session.scalars(
-        (
-            select(WorkflowSchedulePlan)
-            .join(
-                AppTrigger,
-                and_(
-                    AppTrigger.app_id == WorkflowSchedulePlan.app_id,
-                    AppTrigger.node_id == WorkflowSchedulePlan.node_id,
-                    AppTrigger.trigger_type == AppTriggerType.TRIGGER_SCHEDULE,
-                ),
-            )
-            .where(
-                WorkflowSchedulePlan.next_run_at <= now,
-                WorkflowSchedulePlan.next_run_at.isnot(None),
-                AppTrigger.status == AppTriggerStatus.ENABLED,
-            )
-        )
-        .order_by(WorkflowSchedulePlan.next_run_at.asc())
+        stmt.order_by(WorkflowSchedulePlan.next_run_at.asc())
         .with_for_update(skip_locked=True)
         .limit(dify_config.WORKFLOW_SCHEDULE_POLLER_BATCH_SIZE)
     )
@@ -86,6 +77,21 @@ def _fetch_due_schedules(session: Session) -> list[WorkflowSchedulePlan]:
     return list(due_schedules)
 
 
+def _enabled_schedule_plans[T: tuple](stmt: Select[T]) -> Select[T]:
+    """Restrict ``stmt`` to schedule plans with a next run time whose schedule trigger is enabled."""
+    return stmt.join(
+        AppTrigger,
+        and_(
+            AppTrigger.app_id == WorkflowSchedulePlan.app_id,
+            AppTrigger.node_id == WorkflowSchedulePlan.node_id,
+            AppTrigger.trigger_type == AppTriggerType.TRIGGER_SCHEDULE,
+        ),
+    ).where(
+        WorkflowSchedulePlan.next_run_at.isnot(None),
+        AppTrigger.status == AppTriggerStatus.ENABLED,
+    )
+
+
 def _process_schedules(session: Session, schedules: list[WorkflowSchedulePlan], producer=None) -> int:
     """Process schedules: check quota, update next run time and dispatch to Celery in parallel."""
     if not schedules:
@@ -108,5 +114,6 @@ def _process_schedules(session: Session, schedules: list[WorkflowSchedulePlan],
         logger.debug("Dispatched %d tasks in parallel", len(tasks_to_dispatch))
 
     session.commit()
+    ScheduleTimerIndex.sync({schedule.id: schedule.next_run_at for schedule in schedules})
 
     return len(tasks_to_dispatch)
@@ -32,6 +32,8 @@ from tasks.async_workflow_tasks import (
     execute_workflow_sandbox,
     execute_workflow_team,
 )
+from tasks.workflow_cfs_scheduler.cfs_scheduler import AsyncWorkflowCFSPlanScheduler
+from tasks.workflow_cfs_scheduler.entities import resolve_async_workflow_queue
 
 logger = logging.getLogger(__name__)
 
@@ -165,6 +167,7 @@ class AsyncWorkflowService:
 
         # 9. Dispatch to appropriate queue
         task_data_dict = task_data.model_dump(mode="json")
+        AsyncWorkflowCFSPlanScheduler.record_queued(resolve_async_workflow_queue(queue_name), trigger_data.tenant_id)
 
         try:
             task: AsyncResult[Any] | None = None
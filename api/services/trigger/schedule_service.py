@@ -19,6 +19,7 @@ from models.account import Account, TenantAccountJoin
 from models.trigger import WorkflowSchedulePlan
 from models.workflow import Workflow
 from services.errors.account import AccountNotFoundError
+from services.trigger.schedule_timer_index import ScheduleTimerIndex
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,7 @@ class ScheduleService:
 
         session.add(schedule)
         session.flush()
+        ScheduleTimerIndex.sync_after_commit(session, {schedule.id: schedule.next_run_at})
 
         return schedule
 
@@ -100,6 +102,8 @@ class ScheduleService:
             )
 
         session.flush()
+        if time_fields_updated:
+            ScheduleTimerIndex.sync_after_commit(session, {schedule.id: schedule.next_run_at})
         return schedule
 
     @staticmethod
@@ -117,6 +121,7 @@ class ScheduleService:
 
         session.delete(schedule)
         session.flush()
+        ScheduleTimerIndex.sync_after_commit(session, {schedule_id: None})
 
     @staticmethod
     def get_tenant_owner(tenant_id: str, *, session: Session) -> Account:
@@ -164,6 +169,7 @@ class ScheduleService:
 
         schedule.next_run_at = next_run_at
         session.flush()
+        ScheduleTimerIndex.sync_after_commit(session, {schedule.id: next_run_at})
         return next_run_at
 
     @staticmethod
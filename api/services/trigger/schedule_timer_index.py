@@ -0,0 +1,112 @@
+"""Redis sorted set of the next fire time of every enabled workflow schedule plan.
+
+Members are schedule plan ids scored by ``next_run_at`` as a UTC epoch timestamp, so the earliest
+due plan is always the first member. The database stays the source of truth: the index is only a
+wake-up hint for ``WorkflowScheduleDispatcher``, which re-checks every due plan under a row lock,
+and it is rebuilt from the database periodically.
+"""
+
+import logging
+from collections.abc import Iterable, Mapping
+from datetime import UTC, datetime
+
+from redis import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_TIMER_INDEX_KEY = "workflow_schedule:next_run_at"
+_PENDING_SYNC_INFO_KEY = "workflow_schedule_timer_index_pending"
+
+
+def _score(next_run_at: datetime) -> float:
+    # Stored values are naive UTC; aware ones come straight from calculate_next_run_at.
+    if next_run_at.tzinfo is None:
+        next_run_at = next_run_at.replace(tzinfo=UTC)
+    return next_run_at.timestamp()
+
+
+def _sync_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_SYNC_INFO_KEY, None)
+    if pending:
+        ScheduleTimerIndex.sync(pending)
+
+
+def _discard_pending(session: Session, previous_transaction: SessionTransaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_SYNC_INFO_KEY, None)
+
+
+class ScheduleTimerIndex:
+    @staticmethod
+    def enabled() -> bool:
+        return dify_config.ENABLE_WORKFLOW_SCHEDULE_DISPATCHER
+
+    @staticmethod
+    def add(next_run_ats: Mapping[str, datetime | None]) -> None:
+        """Set the fire time of each plan; plans without a next run time are removed."""
+        scores = {
+            schedule_id: _score(next_run_at)
+            for schedule_id, next_run_at in next_run_ats.items()
+            if next_run_at is not None
+        }
+        if scores:
+            redis_client.zadd(SCHEDULE_TIMER_INDEX_KEY, scores)
+        ScheduleTimerIndex.remove(
+            [schedule_id for schedule_id, next_run_at in next_run_ats.items() if next_run_at is None]
+        )
+
+    @staticmethod
+    def remove(schedule_ids: Iterable[str]) -> None:
+        schedule_ids = list(schedule_ids)
+        if schedule_ids:
+            redis_client.zrem(SCHEDULE_TIMER_INDEX_KEY, *schedule_ids)
+
+    @staticmethod
+    def sync(next_run_ats: Mapping[str, datetime | None]) -> None:
+        """
+        Best-effort ``add`` for callers that change plans in the database.
+
+        A failed update only delays the plan until the next reconciliation or poll, so Redis
+        errors are logged instead of failing the caller's transaction.
+        """
+        if not ScheduleTimerIndex.enabled():
+            return
+        try:
+            ScheduleTimerIndex.add(next_run_ats)
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to update the workflow schedule timer index.", exc_info=True)
+
+    @staticmethod
+    def sync_after_commit(session: Session, next_run_ats: Mapping[str, datetime | None]) -> None:
+        """
+        ``sync`` once ``session`` commits, so the dispatcher never sees a fire time it cannot read yet.
+
+        Updates are dropped if the transaction rolls back; later updates of the same plan win.
+        """
+        if not ScheduleTimerIndex.enabled():
+            return
+        session.info.setdefault(_PENDING_SYNC_INFO_KEY, {}).update(next_run_ats)
+        if not event.contains(session, "after_commit", _sync_pending):
+            event.listen(session, "after_commit", _sync_pending)
+            event.listen(session, "after_soft_rollback", _discard_pending)
+
+    @staticmethod
+    def due_ids(now: float, limit: int) -> list[str]:
+        members = redis_client.zrangebyscore(SCHEDULE_TIMER_INDEX_KEY, "-inf", now, start=0, num=limit)
+        return [member.decode() if isinstance(member, bytes) else member for member in members]
+
+    @staticmethod
+    def next_fire_time() -> float | None:
+        """Epoch timestamp of the earliest indexed plan, or None when the index is empty."""
+        first = redis_client.zrange(SCHEDULE_TIMER_INDEX_KEY, 0, 0, withscores=True)
+        return float(first[0][1]) if first else None
+
+    @staticmethod
+    def all_ids() -> set[str]:
+        members = redis_client.zrange(SCHEDULE_TIMER_INDEX_KEY, 0, -1)
+        return {member.decode() if isinstance(member, bytes) else member for member in members}
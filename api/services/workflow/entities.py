@@ -102,6 +102,8 @@ class WorkflowResumeTaskData(BaseModel):
     """Payload for workflow resumption tasks."""
 
     workflow_run_id: str
+    # Set when the fair scheduler paused the run and registered it as waiting for a worker.
+    preempted: bool = False
 
 
 class AsyncTriggerExecutionResult(BaseModel):
@@ -34,3 +34,13 @@ class CFSPlanScheduler[PlanT: WorkflowScheduleCFSPlanEntity](ABC):
         """
         Whether a workflow run can be scheduled.
         """
+
+    def on_run_end(self, paused_run_id: str | None = None) -> None:
+        """
+        Called when a workflow run stops executing.
+
+        Args:
+            paused_run_id: The workflow run id when the run was paused because ``can_schedule``
+                returned ``RESOURCE_LIMIT_REACHED``, None otherwise.
+        """
+        return
@@ -23,6 +23,7 @@ from core.app.layers.trigger_post_layer import TriggerPostLayer
 from core.db.session_factory import session_factory
 from core.repositories import DifyCoreRepositoryFactory
 from extensions.ext_database import db
+from graphon.graph_engine.layers import GraphEngineLayer
 from graphon.runtime import GraphRuntimeState
 from models.account import Account
 from models.enums import CreatorUserRole, WorkflowRunTriggeredFrom, WorkflowTriggerStatus
@@ -37,8 +38,13 @@ from services.workflow.entities import (
     WorkflowResumeTaskData,
     WorkflowTaskData,
 )
+from services.workflow.scheduler import SchedulerCommand
 from tasks.workflow_cfs_scheduler.cfs_scheduler import AsyncWorkflowCFSPlanEntity, AsyncWorkflowCFSPlanScheduler
-from tasks.workflow_cfs_scheduler.entities import AsyncWorkflowQueue, AsyncWorkflowSystemStrategy
+from tasks.workflow_cfs_scheduler.entities import (
+    AsyncWorkflowQueue,
+    AsyncWorkflowSystemStrategy,
+    resolve_async_workflow_queue,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +69,7 @@ def execute_workflow_professional(task_data_dict: dict[str, Any]):
         task_data,
         AsyncWorkflowCFSPlanScheduler(plan=cfs_plan_scheduler_entity),
         cfs_plan_scheduler_entity,
+        execute_workflow_professional,
     )
 
 
@@ -79,6 +86,7 @@ def execute_workflow_team(task_data_dict: dict[str, Any]):
         task_data,
         AsyncWorkflowCFSPlanScheduler(plan=cfs_plan_scheduler_entity),
         cfs_plan_scheduler_entity,
+        execute_workflow_team,
     )
 
 
@@ -95,6 +103,7 @@ def execute_workflow_sandbox(task_data_dict: dict[str, Any]):
         task_data,
         AsyncWorkflowCFSPlanScheduler(plan=cfs_plan_scheduler_entity),
         cfs_plan_scheduler_entity,
+        execute_workflow_sandbox,
     )
 
 
@@ -111,6 +120,7 @@ def _execute_workflow_common(
     task_data: WorkflowTaskData,
     cfs_plan_scheduler: AsyncWorkflowCFSPlanScheduler,
     cfs_plan_scheduler_entity: AsyncWorkflowCFSPlanEntity,
+    task: Any,
 ):
     """Execute workflow with common logic and trigger log updates."""
 
@@ -124,6 +134,15 @@ def _execute_workflow_common(
             # This should not happen, but handle gracefully
             return
 
+        # Tenants over their fair share of the queue wait while other tenants have queued runs
+        cfs_plan_scheduler_entity.tenant_id = trigger_log.tenant_id
+        if cfs_plan_scheduler.admit() == SchedulerCommand.RESOURCE_LIMIT_REACHED:
+            task.apply_async(
+                args=[task_data.model_dump(mode="json")],
+                countdown=cfs_plan_scheduler_entity.granularity,
+            )
+            return
+
         # Reconstruct execution data from trigger log
         trigger_data = TriggerData.model_validate_json(trigger_log.trigger_data)
 
@@ -162,6 +181,13 @@ def _execute_workflow_common(
                 state_owner_user_id=workflow.created_by,
             )
 
+            # TODO: Re-enable TimeSliceLayer for the legacy scheduler after the HITL release.
+            graph_engine_layers: list[GraphEngineLayer] = [
+                TriggerPostLayer(cfs_plan_scheduler_entity, start_time, trigger_log.id),
+            ]
+            if AsyncWorkflowCFSPlanScheduler.enabled():
+                graph_engine_layers.insert(0, TimeSliceLayer(cfs_plan_scheduler))
+
             # NOTE (hj24)
             # Release the transaction before the blocking generate() call,
             # otherwise the connection stays "idle in transaction" for hours.
@@ -178,10 +204,7 @@ def _execute_workflow_common(
                 call_depth=0,
                 triggered_from=trigger_data.trigger_from,
                 root_node_id=trigger_data.root_node_id,
-                graph_engine_layers=[
-                    # TODO: Re-enable TimeSliceLayer after the HITL release.
-                    TriggerPostLayer(cfs_plan_scheduler_entity, start_time, trigger_log.id),
-                ],
+                graph_engine_layers=graph_engine_layers,
                 pause_state_config=pause_config,
             )
 
@@ -267,23 +290,30 @@ def resume_workflow_execution(task_data_dict: dict[str, Any]) -> None:
 
     generator = WorkflowAppGenerator()
     start_time = datetime.now(UTC)
-    graph_engine_layers = []
+    graph_engine_layers: list[GraphEngineLayer] = []
     trigger_log = _query_trigger_log_info(session_factory, task_data.workflow_run_id)
 
     if trigger_log:
         cfs_plan_scheduler_entity = AsyncWorkflowCFSPlanEntity(
-            queue=AsyncWorkflowQueue(trigger_log.queue_name),
+            queue=resolve_async_workflow_queue(trigger_log.queue_name),
             schedule_strategy=AsyncWorkflowSystemStrategy,
             granularity=dify_config.ASYNC_WORKFLOW_SCHEDULER_GRANULARITY,
+            tenant_id=trigger_log.tenant_id,
         )
         cfs_plan_scheduler = AsyncWorkflowCFSPlanScheduler(plan=cfs_plan_scheduler_entity)
+        # Only runs paused by the fair scheduler were registered as waiting for a worker.
+        if cfs_plan_scheduler.admit(queued=task_data.preempted) == SchedulerCommand.RESOURCE_LIMIT_REACHED:
+            resume_workflow_execution.apply_async(
+                args=[task_data_dict],
+                queue=cfs_plan_scheduler_entity.queue,
+                countdown=cfs_plan_scheduler_entity.granularity,
+            )
+            return
 
-        graph_engine_layers.extend(
-            [
-                TimeSliceLayer(cfs_plan_scheduler),
-                TriggerPostLayer(cfs_plan_scheduler_entity, start_time, trigger_log.id),
-            ]
-        )
+        # TODO: Re-enable TimeSliceLayer for the legacy scheduler after the HITL release.
+        if AsyncWorkflowCFSPlanScheduler.enabled():
+            graph_engine_layers.append(TimeSliceLayer(cfs_plan_scheduler))
+        graph_engine_layers.append(TriggerPostLayer(cfs_plan_scheduler_entity, start_time, trigger_log.id))
 
     workflow_run_repo.resume_workflow_pause(task_data.workflow_run_id, pause_entity)
 
@@ -38,6 +38,43 @@ _RETRYABLE_TRACE_DISPATCH_LIMIT = dify_config.OPS_TRACE_RETRYABLE_DISPATCH_MAX_R
 _RETRYABLE_TRACE_DISPATCH_DELAY_SECONDS = dify_config.OPS_TRACE_RETRYABLE_DISPATCH_DELAY_SECONDS
 
 
+def _dispatch_trace(app_id: str, trace_data: dict, trace_instance) -> None:
+    """Send one stored trace to enterprise telemetry and the app's trace provider.
+
+    Sets ``_enterprise_trace_dispatched`` on ``trace_data`` once enterprise telemetry
+    accepted it, so a retried payload does not emit the same enterprise trace twice.
+    """
+    trace_info = dict(trace_data.get("trace_info") or {})
+    trace_info_type = trace_data.get("trace_info_type")
+
+    if trace_info.get("message_data"):
+        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
+    if trace_info.get("workflow_data"):
+        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
+    if trace_info.get("documents"):
+        trace_info["documents"] = [Document.model_validate(doc) for doc in trace_info["documents"]]
+
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        trace_info = trace_type(**trace_info)
+
+    from extensions.ext_enterprise_telemetry import is_enabled as is_ee_telemetry_enabled
+
+    if is_ee_telemetry_enabled() and not trace_data.get("_enterprise_trace_dispatched"):
+        from enterprise.telemetry.enterprise_trace import EnterpriseOtelTrace
+
+        try:
+            EnterpriseOtelTrace().trace(trace_info)
+        except Exception:
+            logger.exception("Enterprise trace failed for app_id: %s", app_id)
+        else:
+            trace_data["_enterprise_trace_dispatched"] = True
+
+    if trace_instance:
+        with current_app.app_context():
+            trace_instance.trace(trace_info)
+
+
 @shared_task(
     queue="ops_trace",
     bind=True,
@@ -48,6 +85,9 @@ def process_trace_tasks(self, file_info):
     """
     Async process trace tasks
     Usage: process_trace_tasks.delay(tasks_data)
+
+    The payload file holds either a batch of traces of one app (``{"app_id", "traces"}``)
+    or, for payloads persisted one by one, a single trace.
     """
     from core.ops.ops_trace_manager import OpsTraceManager
 
@@ -55,44 +95,34 @@ def process_trace_tasks(self, file_info):
     file_id = file_info.get("file_id")
     file_path = f"{OPS_FILE_PATH}{app_id}/{file_id}.json"
     file_data = json.loads(storage.load(file_path))
-    trace_info = file_data.get("trace_info")
-    trace_info_type = file_data.get("trace_info_type")
-    enterprise_trace_dispatched = bool(file_data.get("_enterprise_trace_dispatched"))
+    is_batch = "traces" in file_data
+    traces: list[dict] = file_data["traces"] if is_batch else [file_data]
     trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+    failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
 
-    if trace_info.get("message_data"):
-        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
-    if trace_info.get("workflow_data"):
-        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
-    if trace_info.get("documents"):
-        trace_info["documents"] = [Document.model_validate(doc) for doc in trace_info["documents"]]
-
+    retryable_traces: list[dict] = []
+    retryable_error: RetryableTraceDispatchError | None = None
+    payload_changed = False
     should_delete_file = True
 
     try:
-        trace_type = trace_info_info_map.get(trace_info_type)
-        if trace_type:
-            trace_info = trace_type(**trace_info)
-
-        from extensions.ext_enterprise_telemetry import is_enabled as is_ee_telemetry_enabled
-
-        if is_ee_telemetry_enabled() and not enterprise_trace_dispatched:
-            from enterprise.telemetry.enterprise_trace import EnterpriseOtelTrace
-
+        for trace_data in traces:
+            enterprise_trace_dispatched = bool(trace_data.get("_enterprise_trace_dispatched"))
             try:
-                EnterpriseOtelTrace().trace(trace_info)
+                _dispatch_trace(app_id, trace_data, trace_instance)
+            except RetryableTraceDispatchError as e:
+                retryable_traces.append(trace_data)
+                retryable_error = e
+                if enterprise_trace_dispatched != bool(trace_data.get("_enterprise_trace_dispatched")):
+                    payload_changed = True
             except Exception:
-                logger.exception("Enterprise trace failed for app_id: %s", app_id)
-            else:
-                file_data["_enterprise_trace_dispatched"] = True
-                enterprise_trace_dispatched = True
+                logger.exception("Processing trace tasks failed, app_id: %s", app_id)
+                redis_client.incr(failed_key)
 
-        if trace_instance:
-            with current_app.app_context():
-                trace_instance.trace(trace_info)
+        if retryable_error is None:
+            logger.info("Processing trace tasks success, app_id: %s", app_id)
+            return
 
-        logger.info("Processing trace tasks success, app_id: %s", app_id)
-    except RetryableTraceDispatchError as e:
         # Retryable dispatch failures represent a transient provider-side
         # ordering gap, not corrupt payload data. Keep the payload only after
         # Celery accepts the retry request; otherwise this attempt becomes a
@@ -100,10 +130,10 @@ def process_trace_tasks(self, file_info):
         #
         # Enterprise telemetry runs before provider dispatch. If it already ran
         # and provider dispatch asks for a retry, persist that private flag so
-        # the next attempt does not emit the same enterprise trace twice.
+        # the next attempt does not emit the same enterprise trace twice. A batch
+        # is rewritten with only the traces that still need a retry.
         if self.request.retries >= _RETRYABLE_TRACE_DISPATCH_LIMIT:
-            logger.exception("Retryable trace dispatch budget exhausted, app_id: %s", app_id)
-            failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
+            logger.error("Retryable trace dispatch budget exhausted, app_id: %s", app_id, exc_info=retryable_error)
             redis_client.incr(failed_key)
         else:
             logger.warning(
@@ -111,23 +141,19 @@ def process_trace_tasks(self, file_info):
                 self.request.retries + 1,
                 _RETRYABLE_TRACE_DISPATCH_LIMIT,
                 app_id,
-                e,
+                retryable_error,
             )
             try:
-                if enterprise_trace_dispatched:
-                    storage.save(file_path, json.dumps(file_data).encode("utf-8"))
-                raise self.retry(exc=e, countdown=_RETRYABLE_TRACE_DISPATCH_DELAY_SECONDS)
+                if payload_changed or len(retryable_traces) < len(traces):
+                    retry_data = {**file_data, "traces": retryable_traces} if is_batch else file_data
+                    storage.save(file_path, json.dumps(retry_data).encode("utf-8"))
+                raise self.retry(exc=retryable_error, countdown=_RETRYABLE_TRACE_DISPATCH_DELAY_SECONDS)
             except Retry:
                 should_delete_file = False
                 raise
             except Exception:
                 logger.exception("Failed to schedule trace dispatch retry, app_id: %s", app_id)
-                failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
                 redis_client.incr(failed_key)
-    except Exception as e:
-        logger.exception("Processing trace tasks failed, app_id: %s", app_id)
-        failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
-        redis_client.incr(failed_key)
     finally:
         if should_delete_file:
             try:
@@ -1,8 +1,88 @@
-from typing import override
+import logging
+import threading
+import time
+from collections import defaultdict
+from enum import StrEnum
+from typing import TYPE_CHECKING, override
 
+from redis import RedisError
+
+from configs import dify_config
 from services.workflow.entities import WorkflowScheduleCFSPlanEntity
 from services.workflow.scheduler import CFSPlanScheduler, SchedulerCommand
 from tasks.workflow_cfs_scheduler.entities import AsyncWorkflowQueue
+from tasks.workflow_cfs_scheduler.run_queue import TenantRunQueue
+
+if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerDecision(StrEnum):
+    ADMITTED = "admitted"  # a queued run got a worker
+    DEFERRED = "deferred"  # a queued run was put back on its queue
+    PREEMPTED = "preempted"  # a running run was paused
+    REQUEUED = "requeued"  # a paused run was queued for resumption
+
+
+class CFSSchedulerStats:
+    """Process-wide decision counters per queue, optionally mirrored to OpenTelemetry."""
+
+    _decisions_total: "Counter | None"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._decisions: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._decisions_total = None
+        self._instruments_initialized = False
+
+    def _init_instruments(self) -> None:
+        self._instruments_initialized = True
+        if not dify_config.ENABLE_OTEL:
+            return
+        try:
+            from opentelemetry.metrics import get_meter
+
+            meter = get_meter("workflow_cfs_scheduler", version=dify_config.project.version)
+            self._decisions_total = meter.create_counter(
+                "workflow_cfs_scheduler_decisions_total",
+                description="Total async workflow fair scheduler decisions by queue and decision.",
+                unit="{decision}",
+            )
+        except Exception:
+            logger.exception("workflow_cfs_scheduler_metrics: failed to initialize instruments")
+
+    def record(self, queue: str, decision: SchedulerDecision) -> None:
+        with self._lock:
+            self._decisions[queue][decision] += 1
+            if not self._instruments_initialized:
+                self._init_instruments()
+        if self._decisions_total is None:
+            return
+        try:
+            self._decisions_total.add(1, {"queue": queue, "decision": decision.value})
+        except Exception:
+            logger.exception("workflow_cfs_scheduler_metrics: failed to add counter value")
+
+    def preemption_rate(self, queue: str) -> float | None:
+        """Share of admitted runs of a queue that were later preempted, or None before the first admission."""
+        with self._lock:
+            decisions = self._decisions.get(queue, {})
+            admitted = decisions.get(SchedulerDecision.ADMITTED, 0)
+            preempted = decisions.get(SchedulerDecision.PREEMPTED, 0)
+        return preempted / admitted if admitted else None
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {queue: dict(decisions) for queue, decisions in self._decisions.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._decisions.clear()
+
+
+cfs_scheduler_stats = CFSSchedulerStats()
 
 
 class AsyncWorkflowCFSPlanEntity(WorkflowScheduleCFSPlanEntity):
@@ -11,23 +91,125 @@ class AsyncWorkflowCFSPlanEntity(WorkflowScheduleCFSPlanEntity):
     """
 
     queue: AsyncWorkflowQueue
+    tenant_id: str | None = None
 
 
 class AsyncWorkflowCFSPlanScheduler(CFSPlanScheduler[AsyncWorkflowCFSPlanEntity]):
     """
     Trigger workflow CFS plan scheduler.
+
+    With ``ASYNC_WORKFLOW_CFS_ENABLED``, tenants sharing a queue get an equal share of its
+    workers: every run charges its execution time to the virtual runtime of its tenant in a
+    ``TenantRunQueue``, and a run whose tenant is more than ``granularity`` seconds ahead of
+    another tenant with waiting runs is deferred before it starts, or paused and requeued on
+    its tier queue while it runs. Redis errors let runs proceed unscheduled.
     """
 
+    def __init__(self, plan: AsyncWorkflowCFSPlanEntity):
+        super().__init__(plan)
+        self._run_queue = TenantRunQueue(plan.queue)
+        self._charged_at: float | None = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return dify_config.ASYNC_WORKFLOW_CFS_ENABLED
+
+    @staticmethod
+    def record_queued(queue: AsyncWorkflowQueue, tenant_id: str) -> None:
+        """Best-effort registration of a run dispatched to ``queue`` as waiting for a worker."""
+        if not AsyncWorkflowCFSPlanScheduler.enabled():
+            return
+        try:
+            TenantRunQueue(queue).enqueue(tenant_id)
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to record a queued workflow run for tenant %s.", tenant_id, exc_info=True)
+
+    def admit(self, *, queued: bool = True) -> SchedulerCommand:
+        """
+        Whether a queued run of the plan's tenant can start now.
+
+        ``RESOURCE_LIMIT_REACHED`` means the caller should put the run back on its queue for
+        ``granularity`` seconds; the run stays counted as waiting meanwhile. Runs that were never
+        counted as waiting, such as human input resumes, pass ``queued=False``: they start at
+        once and are only charged for their execution time.
+        """
+        tenant_id = self.plan.tenant_id
+        if not self.enabled() or tenant_id is None:
+            return SchedulerCommand.NONE
+        if not queued:
+            self._charged_at = time.monotonic()
+            return SchedulerCommand.NONE
+        try:
+            if self._run_queue.lag(tenant_id) > self.plan.granularity:
+                self._run_queue.touch(tenant_id)
+                cfs_scheduler_stats.record(self.plan.queue, SchedulerDecision.DEFERRED)
+                return SchedulerCommand.RESOURCE_LIMIT_REACHED
+            self._run_queue.dequeue(tenant_id)
+        except (RedisError, RuntimeError):
+            logger.warning("Fair scheduler unavailable, starting workflow run without it.", exc_info=True)
+        self._charged_at = time.monotonic()
+        cfs_scheduler_stats.record(self.plan.queue, SchedulerDecision.ADMITTED)
+        return SchedulerCommand.NONE
+
     @override
     def can_schedule(self) -> SchedulerCommand:
         """
         Check if the workflow can be scheduled.
         """
-        if self.plan.queue in [AsyncWorkflowQueue.PROFESSIONAL_QUEUE, AsyncWorkflowQueue.TEAM_QUEUE]:
-            """
-            permitted all paid users to schedule the workflow any time
-            """
+        if not self.enabled():
+            if self.plan.queue in [AsyncWorkflowQueue.PROFESSIONAL_QUEUE, AsyncWorkflowQueue.TEAM_QUEUE]:
+                """
+                permitted all paid users to schedule the workflow any time
+                """
+                return SchedulerCommand.NONE
+
+            # FIXME: avoid the sandbox user's workflow at a running state for ever
+            return SchedulerCommand.RESOURCE_LIMIT_REACHED
+
+        tenant_id = self.plan.tenant_id
+        if tenant_id is None:
             return SchedulerCommand.NONE
+        try:
+            self._charge(tenant_id)
+            if self._run_queue.lag(tenant_id) > self.plan.granularity:
+                cfs_scheduler_stats.record(self.plan.queue, SchedulerDecision.PREEMPTED)
+                return SchedulerCommand.RESOURCE_LIMIT_REACHED
+        except (RedisError, RuntimeError):
+            logger.warning("Fair scheduler unavailable, keeping workflow run scheduled.", exc_info=True)
+        return SchedulerCommand.NONE
+
+    @override
+    def on_run_end(self, paused_run_id: str | None = None) -> None:
+        tenant_id = self.plan.tenant_id
+        if not self.enabled() or tenant_id is None:
+            return
+        try:
+            self._charge(tenant_id)
+            if paused_run_id is None:
+                return
+            self._run_queue.enqueue(tenant_id)
+        except (RedisError, RuntimeError):
+            logger.warning("Failed to update the fair scheduler for tenant %s.", tenant_id, exc_info=True)
+
+        if paused_run_id is not None:
+            self.requeue(paused_run_id)
+
+    def requeue(self, workflow_run_id: str) -> None:
+        """
+        Resume a preempted run on its tier queue once the other tenants had ``granularity``
+        seconds to catch up; it is deferred again at that point if they still have not.
+        """
+        from tasks.async_workflow_tasks import resume_workflow_execution
+
+        resume_workflow_execution.apply_async(
+            args=[{"workflow_run_id": workflow_run_id, "preempted": True}],
+            queue=self.plan.queue,
+            countdown=self.plan.granularity,
+        )
+        cfs_scheduler_stats.record(self.plan.queue, SchedulerDecision.REQUEUED)
 
-        # FIXME: avoid the sandbox user's workflow at a running state for ever
-        return SchedulerCommand.RESOURCE_LIMIT_REACHED
+    def _charge(self, tenant_id: str) -> None:
+        now = time.monotonic()
+        if self._charged_at is not None:
+            self._run_queue.charge(tenant_id, now - self._charged_at)
+        self._charged_at = now
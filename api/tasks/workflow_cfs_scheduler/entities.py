@@ -10,12 +10,16 @@ if dify_config.DEPLOYMENT_EDITION == DeploymentEdition.CLOUD:
     _professional_queue = "workflow_professional"
     _team_queue = "workflow_team"
     _sandbox_queue = "workflow_sandbox"
-    AsyncWorkflowSystemStrategy = WorkflowScheduleCFSPlanEntity.Strategy.TimeSlice
 else:
     # Community edition: single workflow queue (not dataset)
     _professional_queue = "workflow"
     _team_queue = "workflow"
     _sandbox_queue = "workflow"
+
+# The fair scheduler relies on the time-slice checker in every edition
+if dify_config.DEPLOYMENT_EDITION == DeploymentEdition.CLOUD or dify_config.ASYNC_WORKFLOW_CFS_ENABLED:
+    AsyncWorkflowSystemStrategy = WorkflowScheduleCFSPlanEntity.Strategy.TimeSlice
+else:
     AsyncWorkflowSystemStrategy = WorkflowScheduleCFSPlanEntity.Strategy.Nop
 
 
@@ -24,3 +28,16 @@ class AsyncWorkflowQueue(StrEnum):
     PROFESSIONAL_QUEUE = _professional_queue
     TEAM_QUEUE = _team_queue
     SANDBOX_QUEUE = _sandbox_queue
+
+
+def resolve_async_workflow_queue(queue_name: str) -> AsyncWorkflowQueue:
+    """
+    Map the tier queue name recorded on a trigger log to the queue serving that tier in this edition.
+    """
+    match queue_name:
+        case "workflow_professional":
+            return AsyncWorkflowQueue.PROFESSIONAL_QUEUE
+        case "workflow_team":
+            return AsyncWorkflowQueue.TEAM_QUEUE
+        case _:
+            return AsyncWorkflowQueue.SANDBOX_QUEUE
@@ -0,0 +1,84 @@
+"""Per-queue tenant run queue of the async workflow fair scheduler, kept in Redis.
+
+Every Celery queue of async workflows has three keys:
+
+- ``workflow_cfs:{queue}:vruntime``: sorted set of the worker seconds each active tenant has
+  consumed on the queue, its virtual runtime. A tenant that joins, or comes back after being
+  idle, starts at the smallest virtual runtime of the queue, so idle time is never banked.
+- ``workflow_cfs:{queue}:waiting``: hash of the number of runs of each tenant that are queued
+  but not running. Only tenants with waiting runs compete for workers.
+- ``workflow_cfs:{queue}:active``: sorted set of the last time each tenant queued, started or
+  ran a workflow. Tenants silent for ``ASYNC_WORKFLOW_CFS_IDLE_TIMEOUT`` are dropped from all
+  three keys, which also clears counts left behind by a crashed worker.
+
+The keys are updated without transactions: concurrent updates can only make the scheduler
+briefly less fair, never lose a run.
+"""
+
+import time
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+
+def _decode(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class TenantRunQueue:
+    def __init__(self, queue: str):
+        self.queue = queue
+        self._vruntime_key = f"workflow_cfs:{queue}:vruntime"
+        self._waiting_key = f"workflow_cfs:{queue}:waiting"
+        self._active_key = f"workflow_cfs:{queue}:active"
+
+    def enqueue(self, tenant_id: str) -> None:
+        """Record a run of the tenant waiting for a worker."""
+        self._join(tenant_id)
+        redis_client.hincrby(self._waiting_key, tenant_id, 1)
+
+    def dequeue(self, tenant_id: str) -> None:
+        """Record that a waiting run of the tenant got a worker or was dropped."""
+        self.touch(tenant_id)
+        if redis_client.hincrby(self._waiting_key, tenant_id, -1) <= 0:
+            redis_client.hdel(self._waiting_key, tenant_id)
+
+    def charge(self, tenant_id: str, seconds: float) -> float:
+        """Add worker time used by the tenant to its virtual runtime and return the new value."""
+        self._join(tenant_id)
+        return float(redis_client.zincrby(self._vruntime_key, max(seconds, 0.0), tenant_id))
+
+    def lag(self, tenant_id: str) -> float:
+        """
+        How far the tenant is ahead of the furthest-behind other tenant with waiting runs, in
+        seconds of virtual runtime; 0 when no other tenant is waiting or the tenant is behind.
+        """
+        self._expire_idle()
+        vruntime = redis_client.zscore(self._vruntime_key, tenant_id)
+        if vruntime is None:
+            return 0.0
+        waiting = {_decode(tenant) for tenant in redis_client.hgetall(self._waiting_key)}
+        waiting.discard(tenant_id)
+        if not waiting:
+            return 0.0
+        for tenant, score in redis_client.zrangebyscore(self._vruntime_key, "-inf", vruntime, withscores=True):
+            if _decode(tenant) in waiting:
+                return float(vruntime) - float(score)
+        return 0.0
+
+    def _join(self, tenant_id: str) -> None:
+        lowest = redis_client.zrange(self._vruntime_key, 0, 0, withscores=True)
+        redis_client.zadd(self._vruntime_key, {tenant_id: float(lowest[0][1]) if lowest else 0.0}, nx=True)
+        self.touch(tenant_id)
+
+    def touch(self, tenant_id: str) -> None:
+        redis_client.zadd(self._active_key, {tenant_id: time.time()})
+
+    def _expire_idle(self) -> None:
+        cutoff = time.time() - dify_config.ASYNC_WORKFLOW_CFS_IDLE_TIMEOUT
+        idle = redis_client.zrangebyscore(self._active_key, "-inf", cutoff)
+        if not idle:
+            return
+        redis_client.zrem(self._vruntime_key, *idle)
+        redis_client.hdel(self._waiting_key, *idle)
+        redis_client.zrem(self._active_key, *idle)
@@ -5,11 +5,15 @@ These tasks provide asynchronous storage capabilities for workflow node executio
 improving performance by offloading storage operations to background workers.
 """
 
+import base64
 import json
 import logging
+import zlib
+from collections.abc import Sequence
 from typing import Any
 
 from celery import shared_task
+from pydantic import TypeAdapter
 from sqlalchemy import select
 
 from core.db.session_factory import session_factory
@@ -23,6 +27,26 @@ from models.workflow import WorkflowNodeExecutionTriggeredFrom
 
 logger = logging.getLogger(__name__)
 
+_EXECUTION_BATCH_ADAPTER = TypeAdapter(list[WorkflowNodeExecution])
+
+
+def encode_node_execution_batch(serialized_executions: Sequence[str]) -> str:
+    """
+    Pack JSON-serialized executions into the compressed payload of save_workflow_node_executions_task.
+
+    Args:
+        serialized_executions: Executions serialized with ``WorkflowNodeExecution.model_dump_json``
+
+    Returns:
+        The base64 text of the zlib-compressed JSON array
+    """
+    raw = ("[" + ",".join(serialized_executions) + "]").encode("utf-8")
+    return base64.b64encode(zlib.compress(raw)).decode("ascii")
+
+
+def decode_node_execution_batch(payload: str) -> list[WorkflowNodeExecution]:
+    return _EXECUTION_BATCH_ADAPTER.validate_json(zlib.decompress(base64.b64decode(payload)))
+
 
 @shared_task(queue="workflow_storage", bind=True, max_retries=3, default_retry_delay=60)
 def save_workflow_node_execution_task(
@@ -84,6 +108,67 @@ def save_workflow_node_execution_task(
         raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
 
 
+@shared_task(queue="workflow_storage", bind=True, max_retries=3, default_retry_delay=60)
+def save_workflow_node_executions_task(
+    self,
+    payload: str,
+    tenant_id: str,
+    app_id: str,
+    triggered_from: str,
+    creator_user_id: str,
+    creator_user_role: str,
+) -> bool:
+    """
+    Asynchronously save or update a batch of workflow node executions in one transaction.
+
+    Args:
+        payload: Executions packed by ``encode_node_execution_batch``, at most one state per execution
+        tenant_id: Tenant ID for multi-tenancy
+        app_id: Application ID
+        triggered_from: Source of the execution trigger
+        creator_user_id: ID of the user who created the executions
+        creator_user_role: Role of the user who created the executions
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        executions = decode_node_execution_batch(payload)
+        with session_factory.create_session() as session:
+            existing_executions = {
+                node_execution.id: node_execution
+                for node_execution in session.scalars(
+                    select(WorkflowNodeExecutionModel).where(
+                        WorkflowNodeExecutionModel.id.in_([execution.id for execution in executions])
+                    )
+                )
+            }
+            for execution in executions:
+                existing_execution = existing_executions.get(execution.id)
+                if existing_execution:
+                    _update_node_execution_from_domain(existing_execution, execution)
+                else:
+                    session.add(
+                        _create_node_execution_from_domain(
+                            execution=execution,
+                            tenant_id=tenant_id,
+                            app_id=app_id,
+                            triggered_from=WorkflowNodeExecutionTriggeredFrom(triggered_from),
+                            creator_user_id=creator_user_id,
+                            creator_user_role=CreatorUserRole(creator_user_role),
+                        )
+                    )
+
+            session.commit()
+            logger.debug("Saved a batch of %d workflow node executions", len(executions))
+            return True
+
+    except Exception as e:
+        logger.exception("Failed to save a batch of workflow node executions")
+        # Retry the task with exponential backoff
+        raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
+
+
 def _create_node_execution_from_domain(
     execution: WorkflowNodeExecution,
     tenant_id: str,
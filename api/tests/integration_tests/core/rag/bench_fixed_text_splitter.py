@@ -0,0 +1,78 @@
+"""
+Benchmark: FixedRecursiveCharacterTextSplitter throughput on large synthetic corpora.
+
+Two corpora of CORPUS_MB megabytes each are split with the indexing settings of a custom
+process rule:
+- prose: paragraphs of sentences with occasional oversized paragraphs, as extracted from PDFs,
+- csv: newline-separated rows with no paragraph breaks, as exported spreadsheets.
+
+Usage (from api/):
+    uv run python -m tests.integration_tests.core.rag.bench_fixed_text_splitter [CORPUS_MB]
+"""
+
+import random
+import sys
+import time
+
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+CORPUS_MB = 100
+CHUNK_SIZE = 1024
+CHUNK_OVERLAP = 50
+SEPARATORS = ["\n\n", "。", ". ", " ", ""]
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "数据", "集合", "1984", "x"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _prose(rng: random.Random, size: int) -> str:
+    paragraphs: list[str] = []
+    total = 0
+    while total < size:
+        # One paragraph in twenty is far above the chunk size and gets split recursively.
+        sentences = rng.randint(40, 120) if rng.random() < 0.05 else rng.randint(1, 8)
+        paragraph = " ".join(
+            " ".join(rng.choices(WORDS, k=rng.randint(5, 25))).capitalize() + "." for _ in range(sentences)
+        )
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def _csv(rng: random.Random, size: int) -> str:
+    rows: list[str] = []
+    total = 0
+    while total < size:
+        row = ",".join(rng.choices(WORDS, k=12))
+        rows.append(row)
+        total += len(row) + 1
+    return "\n".join(rows)
+
+
+def _run(name: str, text: str) -> None:
+    splitter = FixedRecursiveCharacterTextSplitter(
+        fixed_separator="\n\n", separators=SEPARATORS, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+    started = time.perf_counter()
+    chunks = 0
+    for _chunk in splitter.iter_split_text(text):
+        chunks += 1
+    elapsed = time.perf_counter() - started
+    megabytes = len(text) / 1_000_000
+    print(f"{name:6s} {megabytes:7.1f} MB  {chunks:9d} chunks  {elapsed:7.2f} s  {megabytes / elapsed:6.1f} MB/s")
+
+
+def main() -> None:
+    corpus_mb = int(sys.argv[1]) if len(sys.argv) > 1 else CORPUS_MB
+    rng = random.Random(42)  # noqa: S311
+    size = corpus_mb * 1_000_000
+    _run("prose", _prose(rng, size))
+    _run("csv", _csv(rng, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: workflow graph access on large synthetic DSLs.
+
+For graphs of NODE_COUNTS nodes, measures the reads done while starting a run (root node lookup,
+graph init, entry and persistence layer) and a single-node config lookup:
+- graph_dict: decodes the graph JSON on every access,
+- graph_view: parses once per workflow version and shares the frozen result.
+
+Usage (from api/):
+    uv run python -m tests.integration_tests.workflow.bench_workflow_graph [ITERATIONS]
+"""
+
+import json
+import sys
+import time
+from collections.abc import Callable
+from uuid import uuid4
+
+from models.workflow import Workflow
+from models.workflow_graph import clear_workflow_graph_cache
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+NODE_COUNTS = [50, 200, 800]
+ITERATIONS = 200
+# Graph reads done by WorkflowAppRunner.run before the engine starts.
+READS_PER_RUN = 4
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _graph(node_count: int) -> str:
+    nodes = [{"id": "start", "type": "custom", "data": {"type": "start", "title": "Start", "variables": []}}]
+    for index in range(1, node_count):
+        nodes.append(
+            {
+                "id": f"llm-{index}",
+                "type": "custom",
+                "position": {"x": index * 300, "y": 100},
+                "data": {
+                    "type": "llm",
+                    "title": f"LLM {index}",
+                    "model": {"provider": "openai", "name": "gpt-4o", "mode": "chat", "completion_params": {}},
+                    "prompt_template": [{"role": "system", "text": "You are a helpful assistant. " * 20}],
+                    "context": {"enabled": False, "variable_selector": []},
+                    "vision": {"enabled": False},
+                },
+            }
+        )
+    edges = [
+        {"id": f"e-{index}", "source": nodes[index - 1]["id"], "target": nodes[index]["id"]}
+        for index in range(1, node_count)
+    ]
+    return json.dumps({"nodes": nodes, "edges": edges, "viewport": {"x": 0, "y": 0, "zoom": 1}})
+
+
+def _time(label: str, size_mb: float, iterations: int, run: Callable[[], object]) -> None:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    elapsed = (time.perf_counter() - started) / iterations * 1000
+    print(f"{label:28s} {size_mb:6.2f} MB  {elapsed:9.3f} ms/run")
+
+
+def _run(node_count: int, iterations: int) -> None:
+    graph = _graph(node_count)
+    size_mb = len(graph) / 1_000_000
+    last_node_id = f"llm-{node_count - 1}"
+    workflow_id = str(uuid4())
+    clear_workflow_graph_cache()
+
+    def _workflow() -> Workflow:
+        # A fresh instance per run, as each run loads the workflow in a new session.
+        workflow = Workflow()
+        workflow.id = workflow_id
+        workflow.graph = graph
+        return workflow
+
+    def _start_with_graph_dict() -> list[object]:
+        workflow = _workflow()
+        return [workflow.graph_dict for _ in range(READS_PER_RUN)]
+
+    def _start_with_graph_view() -> list[object]:
+        workflow = _workflow()
+        return [workflow.graph_view for _ in range(READS_PER_RUN)]
+
+    print(f"--- {node_count} nodes")
+    _time("run start (graph_dict)", size_mb, iterations, _start_with_graph_dict)
+    _time("run start (graph_view)", size_mb, iterations, _start_with_graph_view)
+    _time("get_node_config_by_id", size_mb, iterations, lambda: _workflow().get_node_config_by_id(last_node_id))
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    for node_count in NODE_COUNTS:
+        _run(node_count, iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import dify_vdb_pgvector.pgvector as pgvector_module
+import pytest
+from click.testing import CliRunner
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from commands import vector as vector_commands
+from models.dataset import Dataset
+
+
+@pytest.fixture
+def command_engine(monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine) -> Engine:
+    monkeypatch.setattr(vector_commands, "db", SimpleNamespace(engine=sqlite_engine))
+    monkeypatch.setattr(pgvector_module.PGVectorFactory, "pgvector_config", staticmethod(MagicMock))
+    return sqlite_engine
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_indexes_pgvector_collections_and_reports_failures(monkeypatch: pytest.MonkeyPatch, sqlite_session: Session):
+    index_structs = [
+        {"type": "pgvector", "vector_store": {"class_prefix": "First"}},
+        {"type": "pgvector", "vector_store": {"class_prefix": "Second"}},
+        {"type": "qdrant", "vector_store": {"class_prefix": "Other"}},
+    ]
+    for i, index_struct in enumerate(index_structs, start=1):
+        sqlite_session.add(
+            Dataset(
+                id=f"00000000-0000-0000-0000-00000000000{i}",
+                tenant_id="tenant-1",
+                name=f"dataset-{i}",
+                created_by="account-1",
+                index_struct=json.dumps(index_struct),
+            )
+        )
+    sqlite_session.commit()
+    vector = MagicMock()
+    vector.create_document_id_index.side_effect = [None, RuntimeError("lock timeout")]
+    vector_cls = MagicMock(return_value=vector)
+    monkeypatch.setattr(pgvector_module, "PGVector", vector_cls)
+
+    result = CliRunner().invoke(vector_commands.create_pgvector_document_id_indexes, [])
+
+    assert result.exit_code == 0, result.output
+    assert "indexed 1, skipped 1, failed 1" in result.output
+    assert [call.args[0] for call in vector_cls.call_args_list] == ["First", "Second"]
+    assert vector.pool.closeall.call_count == 2
@@ -0,0 +1,72 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from commands import vector as vector_commands
+from libs.embedding_codec import decode_embedding, encode_embedding, is_compact_embedding
+from models.dataset import Embedding
+
+
+def _persist(session: Session, key: str, payload: bytes) -> None:
+    session.add(Embedding(model_name="embed-model", hash=key, provider_name="openai", embedding=payload))
+    session.commit()
+
+
+@pytest.fixture
+def command_engine(monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine) -> Engine:
+    monkeypatch.setattr(vector_commands, "db", SimpleNamespace(engine=sqlite_engine))
+    return sqlite_engine
+
+
+def _payloads(session: Session) -> dict[str, bytes]:
+    session.expire_all()
+    return {row.hash: row.embedding for row in session.scalars(select(Embedding))}
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_converts_legacy_rows_in_batches_and_skips_compact_rows(sqlite_session: Session):
+    for index in range(5):
+        _persist(sqlite_session, f"legacy-{index}", pickle.dumps([float(index), 0.5]))
+    compact = encode_embedding([1.0, 2.0])
+    _persist(sqlite_session, "compact", compact)
+
+    result = CliRunner().invoke(vector_commands.migrate_embedding_cache_format, ["--batch-size", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert "converted 5" in result.output
+    payloads = _payloads(sqlite_session)
+    assert payloads["compact"] == compact
+    for index in range(5):
+        assert is_compact_embedding(payloads[f"legacy-{index}"])
+        assert decode_embedding(payloads[f"legacy-{index}"]).tolist() == [float(index), 0.5]
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_dry_run_leaves_rows_untouched(sqlite_session: Session):
+    legacy = pickle.dumps([0.25])
+    _persist(sqlite_session, "legacy", legacy)
+
+    result = CliRunner().invoke(vector_commands.migrate_embedding_cache_format, ["--dry-run"])
+
+    assert result.exit_code == 0, result.output
+    assert "legacy 1" in result.output
+    assert _payloads(sqlite_session)["legacy"] == legacy
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_undecodable_rows_are_reported_and_skipped(sqlite_session: Session):
+    _persist(sqlite_session, "broken", b"not a pickle")
+    _persist(sqlite_session, "legacy", pickle.dumps([0.5]))
+
+    result = CliRunner().invoke(vector_commands.migrate_embedding_cache_format, ["--dtype", "float16"])
+
+    assert result.exit_code == 0, result.output
+    assert "failed 1" in result.output
+    payloads = _payloads(sqlite_session)
+    assert payloads["broken"] == b"not a pickle"
+    assert decode_embedding(payloads["legacy"]).tolist() == [0.5]
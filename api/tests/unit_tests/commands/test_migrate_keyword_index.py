@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from commands import vector as vector_commands
+from core.rag.datasource.keyword.jieba.jieba import dumps_with_sets
+from models.dataset import Dataset, DatasetKeywordPosting, DatasetKeywordTable
+
+
+@pytest.fixture
+def command_engine(monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine) -> Engine:
+    monkeypatch.setattr(vector_commands, "db", SimpleNamespace(engine=sqlite_engine))
+    return sqlite_engine
+
+
+def _persist_keyword_table(session: Session, dataset_id: str, table: dict[str, set[str]]) -> None:
+    session.add(Dataset(id=dataset_id, tenant_id="tenant-1", name=dataset_id, created_by="account-1"))
+    session.add(
+        DatasetKeywordTable(
+            dataset_id=dataset_id,
+            data_source_type="database",
+            keyword_table=dumps_with_sets(
+                {"__type__": "keyword_table", "__data__": {"index_id": dataset_id, "summary": None, "table": table}}
+            ),
+        )
+    )
+    session.commit()
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_backfills_postings_from_keyword_tables(sqlite_session: Session):
+    dataset_ids = ["00000000-0000-0000-0000-000000000001", "00000000-0000-0000-0000-000000000002"]
+    _persist_keyword_table(sqlite_session, dataset_ids[0], {"a": {"node-1", "node-2"}, "b": {"node-2"}})
+    _persist_keyword_table(sqlite_session, dataset_ids[1], {"c": {"node-3"}})
+
+    result = CliRunner().invoke(vector_commands.migrate_keyword_index, [])
+    rerun = CliRunner().invoke(vector_commands.migrate_keyword_index, ["--dataset-id", dataset_ids[1]])
+
+    assert result.exit_code == 0, result.output
+    assert "migrated 2" in result.output
+    assert rerun.exit_code == 0, rerun.output
+    assert "migrated 1" in rerun.output
+    sqlite_session.expire_all()
+    postings = sqlite_session.execute(
+        select(DatasetKeywordPosting.dataset_id, DatasetKeywordPosting.keyword, DatasetKeywordPosting.index_node_id)
+    ).tuples()
+    assert set(postings) == {
+        (dataset_ids[0], "a", "node-1"),
+        (dataset_ids[0], "a", "node-2"),
+        (dataset_ids[0], "b", "node-2"),
+        (dataset_ids[1], "c", "node-3"),
+    }
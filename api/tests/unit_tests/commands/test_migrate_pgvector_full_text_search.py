@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import dify_vdb_pgvector.pgvector as pgvector_module
+import pytest
+from click.testing import CliRunner
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from commands import vector as vector_commands
+from models.dataset import Dataset
+
+
+@pytest.fixture
+def command_engine(monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine) -> Engine:
+    monkeypatch.setattr(vector_commands, "db", SimpleNamespace(engine=sqlite_engine))
+    monkeypatch.setattr(pgvector_module.PGVectorFactory, "pgvector_config", staticmethod(MagicMock))
+    return sqlite_engine
+
+
+def _persist_dataset(session: Session, dataset_id: str, index_struct: dict | None) -> None:
+    session.add(
+        Dataset(
+            id=dataset_id,
+            tenant_id="tenant-1",
+            name=dataset_id,
+            created_by="account-1",
+            index_struct=json.dumps(index_struct) if index_struct else None,
+        )
+    )
+    session.commit()
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_migrates_only_pgvector_collections_without_a_text_search_config(
+    monkeypatch: pytest.MonkeyPatch, sqlite_session: Session
+):
+    dataset_ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(1, 5)]
+    _persist_dataset(sqlite_session, dataset_ids[0], {"type": "pgvector", "vector_store": {"class_prefix": "Legacy"}})
+    _persist_dataset(
+        sqlite_session,
+        dataset_ids[1],
+        {"type": "pgvector", "vector_store": {"class_prefix": "Current", "text_search_config": "english"}},
+    )
+    _persist_dataset(sqlite_session, dataset_ids[2], {"type": "qdrant", "vector_store": {"class_prefix": "Other"}})
+    _persist_dataset(sqlite_session, dataset_ids[3], None)
+    vector = MagicMock()
+    vector.migrate_full_text_search.return_value = 3
+    vector_cls = MagicMock(return_value=vector)
+    monkeypatch.setattr(pgvector_module, "PGVector", vector_cls)
+
+    result = CliRunner().invoke(
+        vector_commands.migrate_pgvector_full_text_search, ["--text-search-config", "simple", "--batch-size", "10"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "migrated 1, skipped 2, failed 0" in result.output
+    assert vector_cls.call_args.args[0] == "Legacy"
+    vector.migrate_full_text_search.assert_called_once_with("simple", batch_size=10)
+    vector.pool.closeall.assert_called_once()
+    sqlite_session.expire_all()
+    migrated = sqlite_session.get(Dataset, dataset_ids[0])
+    assert migrated is not None
+    assert migrated.index_struct_dict["vector_store"]["text_search_config"] == "simple"
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_failed_collection_keeps_query_time_tokenization(monkeypatch: pytest.MonkeyPatch, sqlite_session: Session):
+    dataset_id = "00000000-0000-0000-0000-000000000001"
+    _persist_dataset(sqlite_session, dataset_id, {"type": "pgvector", "vector_store": {"class_prefix": "Legacy"}})
+    vector = MagicMock()
+    vector.migrate_full_text_search.side_effect = RuntimeError("lock timeout")
+    monkeypatch.setattr(pgvector_module, "PGVector", MagicMock(return_value=vector))
+
+    result = CliRunner().invoke(vector_commands.migrate_pgvector_full_text_search, [])
+
+    assert result.exit_code == 0, result.output
+    assert "failed 1" in result.output
+    sqlite_session.expire_all()
+    dataset = sqlite_session.get(Dataset, dataset_id)
+    assert dataset is not None
+    assert "text_search_config" not in dataset.index_struct_dict["vector_store"]
@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import dify_vdb_pgvector.pgvector as pgvector_module
+import pytest
+from click.testing import CliRunner
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from commands import vector as vector_commands
+from models.dataset import Dataset
+
+
+@pytest.fixture
+def command_engine(monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine) -> Engine:
+    monkeypatch.setattr(vector_commands, "db", SimpleNamespace(engine=sqlite_engine))
+    monkeypatch.setattr(pgvector_module.PGVectorFactory, "pgvector_config", staticmethod(MagicMock))
+    return sqlite_engine
+
+
+def _persist_dataset(session: Session, dataset_id: str, index_struct: dict) -> None:
+    session.add(
+        Dataset(
+            id=dataset_id,
+            tenant_id="tenant-1",
+            name=dataset_id,
+            created_by="account-1",
+            index_struct=json.dumps(index_struct),
+        )
+    )
+    session.commit()
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_records_index_type_only_for_indexed_collections(monkeypatch: pytest.MonkeyPatch, sqlite_session: Session):
+    dataset_ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(1, 4)]
+    _persist_dataset(sqlite_session, dataset_ids[0], {"type": "pgvector", "vector_store": {"class_prefix": "Large"}})
+    _persist_dataset(sqlite_session, dataset_ids[1], {"type": "pgvector", "vector_store": {"class_prefix": "Huge"}})
+    _persist_dataset(
+        sqlite_session,
+        dataset_ids[2],
+        {"type": "pgvector", "vector_store": {"class_prefix": "Current", "index_type": "halfvec"}},
+    )
+    vector = MagicMock()
+    vector.migrate_vector_index.side_effect = [True, False]
+    vector_cls = MagicMock(return_value=vector)
+    monkeypatch.setattr(pgvector_module, "PGVector", vector_cls)
+
+    result = CliRunner().invoke(vector_commands.migrate_pgvector_vector_index, ["--index-type", "halfvec"])
+
+    assert result.exit_code == 0, result.output
+    assert "migrated 1, skipped 2, failed 0" in result.output
+    assert [call.args[0] for call in vector_cls.call_args_list] == ["Large", "Huge"]
+    assert vector.pool.closeall.call_count == 2
+    sqlite_session.expire_all()
+    migrated = sqlite_session.get(Dataset, dataset_ids[0])
+    too_large = sqlite_session.get(Dataset, dataset_ids[1])
+    assert migrated is not None
+    assert too_large is not None
+    assert migrated.index_struct_dict["vector_store"]["index_type"] == "halfvec"
+    assert "index_type" not in too_large.index_struct_dict["vector_store"]
+
+
+@pytest.mark.usefixtures("command_engine")
+def test_requires_a_quantized_index_type(monkeypatch: pytest.MonkeyPatch, config_overrides):
+    config_overrides(PGVECTOR_INDEX_TYPE="vector")
+    vector_cls = MagicMock()
+    monkeypatch.setattr(pgvector_module, "PGVector", vector_cls)
+
+    result = CliRunner().invoke(vector_commands.migrate_pgvector_vector_index, [])
+
+    assert "Specify --index-type" in result.output
+    vector_cls.assert_not_called()
@@ -582,12 +582,14 @@ class TestBaseAppGeneratorExtras:
         def _gen():
             yield {"delta": "hi"}
             yield "ping"
+            yield b'{"event": "text_chunk"}'
 
         converted = list(base_app_generator.convert_to_event_stream(_gen()))
 
         assert converted[0].startswith("data: ")
         assert "\n\n" in converted[0]
         assert converted[1] == "event: ping\n\n"
+        assert converted[2] == b'data: {"event": "text_chunk"}\n\n'
 
     def test_get_draft_var_saver_factory_debugger(self):
         from core.app.entities.app_invoke_entities import InvokeFrom
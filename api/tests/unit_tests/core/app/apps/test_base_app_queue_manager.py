@@ -6,7 +6,7 @@ import pytest
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.apps.execution_coordinator import AppExecutionState
 from core.app.entities.app_invoke_entities import InvokeFrom
-from core.app.entities.queue_entities import QueueErrorEvent
+from core.app.entities.queue_entities import QueueErrorEvent, QueueTextChunkEvent, QueueWorkflowSucceededEvent
 from models import Tenant
 
 
@@ -62,6 +62,36 @@ class TestBaseAppQueueManager:
         with pytest.raises(TypeError):
             manager._check_for_sqlalchemy_models(bad)
 
+    def test_publish_checks_top_level_fields_and_nested_values_only_in_debug(self, config_overrides):
+        with patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis:
+            mock_redis.setex.return_value = True
+            manager = DummyQueueManager(task_id="t1", user_id="u1", invoke_from=InvokeFrom.SERVICE_API)
+        nested = QueueWorkflowSucceededEvent(outputs={"tenant": Tenant(name="Nested ORM model")})
+
+        config_overrides(DEBUG=False)
+        with pytest.raises(TypeError):
+            manager.publish(QueueErrorEvent(error=Tenant(name="Queued ORM model")), PublishFrom.TASK_PIPELINE)
+        manager.publish(nested, PublishFrom.TASK_PIPELINE)
+
+        config_overrides(DEBUG=True)
+        with pytest.raises(TypeError):
+            manager.publish(nested, PublishFrom.TASK_PIPELINE)
+        assert len(manager.published) == 1
+
+    def test_listen_checks_stop_flag_on_a_schedule_instead_of_per_message(self):
+        with patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis:
+            mock_redis.setex.return_value = True
+            mock_redis.get.return_value = None
+            manager = DummyQueueManager(task_id="t1", user_id="u1", invoke_from=InvokeFrom.SERVICE_API)
+            for index in range(100):
+                manager._q.put(SimpleNamespace(event=QueueTextChunkEvent(text=str(index))))
+            manager.stop_listen(execution_state=AppExecutionState.TERMINAL)
+
+            messages = list(manager.listen())
+
+        assert len(messages) == 100
+        mock_redis.get.assert_not_called()
+
     def test_completed_listener_defers_graph_runtime_state_cleanup_until_listener_exits(self):
         with (
             patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis,
@@ -70,6 +70,7 @@ class TestMessageGenerator:
             ping_interval=2,
             on_subscribe=None,
             terminal_events=[StreamEvent.WORKFLOW_FINISHED.value],
+            raw=True,
         )
 
     def test_retrieve_events_uses_prepared_subscription_capability(self):
@@ -87,5 +88,6 @@ class TestMessageGenerator:
             ping_interval=10.0,
             on_subscribe=None,
             terminal_events=None,
+            raw=True,
         )
         assert list(events) == []
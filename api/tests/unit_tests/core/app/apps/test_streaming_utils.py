@@ -126,7 +126,7 @@ def test_retrieve_events_falls_back_to_subscribe_and_invokes_hook_after_entry(mo
     assert topic.subscribed is False
     assert next(generator) == StreamEvent.PING.value
     event = next(generator)
-    assert event["event"] == StreamEvent.WORKFLOW_FINISHED.value
+    assert json.loads(event)["event"] == StreamEvent.WORKFLOW_FINISHED.value
     with pytest.raises(StopIteration):
         next(generator)
 
@@ -150,9 +150,10 @@ def test_retrieve_events_prepares_capable_topic_before_generator_iteration(monke
     assert topic.subscribe_calls == 0
     assert topic.subscribed is False
 
-    topic.publish(json.dumps({"event": StreamEvent.WORKFLOW_FINISHED.value}).encode())
+    payload = json.dumps({"event": StreamEvent.WORKFLOW_FINISHED.value}).encode()
+    topic.publish(payload)
     assert next(generator) == StreamEvent.PING.value
-    assert next(generator)["event"] == StreamEvent.WORKFLOW_FINISHED.value
+    assert next(generator) == payload
 
 
 def test_retrieve_events_propagates_preparation_error_before_generator_iteration(monkeypatch: pytest.MonkeyPatch):
@@ -220,3 +221,29 @@ def test_stream_topic_events_can_continue_past_pause():
     assert next(generator)["event"] == StreamEvent.WORKFLOW_FINISHED.value
     with pytest.raises(StopIteration):
         next(generator)
+
+
+def test_stream_topic_events_relays_raw_json_objects():
+    topic = FakeTopic()
+    message = json.dumps({"event": "text_chunk", "data": {"text": '"event": "workflow_finished"'}}).encode()
+    reordered = json.dumps({"task_id": "t", "event": StreamEvent.WORKFLOW_PAUSED.value}).encode()
+    finished = json.dumps({"event": StreamEvent.WORKFLOW_FINISHED.value, "task_id": "t"}).encode()
+    for payload in (json.dumps(StreamEvent.PING.value).encode(), message, reordered, finished, message):
+        topic.publish(payload)
+
+    events = list(
+        stream_topic_events(
+            subscription=topic.subscribe(),
+            idle_timeout=1.0,
+            terminal_events=[StreamEvent.WORKFLOW_FINISHED.value],
+            raw=True,
+        )
+    )
+
+    assert events == [
+        StreamEvent.PING.value,
+        StreamEvent.PING.value,
+        message,
+        {"task_id": "t", "event": StreamEvent.WORKFLOW_PAUSED.value},
+        finished,
+    ]
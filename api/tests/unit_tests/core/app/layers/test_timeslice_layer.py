@@ -4,7 +4,9 @@ from unittest.mock import Mock, patch
 import pytest
 
 from core.app.layers.timeslice_layer import TimeSliceLayer
+from graphon.entities.pause_reason import HitlRequired, SchedulingPause
 from graphon.graph_engine.entities.commands import CommandType, GraphEngineCommand
+from graphon.graph_events import GraphRunPausedEvent
 from services.workflow.entities import WorkflowScheduleCFSPlanEntity
 from services.workflow.scheduler import SchedulerCommand
 
@@ -97,3 +99,27 @@ class TestTimeSliceLayer:
         sent_command = layer.command_channel.send_command.call_args[0][0]
         assert isinstance(sent_command, GraphEngineCommand)
         assert sent_command.command_type == CommandType.PAUSE
+
+    @pytest.mark.parametrize(
+        ("reasons", "expected_run_id"),
+        [
+            ([SchedulingPause(message=SchedulerCommand.RESOURCE_LIMIT_REACHED)], "run-1"),
+            ([HitlRequired(session_id="s", node_id="n", node_title="Human")], None),
+        ],
+    )
+    def test_on_graph_end_hands_scheduler_pauses_back_to_the_scheduler(self, reasons, expected_run_id):
+        scheduler = Mock()
+        scheduler.running = True
+        cfs_plan_scheduler = Mock(plan=Mock())
+
+        with (
+            patch("core.app.layers.timeslice_layer.TimeSliceLayer.scheduler", scheduler),
+            patch("core.app.layers.timeslice_layer.get_system_text", return_value="run-1"),
+        ):
+            layer = TimeSliceLayer(cfs_plan_scheduler=cfs_plan_scheduler)
+            layer._graph_runtime_state = Mock()
+            layer.preempted = True
+            layer.on_event(GraphRunPausedEvent(reasons=reasons))
+            layer.on_graph_end(None)
+
+        cfs_plan_scheduler.on_run_end.assert_called_once_with(expected_run_id)
@@ -43,6 +43,7 @@ class _RepoRecorder:
         self.synchronously_saved: list[object] = []
         self.saved_exec_data: list[object] = []
         self.loaded: list[object] = []
+        self.flush_count = 0
 
     def save(self, entity):
         self.saved.append(entity)
@@ -53,6 +54,9 @@ class _RepoRecorder:
     def save_execution_data(self, entity):
         self.saved_exec_data.append(entity)
 
+    def flush(self):
+        self.flush_count += 1
+
     def get_by_workflow_execution(self, _workflow_execution_id):
         return self.loaded
 
@@ -205,7 +209,7 @@ class TestWorkflowPersistenceLayer:
         assert layer._next_node_sequence() == 5
 
     def test_handle_graph_run_succeeded_updates_execution(self):
-        layer, exec_repo, _, runtime_state = _make_layer()
+        layer, exec_repo, node_repo, runtime_state = _make_layer()
         layer._handle_graph_run_started()
         usage = LLMUsage.empty_usage()
         usage.total_tokens = 3
@@ -220,6 +224,7 @@ class TestWorkflowPersistenceLayer:
         assert saved.status == WorkflowExecutionStatus.SUCCEEDED
         assert saved.total_tokens == 3
         assert saved.total_steps == 2
+        assert node_repo.flush_count == 1
 
     def test_handle_graph_run_partial_succeeded_updates_execution(self):
         layer, exec_repo, _, runtime_state = _make_layer()
@@ -633,10 +638,11 @@ class TestWorkflowPersistenceLayer:
         assert layer._next_node_sequence() == 1
         assert layer._next_node_sequence() == 2
 
-    def test_on_graph_end_is_noop(self):
-        layer, _, _, _ = _make_layer()
+    def test_on_graph_end_flushes_node_executions(self):
+        layer, _, node_repo, _ = _make_layer()
 
         assert layer.on_graph_end(error=None) is None
+        assert node_repo.flush_count == 1
 
     def test_on_event_dispatches_to_all_known_handlers(self):
         layer, _, _, _ = _make_layer()
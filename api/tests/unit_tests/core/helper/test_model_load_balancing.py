@@ -0,0 +1,259 @@
+import random
+from collections.abc import Callable, Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+import core.helper.model_load_balancing as lb_module
+from core.entities.provider_entities import ModelLoadBalancingConfiguration
+from core.helper.model_load_balancing import (
+    LoadBalancingStrategy,
+    ModelLBHealthStore,
+    clear_model_lb_health_cache,
+    get_load_balancing_policy,
+)
+from core.model_manager import LBModelManager
+from graphon.model_runtime.entities.model_entities import ModelType
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self._commands: list[Callable[[], object]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        command = getattr(self._redis, name)
+
+        def queue(*args: object, **kwargs: object) -> None:
+            self._commands.append(lambda: command(*args, **kwargs))
+
+        return queue
+
+    def execute(self) -> list[object]:
+        return [command() for command in self._commands]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self.hgetall_calls = 0
+        self.now = 1000.0
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        self.hgetall_calls += 1
+        return {field.encode(): value.encode() for field, value in self.hashes.get(key, {}).items()}
+
+    def hset(self, key: str, *, mapping: dict[str, float]) -> None:
+        self.hashes.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+
+    def expire(self, key: str, seconds: int) -> None:
+        pass
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key: str, *members: str) -> None:
+        for member in members:
+            self.sorted_sets.get(key, {}).pop(member, None)
+
+    def zremrangebyscore(self, key: str, _min: str, max: float) -> None:
+        members = self.sorted_sets.get(key, {})
+        for member in [member for member, score in members.items() if score <= max]:
+            del members[member]
+
+    def zrange(self, key: str, start: int, end: int) -> list[bytes]:
+        return [member.encode() for member in self.sorted_sets.get(key, {})]
+
+    def eval(self, script: str, numkeys: int, key: str, *args: object) -> list[str]:
+        # Emulates _CONSUME_TOKEN_LUA.
+        tokens_field, updated_at_field, capacity, rate, _ = args
+        fields = self.hashes.setdefault(key, {})
+        if tokens_field in fields and updated_at_field in fields:
+            elapsed = max(0.0, self.now - float(fields[updated_at_field]))
+            tokens = min(float(capacity), float(fields[tokens_field]) + elapsed * float(rate))
+        else:
+            tokens = float(capacity)
+        fields[tokens_field] = str(tokens - 1)
+        fields[updated_at_field] = str(self.now)
+        return [fields[tokens_field], fields[updated_at_field]]
+
+    def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    def pipeline(self, **_: bool) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+_HEALTH_KEY = "model_lb_health:tenant-1:openai:llm:gpt-4"
+_OUTSTANDING_KEY = "model_lb_outstanding:tenant-1:openai:llm:gpt-4"
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> Iterator[_FakeRedis]:
+    redis = _FakeRedis()
+    monkeypatch.setattr(lb_module, "redis_client", redis)
+    clear_model_lb_health_cache()
+    yield redis
+    clear_model_lb_health_cache()
+
+
+def _configs(*config_ids: str) -> list[ModelLoadBalancingConfiguration]:
+    return [
+        ModelLoadBalancingConfiguration(id=config_id, name=config_id, credentials={"api_key": config_id})
+        for config_id in config_ids
+    ]
+
+
+def _manager(configs: list[ModelLoadBalancingConfiguration]) -> LBModelManager:
+    return LBModelManager(
+        tenant_id="tenant-1", provider="openai", model_type=ModelType.LLM, model="gpt-4", load_balancing_configs=configs
+    )
+
+
+def _store() -> ModelLBHealthStore:
+    return ModelLBHealthStore("tenant-1", "openai", ModelType.LLM, "gpt-4")
+
+
+def test_health_hash_is_read_once_per_cache_ttl(fake_redis: _FakeRedis):
+    manager = _manager(_configs("a", "b", "c"))
+
+    for _ in range(5):
+        manager.fetch_next()
+
+    assert fake_redis.hgetall_calls == 1
+
+
+def test_cooldown_is_shared_through_one_hash(fake_redis: _FakeRedis):
+    configs = _configs("a", "b")
+    _manager(configs).cooldown(configs[0], expire=60)
+    clear_model_lb_health_cache()
+
+    other_manager = _manager(_configs("a", "b"))
+    in_cooldown, ttl = LBModelManager.get_config_in_cooldown_and_ttl("tenant-1", "openai", ModelType.LLM, "gpt-4", "a")
+
+    assert list(fake_redis.hashes[_HEALTH_KEY]) == ["a:cooldown_until"]
+    assert [other_manager.fetch_next().id for _ in range(3)] == ["b", "b", "b"]
+    assert in_cooldown is True
+    assert 0 < ttl <= 60
+    assert LBModelManager.get_config_in_cooldown_and_ttl("tenant-1", "openai", ModelType.LLM, "gpt-4", "b") == (
+        False,
+        0,
+    )
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_all_configs_in_cooldown_returns_none():
+    configs = _configs("a", "b")
+    manager = _manager(configs)
+    for config in configs:
+        manager.cooldown(config, expire=10)
+
+    assert manager.fetch_next() is None
+
+
+def test_least_outstanding_tracks_in_flight_requests_including_streams(fake_redis: _FakeRedis, config_overrides):
+    config_overrides(MODEL_LB_STRATEGY="least_outstanding")
+    manager = _manager(_configs("a", "b"))
+
+    first = manager.fetch_next()
+    assert first is not None
+    stream = manager.invoke(first, lambda: (chunk for chunk in ["x", "y"]))
+    second = manager.fetch_next()
+    assert second is not None
+
+    def in_flight(config_id: str) -> int:
+        return sum(member.startswith(f"{config_id}:") for member in fake_redis.sorted_sets.get(_OUTSTANDING_KEY, {}))
+
+    assert second.id != first.id
+    assert in_flight(first.id) == 1
+    assert list(stream) == ["x", "y"]
+    assert in_flight(first.id) == 0
+
+    with pytest.raises(ValueError):
+        manager.invoke(second, MagicMock(side_effect=ValueError("boom")))
+    assert in_flight(second.id) == 0
+
+
+def test_requests_of_dead_workers_stop_counting_as_outstanding(
+    fake_redis: _FakeRedis, config_overrides, monkeypatch: pytest.MonkeyPatch
+):
+    config_overrides(MODEL_LB_OUTSTANDING_MAX_AGE=60, MODEL_LB_HEALTH_CACHE_TTL=0)
+    store = _store()
+    monkeypatch.setattr(lb_module.time, "time", lambda: 1000.0)
+    store.record_started("a")
+    store.record_started("a")
+    assert store.snapshot()["a"].outstanding == 2
+
+    # the workers died without calling record_finished
+    monkeypatch.setattr(lb_module.time, "time", lambda: 1100.0)
+    store.record_started("a")
+
+    assert store.snapshot()["a"].outstanding == 1
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_latency_weighted_prefers_the_faster_config(config_overrides):
+    config_overrides(MODEL_LB_STRATEGY="latency_weighted", MODEL_LB_LATENCY_EWMA_ALPHA=1.0)
+    configs = _configs("slow", "fast")
+    store = _store()
+    store.record_finished("slow", latency=5.0, track_outstanding=False)
+    store.record_finished("fast", latency=0.05, track_outstanding=False)
+    random.seed(0)
+
+    picks = [_manager(configs).fetch_next().id for _ in range(50)]
+
+    assert picks.count("fast") >= 45
+    assert store.config_health("fast").latency == pytest.approx(0.05)
+
+
+def test_token_bucket_moves_traffic_off_an_exhausted_config(fake_redis: _FakeRedis, config_overrides):
+    config_overrides(MODEL_LB_STRATEGY="token_bucket", MODEL_LB_TOKEN_BUCKET_CAPACITY=2.0)
+    manager = _manager(_configs("a", "b"))
+
+    picks = [manager.fetch_next().id for _ in range(4)]
+
+    assert sorted(picks) == ["a", "a", "b", "b"]
+    assert float(fake_redis.hashes[_HEALTH_KEY]["a:tokens"]) < 1
+
+
+def test_token_bucket_is_shared_by_workers_with_stale_snapshots(fake_redis: _FakeRedis, config_overrides):
+    config_overrides(MODEL_LB_TOKEN_BUCKET_CAPACITY=3.0, MODEL_LB_TOKEN_BUCKET_REFILL_RATE=0.001)
+    first, second = _store(), _store()
+    first.snapshot()
+    second.snapshot()
+
+    for store in (first, second, first):
+        store.consume_token("a")
+
+    assert float(fake_redis.hashes[_HEALTH_KEY]["a:tokens"]) == pytest.approx(0.0)
+
+
+def test_round_robin_rotates_through_configs(fake_redis: _FakeRedis):
+    manager = _manager(_configs("a", "b", "c"))
+
+    assert [manager.fetch_next().id for _ in range(4)] == ["a", "b", "c", "a"]
+    assert fake_redis.counters == {"model_lb_index:tenant-1:openai:llm:gpt-4": 4}
+
+
+def test_redis_failure_treats_every_config_as_healthy(monkeypatch: pytest.MonkeyPatch):
+    failing_redis = MagicMock()
+    failing_redis.hgetall.side_effect = RuntimeError("redis down")
+    failing_redis.pipeline.side_effect = RuntimeError("redis down")
+    monkeypatch.setattr(lb_module, "redis_client", failing_redis)
+    clear_model_lb_health_cache()
+    store = _store()
+
+    store.cooldown("a", 60)
+    clear_model_lb_health_cache()
+
+    assert store.snapshot() == {}
+    assert store.cooldown_remaining("a") == 0.0
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        get_load_balancing_policy("random")
+    assert get_load_balancing_policy(LoadBalancingStrategy.ROUND_ROBIN).consumes_tokens is False
@@ -12,6 +12,7 @@ from sqlalchemy import Engine, event
 from sqlalchemy.orm import Session
 
 import models.model as model_module
+from constants import UUID_NIL
 from core.memory import token_buffer_memory as memory_module
 from core.memory.token_buffer_memory import TokenBufferMemory
 from graphon.file import FileTransferMethod, FileType
@@ -163,9 +164,11 @@ def _persist_message(
     answer_tokens: int = 5,
     created_at: datetime | None = None,
     workflow_run_id: str | None = None,
+    parent_message_id: str | None = None,
 ) -> Message:
     message = Message(
         id=str(uuid4()),
+        parent_message_id=parent_message_id,
         app_id="app-1",
         conversation_id=conversation_id,
         _inputs={},
@@ -185,6 +188,24 @@ def _persist_message(
     return message
 
 
+def _persist_thread(database: Database, conversation_id: str, count: int) -> list[Message]:
+    """Persist ``count`` chained messages, oldest first, with distinct creation times."""
+    base_time = datetime.now(UTC).replace(tzinfo=None)
+    messages: list[Message] = []
+    for index in range(count):
+        messages.append(
+            _persist_message(
+                database,
+                conversation_id,
+                query=f"query-{index}",
+                answer=f"answer-{index}",
+                created_at=base_time + timedelta(seconds=index),
+                parent_message_id=messages[-1].id if messages else None,
+            )
+        )
+    return messages
+
+
 def _persist_message_file(
     database: Database,
     message: Message,
@@ -686,7 +707,7 @@ class TestGetHistoryPromptMessages:
 
     @pytest.mark.parametrize(
         ("message_limit", "expected_limit"),
-        [(None, 500), (9999, 500), (10, 10), (0, 500)],
+        [(None, 50), (9999, 50), (10, 10), (0, 50)],
     )
     def test_message_limit_is_applied_to_executable_query(
         self,
@@ -737,34 +758,111 @@ class TestGetHistoryPromptMessages:
         assert built_prompt in result
 
     def test_message_files_are_batch_loaded_with_constant_query_count(self, database: Database) -> None:
+        mem = self._make_memory(database)
+        _persist_thread(database, mem.conversation.id, 5)
+        before = len(database.statements)
+
+        result = mem.get_history_prompt_messages()
+
+        selects = [sql for sql, _ in database.statements[before:] if sql.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 4
+        assert sum("FROM apps" in sql for sql in selects) == 1
+        assert len(result) == 10
+
+    def test_older_pages_are_fetched_until_message_limit(self, database: Database) -> None:
+        mem = self._make_memory(database)
+        _persist_thread(database, mem.conversation.id, 60)
+        mem.model_instance.get_llm_num_tokens.return_value = 1
+        before = len(database.statements)
+
+        result = mem.get_history_prompt_messages(max_token_limit=10_000, message_limit=55)
+
+        message_queries = [entry for entry in database.statements[before:] if "FROM messages" in entry[0]]
+        assert len(message_queries) == 2
+        assert len(result) == 110
+        assert result[-1].content == "answer-59"
+        assert result[0].content == "query-5"
+
+    def test_history_within_budget_is_counted_once(self, database: Database) -> None:
+        mem = self._make_memory(database)
+        _persist_thread(database, mem.conversation.id, 60)
+
+        result = mem.get_history_prompt_messages(max_token_limit=10_000)
+
+        assert len(result) == 120
+        mem.model_instance.get_llm_num_tokens.assert_called_once_with(result)
+
+    def test_history_over_budget_is_counted_per_message_until_the_budget_is_used(self, database: Database) -> None:
+        mem = self._make_memory(database)
+        mem.model_instance.get_llm_num_tokens.side_effect = lambda prompt_messages: 100 * len(prompt_messages)
+        _persist_thread(database, mem.conversation.id, 60)
+
+        result = mem.get_history_prompt_messages(max_token_limit=350)
+
+        assert [prompt.content for prompt in result] == ["answer-58", "query-59", "answer-59"]
+        counted = [call.args[0] for call in mem.model_instance.get_llm_num_tokens.call_args_list]
+        # One count over the whole history, then one per prompt message of the two newest turns.
+        assert [len(prompt_messages) for prompt_messages in counted] == [120, 1, 1, 1, 1]
+
+    def test_pages_do_not_repeat_messages_created_while_reading(self, database: Database) -> None:
         mem = self._make_memory(database)
         base_time = datetime.now(UTC).replace(tzinfo=None)
-        messages = [
+        for index in range(60):
             _persist_message(
                 database,
                 mem.conversation.id,
                 query=f"query-{index}",
                 answer=f"answer-{index}",
                 created_at=base_time + timedelta(seconds=index),
+                parent_message_id=UUID_NIL,
             )
-            for index in range(5)
-        ]
-        before = len(database.statements)
-
-        with patch("core.memory.token_buffer_memory.extract_thread_messages", return_value=messages):
-            result = mem.get_history_prompt_messages()
-
-        selects = [sql for sql, _ in database.statements[before:] if sql.lstrip().upper().startswith("SELECT")]
-        assert len(selects) == 4
-        assert sum("FROM apps" in sql for sql in selects) == 1
-        assert len(result) == 10
+        build_turns = mem._build_history_turns
+        pages: list[int] = []
+
+        def build_turns_then_receive_a_message(messages, app_record):
+            if not pages:
+                _persist_message(
+                    database, mem.conversation.id, answer="late", created_at=base_time + timedelta(minutes=5)
+                )
+            pages.append(len(messages))
+            return build_turns(messages, app_record)
+
+        with patch.object(mem, "_build_history_turns", side_effect=build_turns_then_receive_a_message):
+            result = mem.get_history_prompt_messages(max_token_limit=10_000)
+
+        contents = [prompt.content for prompt in result]
+        assert pages == [50, 10]
+        assert len(contents) == len(set(contents)) == 120
+        assert "late" not in contents
+
+    def test_token_counts_are_cached_per_message_and_model(self, database: Database) -> None:
+        mem = self._make_memory(database)
+        mem.model_instance.provider = "openai"
+        mem.model_instance.model_name = "gpt-4o"
+        mem.model_instance.get_llm_num_tokens.side_effect = lambda prompt_messages: 100 * len(prompt_messages)
+        _persist_thread(database, mem.conversation.id, 3)
+        cache: dict[str, bytes] = {}
+        fake_redis = MagicMock()
+        fake_redis.mget.side_effect = lambda keys: [cache.get(key) for key in keys]
+        pipe = fake_redis.pipeline.return_value
+        pipe.setex.side_effect = lambda key, _ttl, value: cache.__setitem__(key, value.encode())
+
+        with patch.object(memory_module, "redis_client", fake_redis):
+            first = mem.get_history_prompt_messages(max_token_limit=350)
+            second = mem.get_history_prompt_messages(max_token_limit=350)
+
+        assert first == second
+        # The second read prunes from cached counts alone.
+        assert mem.model_instance.get_llm_num_tokens.call_count == 5
+        assert len(cache) == 2
+        assert all(":openai:gpt-4o:" in key for key in cache)
 
     @pytest.mark.parametrize(
         ("token_values", "max_token_limit", "expected_length"),
         [
-            ([3000, 1500], 2000, 1),
-            ([99999, 99999], 1, 1),
-            ([50], 2000, 2),
+            ([4500, 3000, 1500], 2000, 1),
+            ([99999, 99999, 99999], 1, 1),
+            ([100], 2000, 2),
         ],
     )
     def test_token_pruning_uses_persisted_history(
@@ -82,19 +82,15 @@ UNIFIED_PROVIDER_ENTRY = {
 }
 
 
-class DummyTimer:
-    def __init__(self, interval, function):
-        self.interval = interval
-        self.function = function
-        self.name = ""
-        self.daemon = False
-        self.started = False
-
-    def start(self):
-        self.started = True
+class DummyExporter:
+    def __init__(self):
+        self.queued = 0
 
     def is_alive(self):
-        return False
+        return True
+
+    def task_queued(self):
+        self.queued += 1
 
 
 class EncryptTokenRecorder:
@@ -158,9 +154,8 @@ def trace_environment(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
     monkeypatch.setattr(dify_config, "OPS_TRACE_UNIFIED_ENABLED", False)
     OpsTraceManager.ops_trace_instances_cache.clear()
     OpsTraceManager.decrypted_configs_cache.clear()
-    monkeypatch.setattr(module.threading, "Timer", DummyTimer)
     monkeypatch.setattr(module, "trace_manager_queue", queue.Queue())
-    monkeypatch.setattr(module, "trace_manager_timer", None)
+    monkeypatch.setattr(module, "trace_manager_exporter", DummyExporter())
     monkeypatch.setattr("core.telemetry.gateway.is_enterprise_telemetry_enabled", lambda: False)
 
     app = Flask(__name__)
@@ -711,12 +706,8 @@ def test_trace_queue_collect_run_and_storage_boundary(monkeypatch: pytest.Monkey
     assert dispatcher.payloads == [{"file_id": file_id.hex, "app_id": "app-id"}]
 
 
-def test_trace_queue_persists_with_caller_supplied_file_id(
-    monkeypatch: pytest.MonkeyPatch, trace_environment: None
-) -> None:
-    monkeypatch.setattr(OpsTraceManager, "get_ops_trace_instance", classmethod(lambda cls, _app_id: True))
-    manager = TraceQueueManager(app_id="app-id", user_id="user-1")
-    task = TraceTask(
+def _generate_name_task() -> TraceTask:
+    return TraceTask(
         trace_type=TraceTaskName.GENERATE_NAME_TRACE,
         conversation_id="conversation-1",
         timer={"start": 1, "end": 2},
@@ -724,30 +715,62 @@ def test_trace_queue_persists_with_caller_supplied_file_id(
         generate_conversation_name="name",
         inputs="query",
     )
+
+
+def test_trace_queue_exports_one_batch_per_app(monkeypatch: pytest.MonkeyPatch, trace_environment: None) -> None:
+    monkeypatch.setattr(OpsTraceManager, "get_ops_trace_instance", classmethod(lambda cls, _app_id: True))
+    first_app = TraceQueueManager(app_id="app-1", user_id="user-1")
+    second_app = TraceQueueManager(app_id="app-2", user_id="user-1")
+    for manager in (first_app, second_app, first_app):
+        manager.add_trace_task(_generate_name_task())
+
     recording_storage = RecordingStorage()
+    dispatcher = RecordingDispatcher()
     monkeypatch.setattr(module.storage, "save", recording_storage.save)
+    monkeypatch.setattr(module.process_trace_tasks, "apply_async", dispatcher.apply_async)
+    second_app.run()
 
-    file_info = manager.persist_trace_task(task, file_id="workflow-final-run-1")
-
-    assert file_info == {"file_id": "workflow-final-run-1", "app_id": "app-id"}
-    path, data = recording_storage.writes[0]
-    payload = json.loads(data)
-    assert path == "ops_trace/app-id/workflow-final-run-1.json"
-    assert UUID(payload["trace_info"]["operation_id"])
+    batches = {json.loads(data)["app_id"]: json.loads(data)["traces"] for _, data in recording_storage.writes}
+    assert {app_id: len(traces) for app_id, traces in batches.items()} == {"app-1": 2, "app-2": 1}
+    assert all(UUID(trace["trace_info"]["operation_id"]) for traces in batches.values() for trace in traces)
+    assert sorted(payload["app_id"] for payload in dispatcher.payloads) == ["app-1", "app-2"]
+    assert module.trace_manager_exporter.queued == 3
+    assert module.trace_manager_queue.empty()
 
 
-def test_trace_queue_persistence_error_propagates(monkeypatch: pytest.MonkeyPatch, trace_environment: None) -> None:
+def test_trace_queue_drops_and_counts_when_full(monkeypatch: pytest.MonkeyPatch, trace_environment: None) -> None:
     monkeypatch.setattr(OpsTraceManager, "get_ops_trace_instance", classmethod(lambda cls, _app_id: True))
+    monkeypatch.setattr(module, "trace_manager_queue", queue.Queue(maxsize=1))
+    monkeypatch.setattr(module, "trace_manager_dropped_count", 0)
     manager = TraceQueueManager(app_id="app-id", user_id="user-1")
-    task = TraceTask(trace_type=TraceTaskName.GENERATE_NAME_TRACE)
 
-    def fail_save(_path: str, _data: bytes) -> None:
-        raise OSError("storage unavailable")
+    manager.add_trace_task(_generate_name_task())
+    manager.add_trace_task(_generate_name_task())
+
+    assert module.trace_manager_queue.qsize() == 1
+    assert module.trace_manager_dropped_count == 1
+    assert module.trace_manager_exporter.queued == 1
 
-    monkeypatch.setattr(module.storage, "save", fail_save)
 
-    with pytest.raises(OSError, match="storage unavailable"):
-        manager.persist_trace_task(task, file_id="workflow-final-run-1")
+def test_trace_sampling_uses_app_rate_and_keeps_runs_together(
+    monkeypatch: pytest.MonkeyPatch, trace_environment: None
+) -> None:
+    monkeypatch.setattr(OpsTraceManager, "get_ops_trace_instance", classmethod(lambda cls, _app_id: True))
+    monkeypatch.setattr(dify_config, "OPS_TRACE_SAMPLE_RATE", 0.5)
+    monkeypatch.setattr(dify_config, "inner_OPS_TRACE_APP_SAMPLE_RATES", "muted-app:0,traced-app:1")
+
+    TraceQueueManager(app_id="muted-app").add_trace_task(_generate_name_task())
+    TraceQueueManager(app_id="traced-app").add_trace_task(_generate_name_task())
+    assert [task.app_id for task in TraceQueueManager(app_id="other").collect_tasks()] == ["traced-app"]
+
+    run_tasks = [TraceTask(trace_type=TraceTaskName.WORKFLOW_TRACE, workflow_run_id="run-1") for _ in range(5)]
+    decisions = {module.should_sample_trace("other", task) for task in run_tasks}
+    assert len(decisions) == 1
+    sampled = [
+        module.should_sample_trace("other", TraceTask(trace_type=TraceTaskName.MESSAGE_TRACE, message_id=str(i)))
+        for i in range(1000)
+    ]
+    assert 400 < sum(sampled) < 600
 
 
 def test_trace_queue_enqueue_error_propagates(monkeypatch: pytest.MonkeyPatch, trace_environment: None) -> None:
@@ -0,0 +1,138 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import core.rag.datasource.keyword.jieba.jieba_inverted_index as inverted_index_module
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+from core.rag.models.document import Document
+from models.dataset import Dataset, DatasetKeywordPosting, DocumentSegment
+
+
+@pytest.fixture
+def handler(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    handler = MagicMock()
+    monkeypatch.setattr(inverted_index_module, "JiebaKeywordTableHandler", lambda: handler)
+    return handler
+
+
+def _dataset(dataset_id: str = "dataset-1") -> Dataset:
+    return Dataset(id=dataset_id, tenant_id="tenant-1", keyword_number=3)
+
+
+def _segment(index_node_id: str, content: str = "content") -> DocumentSegment:
+    return DocumentSegment(
+        tenant_id="tenant-1",
+        dataset_id="dataset-1",
+        document_id="doc-1",
+        position=1,
+        content=content,
+        word_count=1,
+        tokens=1,
+        created_by="user-1",
+        enabled=True,
+        keywords=[],
+        answer=None,
+        index_node_id=index_node_id,
+        index_node_hash=f"hash-{index_node_id}",
+        status="completed",
+    )
+
+
+def _postings(session: Session, dataset_id: str = "dataset-1") -> set[tuple[str, str]]:
+    rows = session.execute(
+        select(DatasetKeywordPosting.keyword, DatasetKeywordPosting.index_node_id).where(
+            DatasetKeywordPosting.dataset_id == dataset_id
+        )
+    ).tuples()
+    return set(rows)
+
+
+def test_add_texts_writes_postings_and_segment_keywords(sqlite_session: Session, handler: MagicMock):
+    sqlite_session.add(_segment("node-1"))
+    sqlite_session.flush()
+    handler.extract_keywords.return_value = {"auto"}
+    index = JiebaInvertedIndex(_dataset())
+
+    index.add_texts(
+        [
+            Document(page_content="alpha", metadata={"doc_id": "node-1"}),
+            Document(page_content="beta", metadata={"doc_id": "node-2"}),
+        ],
+        sqlite_session,
+        keywords_list=[[], ["manual", "manual", "x" * 256]],
+    )
+
+    assert _postings(sqlite_session) == {("auto", "node-1"), ("manual", "node-2")}
+    segment = sqlite_session.scalar(select(DocumentSegment).where(DocumentSegment.index_node_id == "node-1"))
+    assert segment is not None
+    assert segment.keywords == ["auto"]
+
+
+def test_add_texts_replaces_previous_postings_of_the_node(sqlite_session: Session, handler: MagicMock):
+    index = JiebaInvertedIndex(_dataset())
+    handler.extract_keywords.return_value = {"old"}
+    index.add_texts([Document(page_content="v1", metadata={"doc_id": "node-1"})], sqlite_session)
+    handler.extract_keywords.return_value = {"new"}
+
+    index.add_texts([Document(page_content="v2", metadata={"doc_id": "node-1"})], sqlite_session)
+
+    assert _postings(sqlite_session) == {("new", "node-1")}
+
+
+def test_delete_by_ids_only_touches_the_given_nodes(sqlite_session: Session):
+    index = JiebaInvertedIndex(_dataset())
+    index.rebuild_from_keyword_table({"a": {"node-1", "node-2"}, "b": {"node-2"}}, sqlite_session)
+    JiebaInvertedIndex(_dataset("dataset-2")).rebuild_from_keyword_table({"a": {"node-2"}}, sqlite_session)
+
+    index.delete_by_ids(["node-2"], sqlite_session)
+
+    assert _postings(sqlite_session) == {("a", "node-1")}
+    assert _postings(sqlite_session, "dataset-2") == {("a", "node-2")}
+    assert index.text_exists("node-1", session=sqlite_session) is True
+    assert index.text_exists("node-2", session=sqlite_session) is False
+
+
+def test_search_ranks_nodes_by_matching_keywords(sqlite_session: Session, handler: MagicMock):
+    for node_id in ("node-1", "node-2", "node-3"):
+        sqlite_session.add(_segment(node_id, content=f"content of {node_id}"))
+    index = JiebaInvertedIndex(_dataset())
+    index.rebuild_from_keyword_table(
+        {"a": {"node-1", "node-2", "node-3"}, "b": {"node-2", "node-3"}, "c": {"node-3"}}, sqlite_session
+    )
+    sqlite_session.flush()
+    handler.extract_keywords.return_value = {"a", "b", "c", "unknown"}
+
+    documents = index.search("query", session=sqlite_session, top_k=2)
+
+    assert [document.metadata["doc_id"] for document in documents] == ["node-3", "node-2"]
+    assert documents[0].page_content == "content of node-3"
+
+
+def test_update_segment_keywords_index_keeps_existing_postings(sqlite_session: Session):
+    index = JiebaInvertedIndex(_dataset())
+    index.rebuild_from_keyword_table({"a": {"node-1"}}, sqlite_session)
+
+    index.update_segment_keywords_index("node-1", ["a", "b"], sqlite_session)
+
+    assert _postings(sqlite_session) == {("a", "node-1"), ("b", "node-1")}
+
+
+def test_insert_postings_skips_postings_that_already_exist(sqlite_session: Session):
+    index = JiebaInvertedIndex(_dataset())
+    index.rebuild_from_keyword_table({"a": {"node-1"}}, sqlite_session)
+
+    # A concurrent writer may have inserted the same posting since this worker read the node's keywords.
+    index._insert_postings({"node-1": ["a", "b"]}, sqlite_session)
+
+    assert _postings(sqlite_session) == {("a", "node-1"), ("b", "node-1")}
+
+
+def test_delete_removes_all_postings_of_the_dataset(sqlite_session: Session):
+    index = JiebaInvertedIndex(_dataset())
+    index.rebuild_from_keyword_table({"a": {"node-1"}, "b": {"node-2"}}, sqlite_session)
+
+    index.delete(session=sqlite_session)
+
+    assert _postings(sqlite_session) == set()
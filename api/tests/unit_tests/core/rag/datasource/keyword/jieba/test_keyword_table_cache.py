@@ -0,0 +1,95 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import core.rag.datasource.keyword.jieba.keyword_table_cache as cache_module
+from core.rag.datasource.keyword.jieba.keyword_table_cache import (
+    bump_keyword_table_version,
+    bump_keyword_table_version_after_commit,
+    clear_keyword_table_cache,
+    load_keyword_table_snapshot,
+)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return str(self.values[key]).encode() if key in self.values else None
+
+    def setnx(self, key: str, value: int) -> None:
+        self.values.setdefault(key, value)
+
+    def incr(self, key: str) -> None:
+        self.values[key] = self.values.get(key, 0) + 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> Iterator[_FakeRedis]:
+    redis = _FakeRedis()
+    monkeypatch.setattr(cache_module, "redis_client", redis)
+    clear_keyword_table_cache()
+    yield redis
+    clear_keyword_table_cache()
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_snapshot_is_reused_until_the_version_is_bumped():
+    loader = MagicMock(return_value={"kw": {"node-1"}})
+
+    first = load_keyword_table_snapshot("dataset-1", loader)
+    second = load_keyword_table_snapshot("dataset-1", loader)
+    assert first is second
+    assert loader.call_count == 1
+    assert first is not None
+    assert first.node_ids == {"node-1"}
+
+    bump_keyword_table_version("dataset-1")
+    load_keyword_table_snapshot("dataset-1", loader)
+    assert loader.call_count == 2
+
+
+def test_version_bumped_by_another_process_invalidates_the_snapshot(fake_redis: _FakeRedis):
+    loader = MagicMock(return_value={"kw": {"node-1"}})
+    load_keyword_table_snapshot("dataset-1", loader)
+
+    fake_redis.incr("keyword_table_version:dataset-1")
+    load_keyword_table_snapshot("dataset-1", loader)
+
+    assert loader.call_count == 2
+
+
+def test_cache_is_bypassed_when_disabled_or_redis_fails(monkeypatch: pytest.MonkeyPatch, config_overrides):
+    clear_keyword_table_cache()
+    failing_redis = MagicMock()
+    failing_redis.get.side_effect = RuntimeError("redis down")
+    monkeypatch.setattr(cache_module, "redis_client", failing_redis)
+    loader = MagicMock(return_value={"kw": {"node-1"}})
+
+    load_keyword_table_snapshot("dataset-1", loader)
+    load_keyword_table_snapshot("dataset-1", loader)
+    assert loader.call_count == 2
+
+    config_overrides(KEYWORD_TABLE_CACHE_MAX_DATASETS=0)
+    load_keyword_table_snapshot("dataset-1", loader)
+    assert loader.call_count == 3
+    failing_redis.get.assert_called()
+
+
+def test_after_commit_bump_waits_for_commit_and_is_dropped_on_rollback(fake_redis: _FakeRedis, sqlite_session: Session):
+    bump_keyword_table_version_after_commit(sqlite_session, "dataset-1")
+    bump_keyword_table_version_after_commit(sqlite_session, "dataset-1")
+    assert fake_redis.values == {}
+
+    sqlite_session.commit()
+    assert fake_redis.values == {"keyword_table_version:dataset-1": 1}
+
+    sqlite_session.execute(select(1))
+    bump_keyword_table_version_after_commit(sqlite_session, "dataset-1")
+    sqlite_session.rollback()
+    sqlite_session.commit()
+    assert fake_redis.values == {"keyword_table_version:dataset-1": 1}
@@ -23,6 +23,12 @@ def test_get_keyword_factory_returns_jieba_factory(monkeypatch: pytest.MonkeyPat
     assert Keyword.get_keyword_factory(KeyWordType.JIEBA) is FakeJieba
 
 
+def test_get_keyword_factory_returns_inverted_index_factory():
+    from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+
+    assert Keyword.get_keyword_factory(KeyWordType.JIEBA_INVERTED) is JiebaInvertedIndex
+
+
 def test_get_keyword_factory_raises_for_unsupported_type():
     with pytest.raises(ValueError, match="Keyword store unsupported is not supported"):
         Keyword.get_keyword_factory("unsupported")
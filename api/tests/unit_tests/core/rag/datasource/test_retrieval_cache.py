@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from core.rag.datasource import retrieval_cache
+from core.rag.datasource import retrieval_service as retrieval_service_module
+from core.rag.datasource.retrieval_cache import (
+    bump_dataset_retrieval_version,
+    load_cached_retrieval,
+    retrieval_cache_key,
+    retrieval_cache_stats,
+    save_cached_retrieval,
+)
+from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.index_processor.constant.doc_type import DocType
+from core.rag.models.document import Document
+from core.rag.retrieval.retrieval_methods import RetrievalMethod
+from models.dataset import ChildChunk, Dataset, DocumentSegment, DocumentSegmentSummary
+
+DATASET_ID = "dataset-1"
+DOCUMENT_ID = "document-1"
+PARAMETERS = {"query": "what is dify", "retrieval_method": "semantic_search", "top_k": 4}
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, name: str) -> str | None:
+        return self.values.get(name)
+
+    def setex(self, name: str, ttl: int, value: str) -> None:
+        self.values[name] = value
+        self.ttls[name] = ttl
+
+    def incr(self, name: str) -> int:
+        self.values[name] = str(int(self.values.get(name, 0)) + 1)
+        return int(self.values[name])
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch, config_overrides) -> _FakeRedis:
+    config_overrides(RETRIEVAL_RESULT_CACHE_ENABLED=True, RETRIEVAL_RESULT_CACHE_TTL=60)
+    redis = _FakeRedis()
+    monkeypatch.setattr(retrieval_cache, "redis_client", redis)
+    retrieval_cache_stats.reset()
+    return redis
+
+
+@pytest.fixture
+def indexed_session(sqlite_session: Session) -> Session:
+    segment = DocumentSegment(
+        tenant_id="tenant-1",
+        dataset_id=DATASET_ID,
+        document_id=DOCUMENT_ID,
+        position=1,
+        content="Dify is an LLM app platform.",
+        word_count=6,
+        tokens=8,
+        created_by="user-1",
+        index_node_id="node-1",
+    )
+    sqlite_session.add(segment)
+    sqlite_session.flush()
+    sqlite_session.add(
+        ChildChunk(
+            tenant_id="tenant-1",
+            dataset_id=DATASET_ID,
+            document_id=DOCUMENT_ID,
+            segment_id=segment.id,
+            position=1,
+            content="LLM app platform.",
+            word_count=3,
+            created_by="user-1",
+            index_node_id="child-node-1",
+        )
+    )
+    sqlite_session.add(
+        DocumentSegmentSummary(
+            dataset_id=DATASET_ID,
+            document_id=DOCUMENT_ID,
+            chunk_id=segment.id,
+            summary_content="A platform.",
+            summary_index_node_id="summary-node-1",
+        )
+    )
+    sqlite_session.commit()
+    return sqlite_session
+
+
+def _document(content: str, doc_id: str, score: float, **metadata: object) -> Document:
+    return Document(
+        page_content=content,
+        metadata={"doc_id": doc_id, "document_id": DOCUMENT_ID, "dataset_id": DATASET_ID, "score": score, **metadata},
+    )
+
+
+def test_cached_documents_are_rebuilt_from_stored_rows(fake_redis: _FakeRedis, indexed_session: Session) -> None:
+    documents = [
+        _document("Dify is an LLM app platform.", "node-1", 0.9),
+        _document("LLM app platform.", "child-node-1", 0.8),
+        _document("A platform.", "summary-node-1", 0.7, is_summary=True, original_chunk_id="segment"),
+    ]
+    cache_key = retrieval_cache_key(DATASET_ID, PARAMETERS)
+    assert cache_key is not None
+
+    assert load_cached_retrieval(indexed_session, DATASET_ID, cache_key) is None
+    save_cached_retrieval(cache_key, documents)
+    cached = load_cached_retrieval(indexed_session, DATASET_ID, cache_key)
+
+    assert cached == documents
+    assert "platform" not in fake_redis.values[cache_key]
+    assert fake_redis.ttls[cache_key] == 60
+    assert retrieval_cache_stats.hit_rate(DATASET_ID) == 0.5
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_index_changes_invalidate_cached_results() -> None:
+    cache_key = retrieval_cache_key(DATASET_ID, PARAMETERS)
+    assert cache_key is not None
+    save_cached_retrieval(cache_key, [_document("Dify is an LLM app platform.", "node-1", 0.9)])
+
+    bump_dataset_retrieval_version(DATASET_ID)
+
+    assert retrieval_cache_key(DATASET_ID, PARAMETERS) != cache_key
+    assert retrieval_cache_key(DATASET_ID, {**PARAMETERS, "top_k": 5}) != retrieval_cache_key(DATASET_ID, PARAMETERS)
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_results_with_missing_rows_are_misses(indexed_session: Session) -> None:
+    cache_key = retrieval_cache_key(DATASET_ID, PARAMETERS)
+    assert cache_key is not None
+    save_cached_retrieval(cache_key, [_document("gone", "deleted-node", 0.9)])
+
+    assert load_cached_retrieval(indexed_session, DATASET_ID, cache_key) is None
+    assert retrieval_cache_stats.snapshot() == {DATASET_ID: {"hits": 0, "misses": 1}}
+
+
+def test_results_with_image_documents_are_not_cached(fake_redis: _FakeRedis) -> None:
+    cache_key = retrieval_cache_key(DATASET_ID, PARAMETERS)
+    assert cache_key is not None
+
+    save_cached_retrieval(cache_key, [_document("image.png", "upload-file-1", 0.9, doc_type=DocType.IMAGE)])
+
+    assert cache_key not in fake_redis.values
+
+
+@pytest.mark.usefixtures("fake_redis", "indexed_session")
+def test_retrieve_serves_repeated_queries_from_the_cache(
+    sqlite_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(retrieval_service_module, "db", SimpleNamespace(engine=sqlite_engine))
+    dataset = Dataset(id=DATASET_ID, tenant_id="tenant-1", name="FAQ", created_by="user-1")
+
+    def _retrieve(_self, all_documents: list[Document], **_: object) -> None:
+        all_documents.append(_document("Dify is an LLM app platform.", "node-1", 0.9))
+
+    with (
+        patch.object(RetrievalService, "_get_dataset", return_value=dataset),
+        patch.object(RetrievalService, "_retrieve", autospec=True, side_effect=_retrieve) as retrieve,
+    ):
+        first = RetrievalService.retrieve(RetrievalMethod.SEMANTIC_SEARCH, DATASET_ID, "what is dify")
+        second = RetrievalService.retrieve(RetrievalMethod.SEMANTIC_SEARCH, DATASET_ID, "what is dify")
+        RetrievalService.retrieve(RetrievalMethod.SEMANTIC_SEARCH, DATASET_ID, "what is dify", top_k=2)
+
+    assert second == first
+    assert retrieve.call_count == 2
@@ -538,6 +538,7 @@ def test_delete_clears_redis_cache_when_collection_exists(vector_factory_module,
     monkeypatch.setattr(vector_factory_module.redis_client, "delete", redis_delete)
 
     vector = vector_factory_module.Vector.__new__(vector_factory_module.Vector)
+    vector._dataset = SimpleNamespace(id="dataset-1")
     vector._vector_processor = SimpleNamespace(delete=delete_mock, collection_name="collection_1")
 
     vector.delete()
@@ -8,12 +8,15 @@ This test file covers the methods not fully tested in test_embedding_service.py:
 
 import base64
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 from unittest.mock import Mock, patch
 
 import numpy as np
 import pytest
+from flask import current_app, g
 from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 
@@ -121,7 +124,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         mock_model_instance.invoke_multimodal_embedding.assert_called_once()
         persisted = embedding_session.scalar(select(Embedding).where(Embedding.hash == "file123"))
         assert persisted is not None
-        assert persisted.get_embedding() == result[0]
+        assert persisted.get_embedding() == pytest.approx(result[0], rel=1e-6)
 
     def test_embed_multiple_multimodal_documents_cache_miss(self, mock_model_instance, embedding_session: Session):
         """Test embedding multiple multimodal documents when cache is empty."""
@@ -175,7 +178,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         result = cache_embedding.embed_multimodal_documents(documents)
 
         assert len(result) == 1
-        assert result[0] == normalized_cached
+        assert result[0] == pytest.approx(normalized_cached, rel=1e-6)
         mock_model_instance.invoke_multimodal_embedding.assert_not_called()
 
     def test_embed_multimodal_documents_partial_cache_hit(self, mock_model_instance, embedding_session: Session):
@@ -219,7 +222,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         result = cache_embedding.embed_multimodal_documents(documents)
 
         assert len(result) == 3
-        assert result[0] == normalized_cached
+        assert result[0] == pytest.approx(normalized_cached, rel=1e-6)
         assert embedding_session.scalar(select(func.count()).select_from(Embedding)) == 3
 
     def test_embed_multimodal_documents_nan_handling(
@@ -585,3 +588,91 @@ class TestCacheEmbeddingInitialization:
         cache_embedding = CacheEmbedding(model_instance)
 
         assert cache_embedding._model_instance == model_instance
+
+
+class TestCacheEmbeddingConcurrentDocuments:
+    """Test suite for the bounded concurrent requests of CacheEmbedding.embed_documents."""
+
+    def test_embed_documents_bounds_in_flight_requests_and_keeps_order(
+        self, embedding_session: Session, config_overrides
+    ):
+        config_overrides(EMBEDDING_MAX_CONCURRENT_REQUESTS=2)
+        model_instance = Mock()
+        model_instance.model_name = "concurrency-embedding-model"
+        model_instance.provider = "openai"
+        model_schema = Mock()
+        model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: 1}
+        model_instance.model_type_instance.get_model_schema.return_value = model_schema
+        usage = EmbeddingUsage(
+            tokens=1,
+            total_tokens=1,
+            unit_price=Decimal("0.0001"),
+            price_unit=Decimal(1000),
+            total_price=Decimal("0.0000001"),
+            currency="USD",
+            latency=0.1,
+        )
+        lock = threading.Lock()
+        in_flight = {"current": 0, "peak": 0}
+
+        def invoke_text_embedding(texts: list[str], **_: object) -> EmbeddingResult:
+            with lock:
+                in_flight["current"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            time.sleep(0.02)
+            with lock:
+                in_flight["current"] -= 1
+            index = int(texts[0].removeprefix("text "))
+            return EmbeddingResult(model="concurrency-embedding-model", embeddings=[[1.0, float(index)]], usage=usage)
+
+        model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+
+        embeddings = CacheEmbedding(model_instance).embed_documents([f"text {index}" for index in range(6)])
+
+        assert [round(embedding[1] / embedding[0]) for embedding in embeddings] == list(range(6))
+        assert in_flight["peak"] == 2
+        assert embedding_session.scalar(select(func.count()).select_from(Embedding)) == 6
+
+    def test_embed_documents_runs_each_request_in_its_own_app_context(
+        self, embedding_session: Session, config_overrides
+    ):
+        config_overrides(EMBEDDING_MAX_CONCURRENT_REQUESTS=2)
+        model_instance = Mock()
+        model_instance.model_name = "app-context-embedding-model"
+        model_instance.provider = "openai"
+        model_schema = Mock()
+        model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: 1}
+        model_instance.model_type_instance.get_model_schema.return_value = model_schema
+        usage = EmbeddingUsage(
+            tokens=1,
+            total_tokens=1,
+            unit_price=Decimal("0.0001"),
+            price_unit=Decimal(1000),
+            total_price=Decimal("0.0000001"),
+            currency="USD",
+            latency=0.1,
+        )
+        g.caller_marker = True
+        caller_app = current_app._get_current_object()
+        worker_markers: list[bool] = []
+        worker_apps: list[object] = []
+
+        def invoke_text_embedding(texts: list[str], **_: object) -> EmbeddingResult:
+            worker_markers.append(hasattr(g, "caller_marker"))
+            worker_apps.append(current_app._get_current_object())
+            return EmbeddingResult(model="app-context-embedding-model", embeddings=[[1.0, 2.0]], usage=usage)
+
+        model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+
+        CacheEmbedding(model_instance).embed_documents(["first text", "second text"])
+
+        assert worker_markers == [False, False]
+        assert worker_apps == [caller_app, caller_app]
+
+    def test_each_provider_has_its_own_request_pool(self, config_overrides):
+        config_overrides(EMBEDDING_MAX_CONCURRENT_REQUESTS=2)
+
+        openai_pool = cached_embedding_module._document_embedding_executor("openai")
+
+        assert cached_embedding_module._document_embedding_executor("openai") is openai_pool
+        assert cached_embedding_module._document_embedding_executor("cohere") is not openai_pool
@@ -0,0 +1,258 @@
+"""Behavior tests for the tiered document embedding cache.
+
+The database tier runs against the shared SQLite schema so the batched ``IN``
+lookup is exercised for real; Redis stays a mocked external dependency.
+"""
+
+import pickle
+from collections.abc import Iterator
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.rag.embedding import embedding_cache
+from core.rag.embedding.embedding_cache import (
+    DocumentEmbeddingCache,
+    EmbeddingCacheHitRecorder,
+    EmbeddingCacheTier,
+    clear_local_embedding_cache,
+    embedding_cache_stats,
+    evict_embedding_cache,
+)
+from libs.datetime_utils import naive_utc_now
+from libs.embedding_codec import decode_compact_embedding, encode_embedding
+from models.dataset import Embedding
+
+
+@pytest.fixture
+def cache_session(sqlite_session: Session, config_overrides) -> Iterator[Session]:
+    config_overrides(EMBEDDING_CACHE_HIT_TRACKING_ENABLED=False)
+    clear_local_embedding_cache()
+    embedding_cache_stats.reset()
+    yield sqlite_session
+    clear_local_embedding_cache()
+
+
+def _persist(session: Session, key: str, vector: list[float], *, model_name: str = "embed-model") -> None:
+    session.add(
+        Embedding(
+            model_name=model_name,
+            hash=key,
+            provider_name="openai",
+            embedding=pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+    )
+    session.commit()
+
+
+def _count_selects(session: Session) -> list[str]:
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def _cache() -> DocumentEmbeddingCache:
+    return DocumentEmbeddingCache(provider_name="openai", model_name="embed-model")
+
+
+class TestDatabaseTier:
+    def test_resolves_batch_with_one_query_per_lookup_batch(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_LOOKUP_BATCH_SIZE=2)
+        for index in range(5):
+            _persist(cache_session, f"hash-{index}", [float(index), 1.0])
+        statements = _count_selects(cache_session)
+
+        found = _cache().get_many([f"hash-{index}" for index in range(5)] + ["missing"], cache_session)
+
+        assert found == {f"hash-{index}": [float(index), 1.0] for index in range(5)}
+        assert len(statements) == 3
+        assert embedding_cache_stats.snapshot()[EmbeddingCacheTier.DATABASE] == {"hits": 5, "misses": 1}
+
+    def test_duplicate_keys_are_looked_up_once(self, cache_session: Session) -> None:
+        _persist(cache_session, "dup", [1.0, 2.0])
+
+        found = _cache().get_many(["dup", "dup", "dup"], cache_session)
+
+        assert found == {"dup": [1.0, 2.0]}
+        assert embedding_cache_stats.snapshot()[EmbeddingCacheTier.DATABASE] == {"hits": 1, "misses": 0}
+
+    def test_isolates_rows_from_other_models(self, cache_session: Session) -> None:
+        _persist(cache_session, "shared", [1.0], model_name="other-model")
+
+        assert _cache().get_many(["shared"], cache_session) == {}
+
+
+class TestLocalTier:
+    def test_database_hits_are_served_locally_afterwards(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_LOCAL_ENABLED=True)
+        _persist(cache_session, "hot", [0.5, 0.5])
+        _cache().get_many(["hot"], cache_session)
+        statements = _count_selects(cache_session)
+
+        found = _cache().get_many(["hot"], cache_session)
+
+        assert found == {"hot": [0.5, 0.5]}
+        assert statements == []
+        assert embedding_cache_stats.snapshot()[EmbeddingCacheTier.LOCAL] == {"hits": 1, "misses": 1}
+
+    def test_returned_vectors_do_not_alias_cached_entries(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_LOCAL_ENABLED=True)
+        _cache().put_many({"key": [1.0, 2.0]})
+
+        _cache().get_many(["key"], cache_session)["key"].append(3.0)
+
+        assert _cache().get_many(["key"], cache_session) == {"key": [1.0, 2.0]}
+
+    def test_evicts_least_recently_used_entries(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_LOCAL_ENABLED=True, EMBEDDING_CACHE_LOCAL_MAX_SIZE=1)
+        _cache().put_many({"first": [1.0]})
+        _cache().put_many({"second": [2.0]})
+
+        assert _cache().get_many(["first", "second"], cache_session) == {"second": [2.0]}
+
+
+class TestRedisTier:
+    def test_redis_hits_skip_the_database(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_REDIS_ENABLED=True)
+        stored = encode_embedding([0.25, 0.75])
+        statements = _count_selects(cache_session)
+
+        with patch.object(embedding_cache, "redis_client") as mock_redis:
+            mock_redis.mget.return_value = [stored, None]
+            found = _cache().get_many(["cached", "missing"], cache_session)
+
+        assert found == {"cached": [0.25, 0.75]}
+        mock_redis.mget.assert_called_once()
+        assert len(statements) == 1
+        assert embedding_cache_stats.snapshot()[EmbeddingCacheTier.REDIS] == {"hits": 1, "misses": 1}
+
+    def test_database_hits_are_written_back_to_redis(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_REDIS_ENABLED=True, EMBEDDING_CACHE_REDIS_TTL=120)
+        _persist(cache_session, "row", [1.0, 0.0])
+        pipe = MagicMock()
+
+        with patch.object(embedding_cache, "redis_client") as mock_redis:
+            mock_redis.mget.return_value = [None]
+            mock_redis.pipeline.return_value = pipe
+            _cache().get_many(["row"], cache_session)
+
+        pipe.setex.assert_called_once()
+        key, ttl, value = pipe.setex.call_args.args
+        assert key.endswith("embedding_cache:document:openai:embed-model:row")
+        assert ttl == 120
+        assert decode_compact_embedding(value).tolist() == [1.0, 0.0]
+        pipe.execute.assert_called_once()
+
+    def test_redis_failures_fall_back_to_the_database(self, cache_session: Session, config_overrides) -> None:
+        config_overrides(EMBEDDING_CACHE_REDIS_ENABLED=True)
+        _persist(cache_session, "row", [1.0])
+
+        with patch.object(embedding_cache, "redis_client") as mock_redis:
+            mock_redis.mget.side_effect = RuntimeError("redis down")
+            mock_redis.pipeline.side_effect = RuntimeError("redis down")
+            found = _cache().get_many(["row"], cache_session)
+
+        assert found == {"row": [1.0]}
+
+
+def _hit_times(session: Session) -> dict[str, object]:
+    session.expire_all()
+    return dict(session.execute(select(Embedding.hash, Embedding.last_hit_at)).tuples().all())
+
+
+class TestHitTracking:
+    def test_hits_are_buffered_and_stamped_in_one_flush(
+        self,
+        cache_session: Session,
+        sqlite_session_factory: sessionmaker[Session],
+        monkeypatch: pytest.MonkeyPatch,
+        config_overrides,
+    ) -> None:
+        config_overrides(EMBEDDING_CACHE_HIT_TRACKING_ENABLED=True, EMBEDDING_CACHE_HIT_FLUSH_INTERVAL=3600.0)
+        monkeypatch.setattr(embedding_cache, "session_factory", SimpleNamespace(create_session=sqlite_session_factory))
+        recorder = EmbeddingCacheHitRecorder()
+        monkeypatch.setattr(embedding_cache, "embedding_cache_hit_recorder", recorder)
+        _persist(cache_session, "hot", [1.0])
+        _persist(cache_session, "cold", [2.0])
+
+        _cache().get_many(["hot", "missing"], cache_session)
+        _cache().get_many(["hot"], cache_session)
+        assert _hit_times(cache_session) == {"hot": None, "cold": None}
+
+        assert recorder.flush() == 1
+        hit_times = _hit_times(cache_session)
+        assert hit_times["hot"] is not None
+        assert hit_times["cold"] is None
+
+    def test_recently_stamped_rows_are_not_rewritten(
+        self,
+        cache_session: Session,
+        sqlite_session_factory: sessionmaker[Session],
+        monkeypatch: pytest.MonkeyPatch,
+        config_overrides,
+    ) -> None:
+        config_overrides(EMBEDDING_CACHE_HIT_TRACKING_ENABLED=True, EMBEDDING_CACHE_HIT_FLUSH_INTERVAL=3600.0)
+        monkeypatch.setattr(embedding_cache, "session_factory", SimpleNamespace(create_session=sqlite_session_factory))
+        recorder = EmbeddingCacheHitRecorder()
+        _persist(cache_session, "hot", [1.0])
+
+        recorder.record(provider_name="openai", model_name="embed-model", keys=["hot"])
+        assert recorder.flush() == 1
+        recorder.record(provider_name="openai", model_name="embed-model", keys=["hot"])
+
+        assert recorder.flush() == 0
+
+
+class TestEviction:
+    def _age(self, session: Session, key: str, *, created_days: int, hit_days: int | None) -> None:
+        row = session.scalars(select(Embedding).where(Embedding.hash == key)).one()
+        row.created_at = naive_utc_now() - timedelta(days=created_days)
+        row.last_hit_at = naive_utc_now() - timedelta(days=hit_days) if hit_days is not None else None
+        session.commit()
+
+    def _seed(self, session: Session) -> None:
+        for key in ("old-hot", "old-cold", "old-unhit", "new"):
+            _persist(session, key, [1.0])
+        self._age(session, "old-hot", created_days=90, hit_days=1)
+        self._age(session, "old-cold", created_days=90, hit_days=60)
+        self._age(session, "old-unhit", created_days=90, hit_days=None)
+        self._age(session, "new", created_days=1, hit_days=None)
+
+    def test_lru_keeps_recently_hit_entries(self, cache_session: Session) -> None:
+        self._seed(cache_session)
+
+        evicted = evict_embedding_cache(
+            cache_session, policy="lru", cutoff=naive_utc_now() - timedelta(days=30), batch_size=100
+        )
+
+        assert evicted == 2
+        assert set(_hit_times(cache_session)) == {"old-hot", "new"}
+
+    def test_age_evicts_by_creation_time_in_bounded_deletes(self, cache_session: Session) -> None:
+        self._seed(cache_session)
+        deletes: list[str] = []
+
+        def record(_conn, _cursor, statement, *_args):
+            if statement.lstrip().upper().startswith("DELETE"):
+                deletes.append(statement)
+
+        event.listen(cache_session.get_bind(), "before_cursor_execute", record)
+        try:
+            evicted = evict_embedding_cache(
+                cache_session, policy="age", cutoff=naive_utc_now() - timedelta(days=30), batch_size=2
+            )
+        finally:
+            event.remove(cache_session.get_bind(), "before_cursor_execute", record)
+
+        assert evicted == 3
+        assert set(_hit_times(cache_session)) == {"new"}
+        assert len(deletes) == 2
@@ -108,7 +108,7 @@ class TestDocumentCache:
         )
         persisted = sqlite_embedding_session.scalar(select(Embedding))
         assert persisted is not None
-        assert persisted.get_embedding() == result[0]
+        assert persisted.get_embedding() == pytest.approx(result[0], rel=1e-6)
 
     def test_cache_hit_uses_persisted_vector(self, sqlite_embedding_session: Session, model_instance: Mock) -> None:
         cached_vector = (_vector() / np.linalg.norm(_vector())).tolist()
@@ -245,7 +245,7 @@ class TestMultimodalDocumentCache:
         generated = cache.embed_multimodal_documents([document])
         cached = cache.embed_multimodal_documents([document])
 
-        assert cached == generated
+        assert cached[0] == pytest.approx(generated[0], rel=1e-6)
         model_instance.invoke_multimodal_embedding.assert_called_once_with(
             multimodel_documents=[document], input_type=EmbeddingInputType.DOCUMENT
         )
@@ -1,7 +1,12 @@
+import ctypes
+import json
 from dataclasses import dataclass
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
+import pypdfium2
+import pypdfium2.raw as pdfium_c
 import pytest
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -22,6 +27,15 @@ class _Storage:
     def save(self, key: str, data: bytes) -> None:
         self.saves.append((key, data))
 
+    def load(self, key: str) -> bytes:
+        for saved_key, data in reversed(self.saves):
+            if saved_key == key:
+                return data
+        raise FileNotFoundError(key)
+
+    def delete(self, key: str) -> None:
+        self.saves = [(saved_key, data) for saved_key, data in self.saves if saved_key != key]
+
 
 class _DatabaseBinding:
     session: Session
@@ -192,3 +206,141 @@ def test_extract_images_failures(mock_dependencies: _Dependencies):
     assert upload_file is not None
     assert f"![image](http://files.local/files/{upload_file.id}/file-preview)" in result
     assert mock_dependencies.storage.saves == [(upload_file.key, jpeg_bytes)]
+
+
+def _write_pdf(path: Path, page_count: int) -> str:
+    pdf = pypdfium2.PdfDocument.new()
+    for page_number in range(page_count):
+        page = pdf.new_page(200, 200)
+        text = pdfium_c.FPDFPageObj_NewTextObj(pdf, b"Helvetica", ctypes.c_float(12))
+        buffer = f"page {page_number}\0".encode("utf-16-le")
+        pdfium_c.FPDFText_SetText(text, ctypes.cast(ctypes.c_char_p(buffer), ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+        pdfium_c.FPDFPageObj_Transform(text, 1, 0, 0, 1, 20, 100)
+        pdfium_c.FPDFPage_InsertObject(page, text)
+        page.gen_content()
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_parallel_extraction_yields_pages_in_order(mock_dependencies: _Dependencies, config_overrides, tmp_path: Path):
+    config_overrides(PDF_EXTRACTION_MAX_WORKERS=2, PDF_EXTRACTION_PARALLEL_MIN_PAGES=1, PDF_EXTRACTION_PAGES_PER_TASK=2)
+    file_path = _write_pdf(tmp_path / "manual.pdf", 5)
+
+    extractor = pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID)
+    documents = extractor.load()
+
+    assert [(document.page_content, document.metadata["page"]) for document in documents] == [
+        (f"page {page_number}", page_number) for page_number in range(5)
+    ]
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_parallel_extraction_falls_back_in_process(
+    mock_dependencies: _Dependencies, config_overrides, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    config_overrides(PDF_EXTRACTION_MAX_WORKERS=2, PDF_EXTRACTION_PARALLEL_MIN_PAGES=1, PDF_EXTRACTION_PAGES_PER_TASK=2)
+    file_path = _write_pdf(tmp_path / "manual.pdf", 3)
+
+    class _DaemonicExecutor:
+        def __init__(self, **_: object) -> None:
+            pass
+
+        def submit(self, *_: object) -> None:
+            raise AssertionError("daemonic processes are not allowed to have children")
+
+        def shutdown(self, **_: bool) -> None:
+            pass
+
+    monkeypatch.setattr(pe, "ProcessPoolExecutor", _DaemonicExecutor)
+    extractor = pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID)
+
+    assert [document.page_content for document in extractor.extract()] == ["page 0", "page 1", "page 2"]
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_content_cache_skips_extraction_of_identical_pdf(
+    mock_dependencies: _Dependencies, config_overrides, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    config_overrides(PDF_EXTRACTION_CACHE_ENABLED=True)
+    first_path = _write_pdf(tmp_path / "first.pdf", 2)
+    second_path = tmp_path / "second.pdf"
+    second_path.write_bytes(Path(first_path).read_bytes())
+
+    first = pe.PdfExtractor(file_path=first_path, tenant_id=TENANT_ID, user_id=USER_ID).extract()
+    cache_keys = [key for key, _ in mock_dependencies.storage.saves if key.startswith("extract_cache/pdf/")]
+    assert len(cache_keys) == 1
+    assert TENANT_ID in cache_keys[0]
+
+    def _parse_pages(*_: object):
+        raise AssertionError("cached PDF was extracted again")
+
+    monkeypatch.setattr(pe.PdfExtractor, "_parse_pages", _parse_pages)
+    second = pe.PdfExtractor(file_path=str(second_path), tenant_id=TENANT_ID, user_id=USER_ID).extract()
+
+    assert [(d.page_content, d.metadata["page"]) for d in second] == [
+        (d.page_content, d.metadata["page"]) for d in first
+    ]
+    assert second[0].metadata["source"] == str(second_path)
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_content_cache_hit_stores_its_own_images(
+    mock_dependencies: _Dependencies, config_overrides, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    config_overrides(PDF_EXTRACTION_CACHE_ENABLED=True)
+    file_path = _write_pdf(tmp_path / "manual.pdf", 2)
+    image = pe.PdfImage(data=b"\x89PNG\r\n\x1a\n some png", extension="png", mime_type="image/png")
+    monkeypatch.setattr(pe, "read_page_images", lambda page: [image])
+
+    first = pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID).extract()
+
+    def _read_page(*_: object, **__: object):
+        raise AssertionError("text of a cached PDF was extracted again")
+
+    monkeypatch.setattr(pe, "read_page", _read_page)
+    second = pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID).extract()
+
+    upload_files = mock_dependencies.session.scalars(select(UploadFile)).all()
+    assert len(upload_files) == 4
+    first_links = {d.page_content.split("\n", 1)[1] for d in first}
+    second_links = {d.page_content.split("\n", 1)[1] for d in second}
+    assert first_links.isdisjoint(second_links)
+    assert [d.page_content.split("\n", 1)[0] for d in second] == ["page 0", "page 1"]
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_content_cache_expired_entry_is_extracted_again(
+    mock_dependencies: _Dependencies, config_overrides, tmp_path: Path
+):
+    config_overrides(PDF_EXTRACTION_CACHE_ENABLED=True)
+    file_path = _write_pdf(tmp_path / "manual.pdf", 1)
+    pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID).extract()
+    cache_key = next(key for key, _ in mock_dependencies.storage.saves if key.startswith("extract_cache/pdf/"))
+    expired = {"pages": [{"text": "stale", "has_images": False}], "expires_at": 0}
+    mock_dependencies.storage.save(cache_key, json.dumps(expired).encode())
+
+    documents = pe.PdfExtractor(file_path=file_path, tenant_id=TENANT_ID, user_id=USER_ID).extract()
+
+    assert [document.page_content for document in documents] == ["page 0"]
+    assert json.loads(mock_dependencies.storage.load(cache_key))["expires_at"] > 0
+
+
+@pytest.mark.parametrize("sqlite_session", [(UploadFile,)], indirect=True)
+def test_content_cache_save_deletes_expired_entries(
+    mock_dependencies: _Dependencies, config_overrides, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    config_overrides(PDF_EXTRACTION_CACHE_ENABLED=True)
+    expired_key = f"extract_cache/pdf/v2/{TENANT_ID}/expired.json"
+    mock_dependencies.storage.save(expired_key, b"{}")
+    redis = MagicMock()
+    redis.zrangebyscore.return_value = [expired_key.encode()]
+    redis.zrem.return_value = 1
+    monkeypatch.setattr(pe, "redis_client", redis)
+
+    pe.PdfExtractor(file_path=_write_pdf(tmp_path / "manual.pdf", 1), tenant_id=TENANT_ID, user_id=USER_ID).extract()
+
+    redis.zadd.assert_called_once()
+    with pytest.raises(FileNotFoundError):
+        mock_dependencies.storage.load(expired_key)
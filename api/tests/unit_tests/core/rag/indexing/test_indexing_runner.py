@@ -1953,6 +1953,68 @@ class TestIndexingRunnerProcessChunk:
         session.expire_all()
         assert all(session.get(DocumentSegment, segment.id).status == SegmentStatus.COMPLETED for segment in segments)
 
+    def test_process_chunk_commits_each_batch_before_a_pause(
+        self,
+        mock_dependencies,
+        mock_flask_app,
+        sqlite_session_factory: sessionmaker[Session],
+        config_overrides,
+    ):
+        """Test batches completed before a pause stay committed so a retry resumes after them."""
+        from core.indexing_runner import IndexingRunner
+
+        config_overrides(INDEXING_LOAD_BATCH_SIZE=2)
+        runner = IndexingRunner()
+        mock_processor = MagicMock()
+        chunk_documents = [Document(page_content=f"Chunk {i}", metadata={"doc_id": f"c{i}"}) for i in range(1, 4)]
+
+        session = mock_dependencies["session"]
+        mock_dataset, mock_dataset_document = persist_indexing_scope(session)
+        segments = [
+            DocumentSegment(
+                tenant_id=mock_dataset.tenant_id,
+                dataset_id=mock_dataset.id,
+                document_id=mock_dataset_document.id,
+                position=position,
+                content=doc.page_content,
+                word_count=1,
+                tokens=1,
+                created_by=mock_dataset.created_by,
+                index_node_id=doc.metadata["doc_id"],
+                status=SegmentStatus.INDEXING,
+            )
+            for position, doc in enumerate(chunk_documents, start=1)
+        ]
+        session.add_all(segments)
+        session.commit()
+
+        # Paused while the first batch is being indexed.
+        mock_dependencies["redis"].get.side_effect = [None, "1"]
+        mock_context = MagicMock()
+        mock_context.__enter__ = MagicMock(return_value=None)
+        mock_context.__exit__ = MagicMock(return_value=None)
+        mock_flask_app.app_context.return_value = mock_context
+
+        with (
+            patch("core.indexing_runner.session_factory.create_session", sqlite_session_factory),
+            patch("core.indexing_runner.IndexProcessorFactory") as mock_factory,
+        ):
+            mock_factory.return_value.init_index_processor.return_value = mock_processor
+            with pytest.raises(DocumentIsPausedError):
+                runner._process_chunk(
+                    mock_flask_app,
+                    IndexStructureType.PARAGRAPH_INDEX,
+                    chunk_documents,
+                    mock_dataset.id,
+                    mock_dataset_document.id,
+                )
+
+        mock_processor.load.assert_called_once()
+        assert mock_processor.load.call_args.args[1] == chunk_documents[:2]
+        session.expire_all()
+        statuses = [session.get(DocumentSegment, segment.id).status for segment in segments]
+        assert statuses == [SegmentStatus.COMPLETED, SegmentStatus.COMPLETED, SegmentStatus.INDEXING]
+
     def test_process_chunk_detects_pause(
         self,
         mock_dependencies,
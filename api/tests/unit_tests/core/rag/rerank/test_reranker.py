@@ -12,6 +12,7 @@ All tests use mocking to avoid external dependencies and ensure fast, reliable e
 Tests follow the Arrange-Act-Assert pattern for clarity.
 """
 
+import math
 from datetime import UTC, datetime
 from operator import itemgetter
 from unittest.mock import MagicMock, Mock, patch
@@ -28,9 +29,10 @@ from core.rag.rerank.rerank_base import BaseRerankRunner
 from core.rag.rerank.rerank_factory import RerankRunnerFactory
 from core.rag.rerank.rerank_model import RerankModelRunner
 from core.rag.rerank.rerank_type import RerankMode
-from core.rag.rerank.weight_rerank import WeightRerankRunner
+from core.rag.rerank.weight_rerank import WeightRerankRunner, bm25_scores
 from extensions.storage.storage_type import StorageType
 from graphon.model_runtime.entities.rerank_entities import RerankDocument, RerankResult
+from models.dataset import DocumentSegment
 from models.enums import CreatorUserRole
 from models.model import UploadFile
 
@@ -1085,6 +1087,118 @@ class TestWeightRerankRunner:
         assert result[0].metadata["doc_id"] == "doc1"
         assert result[0].metadata["score"] == pytest.approx(expected_score, rel=1e-6)
 
+    @staticmethod
+    def _add_segment(session: Session, index_node_id: str, content: str, keywords: list[str]) -> None:
+        session.add(
+            DocumentSegment(
+                tenant_id="tenant123",
+                dataset_id="dataset-1",
+                document_id="document-1",
+                position=1,
+                content=content,
+                word_count=5,
+                tokens=5,
+                created_by="user-1",
+                keywords=keywords,
+                index_node_id=index_node_id,
+                index_node_hash=f"hash-{index_node_id}",
+            )
+        )
+        session.flush()
+
+    def test_stored_segment_keywords_are_reused(self, sqlite_session: Session, weights_config, mock_jieba_handler):
+        """Test that keywords stored on segments at indexing time replace re-tokenization.
+
+        Verifies:
+        - Only the query is tokenized when every candidate has stored keywords
+        - Stored keywords are exposed in metadata like extracted ones
+        """
+        self._add_segment(sqlite_session, "doc1", "Python is a programming language", ["python", "programming"])
+        self._add_segment(sqlite_session, "doc2", "JavaScript for web development", ["javascript", "web"])
+        documents = [
+            Document(page_content="Python is a programming language", metadata={"doc_id": "doc1"}, provider="dify"),
+            Document(page_content="JavaScript for web development", metadata={"doc_id": "doc2"}, provider="dify"),
+        ]
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.extract_keywords.return_value = ["python"]
+        mock_jieba_handler.return_value = mock_handler_instance
+        runner = WeightRerankRunner(tenant_id="tenant123", weights=weights_config, session=sqlite_session)
+
+        scores = runner._calculate_keyword_score("python", documents)
+
+        assert [call.args[0] for call in mock_handler_instance.extract_keywords.call_args_list] == ["python"]
+        assert documents[0].metadata["keywords"] == ["python", "programming"]
+        assert scores == [pytest.approx(math.log(2) / (math.log(2) + 1)), 0.0]
+
+    def test_keyword_sources_are_not_mixed(self, sqlite_session: Session, weights_config, mock_jieba_handler):
+        """Test that stored keywords are ignored unless every candidate has them.
+
+        Verifies:
+        - A candidate without stored keywords makes every candidate use extracted keywords
+        """
+        self._add_segment(sqlite_session, "doc1", "Python is a programming language", ["stored"])
+        documents = [
+            Document(page_content="Python is a programming language", metadata={"doc_id": "doc1"}, provider="dify"),
+            Document(page_content="JavaScript for web development", metadata={"doc_id": "doc2"}, provider="dify"),
+        ]
+        keyword_map = {
+            "python": ["python"],
+            "Python is a programming language": ["python", "programming"],
+            "JavaScript for web development": ["javascript", "web"],
+        }
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.extract_keywords.side_effect = lambda text, _: keyword_map[text]
+        mock_jieba_handler.return_value = mock_handler_instance
+        runner = WeightRerankRunner(tenant_id="tenant123", weights=weights_config, session=sqlite_session)
+
+        scores = runner._calculate_keyword_score("python", documents)
+
+        assert mock_handler_instance.extract_keywords.call_count == 3
+        assert documents[0].metadata["keywords"] == ["python", "programming"]
+        assert scores == [pytest.approx(math.log(2) / (math.log(2) + 1)), 0.0]
+
+
+class TestBM25Scores:
+    """Unit tests for the vectorized BM25 keyword scorer."""
+
+    def test_matches_reference_bm25(self):
+        documents_keywords = [["a", "b", "a"], ["b", "c"], ["c", "d", "e", "f"]]
+
+        scores = bm25_scores(["a", "b"], documents_keywords, k1=1.5, b=0.75)
+
+        def reference(document_keywords: list[str]) -> float:
+            average_length = 3.0
+            score = 0.0
+            for term in ("a", "b"):
+                frequency = document_keywords.count(term)
+                containing = sum(1 for keywords in documents_keywords if term in keywords)
+                idf = math.log((3 - containing + 0.5) / (containing + 0.5) + 1)
+                norm = 1.5 * (1 - 0.75 + 0.75 * len(document_keywords) / average_length)
+                score += idf * frequency * 2.5 / (frequency + norm)
+            return score
+
+        expected = [reference(keywords) for keywords in documents_keywords]
+        assert scores.tolist() == pytest.approx([value / (value + 1.0) for value in expected])
+
+    def test_returns_zeros_without_matches_or_query_terms(self):
+        assert bm25_scores(["x"], [["a"], ["b"]]).tolist() == [0.0, 0.0]
+        assert bm25_scores([], [["a"]]).tolist() == [0.0]
+        assert bm25_scores(["a"], []).tolist() == []
+
+    def test_tolerates_degenerate_parameters(self):
+        scores = bm25_scores(["a"], [[], ["a"]], k1=0.0, b=1.0)
+
+        assert scores.tolist() == pytest.approx([0.0, math.log(2) / (math.log(2) + 1)])
+
+    def test_weak_best_match_is_not_scaled_to_one(self):
+        documents_keywords = [["a", "x", "y", "z", "w"], ["q", "r"], ["s", "t"]]
+
+        weak = bm25_scores(["a", "b", "c"], documents_keywords)
+        strong = bm25_scores(["a", "b", "c"], [["a", "b", "c"], ["q", "r"], ["s", "t"]])
+
+        assert 0 < weak[0] < strong[0] < 1
+        assert bm25_scores(["a"], [["a"]], saturation=2.0)[0] < bm25_scores(["a"], [["a"]], saturation=1.0)[0]
+
 
 class TestRerankRunnerFactory(_UsesSQLiteSession):
     """Unit tests for RerankRunnerFactory.
@@ -145,6 +145,7 @@ from core.rag.splitter.text_splitter import (
     Tokenizer,
     TokenTextSplitter,
     _split_text_with_regex,
+    character_lengths,
     split_text_on_tokens,
 )
 
@@ -827,18 +828,15 @@ class TestEnhanceRecursiveCharacterTextSplitter:
         - empty texts path
         - embedding model path
         - GPT2Tokenizer fallback path
-        - _character_encoder empty-path branch
         """
 
         class _SpySplitter(EnhanceRecursiveCharacterTextSplitter):
             captured_token_encoder = None
-            captured_character_encoder = None
 
             def __init__(self, **kwargs):
                 frame = currentframe()
                 if frame and frame.f_back:
                     _SpySplitter.captured_token_encoder = frame.f_back.f_locals.get("_token_encoder")
-                    _SpySplitter.captured_character_encoder = frame.f_back.f_locals.get("_character_encoder")
                 super().__init__(**kwargs)
 
         mock_model = Mock()
@@ -846,13 +844,11 @@ class TestEnhanceRecursiveCharacterTextSplitter:
 
         _SpySplitter.from_encoder(embedding_model_instance=mock_model, chunk_size=10, chunk_overlap=1)
         token_encoder = _SpySplitter.captured_token_encoder
-        character_encoder = _SpySplitter.captured_character_encoder
 
         assert token_encoder is not None
-        assert character_encoder is not None
         assert token_encoder([]) == []
         assert token_encoder(["abc", "defgh"]) == [3, 5]
-        assert character_encoder([]) == []
+        assert character_lengths([]) == []
 
         with patch(
             "core.rag.splitter.fixed_text_splitter.GPT2Tokenizer.get_num_tokens",
@@ -863,6 +859,49 @@ class TestEnhanceRecursiveCharacterTextSplitter:
             assert token_encoder_without_model is not None
             assert token_encoder_without_model(["ab", "cdef"]) == [3, 5]
 
+    def test_token_length_unit_measures_with_the_model_in_cached_batches(self):
+        """Token lengths come from the embedding model, once per distinct piece."""
+        measured: list[list[str]] = []
+
+        def count_tokens(texts: list[str]) -> list[int]:
+            measured.append(texts)
+            return [len(text.split()) for text in texts]
+
+        mock_model = Mock()
+        mock_model.get_text_embedding_num_tokens = Mock(side_effect=count_tokens)
+        splitter = FixedRecursiveCharacterTextSplitter.from_encoder(
+            embedding_model_instance=mock_model,
+            length_unit="token",
+            fixed_separator="\n\n",
+            separators=[" ", ""],
+            chunk_size=4,
+            chunk_overlap=0,
+            keep_separator=False,
+        )
+
+        result = splitter.split_text("one two three four five six\n\nseven")
+
+        assert result == ["one two three four", "five six", "seven"]
+        pieces = [text for texts in measured for text in texts]
+        assert len(pieces) == len(set(pieces))
+
+    def test_length_unit_defaults_to_configuration(self, config_overrides):
+        """The configured segmentation unit applies when no unit is passed."""
+        mock_model = Mock()
+        mock_model.get_text_embedding_num_tokens = Mock(side_effect=lambda texts: [1 for _ in texts])
+
+        config_overrides(INDEXING_SEGMENTATION_LENGTH_UNIT="token")
+        token_splitter = EnhanceRecursiveCharacterTextSplitter.from_encoder(
+            embedding_model_instance=mock_model, chunk_size=10, chunk_overlap=0
+        )
+        config_overrides(INDEXING_SEGMENTATION_LENGTH_UNIT="character")
+        character_splitter = EnhanceRecursiveCharacterTextSplitter.from_encoder(
+            embedding_model_instance=mock_model, chunk_size=10, chunk_overlap=0
+        )
+
+        assert token_splitter._length_function is not character_lengths
+        assert character_splitter._length_function is character_lengths
+
 
 # ============================================================================
 # Test FixedRecursiveCharacterTextSplitter
@@ -1090,6 +1129,26 @@ class TestFixedRecursiveCharacterTextSplitter:
         assert "line2" in "".join(chunks)
         assert "line3" in "".join(chunks)
 
+    def test_iter_split_text_yields_chunks_lazily(self):
+        """iter_split_text produces the chunks of split_text without splitting the whole text upfront."""
+        text = "\n\n".join(f"paragraph {index} " + "word " * (index % 30) for index in range(2000))
+        splitter = FixedRecursiveCharacterTextSplitter(fixed_separator="\n\n", chunk_size=60, chunk_overlap=5)
+
+        chunks = splitter.iter_split_text(text)
+
+        assert next(chunks) == "paragraph 0 "
+        assert ["paragraph 0 ", *chunks] == splitter.split_text(text)
+
+    @pytest.mark.parametrize(("chunk_size", "chunk_overlap"), [(10, 0), (10, 3), (10, 10), (7, 6), (1, 0)])
+    def test_character_level_runs_match_piece_by_piece_splitting(self, chunk_size, chunk_overlap):
+        """The run-based character splitting matches measuring every character on its own."""
+        text = "".join(string.ascii_letters[(index * 7) % 52] for index in range(233)) + "\nTAIL\n"
+        kwargs = {"fixed_separator": "", "separators": [""], "chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+        fast = FixedRecursiveCharacterTextSplitter(**kwargs)
+        generic = FixedRecursiveCharacterTextSplitter(length_function=lambda texts: [len(t) for t in texts], **kwargs)
+
+        assert fast.recursive_split_text(text) == generic.recursive_split_text(text)
+
     def test_recursive_split_without_new_separator_appends_long_chunk(self):
         """Cover branch where no further separators exist and long split is appended directly."""
         text = "aa\n" + ("b" * 40)
@@ -20,10 +20,17 @@ from graphon.enums import BuiltinNodeTypes
 from libs.datetime_utils import naive_utc_now
 from models import Account, EndUser, Tenant
 from models.workflow import WorkflowNodeExecutionTriggeredFrom
+from tasks.workflow_node_execution_tasks import decode_node_execution_batch
 
 RESOURCE_TENANT_ID = "resource-tenant-id"
 
 
+@pytest.fixture(autouse=True)
+def _manual_flush(config_overrides):
+    """Keep the dispatch timer from firing so tests control when batches are sent."""
+    config_overrides(WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL=3600.0, WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE=100)
+
+
 @pytest.fixture
 def mock_session_factory():
     """Mock SQLAlchemy session factory."""
@@ -150,11 +157,11 @@ class TestCeleryWorkflowNodeExecutionRepository:
         assert repo._tenant_id == RESOURCE_TENANT_ID
         assert repo._creator_user_id == user.id
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_save_caches_and_queues_celery_task(
         self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution
     ):
-        """Test that save operation caches execution and queues a Celery task."""
+        """Test that save caches the execution and flush queues one batched Celery task."""
         repo = CeleryWorkflowNodeExecutionRepository(
             session_factory=mock_session_factory,
             tenant_id=RESOURCE_TENANT_ID,
@@ -164,12 +171,14 @@ class TestCeleryWorkflowNodeExecutionRepository:
         )
 
         repo.save(sample_workflow_node_execution)
+        mock_task.delay.assert_not_called()
+        repo.flush()
 
         # Verify Celery task was queued with correct parameters
         mock_task.delay.assert_called_once()
         call_args = mock_task.delay.call_args[1]
 
-        assert call_args["execution_data"] == sample_workflow_node_execution.model_dump()
+        assert decode_node_execution_batch(call_args["payload"]) == [sample_workflow_node_execution]
         assert call_args["tenant_id"] == RESOURCE_TENANT_ID
         assert call_args["app_id"] == "test-app"
         assert call_args["triggered_from"] == WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN
@@ -186,6 +195,41 @@ class TestCeleryWorkflowNodeExecutionRepository:
             in repo._workflow_execution_mapping[sample_workflow_node_execution.workflow_execution_id]
         )
 
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
+    def test_flush_sends_only_the_latest_state_per_run_and_batch(
+        self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution, config_overrides
+    ):
+        config_overrides(WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE=3)
+        repo = CeleryWorkflowNodeExecutionRepository(
+            session_factory=mock_session_factory,
+            tenant_id=RESOURCE_TENANT_ID,
+            user=mock_account,
+            app_id="test-app",
+            triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN,
+        )
+        other_run = sample_workflow_node_execution.model_copy(
+            update={"id": str(uuid4()), "workflow_execution_id": str(uuid4())}
+        )
+
+        repo.save(sample_workflow_node_execution)
+        sample_workflow_node_execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+        sample_workflow_node_execution.outputs = {"answer": "done"}
+        repo.save(sample_workflow_node_execution)
+        repo.save(other_run)
+        repo.flush()
+
+        batches = [decode_node_execution_batch(call.kwargs["payload"]) for call in mock_task.delay.call_args_list]
+        assert batches == [[sample_workflow_node_execution], [other_run]]
+        assert batches[0][0].status == WorkflowNodeExecutionStatus.SUCCEEDED
+
+        repo.flush()
+        assert mock_task.delay.call_count == 2
+
+        # Reaching the batch size dispatches without waiting for the timer.
+        for _ in range(3):
+            repo.save(other_run.model_copy(update={"id": str(uuid4())}))
+        assert mock_task.delay.call_count == 3
+
     def test_save_synchronously_uses_sql_repository_without_queueing(
         self, mock_session_factory, mock_account, sample_workflow_node_execution
     ):
@@ -203,11 +247,11 @@ class TestCeleryWorkflowNodeExecutionRepository:
         repo._sql_repository.save_synchronously.assert_called_once_with(sample_workflow_node_execution)
         assert repo._execution_cache[sample_workflow_node_execution.id] is sample_workflow_node_execution
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_save_handles_celery_failure(
         self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution
     ):
-        """Test that save operation handles Celery task failures."""
+        """Test that a failed dispatch is re-raised and retried by the next flush."""
         mock_task.delay.side_effect = Exception("Celery is down")
 
         repo = CeleryWorkflowNodeExecutionRepository(
@@ -217,11 +261,19 @@ class TestCeleryWorkflowNodeExecutionRepository:
             app_id="test-app",
             triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN,
         )
+        repo.save(sample_workflow_node_execution)
 
         with pytest.raises(Exception, match="Celery is down"):
-            repo.save(sample_workflow_node_execution)
+            repo.flush()
+
+        mock_task.delay.side_effect = None
+        repo.flush()
+        assert mock_task.delay.call_count == 2
+        assert decode_node_execution_batch(mock_task.delay.call_args.kwargs["payload"]) == [
+            sample_workflow_node_execution
+        ]
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_get_by_workflow_execution_from_cache(
         self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution
     ):
@@ -283,7 +335,7 @@ class TestCeleryWorkflowNodeExecutionRepository:
             sample_workflow_node_execution.id
         ]
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_get_by_workflow_execution_merges_database_and_newer_cache(
         self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution
     ):
@@ -316,7 +368,7 @@ class TestCeleryWorkflowNodeExecutionRepository:
         assert [execution.id for execution in result] == [historical.id, sample_workflow_node_execution.id]
         assert result[1] is sample_workflow_node_execution
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_cache_operations(self, mock_task, mock_session_factory, mock_account, sample_workflow_node_execution):
         """Test cache operations work correctly."""
         repo = CeleryWorkflowNodeExecutionRepository(
@@ -338,7 +390,7 @@ class TestCeleryWorkflowNodeExecutionRepository:
         assert len(result) == 1
         assert result[0].id == sample_workflow_node_execution.id
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_multiple_executions_same_workflow(self, mock_task, mock_session_factory, mock_account):
         """Test multiple executions for the same workflow."""
         repo = CeleryWorkflowNodeExecutionRepository(
@@ -390,7 +442,7 @@ class TestCeleryWorkflowNodeExecutionRepository:
         result = repo.get_by_workflow_execution(workflow_execution_id)
         assert len(result) == 2
 
-    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+    @patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
     def test_ordering_functionality(self, mock_task, mock_session_factory, mock_account):
         """Test ordering functionality works correctly."""
         repo = CeleryWorkflowNodeExecutionRepository(
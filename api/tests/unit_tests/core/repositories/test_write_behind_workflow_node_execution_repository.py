@@ -0,0 +1,227 @@
+"""SQLite-backed tests for the write-behind workflow node execution repository."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import Engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.repositories.write_behind_workflow_node_execution_repository import (
+    WriteBehindWorkflowNodeExecutionRepository,
+)
+from graphon.entities import WorkflowNodeExecution
+from graphon.enums import BuiltinNodeTypes, WorkflowNodeExecutionStatus
+from models import Account, Tenant
+from models.enums import ExecutionOffLoadType
+from models.workflow import WorkflowNodeExecutionModel, WorkflowNodeExecutionOffload, WorkflowNodeExecutionTriggeredFrom
+
+
+def _account() -> Account:
+    user = Account(name="Test Account", email="test@example.com")
+    user.id = "user-1"
+    user._current_tenant = Tenant(name="Test Tenant")
+    user._current_tenant.id = "tenant-1"
+    return user
+
+
+def _execution(
+    *,
+    execution_id: str = "execution-1",
+    index: int = 1,
+    status: WorkflowNodeExecutionStatus = WorkflowNodeExecutionStatus.RUNNING,
+    outputs: Mapping[str, str] | None = None,
+) -> WorkflowNodeExecution:
+    return WorkflowNodeExecution(
+        id=execution_id,
+        node_execution_id=f"node-{execution_id}",
+        workflow_id="workflow-1",
+        workflow_execution_id="run-1",
+        index=index,
+        predecessor_node_id=None,
+        node_id=f"node-{index}",
+        node_type=BuiltinNodeTypes.LLM,
+        title=f"Node {index}",
+        inputs={"value": index},
+        outputs=outputs,
+        status=status,
+        error=None,
+        elapsed_time=1.0,
+        metadata={},
+        created_at=datetime.now(UTC),
+        finished_at=None,
+    )
+
+
+@pytest.fixture
+def repo(
+    monkeypatch: pytest.MonkeyPatch, sqlite_session_factory: sessionmaker[Session], config_overrides
+) -> WriteBehindWorkflowNodeExecutionRepository:
+    config_overrides(WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL=3600.0, WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE=100)
+    monkeypatch.setattr(
+        "core.repositories.sqlalchemy_workflow_node_execution_repository.FileService",
+        lambda *_args: SimpleNamespace(upload_file=Mock()),
+    )
+    return WriteBehindWorkflowNodeExecutionRepository(
+        session_factory=sqlite_session_factory,
+        tenant_id="tenant-1",
+        user=_account(),
+        app_id="app-1",
+        triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN,
+    )
+
+
+def _persisted(factory: sessionmaker[Session]) -> list[WorkflowNodeExecutionModel]:
+    with factory() as session:
+        return list(session.scalars(select(WorkflowNodeExecutionModel).order_by(WorkflowNodeExecutionModel.index)))
+
+
+def test_start_and_finish_of_a_node_are_written_as_one_row(
+    repo: WriteBehindWorkflowNodeExecutionRepository,
+    sqlite_engine: Engine,
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    execution = _execution()
+    repo.save(execution)
+    execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+    execution.outputs = {"result": "done"}
+    repo.save(execution)
+    repo.save(_execution(execution_id="execution-2", index=2))
+
+    assert _persisted(sqlite_session_factory) == []
+
+    statements: list[str] = []
+
+    def record(_conn: object, _cursor: object, statement: str, *_args: object) -> None:
+        statements.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", record)
+    try:
+        repo.flush()
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", record)
+
+    persisted = _persisted(sqlite_session_factory)
+    assert [(row.id, row.status) for row in persisted] == [
+        ("execution-1", WorkflowNodeExecutionStatus.SUCCEEDED),
+        ("execution-2", WorkflowNodeExecutionStatus.RUNNING),
+    ]
+    assert persisted[0].outputs_dict == {"result": "done"}
+    assert sum("workflow_node_executions" in statement for statement in statements) == 1
+
+
+def test_flush_updates_rows_written_by_an_earlier_flush(
+    repo: WriteBehindWorkflowNodeExecutionRepository, sqlite_session_factory: sessionmaker[Session]
+) -> None:
+    execution = _execution()
+    repo.save(execution)
+    repo.flush()
+    execution.status = WorkflowNodeExecutionStatus.FAILED
+    execution.error = "boom"
+    repo.save(execution)
+    repo.flush()
+
+    [persisted] = _persisted(sqlite_session_factory)
+    assert persisted.status == WorkflowNodeExecutionStatus.FAILED
+    assert persisted.error == "boom"
+
+
+def test_execution_data_of_a_pending_node_is_written_with_its_offloads(
+    repo: WriteBehindWorkflowNodeExecutionRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    execution = _execution(outputs={"large": "value"})
+    offload = WorkflowNodeExecutionOffload(
+        id="offload-1",
+        tenant_id="tenant-1",
+        app_id="app-1",
+        node_execution_id=execution.id,
+        type_=ExecutionOffLoadType.OUTPUTS,
+        file_id="file-1",
+    )
+    result = SimpleNamespace(truncated_value={"large": "truncated"}, offload=offload)
+    monkeypatch.setattr(
+        repo,
+        "_truncate_and_upload",
+        lambda _values, _id, type_: result if type_ == ExecutionOffLoadType.OUTPUTS else None,
+    )
+    repo.save(execution)
+    repo.save_execution_data(execution)
+
+    assert _persisted(sqlite_session_factory) == []
+    repo.flush()
+
+    [persisted] = _persisted(sqlite_session_factory)
+    assert persisted.outputs_dict == {"large": "truncated"}
+    with sqlite_session_factory() as session:
+        offloads = session.scalars(select(WorkflowNodeExecutionOffload)).all()
+        assert [(item.id, item.node_execution_id) for item in offloads] == [("offload-1", execution.id)]
+
+
+def test_reads_flush_pending_state_first(repo: WriteBehindWorkflowNodeExecutionRepository) -> None:
+    repo.save(_execution())
+
+    executions = repo.get_by_workflow_execution("run-1")
+
+    assert [execution.id for execution in executions] == ["execution-1"]
+    assert repo._pending == {}
+
+
+def test_batch_size_triggers_a_flush(
+    repo: WriteBehindWorkflowNodeExecutionRepository, sqlite_session_factory: sessionmaker[Session], config_overrides
+) -> None:
+    config_overrides(WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE=2)
+    repo.save(_execution())
+    assert _persisted(sqlite_session_factory) == []
+
+    repo.save(_execution(execution_id="execution-2", index=2))
+
+    assert len(_persisted(sqlite_session_factory)) == 2
+
+
+def test_failed_flush_is_requeued_behind_newer_state(
+    repo: WriteBehindWorkflowNodeExecutionRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    execution = _execution()
+    repo.save(execution)
+    write_batch = repo._write_batch
+
+    def fail_after_newer_save(_batch: object) -> None:
+        execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+        repo.save(execution)
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(repo, "_write_batch", fail_after_newer_save)
+    with pytest.raises(RuntimeError, match="database down"):
+        repo.flush()
+    monkeypatch.setattr(repo, "_write_batch", write_batch)
+    repo.flush()
+
+    [persisted] = _persisted(sqlite_session_factory)
+    assert persisted.status == WorkflowNodeExecutionStatus.SUCCEEDED
+
+
+def test_single_step_and_synchronous_saves_are_written_immediately(
+    repo: WriteBehindWorkflowNodeExecutionRepository, sqlite_session_factory: sessionmaker[Session]
+) -> None:
+    repo.save(_execution(execution_id="buffered"))
+    caller = _execution(execution_id="caller", index=2)
+
+    repo.save_synchronously(caller)
+    assert [row.id for row in _persisted(sqlite_session_factory)] == ["buffered", "caller"]
+
+    caller.status = WorkflowNodeExecutionStatus.SUCCEEDED
+    repo.save(caller)
+    assert _persisted(sqlite_session_factory)[1].status == WorkflowNodeExecutionStatus.SUCCEEDED
+
+    repo._triggered_from = WorkflowNodeExecutionTriggeredFrom.SINGLE_STEP
+    repo.save(_execution(execution_id="single-step", index=3))
+    assert [row.id for row in _persisted(sqlite_session_factory)] == ["buffered", "caller", "single-step"]
+    assert repo._pending == {}
@@ -9,20 +9,27 @@ from sqlalchemy import Engine, event, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from core import provider_manager as provider_manager_module
+from core.entities.provider_configuration import ProviderConfiguration, ProviderConfigurations
 from core.entities.provider_entities import (
     CustomConfiguration,
     CustomProviderConfiguration,
     ModelSettings,
     ProviderQuotaType,
+    SystemConfiguration,
 )
 from core.hosting_configuration import HostingProvider, TrialHostingQuota
 from core.plugin.entities.plugin import PluginInstallationSource
 from core.plugin.entities.plugin_daemon import PluginModelProviderDeclaration
-from core.provider_manager import ProviderConfigurationCacheSource, ProviderManager
+from core.provider_manager import (
+    ProviderConfigurationCacheSource,
+    ProviderManager,
+    clear_assembled_provider_configurations_cache,
+    provider_configurations_cache_stats,
+)
 from enums import DeploymentEdition
 from graphon.model_runtime.entities.common_entities import I18nObject
 from graphon.model_runtime.entities.model_entities import ModelType
-from graphon.model_runtime.entities.provider_entities import ConfigurateMethod
+from graphon.model_runtime.entities.provider_entities import ConfigurateMethod, ProviderEntity
 from models.base import TypeBase
 from models.provider import (
     LoadBalancingModelConfig,
@@ -141,6 +148,9 @@ class _FakeRedis:
     def expire(self, key: str, time: int) -> None:
         self.expirations[key] = time
 
+    def mget(self, keys: list[str]) -> list[str | None]:
+        return [self.store.get(key) for key in keys]
+
 
 @pytest.fixture
 def mock_provider_entity():
@@ -1319,3 +1329,105 @@ def test_get_all_provider_load_balancing_configs_populates_cache_and_groups_conf
     assert [record.provider_name for record in result["openai"]] == ["openai"]
     assert [record.provider_name for record in result["anthropic"]] == ["anthropic"]
     assert "other-provider" not in result
+
+
+@pytest.fixture
+def assembled_cache_redis() -> Iterator[_FakeRedis]:
+    fake_redis = _FakeRedis()
+    for source in ProviderConfigurationCacheSource:
+        fake_redis.set(f"provider_configurations:tenant:tenant-id:source:{source}:version", "0")
+    clear_assembled_provider_configurations_cache()
+    provider_configurations_cache_stats.reset()
+    with patch("core.provider_manager.redis_client", fake_redis):
+        yield fake_redis
+    clear_assembled_provider_configurations_cache()
+
+
+def _build_assembled_configurations(tenant_id: str) -> ProviderConfigurations:
+    provider_entity = ProviderEntity(
+        provider="langgenius/openai/openai",
+        label=I18nObject(en_US="OpenAI"),
+        supported_model_types=[ModelType.LLM],
+        configurate_methods=[ConfigurateMethod.PREDEFINED_MODEL],
+    )
+    configurations = ProviderConfigurations(tenant_id=tenant_id)
+    configurations["langgenius/openai/openai"] = ProviderConfiguration(
+        tenant_id=tenant_id,
+        provider=provider_entity,
+        preferred_provider_type=ProviderType.CUSTOM,
+        using_provider_type=ProviderType.CUSTOM,
+        system_configuration=SystemConfiguration(enabled=False),
+        custom_configuration=CustomConfiguration(
+            provider=CustomProviderConfiguration(credentials={"api_key": "secret"})
+        ),
+        model_settings=[],
+    )
+    return configurations
+
+
+@pytest.mark.usefixtures("assembled_cache_redis")
+def test_assembled_configurations_are_shared_across_managers_as_rebound_copies():
+    first_manager = _build_provider_manager()
+    second_manager = _build_provider_manager()
+
+    with patch.object(
+        ProviderManager, "_build_configurations", side_effect=_build_assembled_configurations
+    ) as mock_build:
+        first = first_manager.get_configurations("tenant-id")
+        second = second_manager.get_configurations("tenant-id")
+
+    mock_build.assert_called_once_with("tenant-id")
+    assert provider_configurations_cache_stats.snapshot() == {"hits": 1, "misses": 1}
+    first_configuration = first["openai"]
+    second_configuration = second["openai"]
+    assert first_configuration is not second_configuration
+    assert second_configuration.provider is first_configuration.provider
+    assert second_configuration.custom_configuration.provider is not None
+    assert second_configuration.custom_configuration.provider.credentials == {"api_key": "secret"}
+    assert second_configuration.custom_configuration is not first_configuration.custom_configuration
+    assert second_configuration._bound_model_runtime is second_manager._model_runtime
+
+
+def test_assembled_configurations_are_rebuilt_after_a_version_bump_or_ttl(
+    assembled_cache_redis: _FakeRedis, monkeypatch: pytest.MonkeyPatch, config_overrides
+):
+    with patch.object(
+        ProviderManager, "_build_configurations", side_effect=_build_assembled_configurations
+    ) as mock_build:
+        _build_provider_manager().get_configurations("tenant-id")
+        # Another process bumps a source version without touching this worker's cache.
+        assembled_cache_redis.incr(
+            "provider_configurations:tenant:tenant-id:source:provider_load_balancing_configs:version"
+        )
+        _build_provider_manager().get_configurations("tenant-id")
+        _build_provider_manager().get_configurations("tenant-id")
+        assert mock_build.call_count == 2
+
+        config_overrides(PROVIDER_CONFIGURATIONS_CACHE_TTL=1)
+        now = provider_manager_module.time.monotonic()
+        monkeypatch.setattr(provider_manager_module.time, "monotonic", lambda: now + 5)
+        _build_provider_manager().get_configurations("tenant-id")
+
+    assert mock_build.call_count == 3
+
+
+def test_assembled_configurations_cache_is_bypassed_without_redis_or_when_disabled(config_overrides):
+    clear_assembled_provider_configurations_cache()
+    failing_redis = MagicMock()
+    failing_redis.mget.side_effect = RuntimeError("redis down")
+
+    with (
+        patch("core.provider_manager.redis_client", failing_redis),
+        patch.object(
+            ProviderManager, "_build_configurations", side_effect=_build_assembled_configurations
+        ) as mock_build,
+    ):
+        _build_provider_manager().get_configurations("tenant-id")
+        _build_provider_manager().get_configurations("tenant-id")
+        assert mock_build.call_count == 2
+
+        config_overrides(PROVIDER_CONFIGURATIONS_CACHE_MAX_TENANTS=0)
+        _build_provider_manager().get_configurations("tenant-id")
+
+    assert mock_build.call_count == 3
+    assert failing_redis.mget.call_count == 2
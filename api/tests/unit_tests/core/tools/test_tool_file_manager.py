@@ -120,22 +120,26 @@ def test_create_file_by_url_downloads_and_persists_record(sqlite_tool_file_sessi
     manager = ToolFileManager()
     tenant_id = str(uuid4())
     response = Mock()
-    response.content = b"binary"
+    response.iter_bytes.return_value = iter([b"binary"])
     response.headers = {"Content-Type": "application/octet-stream"}
     response.raise_for_status.return_value = None
 
     with (
         patch("core.tools.tool_file_manager.storage") as storage,
         patch("core.tools.tool_file_manager.uuid4", return_value=UUID(int=0xDEF)),
-        patch("core.tools.tool_file_manager.remote_fetcher.make_request", return_value=response),
+        patch("core.tools.tool_file_manager.remote_fetcher.make_request", return_value=response) as make_request,
     ):
+        storage.save_stream.return_value = len(b"binary")
         file_model = manager.create_file_by_url(str(uuid4()), tenant_id, "https://example.com/f.bin", str(uuid4()))
 
     persisted = sqlite_tool_file_session.get(ToolFile, file_model.id)
     assert persisted is not None
     assert persisted.file_key == f"tools/{tenant_id}/{UUID(int=0xDEF).hex}.bin"
     assert persisted.original_url == "https://example.com/f.bin"
-    storage.save.assert_called_once_with(persisted.file_key, b"binary")
+    assert persisted.size == len(b"binary")
+    make_request.assert_called_once_with("GET", "https://example.com/f.bin", stream_response=True)
+    storage.save_stream.assert_called_once_with(persisted.file_key, response.iter_bytes.return_value)
+    response.close.assert_called_once()
 
 
 def test_create_file_by_url_prefers_url_extension_over_mimetype(
@@ -144,7 +148,7 @@ def test_create_file_by_url_prefers_url_extension_over_mimetype(
     manager = ToolFileManager()
     tenant_id = str(uuid4())
     response = Mock()
-    response.content = b"docx"
+    response.iter_bytes.return_value = iter([b"docx"])
     response.headers = {"Content-Type": "application/octet-stream"}
     response.raise_for_status.return_value = None
 
@@ -153,6 +157,7 @@ def test_create_file_by_url_prefers_url_extension_over_mimetype(
         patch("core.tools.tool_file_manager.uuid4", return_value=UUID(int=0xABC)),
         patch("core.tools.tool_file_manager.remote_fetcher.make_request", return_value=response),
     ):
+        storage.save_stream.return_value = len(b"docx")
         file_model = manager.create_file_by_url(
             str(uuid4()), tenant_id, "https://example.com/report.docx?download=1", str(uuid4())
         )
@@ -161,7 +166,7 @@ def test_create_file_by_url_prefers_url_extension_over_mimetype(
     assert persisted is not None
     assert persisted.file_key == f"tools/{tenant_id}/{UUID(int=0xABC).hex}.docx"
     assert persisted.name == f"{UUID(int=0xABC).hex}.docx"
-    storage.save.assert_called_once_with(persisted.file_key, b"docx")
+    storage.save_stream.assert_called_once_with(persisted.file_key, response.iter_bytes.return_value)
 
 
 def test_create_file_by_url_raises_on_timeout() -> None:
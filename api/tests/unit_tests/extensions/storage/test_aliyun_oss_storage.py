@@ -0,0 +1,52 @@
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import extensions.storage.aliyun_oss_storage as oss_module
+from extensions.storage.aliyun_oss_storage import AliyunOssStorage
+from extensions.storage.base_storage import iter_parts
+
+
+@pytest.fixture
+def storage(monkeypatch: pytest.MonkeyPatch) -> AliyunOssStorage:
+    monkeypatch.setattr(oss_module, "iter_parts", partial(iter_parts, part_size=4))
+    storage = AliyunOssStorage.__new__(AliyunOssStorage)
+    storage.folder = "dify"
+    storage.client = MagicMock()
+    storage.client.init_multipart_upload.return_value = SimpleNamespace(upload_id="upload-1")
+    storage.client.upload_part.side_effect = lambda _key, _upload_id, number, _part: SimpleNamespace(etag=f"e{number}")
+    return storage
+
+
+def test_save_stream_uploads_parts_and_completes(storage: AliyunOssStorage) -> None:
+    size = storage.save_stream("files/a.bin", iter([b"abc", b"defgh", b"ij"]))
+
+    assert size == 10
+    assert [c.args[2:] for c in storage.client.upload_part.call_args_list] == [
+        (1, b"abcd"),
+        (2, b"efgh"),
+        (3, b"ij"),
+    ]
+    key, upload_id, parts = storage.client.complete_multipart_upload.call_args.args
+    assert (key, upload_id) == ("dify/files/a.bin", "upload-1")
+    assert [(part.part_number, part.etag) for part in parts] == [(1, "e1"), (2, "e2"), (3, "e3")]
+    storage.client.put_object.assert_not_called()
+
+
+def test_save_stream_puts_single_part_streams(storage: AliyunOssStorage) -> None:
+    assert storage.save_stream("files/a.bin", iter([b"ab"])) == 2
+
+    storage.client.put_object.assert_called_once_with("dify/files/a.bin", b"ab")
+    storage.client.init_multipart_upload.assert_not_called()
+
+
+def test_save_stream_aborts_failed_uploads(storage: AliyunOssStorage) -> None:
+    storage.client.upload_part.side_effect = OSError("connection reset")
+
+    with pytest.raises(OSError):
+        storage.save_stream("files/a.bin", iter([b"abcdefgh"]))
+
+    storage.client.abort_multipart_upload.assert_called_once_with("dify/files/a.bin", "upload-1")
+    storage.client.complete_multipart_upload.assert_not_called()
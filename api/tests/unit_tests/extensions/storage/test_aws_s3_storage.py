@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock
 
 from extensions.storage.aws_s3_storage import AwsS3Storage
+from extensions.storage.base_storage import STREAM_PART_SIZE
 
 
 def test_generate_presigned_url() -> None:
@@ -25,3 +26,20 @@ def test_generate_presigned_url() -> None:
         },
         ExpiresIn=300,
     )
+
+
+def test_save_stream_uploads_file_object_in_parts() -> None:
+    storage = AwsS3Storage.__new__(AwsS3Storage)
+    storage.bucket_name = "test-bucket"
+    storage.client = MagicMock()
+    uploaded = []
+
+    def upload_fileobj(fileobj, bucket, key, **kwargs):
+        uploaded.append((bucket, key, fileobj.read(), kwargs["Config"].multipart_chunksize))
+
+    storage.client.upload_fileobj.side_effect = upload_fileobj
+
+    size = storage.save_stream("tools/tenant/file.bin", iter([b"ab", b"", b"cde"]))
+
+    assert size == 5
+    assert uploaded == [("test-bucket", "tools/tenant/file.bin", b"abcde", STREAM_PART_SIZE)]
@@ -0,0 +1,55 @@
+import io
+
+from extensions.storage.base_storage import BaseStorage, StreamReader, iter_parts, iter_stream
+
+
+class _MemoryStorage(BaseStorage):
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+
+    def save(self, filename: str, data: bytes) -> None:
+        self.files[filename] = data
+
+    def load_once(self, filename: str) -> bytes:
+        return self.files[filename]
+
+    def load_stream(self, filename: str):
+        yield self.files[filename]
+
+    def download(self, filename: str, target_filepath: str) -> None:
+        raise NotImplementedError
+
+    def exists(self, filename: str) -> bool:
+        return filename in self.files
+
+    def delete(self, filename: str) -> None:
+        self.files.pop(filename, None)
+
+
+def test_iter_stream_reads_iterables_and_file_objects() -> None:
+    assert list(iter_stream([b"a", b"", b"bc"])) == [b"a", b"bc"]
+    assert list(iter_stream(io.BytesIO(b"abcde"), chunk_size=2)) == [b"ab", b"cd", b"e"]
+
+
+def test_iter_parts_regroups_chunks_into_fixed_size_parts() -> None:
+    assert list(iter_parts([b"ab", b"cdefg", b"h"], part_size=3)) == [b"abc", b"def", b"gh"]
+    assert list(iter_parts([], part_size=3)) == []
+
+
+def test_stream_reader_tracks_position() -> None:
+    reader = StreamReader(iter([b"abc", b"defg"]))
+
+    assert reader.read(2) == b"ab"
+    assert reader.tell() == 2
+    assert reader.read() == b"cdefg"
+    assert reader.read(1) == b""
+    assert reader.bytes_read == 7
+
+
+def test_save_stream_falls_back_to_buffered_save() -> None:
+    storage = _MemoryStorage()
+
+    size = storage.save_stream("key", iter([b"hello ", b"world"]))
+
+    assert size == 11
+    assert storage.files == {"key": b"hello world"}
@@ -0,0 +1,164 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import extensions.storage.disk_cached_storage as disk_cached_storage_module
+from extensions.storage.base_storage import BaseStorage
+from extensions.storage.disk_cached_storage import DiskCachedStorage, storage_cache_stats
+
+
+class _MemoryStorage(BaseStorage):
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+        self.reads = 0
+        self.exists_calls = 0
+
+    def save(self, filename: str, data: bytes) -> None:
+        self.files[filename] = data
+
+    def load_once(self, filename: str) -> bytes:
+        self.reads += 1
+        return self.files[filename]
+
+    def load_stream(self, filename: str):
+        self.reads += 1
+        data = self.files[filename]
+        for offset in range(0, len(data), 4):
+            yield data[offset : offset + 4]
+
+    def download(self, filename: str, target_filepath: str) -> None:
+        self.reads += 1
+        Path(target_filepath).write_bytes(self.files[filename])
+
+    def exists(self, filename: str) -> bool:
+        self.exists_calls += 1
+        return filename in self.files
+
+    def delete(self, filename: str) -> None:
+        self.files.pop(filename, None)
+
+
+@pytest.fixture
+def backend() -> _MemoryStorage:
+    storage_cache_stats.reset()
+    return _MemoryStorage()
+
+
+def _cached(
+    backend: _MemoryStorage, cache_dir: Path, *, max_size: int = 1024, revalidate_after: float = 0
+) -> DiskCachedStorage:
+    return DiskCachedStorage(
+        backend,
+        backend="memory",
+        cache_dir=str(cache_dir),
+        max_size=max_size,
+        max_object_size=64,
+        key_prefixes=["upload_files/"],
+        revalidate_after=revalidate_after,
+    )
+
+
+def test_repeated_reads_are_served_from_disk(backend: _MemoryStorage, tmp_path: Path) -> None:
+    backend.files["upload_files/t/a.png"] = b"image bytes"
+    storage = _cached(backend, tmp_path)
+
+    assert storage.load_once("upload_files/t/a.png") == b"image bytes"
+    assert storage.load_once("upload_files/t/a.png") == b"image bytes"
+    assert b"".join(storage.load_stream("upload_files/t/a.png")) == b"image bytes"
+    storage.download("upload_files/t/a.png", str(tmp_path / "copy.png"))
+
+    assert backend.reads == 1
+    assert (tmp_path / "copy.png").read_bytes() == b"image bytes"
+    assert storage_cache_stats.snapshot() == {"memory": {"hits": 3, "misses": 1}}
+    assert storage_cache_stats.hit_rate("memory") == 0.75
+
+
+def test_streamed_misses_are_cached_once_fully_read(backend: _MemoryStorage, tmp_path: Path) -> None:
+    backend.files["upload_files/t/a.txt"] = b"0123456789"
+    storage = _cached(backend, tmp_path)
+
+    partial = storage.load_stream("upload_files/t/a.txt")
+    assert next(partial) == b"0123"
+    partial.close()
+    assert b"".join(storage.load_stream("upload_files/t/a.txt")) == b"0123456789"
+    assert storage.load_once("upload_files/t/a.txt") == b"0123456789"
+
+    assert backend.reads == 2
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+
+def test_writes_and_deletes_invalidate_entries(backend: _MemoryStorage, tmp_path: Path) -> None:
+    storage = _cached(backend, tmp_path)
+    storage.save("upload_files/t/a.txt", b"first")
+    assert storage.load_once("upload_files/t/a.txt") == b"first"
+
+    storage.save_stream("upload_files/t/a.txt", [b"sec", b"ond"])
+    assert storage.load_once("upload_files/t/a.txt") == b"second"
+
+    storage.delete("upload_files/t/a.txt")
+    assert not storage.exists("upload_files/t/a.txt")
+
+
+def test_objects_deleted_through_another_node_are_not_served(backend: _MemoryStorage, tmp_path: Path) -> None:
+    backend.files["upload_files/t/a.png"] = b"image bytes"
+    storage = _cached(backend, tmp_path)
+    storage.load_once("upload_files/t/a.png")
+
+    # another node deletes the object from the shared backend
+    del backend.files["upload_files/t/a.png"]
+
+    assert not storage.exists("upload_files/t/a.png")
+    with pytest.raises(KeyError):
+        storage.load_once("upload_files/t/a.png")
+    with pytest.raises(KeyError):
+        b"".join(storage.load_stream("upload_files/t/a.png"))
+    assert not os.path.exists(storage._entry_path("upload_files/t/a.png"))
+
+
+def test_hits_revalidate_at_most_once_per_interval(
+    backend: _MemoryStorage, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend.files["upload_files/t/a.png"] = b"image bytes"
+    storage = _cached(backend, tmp_path, revalidate_after=10)
+    now = 100.0
+    monkeypatch.setattr(disk_cached_storage_module.time, "monotonic", lambda: now)
+
+    storage.load_once("upload_files/t/a.png")
+    for _ in range(3):
+        storage.load_once("upload_files/t/a.png")
+    assert backend.exists_calls == 1
+
+    now = 111.0
+    storage.load_once("upload_files/t/a.png")
+    assert backend.exists_calls == 2
+    assert backend.reads == 1
+
+
+def test_other_keys_and_large_objects_bypass_the_cache(backend: _MemoryStorage, tmp_path: Path) -> None:
+    backend.files["keyword_files/t/d.txt"] = b"{}"
+    backend.files["upload_files/t/big.bin"] = b"x" * 65
+    storage = _cached(backend, tmp_path)
+
+    for _ in range(2):
+        storage.load_once("keyword_files/t/d.txt")
+        storage.load_once("upload_files/t/big.bin")
+
+    assert backend.reads == 4
+    assert storage_cache_stats.snapshot() == {"memory": {"hits": 0, "misses": 2}}
+
+
+def test_least_recently_used_entries_are_evicted(backend: _MemoryStorage, tmp_path: Path) -> None:
+    storage = _cached(backend, tmp_path, max_size=130)
+    for index in range(3):
+        backend.files[f"upload_files/t/{index}"] = bytes([index]) * 40
+        storage.load_once(f"upload_files/t/{index}")
+    # Recency is the modification time of the entries; set it rather than rely on its resolution.
+    for index, last_used in ((0, 10), (1, 1), (2, 2)):
+        os.utime(storage._entry_path(f"upload_files/t/{index}"), (last_used, last_used))
+
+    backend.files["upload_files/t/3"] = b"3" * 40
+    storage.load_once("upload_files/t/3")
+
+    cached = {index for index in range(4) if os.path.exists(storage._entry_path(f"upload_files/t/{index}"))}
+    assert cached == {0, 3}
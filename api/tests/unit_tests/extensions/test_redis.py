@@ -182,11 +182,13 @@ class TestRedisClientWrapperKeyPrefix:
         wrapper.hgetall("hash:key")
         wrapper.hkeys("hash:key")
         wrapper.hexists("hash:key", "field")
+        wrapper.hincrby("hash:key", "field", -1)
 
         mock_client.hset.assert_called_once_with("enterprise-a:hash:key", "field", "value")
         mock_client.hgetall.assert_called_once_with("enterprise-a:hash:key")
         mock_client.hkeys.assert_called_once_with("enterprise-a:hash:key")
         mock_client.hexists.assert_called_once_with("enterprise-a:hash:key", "field")
+        mock_client.hincrby.assert_called_once_with("enterprise-a:hash:key", "field", -1)
 
     def test_wrapper_zadd_prefixes_sorted_set_name(self, config_overrides):
         mock_client = MagicMock()
@@ -201,6 +203,26 @@ class TestRedisClientWrapperKeyPrefix:
         assert args == ("enterprise-a:zset:key", {"member": 1})
         assert kwargs["nx"] is False
 
+    def test_wrapper_sorted_set_reads_and_removals_prefix_key_name(self, config_overrides):
+        mock_client = MagicMock()
+        wrapper = RedisClientWrapper()
+        wrapper.initialize(mock_client)
+
+        config_overrides(REDIS_KEY_PREFIX="enterprise-a")
+        wrapper.zrange("zset:key", 0, 0, withscores=True)
+        wrapper.zrangebyscore("zset:key", "-inf", 10, start=0, num=5)
+        wrapper.zrem("zset:key", "a", "b")
+        wrapper.zincrby("zset:key", 1.5, "a")
+        wrapper.zscore("zset:key", "a")
+
+        mock_client.zrange.assert_called_once_with("enterprise-a:zset:key", 0, 0, withscores=True)
+        mock_client.zrangebyscore.assert_called_once_with(
+            "enterprise-a:zset:key", "-inf", 10, start=0, num=5, withscores=False
+        )
+        mock_client.zrem.assert_called_once_with("enterprise-a:zset:key", "a", "b")
+        mock_client.zincrby.assert_called_once_with("enterprise-a:zset:key", 1.5, "a")
+        mock_client.zscore.assert_called_once_with("enterprise-a:zset:key", "a")
+
     def test_wrapper_preserves_keys_when_prefix_is_empty(self, config_overrides):
         mock_client = MagicMock()
         wrapper = RedisClientWrapper()
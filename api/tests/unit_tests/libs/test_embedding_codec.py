@@ -0,0 +1,78 @@
+import base64
+import pickle
+
+import numpy as np
+import pytest
+
+from libs.embedding_codec import (
+    EmbeddingCodecError,
+    EmbeddingStorageDType,
+    decode_cached_query_embedding,
+    decode_compact_embedding,
+    decode_embedding,
+    encode_embedding,
+    is_compact_embedding,
+)
+
+
+class TestEncodeEmbedding:
+    def test_float32_payload_is_header_plus_four_bytes_per_dimension(self) -> None:
+        encoded = encode_embedding([0.1] * 1536)
+
+        assert is_compact_embedding(encoded)
+        assert len(encoded) == 10 + 1536 * 4
+        assert len(encoded) < len(pickle.dumps([0.1] * 1536, protocol=pickle.HIGHEST_PROTOCOL)) / 2
+
+    def test_float16_halves_the_payload(self) -> None:
+        float32 = encode_embedding([0.5] * 64, EmbeddingStorageDType.FLOAT32)
+        float16 = encode_embedding([0.5] * 64, "float16")
+
+        assert len(float16) - 10 == (len(float32) - 10) // 2
+        assert decode_embedding(float16).tolist() == [0.5] * 64
+
+    def test_rejects_multi_dimensional_input(self) -> None:
+        with pytest.raises(EmbeddingCodecError):
+            encode_embedding([[1.0, 2.0]])
+
+
+class TestDecodeEmbedding:
+    def test_round_trips_within_float32_precision(self) -> None:
+        vector = np.random.default_rng(0).standard_normal(256)
+
+        decoded = decode_embedding(encode_embedding(vector))
+
+        assert decoded.dtype == np.float32
+        assert decoded.tolist() == pytest.approx(vector.tolist(), rel=1e-6)
+
+    def test_reads_legacy_pickled_rows(self) -> None:
+        legacy = pickle.dumps([0.25, 0.5, 0.75], protocol=pickle.HIGHEST_PROTOCOL)
+
+        assert not is_compact_embedding(legacy)
+        assert decode_embedding(legacy).tolist() == [0.25, 0.5, 0.75]
+
+    def test_rejects_truncated_payloads(self) -> None:
+        encoded = encode_embedding([1.0, 2.0, 3.0])
+
+        with pytest.raises(EmbeddingCodecError):
+            decode_embedding(encoded[:-2])
+
+    def test_rejects_unknown_versions(self) -> None:
+        encoded = bytearray(encode_embedding([1.0]))
+        encoded[4] = 99
+
+        with pytest.raises(EmbeddingCodecError, match="version"):
+            decode_compact_embedding(bytes(encoded))
+
+    def test_compact_decoder_does_not_fall_back_to_pickle(self) -> None:
+        with pytest.raises(EmbeddingCodecError):
+            decode_compact_embedding(pickle.dumps([1.0]))
+
+
+class TestDecodeCachedQueryEmbedding:
+    def test_reads_compact_entries(self) -> None:
+        assert decode_cached_query_embedding(encode_embedding([1.0, 0.0])).tolist() == [1.0, 0.0]
+
+    def test_reads_legacy_base64_float64_entries(self) -> None:
+        legacy = base64.b64encode(np.array([0.125, 0.875]).tobytes())
+
+        assert decode_cached_query_embedding(legacy).tolist() == [0.125, 0.875]
@@ -22,6 +22,7 @@ from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from core.rag.entities import ParentMode
 from core.rag.index_processor.constant.index_type import IndexStructureType, IndexTechniqueType
 from extensions.storage.storage_type import StorageType
+from libs.embedding_codec import is_compact_embedding
 from models import dataset as dataset_module
 from models.account import Account
 from models.dataset import (
@@ -1254,13 +1255,13 @@ class TestEmbeddingStorage:
         retrieved_data = embedding.get_embedding()
 
         # Assert
-        assert retrieved_data == embedding_data
+        assert retrieved_data == pytest.approx(embedding_data, rel=1e-6)
         assert len(retrieved_data) == 5
-        assert retrieved_data[0] == 0.1
-        assert retrieved_data[4] == 0.5
+        assert retrieved_data[0] == pytest.approx(0.1, rel=1e-6)
+        assert retrieved_data[4] == pytest.approx(0.5, rel=1e-6)
 
-    def test_embedding_pickle_serialization(self):
-        """Test embedding data is properly pickled."""
+    def test_embedding_compact_serialization(self):
+        """Test embedding data is stored in the compact float32 format."""
         # Arrange
         embedding_data = [0.1, 0.2, 0.3]
         embedding = Embedding(
@@ -1274,11 +1275,21 @@ class TestEmbeddingStorage:
         embedding.set_embedding(embedding_data)
 
         # Assert
-        # Verify the embedding is stored as pickled binary data
         assert isinstance(embedding.embedding, bytes)
-        # Verify we can unpickle it
-        unpickled_data = pickle.loads(embedding.embedding)  # noqa: S301
-        assert unpickled_data == embedding_data
+        assert is_compact_embedding(embedding.embedding)
+        assert len(embedding.embedding) == 10 + 3 * 4
+
+    def test_embedding_reads_legacy_pickled_data(self):
+        """Test rows written before the compact format are still readable."""
+        embedding_data = [0.1, 0.2, 0.3]
+        embedding = Embedding(
+            model_name="text-embedding-ada-002",
+            hash="test_hash",
+            provider_name="openai",
+            embedding=pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+        assert embedding.get_embedding() == embedding_data
 
     def test_embedding_with_large_vector(self):
         """Test embedding with large dimension vector."""
@@ -0,0 +1,90 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from models.workflow import Workflow
+from models.workflow_graph import FrozenDict, FrozenList, WorkflowGraph, clear_workflow_graph_cache, thaw
+
+GRAPH = {
+    "nodes": [
+        {"id": "start", "data": {"type": "start", "title": "Start", "variables": [{"variable": "query"}]}},
+        {"id": "llm", "data": {"type": "llm", "title": "LLM", "model": {"provider": "openai"}}},
+    ],
+    "edges": [{"id": "e1", "source": "start", "target": "llm"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_workflow_graph_cache()
+    yield
+    clear_workflow_graph_cache()
+
+
+def _workflow(graph: dict, workflow_id: str = "workflow-1") -> Workflow:
+    workflow = Workflow()
+    workflow.id = workflow_id
+    workflow.graph = json.dumps(graph)
+    return workflow
+
+
+def test_graph_view_is_deeply_frozen_but_behaves_like_json() -> None:
+    view = _workflow(GRAPH).graph_view
+
+    assert view == GRAPH
+    assert isinstance(view["nodes"], list)
+    assert isinstance(view["nodes"][0]["data"], dict)
+    assert json.loads(json.dumps(view)) == GRAPH
+    with pytest.raises(TypeError):
+        view["nodes"].append({"id": "end"})
+    with pytest.raises(TypeError):
+        view["nodes"][1]["data"]["title"] = "Changed"
+    with pytest.raises(TypeError):
+        view.update(edges=[])
+
+
+def test_copies_of_a_frozen_graph_are_mutable() -> None:
+    view = _workflow(GRAPH).graph_view
+
+    for mutable in (thaw(view), copy.deepcopy(view)):
+        mutable["nodes"][1]["data"]["title"] = "Changed"
+        assert type(mutable["nodes"]) is list
+    shallow = copy.copy(view)
+    shallow["edges"] = []
+
+    assert view == GRAPH
+    assert isinstance(pickle.loads(pickle.dumps(view)), WorkflowGraph)  # noqa: S301
+
+
+def test_graph_view_is_shared_per_workflow_version() -> None:
+    first = _workflow(GRAPH).graph_view
+
+    assert _workflow(GRAPH).graph_view is first
+    assert _workflow(GRAPH, workflow_id="workflow-2").graph_view is not first
+
+    workflow = _workflow(GRAPH)
+    workflow.graph = json.dumps({**GRAPH, "edges": []})
+    assert workflow.graph_view["edges"] == []
+
+
+def test_node_lookups_use_the_node_index() -> None:
+    workflow = _workflow(GRAPH)
+
+    assert workflow.graph_view.get_node("llm") is workflow.graph_view["nodes"][1]
+    assert workflow.graph_view.get_node("missing") is None
+    assert workflow.get_node_config_by_id("llm")["id"] == "llm"
+    assert workflow.user_input_form() == [{"variable": "query"}]
+    assert type(workflow.user_input_form()) is list
+
+
+def test_graph_dict_stays_a_private_mutable_copy() -> None:
+    workflow = _workflow(GRAPH)
+
+    graph = workflow.graph_dict
+    graph["nodes"].clear()
+
+    assert workflow.graph_view == GRAPH
+    assert not isinstance(workflow.graph_dict, FrozenDict)
+    assert not isinstance(workflow.graph_dict["nodes"], FrozenList)
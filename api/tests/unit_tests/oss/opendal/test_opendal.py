@@ -1,3 +1,4 @@
+import io
 from collections.abc import Generator
 from pathlib import Path
 
@@ -86,3 +87,16 @@ class TestOpenDAL:
 
         self.storage.delete(filename)
         assert not self.storage.exists(filename)
+
+    def test_save_stream(self):
+        """Test saving data from an iterator and from a file object."""
+        filename = get_example_filename()
+        data = get_example_data(length=4096 * 3)
+
+        size = self.storage.save_stream(filename, (data[i : i + 1000] for i in range(0, len(data), 1000)))
+        assert size == len(data)
+        assert self.storage.load_once(filename) == data
+
+        size = self.storage.save_stream(filename, io.BytesIO(data[:100]))
+        assert size == 100
+        assert self.storage.load_once(filename) == data[:100]
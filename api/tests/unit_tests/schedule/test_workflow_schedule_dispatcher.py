@@ -0,0 +1,221 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from operator import itemgetter
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import LockError
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+import schedule.workflow_schedule_dispatcher as dispatcher_module
+import schedule.workflow_schedule_task as schedule_task_module
+import services.trigger.schedule_timer_index as timer_index_module
+from libs.datetime_utils import naive_utc_now
+from models.trigger import AppTrigger, AppTriggerStatus, AppTriggerType, WorkflowSchedulePlan
+from schedule.workflow_schedule_dispatcher import WorkflowScheduleDispatcher
+from services.trigger.schedule_timer_index import SCHEDULE_TIMER_INDEX_KEY, ScheduleTimerIndex
+
+
+class _FakeLock:
+    def __init__(self) -> None:
+        self.held_by_other = False
+        self.owned = False
+
+    def acquire(self, **_: bool) -> bool:
+        if self.held_by_other:
+            return False
+        self.owned = True
+        return True
+
+    def reacquire(self) -> None:
+        if not self.owned:
+            raise LockError("not owned")
+
+    def release(self) -> None:
+        self.owned = False
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+        self.leader_lock = _FakeLock()
+
+    def zadd(self, name: str, mapping: dict[str, float]) -> None:
+        self.sorted_sets.setdefault(name, {}).update(mapping)
+
+    def zrem(self, name: str, *values: str) -> None:
+        for value in values:
+            self.sorted_sets.get(name, {}).pop(value, None)
+
+    def _sorted(self, name: str) -> list[tuple[str, float]]:
+        return sorted(self.sorted_sets.get(name, {}).items(), key=itemgetter(1, 0))
+
+    def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> list:
+        items = self._sorted(name)
+        items = items[start:] if end == -1 else items[start : end + 1]
+        return [(member.encode(), score) if withscores else member.encode() for member, score in items]
+
+    def zrangebyscore(self, name: str, _min: str, max: float, start: int = 0, num: int = -1) -> list[bytes]:
+        items = [member.encode() for member, score in self._sorted(name) if score <= max]
+        return items[start : start + num]
+
+    def lock(self, _name: str, **_: object) -> _FakeLock:
+        return self.leader_lock
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch, config_overrides) -> _FakeRedis:
+    config_overrides(ENABLE_WORKFLOW_SCHEDULE_DISPATCHER=True, WORKFLOW_SCHEDULE_DISPATCHER_MAX_WAIT=5.0)
+    redis = _FakeRedis()
+    monkeypatch.setattr(timer_index_module, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def dispatched(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    schedule_ids: list[str] = []
+
+    def group(signatures: Iterator[SimpleNamespace]) -> SimpleNamespace:
+        return SimpleNamespace(apply_async=lambda **_: schedule_ids.extend(s.args[0] for s in signatures))
+
+    @contextmanager
+    def producer_or_acquire() -> Iterator[None]:
+        yield None
+
+    monkeypatch.setattr(schedule_task_module, "group", group)
+    monkeypatch.setattr(dispatcher_module, "current_app", SimpleNamespace(producer_or_acquire=producer_or_acquire))
+    return schedule_ids
+
+
+@pytest.fixture
+def dispatcher(
+    monkeypatch: pytest.MonkeyPatch, sqlite_engine: Engine, fake_redis: _FakeRedis
+) -> WorkflowScheduleDispatcher:
+    monkeypatch.setattr(dispatcher_module, "redis_client", fake_redis)
+    monkeypatch.setattr(dispatcher_module, "db", SimpleNamespace(engine=sqlite_engine))
+    return WorkflowScheduleDispatcher()
+
+
+def _add_plan(
+    session_factory: sessionmaker[Session],
+    node_id: str,
+    minutes_from_now: float,
+    status: AppTriggerStatus = AppTriggerStatus.ENABLED,
+) -> str:
+    with session_factory() as session:
+        session.add(
+            AppTrigger(
+                tenant_id="tenant-1",
+                app_id="app-1",
+                node_id=node_id,
+                trigger_type=AppTriggerType.TRIGGER_SCHEDULE,
+                title="Schedule",
+                status=status,
+            )
+        )
+        plan = WorkflowSchedulePlan(
+            app_id="app-1",
+            node_id=node_id,
+            tenant_id="tenant-1",
+            cron_expression="0 * * * *",
+            timezone="UTC",
+            next_run_at=naive_utc_now() + timedelta(minutes=minutes_from_now),
+        )
+        session.add(plan)
+        session.commit()
+        return plan.id
+
+
+def test_tick_dispatches_only_due_plans_and_waits_for_the_next_one(
+    dispatcher: WorkflowScheduleDispatcher,
+    fake_redis: _FakeRedis,
+    dispatched: list[str],
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    due_id = _add_plan(sqlite_session_factory, "due", -1)
+    later_id = _add_plan(sqlite_session_factory, "later", 10 / 60)
+    disabled_id = _add_plan(sqlite_session_factory, "disabled", -1, AppTriggerStatus.DISABLED)
+
+    wait = dispatcher.tick()
+
+    assert dispatched == [due_id]
+    index = fake_redis.sorted_sets[SCHEDULE_TIMER_INDEX_KEY]
+    assert set(index) == {due_id, later_id}
+    assert disabled_id not in index
+    with sqlite_session_factory() as session:
+        plan = session.get(WorkflowSchedulePlan, due_id)
+        assert plan is not None
+        assert plan.next_run_at is not None
+        assert plan.next_run_at > naive_utc_now()
+    assert wait == 5.0
+
+    # The next tick dispatches nothing new because the re-indexed plan is not due yet.
+    dispatcher.tick()
+    assert dispatched == [due_id]
+
+
+def test_due_ids_that_no_longer_run_are_dropped_from_the_index(
+    dispatcher: WorkflowScheduleDispatcher,
+    fake_redis: _FakeRedis,
+    dispatched: list[str],
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    dispatcher.reconcile()
+    later_id = _add_plan(sqlite_session_factory, "later", 30)
+    fake_redis.zadd(SCHEDULE_TIMER_INDEX_KEY, {"deleted-plan": 0.0, later_id: 0.0})
+
+    assert dispatcher.dispatch_due() == 0
+
+    assert dispatched == []
+    index = fake_redis.sorted_sets[SCHEDULE_TIMER_INDEX_KEY]
+    assert set(index) == {later_id}
+    assert index[later_id] > 0
+
+
+def test_only_the_leader_dispatches(
+    dispatcher: WorkflowScheduleDispatcher,
+    fake_redis: _FakeRedis,
+    dispatched: list[str],
+    sqlite_session_factory: sessionmaker[Session],
+) -> None:
+    _add_plan(sqlite_session_factory, "due", -1)
+    fake_redis.leader_lock.held_by_other = True
+
+    assert dispatcher.tick() == 5.0
+    assert dispatched == []
+    assert SCHEDULE_TIMER_INDEX_KEY not in fake_redis.sorted_sets
+
+    fake_redis.leader_lock.held_by_other = False
+    dispatcher.tick()
+    assert len(dispatched) == 1
+
+
+def test_sync_is_a_no_op_when_the_dispatcher_is_disabled(fake_redis: _FakeRedis, config_overrides) -> None:
+    config_overrides(ENABLE_WORKFLOW_SCHEDULE_DISPATCHER=False)
+
+    ScheduleTimerIndex.sync({"plan-1": naive_utc_now()})
+
+    assert fake_redis.sorted_sets == {}
+
+
+def test_sync_after_commit_waits_for_the_commit(fake_redis: _FakeRedis, sqlite_session: Session) -> None:
+    next_run_at = naive_utc_now()
+
+    ScheduleTimerIndex.sync_after_commit(sqlite_session, {"plan-1": next_run_at, "plan-2": next_run_at})
+    ScheduleTimerIndex.sync_after_commit(sqlite_session, {"plan-2": None})
+    assert fake_redis.sorted_sets == {}
+
+    sqlite_session.commit()
+
+    assert set(fake_redis.sorted_sets[SCHEDULE_TIMER_INDEX_KEY]) == {"plan-1"}
+
+
+def test_sync_after_commit_drops_updates_on_rollback(fake_redis: _FakeRedis, sqlite_session: Session) -> None:
+    sqlite_session.execute(select(1))
+    ScheduleTimerIndex.sync_after_commit(sqlite_session, {"plan-1": naive_utc_now()})
+    sqlite_session.rollback()
+    sqlite_session.commit()
+
+    assert fake_redis.sorted_sets.get(SCHEDULE_TIMER_INDEX_KEY, {}) == {}
@@ -303,3 +303,31 @@ def test_process_trace_tasks_deletes_payload_and_counts_exhausted_retryable_disp
     mock_retry.assert_not_called()
     mock_delete.assert_called_once_with("ops_trace/app-id/file-id.json")
     mock_incr.assert_called_once_with(f"{OPS_TRACE_FAILED_KEY}_app-id")
+
+
+def test_process_trace_tasks_dispatches_batch_and_keeps_only_retryable_traces():
+    file_info = {"app_id": "app-id", "file_id": "file-id"}
+    traces = [{"trace_info": {"index": index}, "trace_info_type": None} for index in range(3)]
+    trace_instance = MagicMock()
+    pending_error = _retryable_dispatch_error()
+    trace_instance.trace.side_effect = [None, pending_error, RuntimeError("trace failed")]
+
+    with (
+        patch.dict(sys.modules, _install_trace_manager(trace_instance)),
+        patch("tasks.ops_trace_task.current_app", FakeCurrentApp()),
+        patch("tasks.ops_trace_task.storage.load", return_value=json.dumps({"app_id": "app-id", "traces": traces})),
+        patch("tasks.ops_trace_task.storage.save") as mock_save,
+        patch("tasks.ops_trace_task.storage.delete") as mock_delete,
+        patch("tasks.ops_trace_task.redis_client.incr") as mock_incr,
+        patch.object(process_trace_tasks, "retry", side_effect=Retry()) as mock_retry,
+        pytest.raises(Retry),
+    ):
+        _run_task(file_info)
+
+    assert [call.args[0] for call in trace_instance.trace.call_args_list] == [{"index": 0}, {"index": 1}, {"index": 2}]
+    saved_path, saved_payload = mock_save.call_args.args
+    assert saved_path == "ops_trace/app-id/file-id.json"
+    assert _decode_saved_payload(saved_payload)["traces"] == [traces[1]]
+    mock_retry.assert_called_once_with(exc=pending_error, countdown=process_trace_tasks.default_retry_delay)
+    mock_delete.assert_not_called()
+    mock_incr.assert_called_once_with(f"{OPS_TRACE_FAILED_KEY}_app-id")
@@ -0,0 +1,232 @@
+import time
+from operator import itemgetter
+from unittest.mock import Mock
+
+import pytest
+from redis import RedisError
+
+import tasks.async_workflow_tasks as async_workflow_tasks_module
+import tasks.workflow_cfs_scheduler.run_queue as run_queue_module
+from services.workflow.entities import WorkflowScheduleCFSPlanEntity
+from services.workflow.scheduler import SchedulerCommand
+from tasks.workflow_cfs_scheduler.cfs_scheduler import (
+    AsyncWorkflowCFSPlanEntity,
+    AsyncWorkflowCFSPlanScheduler,
+    SchedulerDecision,
+    cfs_scheduler_stats,
+)
+from tasks.workflow_cfs_scheduler.entities import AsyncWorkflowQueue, resolve_async_workflow_queue
+from tasks.workflow_cfs_scheduler.run_queue import TenantRunQueue
+
+QUEUE = AsyncWorkflowQueue.TEAM_QUEUE
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+
+    def zadd(self, name: str, mapping: dict[str, float], nx: bool = False) -> None:
+        members = self.sorted_sets.setdefault(name, {})
+        for member, score in mapping.items():
+            if not (nx and member in members):
+                members[member] = score
+
+    def zincrby(self, name: str, amount: float, value: str) -> float:
+        members = self.sorted_sets.setdefault(name, {})
+        members[value] = members.get(value, 0.0) + amount
+        return members[value]
+
+    def zscore(self, name: str, value: str) -> float | None:
+        return self.sorted_sets.get(name, {}).get(value)
+
+    def zrem(self, name: str, *values: bytes) -> None:
+        for value in values:
+            self.sorted_sets.get(name, {}).pop(value.decode(), None)
+
+    def _sorted(self, name: str) -> list[tuple[str, float]]:
+        return sorted(self.sorted_sets.get(name, {}).items(), key=itemgetter(1, 0))
+
+    def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> list:
+        items = self._sorted(name)[start : end + 1]
+        return [(member.encode(), score) if withscores else member.encode() for member, score in items]
+
+    def zrangebyscore(self, name: str, _min: str, max: float, withscores: bool = False) -> list:
+        items = [(member, score) for member, score in self._sorted(name) if score <= max]
+        return [(member.encode(), score) if withscores else member.encode() for member, score in items]
+
+    def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        fields = self.hashes.setdefault(name, {})
+        fields[key] = fields.get(key, 0) + amount
+        return fields[key]
+
+    def hdel(self, name: str, *keys: str | bytes) -> None:
+        for key in keys:
+            self.hashes.get(name, {}).pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def hgetall(self, name: str) -> dict[bytes, bytes]:
+        return {key.encode(): str(value).encode() for key, value in self.hashes.get(name, {}).items()}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch, config_overrides) -> _FakeRedis:
+    config_overrides(ASYNC_WORKFLOW_CFS_ENABLED=True, ASYNC_WORKFLOW_CFS_IDLE_TIMEOUT=3600)
+    redis = _FakeRedis()
+    monkeypatch.setattr(run_queue_module, "redis_client", redis)
+    cfs_scheduler_stats.reset()
+    return redis
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+def _scheduler(tenant_id: str, granularity: int = 60) -> AsyncWorkflowCFSPlanScheduler:
+    plan = AsyncWorkflowCFSPlanEntity(
+        queue=QUEUE,
+        schedule_strategy=WorkflowScheduleCFSPlanEntity.Strategy.TimeSlice,
+        granularity=granularity,
+        tenant_id=tenant_id,
+    )
+    return AsyncWorkflowCFSPlanScheduler(plan=plan)
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_tenants_join_at_the_lowest_virtual_runtime() -> None:
+    run_queue = TenantRunQueue(QUEUE)
+    run_queue.enqueue("flood")
+    run_queue.charge("flood", 500)
+    run_queue.enqueue("quiet")
+
+    assert run_queue.charge("quiet", 0) == 500
+    assert run_queue.charge("flood", 10) == 510
+    # only tenants that are behind and waiting hold the others back
+    assert run_queue.lag("flood") == 10
+    assert run_queue.lag("quiet") == 0
+
+
+def test_idle_tenants_leave_the_run_queue(fake_redis: _FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    run_queue = TenantRunQueue(QUEUE)
+    run_queue.enqueue("crashed")
+    run_queue.enqueue("flood")
+    run_queue.charge("flood", 500)
+
+    assert run_queue.lag("flood") == 500
+
+    later = time.time() + 7200
+    monkeypatch.setattr(run_queue_module.time, "time", lambda: later)
+    run_queue.touch("flood")
+
+    assert run_queue.lag("flood") == 0
+    assert "crashed" not in fake_redis.sorted_sets[run_queue._vruntime_key]
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_runs_over_their_fair_share_are_deferred_then_preempted(clock: _Clock) -> None:
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "flood")
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "flood")
+    first = _scheduler("flood")
+    second = _scheduler("flood")
+    assert first.admit() == SchedulerCommand.NONE
+    assert second.admit() == SchedulerCommand.NONE
+
+    # nobody else is waiting: the tenant keeps every worker it can get
+    clock.now += 300
+    assert first.can_schedule() == SchedulerCommand.NONE
+
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "quiet")
+    clock.now += 60
+    assert first.can_schedule() == SchedulerCommand.NONE
+    assert second.can_schedule() == SchedulerCommand.RESOURCE_LIMIT_REACHED
+
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "flood")
+    assert _scheduler("flood").admit() == SchedulerCommand.RESOURCE_LIMIT_REACHED
+    quiet = _scheduler("quiet")
+    assert quiet.admit() == SchedulerCommand.NONE
+
+    assert cfs_scheduler_stats.snapshot()[QUEUE] == {
+        SchedulerDecision.ADMITTED: 3,
+        SchedulerDecision.PREEMPTED: 1,
+        SchedulerDecision.DEFERRED: 1,
+    }
+    assert cfs_scheduler_stats.preemption_rate(QUEUE) == pytest.approx(1 / 3)
+
+
+def test_preempted_runs_are_requeued_on_their_queue(
+    fake_redis: _FakeRedis, clock: _Clock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    apply_async = Mock()
+    monkeypatch.setattr(async_workflow_tasks_module.resume_workflow_execution, "apply_async", apply_async)
+    scheduler = _scheduler("flood")
+    scheduler.admit()
+
+    clock.now += 30
+    scheduler.on_run_end("run-1")
+
+    apply_async.assert_called_once_with(
+        args=[{"workflow_run_id": "run-1", "preempted": True}], queue=QUEUE, countdown=60
+    )
+    assert fake_redis.hashes[scheduler._run_queue._waiting_key] == {"flood": 1}
+    assert fake_redis.sorted_sets[scheduler._run_queue._vruntime_key]["flood"] == 30
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_runs_that_were_never_queued_do_not_take_a_waiting_slot(clock: _Clock) -> None:
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "flood")
+    AsyncWorkflowCFSPlanScheduler.record_queued(QUEUE, "quiet")
+    run_queue = TenantRunQueue(QUEUE)
+    run_queue.charge("flood", 500)
+    human_input_resume = _scheduler("flood")
+
+    assert human_input_resume.admit(queued=False) == SchedulerCommand.NONE
+    assert _scheduler("flood").admit() == SchedulerCommand.RESOURCE_LIMIT_REACHED
+
+    clock.now += 30
+    human_input_resume.on_run_end()
+
+    assert run_queue.lag("flood") == 530
+    assert SchedulerDecision.ADMITTED not in cfs_scheduler_stats.snapshot().get(QUEUE, {})
+
+
+def test_scheduler_fails_open_without_redis(fake_redis: _FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(fake_redis, "zscore", Mock(side_effect=RedisError("down")))
+    scheduler = _scheduler("flood")
+
+    assert scheduler.admit() == SchedulerCommand.NONE
+    assert scheduler.can_schedule() == SchedulerCommand.NONE
+
+
+def test_legacy_policy_when_disabled(config_overrides) -> None:
+    config_overrides(ASYNC_WORKFLOW_CFS_ENABLED=False)
+    plan = AsyncWorkflowCFSPlanEntity(
+        queue=AsyncWorkflowQueue.SANDBOX_QUEUE,
+        schedule_strategy=WorkflowScheduleCFSPlanEntity.Strategy.TimeSlice,
+        granularity=60,
+        tenant_id="tenant",
+    )
+    scheduler = AsyncWorkflowCFSPlanScheduler(plan=plan)
+
+    assert scheduler.admit() == SchedulerCommand.NONE
+    expected = (
+        SchedulerCommand.NONE
+        if AsyncWorkflowQueue.SANDBOX_QUEUE == AsyncWorkflowQueue.TEAM_QUEUE
+        else SchedulerCommand.RESOURCE_LIMIT_REACHED
+    )
+    assert scheduler.can_schedule() == expected
+
+
+def test_trigger_log_queue_names_map_to_edition_queues() -> None:
+    assert resolve_async_workflow_queue("workflow_professional") == AsyncWorkflowQueue.PROFESSIONAL_QUEUE
+    assert resolve_async_workflow_queue("workflow_team") == AsyncWorkflowQueue.TEAM_QUEUE
+    assert resolve_async_workflow_queue("unknown") == AsyncWorkflowQueue.SANDBOX_QUEUE
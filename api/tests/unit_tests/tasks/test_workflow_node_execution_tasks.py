@@ -0,0 +1,79 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+import tasks.workflow_node_execution_tasks as node_execution_tasks
+from graphon.entities import WorkflowNodeExecution
+from graphon.enums import WorkflowNodeExecutionStatus
+from models.workflow import WorkflowNodeExecutionModel
+from tasks.workflow_node_execution_tasks import (
+    decode_node_execution_batch,
+    encode_node_execution_batch,
+    save_workflow_node_executions_task,
+)
+
+
+def _execution(execution_id: str, status: WorkflowNodeExecutionStatus) -> WorkflowNodeExecution:
+    return WorkflowNodeExecution(
+        id=execution_id,
+        workflow_id="workflow-1",
+        workflow_execution_id="run-1",
+        node_id=f"node-{execution_id}",
+        node_type="llm",
+        title="LLM",
+        index=1,
+        inputs={"query": "hello"},
+        outputs={"text": "world"} if status == WorkflowNodeExecutionStatus.SUCCEEDED else None,
+        status=status,
+        created_at=datetime.now(UTC).replace(tzinfo=None),
+    )
+
+
+def _run_task(payload: str) -> bool:
+    save_workflow_node_executions_task.push_request(retries=0)
+    try:
+        return save_workflow_node_executions_task.run(
+            payload=payload,
+            tenant_id="tenant-1",
+            app_id="app-1",
+            triggered_from="workflow-run",
+            creator_user_id="user-1",
+            creator_user_role="account",
+        )
+    finally:
+        save_workflow_node_executions_task.pop_request()
+
+
+def test_batch_payload_round_trips_executions() -> None:
+    executions = [
+        _execution("execution-1", WorkflowNodeExecutionStatus.RUNNING),
+        _execution("execution-2", WorkflowNodeExecutionStatus.SUCCEEDED),
+    ]
+
+    payload = encode_node_execution_batch([execution.model_dump_json() for execution in executions])
+
+    assert decode_node_execution_batch(payload) == executions
+
+
+def test_batch_task_creates_and_updates_rows_in_one_transaction(
+    monkeypatch: pytest.MonkeyPatch, sqlite_session_factory: sessionmaker[Session]
+) -> None:
+    monkeypatch.setattr(node_execution_tasks, "session_factory", SimpleNamespace(create_session=sqlite_session_factory))
+    running = _execution("execution-1", WorkflowNodeExecutionStatus.RUNNING)
+    assert _run_task(encode_node_execution_batch([running.model_dump_json()]))
+
+    finished = _execution("execution-1", WorkflowNodeExecutionStatus.SUCCEEDED)
+    started = _execution("execution-2", WorkflowNodeExecutionStatus.RUNNING)
+    assert _run_task(encode_node_execution_batch([finished.model_dump_json(), started.model_dump_json()]))
+
+    with sqlite_session_factory() as session:
+        rows = session.scalars(select(WorkflowNodeExecutionModel).order_by(WorkflowNodeExecutionModel.id)).all()
+        assert [(row.id, row.status) for row in rows] == [
+            ("execution-1", WorkflowNodeExecutionStatus.SUCCEEDED),
+            ("execution-2", WorkflowNodeExecutionStatus.RUNNING),
+        ]
+        assert rows[0].outputs_dict == {"text": "world"}
+        assert rows[1].tenant_id == "tenant-1"